@@ -96,6 +96,18 @@ if not DEMO_ACCOUNT_EMAIL:
 
 MAX_DEMO_ACCOUNT_FILE_PROCESSING_COUNT = int(os.getenv("MAX_DEMO_ACCOUNT_FILE_PROCESSING_COUNT", 3))
 
+# * Memory budget for the NLP models of each worker process, least recently used models are evicted above it. Unset means no limit
+MODEL_MEMORY_BUDGET_MB: int | None = int(os.getenv("MODEL_MEMORY_BUDGET_MB")) if os.getenv("MODEL_MEMORY_BUDGET_MB") else None
+
+# * How ClinicalTrial.run_all runs the modules of a document: "serial", "threads" or "processes"
+# * "processes" needs Celery workers that may start child processes, e.g. the threads or solo pool
+RUN_EXECUTION_MODE = cast(Literal["serial", "threads", "processes"], os.getenv("RUN_EXECUTION_MODE", "threads"))
+RUN_MAX_WORKERS: int | None = int(os.getenv("RUN_MAX_WORKERS")) if os.getenv("RUN_MAX_WORKERS") else None
+
+# * Seconds of the task time limit kept for annotating the pdf and creating the report after the modules have run. The
+# * rest is the time budget of ClinicalTrial.run_all, which degrades or skips the slow modules to stay within it
+RUN_TIME_RESERVE_SECONDS = int(os.getenv("RUN_TIME_RESERVE_SECONDS", "60"))
+
 WKHTMLTOPDF_PATH = os.getenv("WKHTMLTOPDF_PATH", "/usr/bin/wkhtmltopdf")
 
 # * DNS for the current server
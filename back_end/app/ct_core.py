@@ -1,4 +1,6 @@
+import json
 import pathlib
+import time
 from contextlib import contextmanager
 from datetime import UTC, datetime, timedelta
 from typing import Any, cast
@@ -6,21 +8,21 @@ from typing import Any, cast
 import numpy as np
 from celery.signals import worker_process_init
 
+from app.ct_utils import map_document_parser_response_to_ct_document
 from app.helpers import create_analysis_report_data_and_upload_to_storage, extract_logs_for_analysis_report
 from app.models.document.repo import get_a_document_by_id
 from app.models.user.base import User
 from app.models.weight_profile.repo import get_a_weight_profile_for_user_or_default
 from app.services.storage_provider import StorageProvider
-from app.utils import get_file_extension, remove_file_extension
+from app.utils import calculate_processing_time_limit, get_file_extension, get_number_of_pages_from_pdf, remove_file_extension
 from clinicaltrials.schemas import WeightProfileBase
 from clinicaltrials.transform import create_rac_nodes
 
 try:
     # * Try importing the package normally
-    from clinicaltrials.core import ClassifierConfig, ClinicalTrial
+    from clinicaltrials.core import CancellationToken, ClassifierConfig, ClinicalTrial, EventData, RunCancelledError
     from clinicaltrials.core import Document as CTDocument
-    from clinicaltrials.core import Page as CTPage
-    from clinicaltrials.model_store import initialize_models
+    from clinicaltrials.model_store import get_model_sizes, initialize_models, set_memory_budget
 except ImportError:
     # * If it fails, append the local source directory to sys.path
     # * Use packaged core lib or installed through package manager
@@ -29,10 +31,9 @@ except ImportError:
     this_folder = pathlib.Path(__file__).parent.resolve()
     sys.path.append(f"{this_folder}/../clinical_trials_core/src")
 
-    from clinicaltrials.core import ClassifierConfig, ClinicalTrial
+    from clinicaltrials.core import CancellationToken, ClassifierConfig, ClinicalTrial, EventData, RunCancelledError
     from clinicaltrials.core import Document as CTDocument
-    from clinicaltrials.core import Page as CTPage
-    from clinicaltrials.model_store import initialize_models
+    from clinicaltrials.model_store import get_model_sizes, initialize_models, set_memory_budget
 
 from redis import Redis
 from sqlmodel import Session as SQLModelSession
@@ -42,13 +43,51 @@ from app import config
 from app.celery_config import celery
 from app.database import engine
 from app.grpc_client.document_parser import process_document
-from app.grpc_client.document_parser.DocumentParser_pb2 import DocumentParserResponse
 from app.log_config import logger
 from app.models.user.user_resource_usage import UserResourceUsage, UserResourceUsageStatus
 from app.models.vm import DocumentQueueItem
 
 redis = Redis.from_url(config.REDIS_ENDPOINT)
 
+# * One ClinicalTrial per worker process, its processors and their models are reused across documents
+worker_ct: ClinicalTrial | None = None
+
+
+class RedisCancellationToken(CancellationToken):
+    """
+    Cancellation token of a document run, cancelled through the API by setting `run_log:{document_id}_cancel` in Redis.
+    The processors check the token after every page, so Redis is only asked every `poll_interval` seconds.
+    """
+
+    def __init__(self, document_id: int, poll_interval: float = 0.5) -> None:
+        super().__init__()
+
+        self.__key = f"run_log:{document_id}_cancel"
+        self.__poll_interval = poll_interval
+        self.__polled_at = 0.0
+
+    def is_cancelled(self) -> bool:
+        if not super().is_cancelled() and time.time() - self.__polled_at >= self.__poll_interval:
+            self.__polled_at = time.time()
+            if redis.exists(self.__key):
+                self.cancel()
+
+        return super().is_cancelled()
+
+
+def mark_document_process_cancelled(session: SQLModelSession, document: DocumentQueueItem) -> None:
+    logger.info(f"Document process cancelled {document.document_id}::{document.user_id}")
+
+    # * There is no record left if the run was cancelled because the document was deleted
+    user_resource_usage = session.exec(select(UserResourceUsage).where(UserResourceUsage.resource_id == document.document_id)).first()
+    if user_resource_usage is not None:
+        user_resource_usage.status = UserResourceUsageStatus.CANCELLED
+        user_resource_usage.end_time = datetime.now(UTC)
+        session.add(user_resource_usage)
+        session.commit()
+
+    redis.delete(f"run_log:{document.document_id}_cancel")
+
 
 @contextmanager
 def session_scope():
@@ -63,14 +102,6 @@ def session_scope():
         session.close()
 
 
-def map_document_parser_response_to_ct_document(data: DocumentParserResponse) -> CTDocument:
-    pages_list = [CTPage(page_number=key, content=value) for key, value in data.pages.items()]
-
-    metadata = data.metadata if isinstance(data.metadata, dict) else None
-
-    return CTDocument(pages=pages_list, metadata=metadata)
-
-
 def transform_keys(data: dict):
     transformed_dict = {}
     for key, value in data.items():
@@ -110,11 +141,29 @@ def convert_set_to_list(object: dict | list | set | Any) -> dict[Any, Any] | lis
     return object
 
 
+def get_worker_clinical_trial() -> ClinicalTrial:
+    global worker_ct
+
+    if worker_ct is None:
+        worker_ct = ClinicalTrial()
+
+    return worker_ct
+
+
 @worker_process_init.connect
 def at_start(sender=None, **kwargs):
     logger.info("Loading models...")
+    if config.MODEL_MEMORY_BUDGET_MB is not None:
+        set_memory_budget(memory_budget=config.MODEL_MEMORY_BUDGET_MB * 1024 * 1024)
     initialize_models(path_to_classifier=ClassifierConfig().classifier_storage_path)
 
+    for model_name, model_size in get_model_sizes().items():
+        logger.info(f"Model {model_name} resident size {model_size / 1024 / 1024:.1f} MB")
+
+    logger.info("Warming up processors...")
+    load_times = get_worker_clinical_trial().warm_up()
+    logger.info(f"Processors warmed up in {sum(load_times.values())} seconds")
+
 
 @celery.task
 def reconcile_document_processing():
@@ -150,13 +199,23 @@ def init_document_process(document_dict: dict):
     document = DocumentQueueItem(**document_dict)
     logger.info(f"Starting document process {document.document_id}::{document.user_id}")
 
+    # * Celery kills the task at the time limit set by the router, so the modules get what is left of it
+    task_started_at = time.time()
+
+    cancellation_token = RedisCancellationToken(document_id=document.document_id)
+
     with session_scope() as session:
         # * Update user resource usage record
         user_resource_usage = cast(
-            UserResourceUsage,
+            UserResourceUsage | None,
             session.exec(select(UserResourceUsage).where(UserResourceUsage.resource_id == document.document_id)).first(),
         )
 
+        # * Deleted or cancelled while it was queued
+        if user_resource_usage is None or user_resource_usage.status is UserResourceUsageStatus.CANCELLING or cancellation_token.is_cancelled():
+            mark_document_process_cancelled(session=session, document=document)
+            return
+
         user_resource_usage.status = UserResourceUsageStatus.IN_PROGRESS
         session.add(user_resource_usage)
         session.commit()
@@ -169,27 +228,53 @@ def init_document_process(document_dict: dict):
         # * Parse the pdf, call tika and get the parsed document back
         parsed_document = process_document(file_contents=file_contents)
 
-        ct = ClinicalTrial()
+        ct = get_worker_clinical_trial()
 
         # * Add event listener
         redis_list_key = f"run_log:{document.document_id}"
         redis_progress_key = f"run_log:{document.document_id}_completion"
+        redis_partial_result_key = f"run_log:{document.document_id}_result"
 
-        ct.event.subscribe(
-            lambda event_data: (
-                redis.lpush(redis_list_key, event_data.data) if event_data.type == "message" else redis.set(redis_progress_key, event_data.data),
-                None,
-            )[1]
-        )
+        def publish_event(event_data: EventData) -> None:
+            if event_data.type == "message":
+                redis.lpush(redis_list_key, event_data.data)
+            else:
+                redis.set(redis_progress_key, event_data.data)
+
+        ct.event.subscribe(publish_event)
 
         # * Expire in 10 minutes
         redis.expire(name=f"run_log:{document.document_id}", time=600)
 
         ct_document = map_document_parser_response_to_ct_document(data=parsed_document)
-        ct_document.extract_tables(file_buffer=file_contents)
+        # * The tables are extracted from the pages of the Schedule of Events, when a module that uses them runs
+        ct_document.file_buffer = file_contents
+
+        processing_time_limit = calculate_processing_time_limit(get_number_of_pages_from_pdf(file_contents=file_contents))
+        time_budget = max(0.0, processing_time_limit - (time.time() - task_started_at) - config.RUN_TIME_RESERVE_SECONDS)
 
         # todo get allowed modules, conditionally run modules, get modules from user_module and subscription_module
-        user_resource_usage_result = ct.run_all(document=ct_document, parallel=True, file_buffer=file_contents)
+        try:
+            user_resource_usage_result = {}
+            for module_name, module_result, _ in ct.run_iter(
+                document=ct_document,
+                execution_mode=config.RUN_EXECUTION_MODE,
+                max_workers=config.RUN_MAX_WORKERS,
+                time_budget=time_budget,
+                cancellation_token=cancellation_token,
+            ):
+                user_resource_usage_result[module_name] = module_result
+
+                # * Publish each result as soon as its module finishes, so the UI can show it before the whole run completes
+                partial_result = cast(dict, convert_int64_to_float(transform_keys(data={module_name: module_result})))
+                redis.hset(name=redis_partial_result_key, key=module_name, value=json.dumps(partial_result[module_name], default=str))
+                redis.expire(name=redis_partial_result_key, time=600)
+        except RunCancelledError:
+            mark_document_process_cancelled(session=session, document=document)
+            return
+        finally:
+            # * The ClinicalTrial outlives this task, so the listener of this document must not receive events of the next one
+            ct.event.unsubscribe(publish_event)
 
         # * Transform the result just in case
         user_resource_usage_result = transform_keys(data=user_resource_usage_result)
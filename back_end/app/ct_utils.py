@@ -1,6 +1,10 @@
 from typing import Any, Literal
 
-from clinicaltrials.core import Metadata, MetadataOption
+from clinicaltrials.document import Document as CTDocument
+from clinicaltrials.document import Page as CTPage
+from clinicaltrials.metadata import Metadata, MetadataOption
+
+from app.grpc_client.document_parser.DocumentParser_pb2 import DocumentParserResponse
 
 
 def get_derived_modules_and_metadata() -> tuple[tuple[Literal["lmic"], Literal["international"]], tuple[dict[Any, Any], ...], tuple["Metadata", "Metadata"]]:
@@ -13,3 +17,11 @@ def get_derived_modules_and_metadata() -> tuple[tuple[Literal["lmic"], Literal["
     metadata_dict = tuple(metadata_item.to_dict() for metadata_item in metadata)
 
     return modules, metadata_dict, metadata
+
+
+def map_document_parser_response_to_ct_document(data: DocumentParserResponse) -> CTDocument:
+    pages_list = [CTPage(page_number=key, content=value) for key, value in data.pages.items()]
+
+    metadata = data.metadata if isinstance(data.metadata, dict) else None
+
+    return CTDocument(pages=pages_list, metadata=metadata)
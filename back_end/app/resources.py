@@ -9,10 +9,9 @@ from typing import Any, Callable
 from uuid import uuid4
 
 import nltk
-import clinicaltrials.core as ct_core
 import grpc
-from clinicaltrials.core import ClinicalTrial
-from clinicaltrials.core import Metadata as ClinicalTrialMetadata
+from clinicaltrials.manifest import load_manifest
+from clinicaltrials.metadata import Metadata as ClinicalTrialMetadata
 from fastapi import Depends, FastAPI, Request
 from fastapi.exceptions import HTTPException, RequestValidationError
 from fastapi.security import HTTPAuthorizationCredentials
@@ -32,7 +31,7 @@ from app.security import JWTBearer, JWTUserExceptionError
 from app.services.storage_provider import StorageProvider
 
 from . import config
-from .ct_core import celery as document_processor_celery_instance
+from .celery_config import celery as document_processor_celery_instance
 from .models.user.repo import get_user_resource_usage_by_document_id
 from .models.user.user_resource_usage import UserResourceUsage
 from .models.weight_profile.repo import get_a_weight_profile_for_user_or_default
@@ -43,19 +42,17 @@ sys.path.append(f"{this_folder}/../clinical_trials_core/src")
 
 __redis_async = RedisAsync.from_url(config.REDIS_ENDPOINT)
 
-logger.debug("Building clinical trials core metadata")
-ct = ClinicalTrial()
-__CORE_LIB_VERSION = ct_core.__version__
+# * The modules and their metadata are read from the manifest generated from the processors, so the API never builds a
+# * ClinicalTrial
+logger.debug("Loading clinical trials core metadata manifest")
+ct_core_manifest = load_manifest()
+__CORE_LIB_VERSION = ct_core_manifest.core_version
 logger.info(f"Clinical Trials Core version: {__CORE_LIB_VERSION}")
 
 # * List of module names loaded for ct core
-__ct_core_modules = ct.modules
-__ct_core_metadata_list = ct.metadata
-__ct_core_metadata_dict = ct.metadata_dict
-
-# * Remove from memory
-del ct
-logger.debug("Clinical trials core metadata built. Removing reference from memory")
+__ct_core_modules = ct_core_manifest.modules
+__ct_core_metadata_list = ct_core_manifest.metadata
+__ct_core_metadata_dict = ct_core_manifest.metadata_dict
 
 
 @asynccontextmanager
@@ -13,8 +13,9 @@ from fastapi.responses import Response, StreamingResponse
 from redis.asyncio import Redis as RedisAsync
 from sqlmodel import Session, col, func, select
 
+from app.celery_config import celery as document_processor_celery
 from app.config import BUCKET_OR_CONTAINER_NAME, MAX_DEMO_ACCOUNT_FILE_PROCESSING_COUNT
-from app.ct_core import init_document_process, map_document_parser_response_to_ct_document
+from app.ct_utils import map_document_parser_response_to_ct_document
 from app.database import paginate
 from app.grpc_client.document_parser import process_document
 from app.helpers import (
@@ -64,7 +65,7 @@ from app.utils import (
     get_number_of_pages_from_pdf,
     remove_file_extension,
 )
-from clinicaltrials.core import Metadata as ClinicalTrialMetadata
+from clinicaltrials.metadata import Metadata as ClinicalTrialMetadata
 from clinicaltrials.transform import get_total_trial_cost, get_trial_risk_score, create_rac_nodes
 from clinicaltrials.schemas import WeightProfileBase
 
@@ -73,6 +74,9 @@ router = APIRouter()
 
 ALLOWED_MIME_TYPES = ["application/pdf"]
 
+# * Expiry of the cancellation flag of a run, the longest processing time limit (see `calculate_processing_time_limit`)
+RUN_CANCEL_EXPIRY_SECONDS = 3600
+
 
 @router.get(path="")
 async def get_documents(
@@ -267,7 +271,9 @@ async def upload_document(
     processing_time_limit = calculate_processing_time_limit(get_number_of_pages_from_pdf(file_contents=file_contents))
 
     if user.user.id is not None and document_record.id is not None:
-        init_document_process.apply_async(  # type: ignore
+        # * Queued by name, like the tasks of the beat schedule, the task module loads the processors that only the workers need
+        document_processor_celery.send_task(
+            "app.ct_core.init_document_process",
             kwargs={
                 "document_dict": DocumentQueueItem(
                     s3_bucket_name=BUCKET_OR_CONTAINER_NAME,
@@ -289,6 +295,7 @@ async def delete_a_document(
     user: UserWithRoles = Depends(get_user_with_roles(required_roles=[RoleEnum.USER])),
     session: Session = Depends(get_db),
     storage_client: StorageProvider = Depends(get_storage_provider),
+    redis: RedisAsync = Depends(get_redis_async),
 ):
     logger.info(f"Delete document request from {user.user.id}::{user.user.email} document id {document_id}")
     document = session.exec(select(Document).where(Document.id == document_id, Document.user_id == user.user.id)).first()
@@ -296,6 +303,11 @@ async def delete_a_document(
     if document is None:
         return ServerResponse(error="Document not found", status_code=404)
 
+    # * Stop the analysis of the document if it is still running, so that it does not keep a worker busy
+    user_resource_usage = session.exec(select(UserResourceUsage).where(UserResourceUsage.resource_id == document_id, UserResourceUsage.user_id == user.user.id)).first()
+    if user_resource_usage is not None and user_resource_usage.status in [UserResourceUsageStatus.QUEUED, UserResourceUsageStatus.IN_PROGRESS]:
+        await redis.set(f"run_log:{document_id}_cancel", 1, ex=RUN_CANCEL_EXPIRY_SECONDS)
+
     db_user = cast(User, session.exec(select(User).where(User.id == user.user.id)).first())
 
     db_analysis_report = cast(AnalysisReport | None, session.exec(select(AnalysisReport).where(AnalysisReport.document_id == document_id)).first())
@@ -331,6 +343,33 @@ async def delete_a_document(
     return ServerResponse(status_code=204)
 
 
+@router.post(path="/{document_id}/cancel")
+async def cancel_document_process_run(
+    document_id: int,
+    user: UserWithRoles = Depends(get_user_with_roles(required_roles=[RoleEnum.USER])),
+    session: Session = Depends(get_db),
+    redis: RedisAsync = Depends(get_redis_async),
+):
+    logger.info(f"Cancel document process request from {user.user.id}::{user.user.email} document id {document_id}")
+    user_resource_usage = session.exec(select(UserResourceUsage).where(UserResourceUsage.resource_id == document_id, UserResourceUsage.user_id == user.user.id)).first()
+
+    if user_resource_usage is None:
+        return ServerResponse(error="No document found", status_code=404)
+
+    if user_resource_usage.status not in [UserResourceUsageStatus.QUEUED, UserResourceUsageStatus.IN_PROGRESS]:
+        return ServerResponse(error="Document is not being processed", status_code=400)
+
+    # * The worker polls this flag while it runs the modules and marks the run as cancelled once it has stopped
+    await redis.set(f"run_log:{document_id}_cancel", 1, ex=RUN_CANCEL_EXPIRY_SECONDS)
+
+    user_resource_usage.status = UserResourceUsageStatus.CANCELLING
+    session.add(user_resource_usage)
+    session.commit()
+    session.refresh(user_resource_usage)
+
+    return ServerResponse(data={**user_resource_usage.model_dump()})
+
+
 @router.get(path="/{document_id}/run-status")
 async def get_document_process_run_status(
     document_id: int,
@@ -353,10 +392,18 @@ async def get_document_process_run_status(
             run_log: list[bytes] = await redis.lrange(f"run_log:{document_id}", 0, -1)  # type: ignore
             run_completion = float(await redis.get(f"run_log:{document_id}_completion") or 0.0)
 
-            data = {"user_resource_usage": user_resource_usage.model_dump_json(), "run_log": [item.decode("utf-8") for item in run_log], "completion": run_completion}
+            # * Results of the modules that have finished so far
+            run_partial_result: dict[bytes, bytes] = await redis.hgetall(f"run_log:{document_id}_result")  # type: ignore
+
+            data = {
+                "user_resource_usage": user_resource_usage.model_dump_json(),
+                "run_log": [item.decode("utf-8") for item in run_log],
+                "completion": run_completion,
+                "partial_result": {key.decode("utf-8"): json.loads(value) for key, value in run_partial_result.items()},
+            }
 
-            # * Check if the run has completed
-            run_completed = user_resource_usage.status is UserResourceUsageStatus.COMPLETED
+            # * Check if the run has completed, a cancelled run will not send anything more
+            run_completed = user_resource_usage.status in [UserResourceUsageStatus.COMPLETED, UserResourceUsageStatus.CANCELLED]
 
             if run_completed and user_resource_usage.result is not None:
                 # * Get weight profile
@@ -6,7 +6,6 @@ from typing import Any
 
 import numpy as np
 import pandas as pd
-from clinicaltrials.core import ClassifierConfig
 from plotly import express as px
 from plotly import graph_objects as pgo
 from plotly import subplots as psp
@@ -16,6 +15,7 @@ from spacy.tokens import Doc as SpacyDoc
 from app import schemas, services, utils
 from app.models.document.document import Document
 from clinicaltrials import schemas as ct_schemas
+from clinicaltrials.utils import get_default_classifier_storage_path
 
 
 class HeatMapResult(BaseModel):
@@ -342,8 +342,7 @@ class AnalysisReportData:
             }
 
         # Generate wordcloud
-        classifier_config = ClassifierConfig()
-        res_wordcloud_generator = services.WordcloudGenerator(classifier_path=f"{classifier_config.classifier_storage_path}/idfs_for_word_cloud.pkl.bz2").generate(
+        res_wordcloud_generator = services.WordcloudGenerator(classifier_path=f"{get_default_classifier_storage_path()}/idfs_for_word_cloud.pkl.bz2").generate(
             tokenised_pages=self.__tokenised_pages,
             condition_to_pages=self.__user_resource_usage_result["condition"]["pages"],
         )
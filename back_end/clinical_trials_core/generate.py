@@ -21,21 +21,12 @@ def main():
     class_name = "".join(word.title() for word in module_name.split("_"))
 
     contents = f"""\
-from clinicaltrials.core import BaseProcessor, Document, ClassifierConfig, Page, Metadata, MetadataOption
+from clinicaltrials.core import BaseProcessor, Document, ClassifierConfig, Page
 
 class {class_name}(BaseProcessor):
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(id="{module_name}", name="{class_name}", feature_type="yesno",
-                        options=[
-                            MetadataOption(label="no", value=0),
-                            MetadataOption(label="yes", value=1),
-                        ]
-                        )
-
     def process(self, document: Document, config: ClassifierConfig | None = None):
         raise NotImplementedError("Subclasses must implement the 'process' method.")
 
@@ -51,7 +42,7 @@ if __name__ == "__main__":
         init_file.write(contents)
 
     print(f"Module '{module_name}' created successfully in 'clinicaltrials' directory.")
-    print("Don't forget to add your module to __loaded_modules in src/core.py!!!")
+    print("Don't forget to add your module to PROCESSORS in src/clinicaltrials/registry.py!!!")
 
     answer = input("Would you like to generate a unit test? Y/n")
     if answer.lower() != "n":
@@ -93,26 +84,38 @@ if __name__ == "__main__":
 
         print(f"Test case for '{module_name}' created successfully in '{test_file_path}'")
 
-    core_file = "src/clinicaltrials/core.py"
-    answer = input("Would you like to add this file to src/clinicaltrials/core.py? Caution: this involves modifying existing Python code. Y/n")
+    registry_file = "src/clinicaltrials/registry.py"
+    answer = input("Would you like to add this module to src/clinicaltrials/registry.py? Caution: this involves modifying existing Python code. Y/n")
     if answer.lower() != "n":
-        with open(core_file, "r") as f:
+        with open(registry_file, "r") as f:
             orig_lines = list(f)
 
-        for idx, l in enumerate(list(orig_lines)):
-            if "__loaded_modules: dict" in l:
-                orig_lines[idx - 2] = orig_lines[idx - 2] + f"    from .{module_name} import {class_name}\n"
+        definition = f"""\
+    "{module_name}": ProcessorDefinition(
+        import_path="clinicaltrials.{module_name}:{class_name}",
+        metadata=Metadata(
+            id="{module_name}",
+            name="{class_name}",
+            feature_type="yesno",
+            options=[
+                MetadataOption(label="no", value=0),
+                MetadataOption(label="yes", value=1),
+            ],
+        ),
+    ),
+"""
 
-                for j in range(idx, idx + 100):
-                    if "}" in orig_lines[j]:
-                        orig_lines[j - 1] = orig_lines[j - 1] + f'        "{module_name}": {class_name},\n'
-                        break
+        # * The registry ends with the closing brace of PROCESSORS
+        for idx in range(len(orig_lines) - 1, -1, -1):
+            if orig_lines[idx].rstrip() == "}":
+                orig_lines.insert(idx, definition)
                 break
 
-        with open(core_file, "w") as f:
+        with open(registry_file, "w") as f:
             f.write("".join(orig_lines))
 
-        print(f"{core_file} has been updated. Please check there are no syntax errors.")
+        print(f"{registry_file} has been updated. Please check there are no syntax errors.")
+        print("Then regenerate the metadata manifest with: cd src && python -m clinicaltrials.manifest")
 
 
 if __name__ == "__main__":
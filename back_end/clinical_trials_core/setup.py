@@ -48,6 +48,7 @@ setuptools.setup(
     },
     package_dir={"": "src"},
     packages=setuptools.find_packages(where="src"),
+    package_data={"clinicaltrials": ["metadata_manifest.json"]},
     python_requires=">=3.11",
     install_requires=[
         "requests==2.32.3",
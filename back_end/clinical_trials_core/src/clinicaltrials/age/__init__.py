@@ -1,121 +1,16 @@
 import bz2
 import json
 import pickle as pkl
-import re
 import time
 
-from spacy.matcher import Matcher, PhraseMatcher
-
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, Page
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
 from clinicaltrials import model_store
+from clinicaltrials.match_engine import match_engine
+from clinicaltrials.proximity import distance_to_span, sorted_positions
 from clinicaltrials.resources import nlp
 
 patterns = dict()
 
-re_num = re.compile(r"^\d+$")
-
-num_lookup = {
-    "one": 1,
-    "two": 2,
-    "three": 3,
-    "four": 4,
-    "five": 5,
-    "six": 6,
-    "seven": 7,
-    "eight": 8,
-    "nine": 9,
-    "ten": 10,
-    "eleven": 11,
-    "twelve": 12,
-    "thirteen": 13,
-    "fourteen": 14,
-    "fifteen": 15,
-    "sixteen": 16,
-    "seventeen": 17,
-    "eighteen": 18,
-    "nineteen": 19,
-    "twenty": 20,
-    "twenty-one": 21,
-    "twenty-two": 22,
-    "twenty-three": 23,
-    "twenty-four": 24,
-    "twenty-five": 25,
-    "twenty-six": 26,
-    "twenty-seven": 27,
-    "twenty-eight": 28,
-    "twenty-nine": 29,
-    "thirty": 30,
-    "thirty-one": 31,
-    "thirty-two": 32,
-    "thirty-three": 33,
-    "thirty-four": 34,
-    "thirty-five": 35,
-    "thirty-six": 36,
-    "thirty-seven": 37,
-    "thirty-eight": 38,
-    "thirty-nine": 39,
-    "forty": 40,
-    "forty-one": 41,
-    "forty-two": 42,
-    "forty-three": 43,
-    "forty-four": 44,
-    "forty-five": 45,
-    "forty-six": 46,
-    "forty-seven": 47,
-    "forty-eight": 48,
-    "forty-nine": 49,
-    "fifty": 50,
-    "fifty-one": 51,
-    "fifty-two": 52,
-    "fifty-three": 53,
-    "fifty-four": 54,
-    "fifty-five": 55,
-    "fifty-six": 56,
-    "fifty-seven": 57,
-    "fifty-eight": 58,
-    "fifty-nine": 59,
-    "sixty": 60,
-    "sixty-one": 61,
-    "sixty-two": 62,
-    "sixty-three": 63,
-    "sixty-four": 64,
-    "sixty-five": 65,
-    "sixty-six": 66,
-    "sixty-seven": 67,
-    "sixty-eight": 68,
-    "sixty-nine": 69,
-    "seventy": 70,
-    "seventy-one": 71,
-    "seventy-two": 72,
-    "seventy-three": 73,
-    "seventy-four": 74,
-    "seventy-five": 75,
-    "seventy-six": 76,
-    "seventy-seven": 77,
-    "seventy-eight": 78,
-    "seventy-nine": 79,
-    "eighty": 80,
-    "eighty-one": 81,
-    "eighty-two": 82,
-    "eighty-three": 83,
-    "eighty-four": 84,
-    "eighty-five": 85,
-    "eighty-six": 86,
-    "eighty-seven": 87,
-    "eighty-eight": 88,
-    "eighty-nine": 89,
-    "ninety": 90,
-    "ninety-one": 91,
-    "ninety-two": 92,
-    "ninety-three": 93,
-    "ninety-four": 94,
-    "ninety-five": 95,
-    "ninety-six": 96,
-    "ninety-seven": 97,
-    "ninety-eight": 98,
-    "ninety-nine": 99,
-}
-
 patterns["eligibility"] = ["eligibility", "inclusion", "exclusion"]
 
 patterns["age years"] = ["# years old", "# year old", "#-year-old", "# year-old", "age # years", "aged # years", "age: # years", "aged: # years"]
@@ -136,13 +31,9 @@ patterns["exclusions"] = ["for #", "during #", "within #", "period of #", "every
 
 context_matcher_names = {"citations", "eligibility", "minimum", "maximum", "age", "exclusions", "old"}
 
-phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
-
-matcher = Matcher(nlp.vocab)
-
 for feature_name, feature_patterns in patterns.items():
     if "#" not in str(feature_patterns):
-        phrase_matcher.add(feature_name, nlp.pipe(feature_patterns))
+        match_engine.add_phrase_patterns(namespace="age_phrases", patterns={feature_name: feature_patterns})
         continue
 
     patterns = []
@@ -168,10 +59,12 @@ for feature_name, feature_patterns in patterns.items():
                 else:
                     pattern.append({"LOWER": word})
             patterns.append(pattern)
-    matcher.add(feature_name, patterns)
+    match_engine.add_token_patterns(namespace="age_patterns", label=feature_name, patterns=patterns)
 
 
 class Age(BaseProcessor):
+    requires = ("page_matches",)
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
@@ -188,28 +81,24 @@ class Age(BaseProcessor):
             "x9_distance_to_exclusions",
         ]
 
-        self.model = None
 
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(
-            id="age",
-            name="Age",
-            feature_type="multiple_numeric",
-            has_multiple_predictions=True,
-        )
+    def load_models(self, config: ClassifierConfig | None = None) -> None:
+        model_store.get_model("age", config=config or self.config)
 
     def process(self, document: Document, config: ClassifierConfig | None = None):
-        if not self.model:
-            self.model = model_store.get_models().age_model
+        model = model_store.get_model("age", config=config or self.config)
 
-        model_lower, model_upper, model_nb_lower, model_nb_upper = self.model
+        model_lower, model_upper, model_nb_lower, model_nb_upper = model
 
         annotations = []
         candidates = []  # will be a list of tuples containing data: cohort value, is explicitly mentioning cohort size, distance to mention of cohort
         occurrence_to_pages = {}
+        page_pattern_matches = match_engine.get_matches(document=document, namespace="age_patterns")
+        page_phrase_matches = match_engine.get_matches(document=document, namespace="age_phrases")
+        numeric_mentions = document.context.numeric_mentions
         for page_no, doc in enumerate(document.tokenised_pages):
-            matches = list(matcher(doc)) + list(phrase_matcher(doc))
+            document.raise_if_cancelled()
+            matches = list(page_pattern_matches[page_no]) + list(page_phrase_matches[page_no])
 
             context_indices = {}
             for context in context_matcher_names:
@@ -221,6 +110,8 @@ class Age(BaseProcessor):
                     context_indices[matcher_name].add(phrase_match[1])
                     context_indices[matcher_name].add(phrase_match[2])
 
+            context_positions = {context: sorted_positions(token_indices) for context, token_indices in context_indices.items()}
+
             for phrase_match in matches:
                 matcher_name = nlp.vocab.strings[phrase_match[0]]
 
@@ -235,16 +126,11 @@ class Age(BaseProcessor):
 
                     candidate_values = []
                     for i in range(phrase_match[1], phrase_match[2]):
-                        if doc[i].like_num and "." not in doc[i].text:
-                            if doc[i].norm_ in num_lookup:
-                                value = num_lookup[doc[i].norm_]
-                            elif re_num.match(doc[i].text):
-                                value = int(doc[i].text)
-                            else:
-                                value = None
-                                print("WARNING! NO VALUE FOUND FOR AGE", doc[i].text)
-                            if value:
-                                candidate_values.append(value)
+                        value = numeric_mentions.get_value(page_no=page_no, token_no=i)
+                        if value is None and doc[i].like_num and "." not in doc[i].text:
+                            print("WARNING! NO VALUE FOUND FOR AGE", doc[i].text)
+                        if value:
+                            candidate_values.append(value)
 
                     start = phrase_match[1] - 5
                     if start < 0:
@@ -256,10 +142,8 @@ class Age(BaseProcessor):
 
                     distances = {}
                     for context in context_matcher_names:
-                        diff = 1000
-                        for i in context_indices[context]:
-                            diff = min([diff, abs(i - phrase_match[1]), abs(i - phrase_match[2])])
-                        distances[context] = diff
+                        diff = distance_to_span(positions=context_positions[context], start=phrase_match[1], end=phrase_match[2])
+                        distances[context] = 1000 if diff is None else min(diff, 1000)
 
                     if len(candidate_values) > 0:
                         v1 = candidate_values[0]
@@ -1,8 +1,7 @@
 import json
 
-from spacy.matcher import PhraseMatcher
-
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, MetadataOption, Page
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
+from clinicaltrials.match_engine import match_engine
 from clinicaltrials.resources import nlp
 
 cohorts = {"specimen", "specimens", "sample", "samples"}
@@ -47,31 +46,23 @@ patterns["negative"] = ["no", "none"]
 
 context_matcher_names = {"negative"}
 
-phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
-
-for pattern_name, pattern_surface_forms in patterns.items():
-    phrase_matcher.add(pattern_name, nlp.pipe(pattern_surface_forms))
+match_engine.add_phrase_patterns(namespace="biobank", patterns=patterns)
 
 
 class Biobank(BaseProcessor):
+    requires = ("page_matches",)
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(id="biobank", name="Biobank", feature_type="yesno",
-                        options=[
-                            MetadataOption(label="no", value=0),
-                            MetadataOption(label="yes", value=1),
-                        ]
-                        )
-
     def process(self, document: Document, config: ClassifierConfig | None = None):
         candidates = []  # will be a list of tuples containing data: cohort value, is explicitly mentioning cohort size, distance to mention of cohort
         annotations = []
         occurrence_to_pages = {}
+        page_matches = match_engine.get_matches(document=document, namespace="biobank")
         for page_no, doc in enumerate(document.tokenised_pages):
-            matches = phrase_matcher(doc)
+            document.raise_if_cancelled()
+            matches = list(page_matches[page_no])
 
             context_indices = {}
             for context in context_matcher_names:
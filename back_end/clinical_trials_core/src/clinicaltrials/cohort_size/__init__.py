@@ -1,32 +1,13 @@
 import json
 
-from spacy.matcher import Matcher
+import numpy as np
 
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, Page
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
+from clinicaltrials.match_engine import match_engine
+from clinicaltrials.numeric_mentions import SMALL_NUMBER_VOCABULARY
+from clinicaltrials.proximity import window_distance
 from clinicaltrials.resources import nlp
 
-word2num = {"one": 1,
-            "two": 2,
-            "three": 3,
-            "four": 4,
-            "five": 5,
-            "six": 6,
-            "seven": 7,
-            "eight": 8,
-            "nine": 9,
-            "ten": 10,
-            "eleven": 11,
-            "twelve": 12,
-            "thirteen": 13,
-            "fourteen": 14,
-            "fifteen": 15,
-            "sixteen": 16,
-            "seventeen": 17,
-            "eighteen": 18,
-            "nineteen": 19,
-            "both": 2,
-            "single": 2}
-
 cohorts = {"cohort", "cohorts"}
 group = {"group", "groups"}
 
@@ -39,8 +20,6 @@ patterns["cohort"] = ["# in cohort", "# per cohort"]
 
 patterns["participants"] = ["# participants", "# patients", "# subjects", "# pts"]
 
-matcher = Matcher(nlp.vocab)
-
 for feature_name, feature_patterns in patterns.items():
     patterns = []
     for feature_pattern in feature_patterns:
@@ -65,54 +44,47 @@ for feature_name, feature_patterns in patterns.items():
                 else:
                     pattern.append({"LOWER": word})
             patterns.append(pattern)
-    matcher.add(feature_name, patterns)
+    match_engine.add_token_patterns(namespace="cohort_size", label=feature_name, patterns=patterns)
 
 
 class CohortSize(BaseProcessor):
+    requires = ("page_matches",)
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(id="cohort_size", name="Cohort Size", feature_type="numeric", )
-
     def process(self, document: Document, config: ClassifierConfig | None = None):
         annotations = []
         candidates = []  # will be a list of tuples containing data: cohort value, is explicitly mentioning cohort size, distance to mention of cohort
         occurrence_to_pages = {}
+        page_matches = match_engine.get_matches(document=document, namespace="cohort_size")
+        numeric_mentions = document.context.numeric_mentions
+        token_arrays = document.context.token_arrays
+        all_cohort_positions = document.context.get_token_index(attribute="norm").find(cohorts)
         for page_no, doc in enumerate(document.tokenised_pages):
+            document.raise_if_cancelled()
             page_text = doc.text.lower()
             if "cohort" in page_text or "group" in page_text:
-                matches = matcher(doc)
+                matches = list(page_matches[page_no])
+
+                page_start, page_end = np.searchsorted(all_cohort_positions, token_arrays.page_offsets[page_no:page_no + 2])
+                cohort_positions = all_cohort_positions[page_start:page_end] - token_arrays.page_offsets[page_no]
 
                 for phrase_match in matches:
                     matcher_name = nlp.vocab.strings[phrase_match[0]]
 
                     candidate_value = None
                     for i in range(phrase_match[1], phrase_match[2]):
-                        if doc[i].like_num:
-                            if doc[i].norm_ in word2num:
-                                candidate_value = word2num[doc[i].norm_]
-                            elif doc[i].is_digit:
-                                candidate_value = int(doc[i].text)
+                        token_value = numeric_mentions.get_value(page_no=page_no, token_no=i, vocabulary=SMALL_NUMBER_VOCABULARY)
+                        if token_value is not None:
+                            candidate_value = token_value
 
                     if "cohort" in matcher_name:  # explicit mention of cohort size - no other logic needed
                         candidates.append((candidate_value, 1, 0))
                     else:
-                        min_dist = 1000
-                        start = phrase_match[1] - 10
-                        end = phrase_match[2] + 10
-                        if start < 0:
-                            start = 0
-                        if end > len(doc):
-                            end = len(doc)
-
-                        for j in range(start, end):
-                            if doc[j].norm_ in cohorts:
-                                if j < phrase_match[1]:
-                                    min_dist = min([abs(j - phrase_match[1]), min_dist])
-                                else:
-                                    min_dist = min([abs(j - phrase_match[2]), min_dist])
+                        min_dist = window_distance(positions=cohort_positions, start=phrase_match[1], end=phrase_match[2], window=10, length=len(doc))
+                        if min_dist is None:
+                            min_dist = 1000
 
                         if min_dist < 1000:
                             candidates.append((candidate_value, 0, min_dist))
@@ -1,78 +1,72 @@
-import bz2
 import json
-import pickle as pkl
 
 import numpy as np
+from scipy.sparse import vstack
 
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, MetadataOption, Page
+from clinicaltrials import model_store
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
+from clinicaltrials.informative_terms import get_term_scores
+from clinicaltrials.resources import nlp
+from clinicaltrials.token_features import get_term_index
 
 
 class Condition(BaseProcessor):
+    is_high_value = True
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-        self.model = None
-
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(id="condition", name="Condition", feature_type="categorical",
-                        options=[MetadataOption(label="HIV", value="HIV"),
-                                 MetadataOption(label="Tuberculosis", value="TB"),
-                                 MetadataOption(label="COVID", value="COVID"),
-                                 MetadataOption(label="Influenza", value="INFLUENZA"),
-                                 MetadataOption(label="Malaria", value="MAL"),
-                                 MetadataOption(label="Enteric and diarrheal diseases", value="EDD"),
-                                 MetadataOption(label="Neglected tropical diseases", value="NTD"),
-                                 MetadataOption(label="Polio", value="POL"),
-                                 MetadataOption(label="Diabetes", value="DIABETES"),
-                                 MetadataOption(label="Pneumonia", value="PNE"),
-                                 MetadataOption(label="Hypertension (see full product)", value="HYPERTENSION"),
-                                 MetadataOption(label="Motor neurone disease (see full product)", value="MND"),
-                                 MetadataOption(label="Multiple sclerosis (see full product)", value="MS"),
-                                 MetadataOption(label="Obesity (see full product)", value="OBESITY"),
-                                 MetadataOption(label="Sickle cell anemia (see full product)", value="SICKLE"),
-                                 MetadataOption(label="Stroke (see full product)", value="STROKE"),
-                                 MetadataOption(label="Cystic fibrosis (see full product)", value="CF"),
-                                 MetadataOption(label="Cancer (see full product)", value="CANCER"),
-                                 MetadataOption(label="Other (see full product)", value="other"), ])
+    def load_models(self, config: ClassifierConfig | None = None) -> None:
+        model_store.get_model("condition", config=config or self.config)
 
     def process(self, document: Document, config: ClassifierConfig | None = None):
-        config = self.get_classifier_config_or_default(config=config)
+        return self.process_batch(documents=[document], config=config)[0]
+
+    def process_batch(self, documents: list[Document], config: ClassifierConfig | None = None) -> list[dict]:
+        """
+        Classify the condition of several documents, stacking their token counts so that the classifier runs once for
+        the whole batch.
+        """
 
-        path_to_classifier = config.path_to_classifier
+        model = model_store.get_model("condition", config=config or self.config)
 
-        if not self.model:
-            with bz2.open(path_to_classifier, "rb") as f:
-                self.model = pkl.load(f)
-        vectoriser = self.model.named_steps["countvectorizer"]
-        transformer = self.model.named_steps["tfidftransformer"]
-        nb = self.model.named_steps["multinomialnb"]
+        vectoriser = model.named_steps["countvectorizer"]
+        transformer = model.named_steps["tfidftransformer"]
+        nb = model.named_steps["multinomialnb"]
         vocabulary = {v: k for k, v in vectoriser.vocabulary_.items()}
 
-        annotations = []
+        term_index = get_term_index(vectoriser)
+        document_token_counts = []
+        for document in documents:
+            document.raise_if_cancelled()
+            document_token_counts.append(term_index.count(hash_ids=document.context.token_arrays.norm))
+        token_counts = vstack(document_token_counts, format="csr")
 
-        tokenised_pages = document.tokenised_pages
+        transformed_documents = transformer.transform(token_counts)
 
-        token_counts = np.zeros((1, len(vectoriser.vocabulary_)))
-        for tokens in tokenised_pages:
-            for token in tokens:
-                token_lower = token.norm_
-                if token_lower in vectoriser.vocabulary_:
-                    token_counts[0, vectoriser.vocabulary_[token_lower]] += 1
+        prediction_probas_batch = nb.predict_proba(transformed_documents)
 
-        transformed_document = transformer.transform(token_counts)
+        return [
+            self.__make_result(
+                document=document,
+                model=model,
+                vocabulary=vocabulary,
+                transformed_document=transformed_documents[document_idx:document_idx + 1],
+                prediction_probas=prediction_probas_batch[document_idx],
+            )
+            for document_idx, document in enumerate(documents)
+        ]
+
+    def __make_result(self, document: Document, model, vocabulary: dict, transformed_document, prediction_probas: np.ndarray) -> dict:
+        nb = model.named_steps["multinomialnb"]
+
+        annotations = []
 
-        prediction_probas = nb.predict_proba(transformed_document)[0]
         prediction_idx = int(np.argmax(prediction_probas))
 
-        prediction = self.model.classes_[prediction_idx]
+        prediction = model.classes_[prediction_idx]
 
-        probas = np.zeros((transformed_document.shape[1]))
-        for i in range(transformed_document.shape[1]):
-            zeros = np.zeros(transformed_document.shape)
-            zeros[0, i] = transformed_document[0, i]
-            proba = nb.predict_log_proba(zeros)
-            probas[i] = proba[0, prediction_idx]
+        probas = get_term_scores(nb=nb, transformed_document=transformed_document, class_idx=prediction_idx)
 
         condition_to_pages = {}
         for vocab_idx in np.argsort(-probas):
@@ -86,18 +80,19 @@ class Condition(BaseProcessor):
             if len(informative_terms) > 50:
                 break
 
-        for page_no, doc in enumerate(tokenised_pages):
-            for token in doc:
-                if token.norm_ in condition_to_pages:
-                    condition_to_pages[token.norm_].append(page_no)
-
-                    match_start_char = token.idx
-                    match_end_char = token.idx + len(token.text)
-                    match_text = token.text
-                    annotations.append(
-                        {"type": "condition", "page_no": page_no,
-                         "start_char": match_start_char,
-                         "end_char": match_end_char, "text": match_text})
+        document.raise_if_cancelled()
+        token_arrays = document.context.token_arrays
+        for token_idx in document.context.get_token_index(attribute="norm").find(list(condition_to_pages)):
+            page_no = int(token_arrays.page[token_idx])
+            condition_to_pages[nlp.vocab.strings[int(token_arrays.norm[token_idx])]].append(page_no)
+
+            match_start_char = int(token_arrays.idx[token_idx])
+            match_end_char = match_start_char + int(token_arrays.length[token_idx])
+            match_text = token_arrays.text(token_idx)
+            annotations.append(
+                {"type": "condition", "page_no": page_no,
+                 "start_char": match_start_char,
+                 "end_char": match_end_char, "text": match_text})
 
         return {"prediction": prediction, "pages": condition_to_pages, "score": prediction_probas[prediction_idx],
                 "probas": list(prediction_probas), "terms": informative_terms, "annotations": annotations}
@@ -1,8 +1,7 @@
 import json
 
-from spacy.matcher import PhraseMatcher
-
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, MetadataOption, Page
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
+from clinicaltrials.match_engine import match_engine
 from clinicaltrials.resources import nlp
 
 patterns = dict()
@@ -37,23 +36,15 @@ patterns["assent"] = ["assent"]
 
 context_matcher_names = {"citations", "this study", "consent", "assent"}
 
-phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
-
-for pattern_name, pattern_surface_forms in patterns.items():
-    phrase_matcher.add(pattern_name, nlp.pipe(pattern_surface_forms))
+match_engine.add_phrase_patterns(namespace="consent", patterns=patterns)
 
 
 class Consent(BaseProcessor):
+    requires = ("page_matches",)
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(id="consent", name="Consent", feature_type="categorical",
-                        options=[MetadataOption(label="none", value="none"),
-                                 MetadataOption(label="consent", value="consent"),
-                                 MetadataOption(label="assent", value="assent"), ])
-
     def process(self, document: Document, config: ClassifierConfig | None = None):
         candidates = []
         annotations = []
@@ -62,8 +53,11 @@ class Consent(BaseProcessor):
         is_doc_contained_consent = False
         is_doc_contained_assent = False
 
+        page_matches = match_engine.get_matches(document=document, namespace="consent")
+
         for page_no, doc in enumerate(document.tokenised_pages):
-            matches = list(phrase_matcher(doc))
+            document.raise_if_cancelled()
+            matches = list(page_matches[page_no])
 
             for tok in doc:
                 if tok.norm_ == "consent":
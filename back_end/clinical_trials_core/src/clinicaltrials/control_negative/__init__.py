@@ -1,8 +1,7 @@
 import json
 
-from spacy.matcher import PhraseMatcher
-
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, Page, MetadataOption
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
+from clinicaltrials.match_engine import match_engine
 from clinicaltrials.resources import nlp
 
 patterns = dict()
@@ -31,29 +30,23 @@ patterns["control negative"] = ["control negative design", "negative control des
                                 "tncc",
                                 ]
 patterns["control negative"].extend([x + "s" for x in patterns["control negative"]])
-phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
-
-for pattern_name, pattern_surface_forms in patterns.items():
-    phrase_matcher.add(pattern_name, nlp.pipe(pattern_surface_forms))
+match_engine.add_phrase_patterns(namespace="control_negative", patterns=patterns)
 
 
 class ControlNegative(BaseProcessor):
+    requires = ("page_matches",)
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(id="control_negative", name="Control Negative", feature_type="yesno", options=[
-            MetadataOption(label="no", value=0),
-            MetadataOption(label="yes", value=1),
-        ])
-
     def process(self, document: Document, config: ClassifierConfig | None = None):
         candidates = []
         annotations = []
         occurrence_to_pages = {}
+        page_matches = match_engine.get_matches(document=document, namespace="control_negative")
         for page_no, doc in enumerate(document.tokenised_pages):
-            matches = list(phrase_matcher(doc))
+            document.raise_if_cancelled()
+            matches = list(page_matches[page_no])
 
             for phrase_match in matches:
                 matcher_name = nlp.vocab.strings[phrase_match[0]]
@@ -7,6 +7,9 @@ Usage:
     from clinicaltrials.core import ClinicalTrial
     ct = ClinicalTrial()
     result = ct.run_all(document=parsed_document, parallel=True, file_buffer=file_contents)
+
+    # * Spread the modules over worker processes instead of threads
+    result = ct.run_all(document=parsed_document, execution_mode="processes", max_workers=4)
 """
 
 __version__ = "1.2.2"
@@ -14,26 +17,39 @@ __version__ = "1.2.2"
 import argparse
 import inspect
 import logging
-import re
+import multiprocessing
 import time
+import uuid
 from abc import ABC, abstractmethod
-from dataclasses import asdict, dataclass, field
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
 from datetime import datetime
-from io import BytesIO
-from os import path
-from threading import Thread
-from typing import Any, Callable, Literal, Self, TypeAlias
+from os import cpu_count, path
+from queue import Empty
+from threading import Event as ThreadEvent
+from threading import Lock
+from typing import Any, Callable, Iterator, Literal, Self, TypeAlias, cast
 from zipfile import ZipFile
 
-import requests
-from pdfplumber import open as pdfplumber_open
-from pypdf import PdfReader, PdfWriter
-from pypdf.annotations import Highlight
-from spacy.tokens import Doc
-
-from clinicaltrials.resources import CLASSIFIER_BIN
-from clinicaltrials.resources import nlp as spacy_nlp
-from clinicaltrials.utils import get_default_classifier_storage_path
+# * spaCy, the tokenised context, the matchers and requests are imported where they are used, so that importing core,
+# * e.g. to read the metadata of the processors, does not load the NLP stack
+from clinicaltrials.document import (  # noqa: F401 # * Re-exported, the processors and the API import the document classes from core
+    MIN_PAGES_PER_PDF_WORKER,
+    CancellationToken,
+    Document,
+    Page,
+    PageAnnotation,
+    PageMarker,
+    RunCancelledError,
+    Table,
+    Tables,
+    read_pdf_pages,
+    run_scope,
+)
+from clinicaltrials.metadata import Metadata, MetadataOption  # noqa: F401 # * Re-exported, the processors and the API import the metadata classes from core
+from clinicaltrials.products import PRODUCT_KEY_PREFIX, PRODUCTS, SHARED_PRODUCTS, get_product, has_product, load_products
+from clinicaltrials.registry import PROCESSORS, ProcessorDefinition
+from clinicaltrials.utils import CLASSIFIER_BIN, get_default_classifier_storage_path
 
 
 def __get_logger(log_level=logging.DEBUG, log_to_file=False, log_file="logfile.log"):
@@ -60,120 +76,19 @@ def __get_logger(log_level=logging.DEBUG, log_to_file=False, log_file="logfile.l
     return logger
 
 
-Table: TypeAlias = list[list[str | None]]
-Tables: TypeAlias = list[list[list[str | None]]]
+ExecutionMode: TypeAlias = Literal["serial", "threads", "processes"]
 
+# * Weight of the latest run in the smoothed execution time of a module
+COST_SMOOTHING = 0.3
 
-@dataclass
-class PageAnnotation:
-    text: str
-    type: str
-    page_no: int
-    subtype: str
-    end_char: int
-    start_char: int
+# * `(module_name, result, execution_time)` of each module as it finishes
+ModuleResults: TypeAlias = Iterator[tuple[str, Any, float]]
 
-    @staticmethod
-    def from_dict(data: dict[str, Any]) -> "PageAnnotation":
-        return PageAnnotation(
-            text=data.get("text", ""),
-            type=data.get("type", ""),
-            page_no=data.get("page_no", 0),
-            subtype=data.get("subtype", ""),
-            end_char=data.get("end_char", 0),
-            start_char=data.get("start_char", 0),
-        )
+# * How a module is run when the run has a time budget: in full, in its cheaper degraded mode, or not at all
+RunPlan: TypeAlias = Literal["full", "degraded", "skipped"]
 
-
-class PageMarker:
-    __words_to_highlight: list[str] = []
-
-    def add_highlight(self, word: str):
-        self.__words_to_highlight.append(word)
-
-    def delete_highlight(self, word: str):
-        self.__words_to_highlight.remove(word)
-
-    @property
-    def markers(self):
-        return self.__words_to_highlight
-
-
-@dataclass
-class Page:
-    page_number: int
-    content: str
-
-    """
-    List of 2d Matrices
-    table -> row -> cell
-    """
-    tables: list[Table] = field(default_factory=lambda: [])
-
-    marker: PageMarker = PageMarker()
-
-
-class Document:
-    """
-    Class representing document object for clinical trails. Created after parsing the document
-    """
-
-    pages: list[Page]
-    metadata: dict | None = None
-
-    def __init__(self, pages: list[Page], metadata: dict | None = None, file_buffer: bytes | None = None):
-        self.logger = logging.getLogger()
-        self.logger.name = __class__.__name__
-
-        self.pages = pages
-        self.metadata = metadata
-
-        if file_buffer:
-            self.extract_tables(file_buffer=file_buffer)
-
-    @staticmethod
-    def pdf_to_document(pdf_path: str) -> "Document":
-        abs_pdf_path = path.abspath(pdf_path)
-        pages = []
-        metadata: dict | None = None
-
-        with pdfplumber_open(path_or_fp=abs_pdf_path) as pdf_buffer:
-            for page_number in range(len(pdf_buffer.pages)):
-                page = pdf_buffer.pages[page_number]
-
-                content = page.extract_text()
-
-                table = page.extract_tables()
-
-                pages.append(Page(page_number=page_number + 1, content=content, tables=table))
-
-            metadata = pdf_buffer.metadata
-
-        return Document(pages, metadata=metadata)
-
-    @property
-    def tokenised_pages(self) -> list[Doc]:
-        """
-        Process the raw text of each page in the document with spaCy and return a list of spaCy Doc objects. Ideally we only do this once.
-        We replace all newlines and multiple spaces with single spaces, because otherwise spaCy makes them into a new token which interferes with matching.
-
-        Returns: List of Docs, where each Doc corresponds to a page
-        """
-
-        return list(spacy_nlp.pipe([re.sub(r"\s+", " ", page.content) for page in self.pages]))
-
-    def extract_tables(self, file_buffer: bytes) -> None:
-        with pdfplumber_open(path_or_fp=BytesIO(file_buffer)) as pdf_buffer:
-            if len(pdf_buffer.pages) != len(self.pages):
-                self.logger.warning("Mismatch between file buffer and pages provided")
-                return
-
-            for page_number in range(len(pdf_buffer.pages)):
-                self.logger.debug(f"Extracting table from page {page_number}")
-                page = pdf_buffer.pages[page_number]
-                table = page.extract_tables()
-
-                self.pages[page_number].tables = table
+# * Suffix of the cost key under which the execution time of the degraded mode of a module is recorded
+DEGRADED_COST_SUFFIX = ":degraded"
 
 
 @dataclass
@@ -188,126 +103,6 @@ class ClassifierConfigException(Exception):
         super().__init__(message)
 
 
-@dataclass
-class MetadataOption:
-    label: str
-    value: str | int
-
-
-@dataclass
-class Metadata:
-    id: str
-    name: str
-    feature_type: Literal[
-        "text",
-        "yesno",
-        "categorical",
-        "numeric",
-        "multiple_numeric",
-        "multi_label",
-        "key_value_list",
-        "numeric_range"
-    ]
-    options: list[MetadataOption] | list[dict[str, str]] = field(default_factory=list)
-    default_weights: dict[str, float] = field(default_factory=dict)
-
-    required_condition: str | None = field(default=None)  # The condition specific for this module
-    is_tertile: bool = field(default=False)  # If True, the tertile nodes will be created for the module
-    has_multiple_predictions: bool = field(default=False)  # If True, the prediction from the module is expected to be a dictionary with multiple prediction values
-
-    def __post_init__(self):
-        # * Ensure "cost" and "risk" are in default_weights with default values if not provided
-        self.default_weights.setdefault("cost", 0.0)
-        self.default_weights.setdefault("risk", 0.0)
-
-        self.validate()
-
-    def to_dict(self) -> dict:
-        return asdict(self)
-
-    def get_description(self, selected_value):
-        if self.id == "gender":
-            genders = [x for x in self.options if x.value == selected_value]
-            if len(genders) > 0:
-                return genders[0].label
-            else:
-                return selected_value
-        if self.feature_type in ["numeric", "yesno"] or self.id == "phase":
-            return self.name
-        if self.feature_type == "multi_label":
-            if isinstance(selected_value, list) and selected_value:
-                return ", ".join(str(value) for value in selected_value)
-            return "_"
-        if isinstance(selected_value, list):
-            return ", ".join(str(value) for value in selected_value)
-        return str(selected_value) if selected_value is not None else "_"
-
-    def get_value(self, selected_value, prediction):
-        if self.id != "phase" and self.feature_type in ["categorical", "multi_label", "numeric_range"]:
-            if selected_value or isinstance(selected_value, list):
-                return 1
-            return 0
-        if self.feature_type == "yesno":
-            if selected_value in ["yes", "no"]:
-                return 1 if selected_value == "yes" else 0
-
-        if selected_value:
-            return selected_value
-        return prediction
-
-    def validate(self):
-        """
-        Validate the options based on the feature_type.
-
-        Raises:
-            ValueError: If feature_type is 'key_value_list' and any option is not a dictionary.
-            ValueError: If feature_type is not 'key_value_list' and any option is not an instance of MetadataOption.
-
-        Examples:
-            >>> # Valid example for feature_type 'key_value_list'
-            >>> metadata = Metadata(
-            >>>     id="123",
-            >>>     name="Example Metadata",
-            >>>     feature_type="key_value_list",
-            >>>     options=[{"key1": "value1"}, {"key2": "value2"}]
-            >>> )
-            >>> metadata.validate()  # Should pass without error
-
-            >>> # Invalid example for feature_type 'key_value_list'
-            >>> metadata = Metadata(
-            >>>     id="123",
-            >>>     name="Example Metadata",
-            >>>     feature_type="key_value_list",
-            >>>     options=[MetadataOption(label="Option1", value="Value1")]
-            >>> )
-            >>> metadata.validate()  # Should raise ValueError
-
-            >>> # Valid example for feature_type 'categorical'
-            >>> metadata = Metadata(
-            >>>     id="123",
-            >>>     name="Example Metadata",
-            >>>     feature_type="categorical",
-            >>>     options=[MetadataOption(label="Option1", value="Value1")]
-            >>> )
-            >>> metadata.validate()  # Should pass without error
-
-            >>> # Invalid example for feature_type 'categorical'
-            >>> metadata = Metadata(
-            >>>     id="123",
-            >>>     name="Example Metadata",
-            >>>     feature_type="categorical",
-            >>>     options=[{"key1": "value1"}, {"key2": "value2"}]
-            >>> )
-            >>> metadata.validate()  # Should raise ValueError
-        """
-        if self.feature_type == "key_value_list":
-            if not all(isinstance(option, dict) for option in self.options):
-                raise ValueError("All options must be dictionaries for key_value_list feature type")
-        else:
-            if not all(isinstance(option, MetadataOption) for option in self.options):
-                raise ValueError(f"All options must be MetadataOption instances for {self.feature_type} feature type")
-
-
 class BaseProcessor(ABC):
     """Base class for all processors."""
 
@@ -322,14 +117,54 @@ class BaseProcessor(ABC):
 
         self.config: ClassifierConfig | None = None
 
+    # * Names of the shared products (see `clinicaltrials.products`) that the processor uses. ClinicalTrial builds each
+    # * of them once per document, before the processors that require it
+    requires: tuple[str, ...] = ()
+
+    # * Whether the result feeds the cost and risk model directly. When a run has a time budget, these processors are
+    # * started before the others
+    is_high_value: bool = False
+
     @abstractmethod
     def process(self, document: Document, config: ClassifierConfig | None = None):
         raise NotImplementedError("Subclasses must implement the 'process' method.")
 
+    def process_degraded(self, document: Document, config: ClassifierConfig | None = None) -> Any:
+        """
+        Cheaper version of `process`, used when a run is about to exceed its time budget. Processors with an expensive
+        step they can do without override this, e.g. to use only their rule based part.
+        """
+
+        raise NotImplementedError("The processor has no degraded mode.")
+
+    @property
+    def can_degrade(self) -> bool:
+        return type(self).process_degraded is not BaseProcessor.process_degraded
+
     @property
-    @abstractmethod
     def metadata(self) -> Metadata | None:
-        """Optional metadata property to be defined in child classes."""
+        """
+        Static metadata of the processor, declared in `clinicaltrials.registry` so that it can be read without importing
+        the processor. Processors that are not registered can override this.
+        """
+
+        definition = PROCESSORS.get(self.module_name)
+        return definition.metadata if definition is not None else None
+
+    def process_batch(self, documents: list[Document], config: ClassifierConfig | None = None) -> list[Any]:
+        """
+        Run the processor on several documents. Processors backed by a classifier override this so that the features of
+        all documents are stacked and the classifier predicts once for the whole batch.
+        """
+
+        return [run_processor(module_instance=self, document=document, config=config) for document in documents]
+
+    def load_models(self, config: ClassifierConfig | None = None) -> None:
+        """
+        Load the classifiers used by the processor. Processors backed by a model override this so that the model can be
+        loaded once, ahead of the first document, instead of inside `process`.
+        """
+
         return None
 
     def set_config(self, config: ClassifierConfig) -> Self:
@@ -404,79 +239,12 @@ class Event:
 
 
 class ClinicalTrial:
-    from .age import Age
-    from .biobank import Biobank
-    from .child import Child
-    from .cohort_size import CohortSize
-    from .condition import Condition
-    from .consent import Consent
-    from .control_negative import ControlNegative
-    from .country import Country
-    from .design import Design
-    from .document_type import DocumentType
-    from .drug import Drug
-    from .duration import Duration
-    from .effect_estimate import EffectEstimate
-    from .gender import Gender
-    from .healthy import Healthy
-    from .human_challenge import HumanChallenge
-    from .interim import Interim
-    from .intervention_type import InterventionType
-    from .master_protocol import MasterProtocol
-    from .num_arms import NumArms
-    from .num_interventions_per_visit import NumInterventionsPerVisit
-    from .num_interventions_total import NumInterventionsTotal
-    from .num_sites import NumSites
-    from .num_visits import NumVisits
-    from .overnight_stay import OvernightStay
-    from .phase import Phase
-    from .placebo import Placebo
-    from .platform_trial import PlatformTrial
-    from .randomisation import Randomisation
-    from .regimen import Regimen
-    from .regimen_duration import RegimenDuration
-    from .sample_size import SampleSize
-    from .sap import Sap
-    from .simulation import Simulation
-    from .vaccine import Vaccine
-
-    __loaded_modules: dict[str, type[BaseProcessor]] = {
-        "drug": Drug,
-        "phase": Phase,
-        "condition": Condition,
-        "country": Country,
-        "effect_estimate": EffectEstimate,
-        "simulation": Simulation,
-        "sample_size": SampleSize,
-        "sap": Sap,
-        "num_arms": NumArms,
-        "cohort_size": CohortSize,
-        "biobank": Biobank,
-        "num_sites": NumSites,
-        "duration": Duration,
-        "num_visits": NumVisits,
-        "num_interventions_per_visit": NumInterventionsPerVisit,
-        "num_interventions_total": NumInterventionsTotal,
-        "design": Design,
-        "consent": Consent,
-        "randomisation": Randomisation,
-        "control_negative": ControlNegative,
-        "healthy": Healthy,
-        "gender": Gender,
-        "age": Age,
-        "child": Child,
-        "placebo": Placebo,
-        "regimen": Regimen,
-        "interim": Interim,
-        "document_type": DocumentType,
-        "vaccine": Vaccine,
-        "intervention_type": InterventionType,
-        "overnight_stay": OvernightStay,
-        "human_challenge": HumanChallenge,
-        "regimen_duration": RegimenDuration,
-        "master_protocol": MasterProtocol,
-        "platform_trial": PlatformTrial,
-    }
+    # * Processors by module name. A processor is imported the first time it is used, see `clinicaltrials.registry`
+    __loaded_modules: dict[str, ProcessorDefinition] = PROCESSORS
+
+    # * Processor classes imported so far, shared by every ClinicalTrial of the process
+    __processor_classes: dict[str, type[BaseProcessor]] = {}
+    __processor_classes_lock = Lock()
 
     def __init__(self, classifier_config: ClassifierConfig | None = None) -> None:
         """
@@ -497,17 +265,38 @@ class ClinicalTrial:
 
         self.classifier_config = classifier_config
 
-        self.__check_modules()
+        # * Long-lived processor instances, created once and reused for every document so that models are loaded once
+        self.__processors: dict[str, BaseProcessor] = {}
+        self.__processors_lock = Lock()
+
+        # * Smoothed execution time in seconds of each module and product, used to start the most expensive work first
+        self.__costs: dict[str, float] = {}
+
+        # * Worker processes of the "processes" execution mode, created on first use
+        self.__process_pool: ProcessPoolExecutor | None = None
+        self.__process_pool_workers: int | None = None
+        self.__result_queue: Any = None
+        self.__cancel_event: Any = None
+        self.__process_run_lock = Lock()
 
-    def __check_modules(self):
+    def __get_processor_class(self, module_name: str) -> type[BaseProcessor]:
         """
-        Checks if all classes in 'modules' extend from BaseProcessor.
-        Raises RuntimeError if any class does not.
+        Get the class of a processor, importing it on first use.
+        Raises RuntimeError if the class does not extend BaseProcessor.
         """
-        for module in self.__loaded_modules.values():
-            direct_inheritance = module.__base__ is BaseProcessor
-            if not direct_inheritance:
-                raise RuntimeError(f"{module.__name__} does not extend BaseProcessor")
+
+        processor_class = self.__processor_classes.get(module_name)
+        if processor_class is not None:
+            return processor_class
+
+        with self.__processor_classes_lock:
+            if module_name not in self.__processor_classes:
+                processor_class = self.__loaded_modules[module_name].load()
+                if processor_class.__base__ is not BaseProcessor:
+                    raise RuntimeError(f"{processor_class.__name__} does not extend BaseProcessor")
+                self.__processor_classes[module_name] = processor_class
+
+        return self.__processor_classes[module_name]
 
     @property
     def modules(self):
@@ -523,17 +312,8 @@ class ClinicalTrial:
 
     @property
     def metadata(self) -> list[Metadata]:
-        metadata_list: list[Metadata] = []
-        for name, processor_cls in self.__loaded_modules.items():
-            try:
-                processor = processor_cls()
-                if processor.metadata is not None:
-                    metadata_list.append(processor.metadata)
-
-            except TypeError as e:
-                self.logger.debug(f"Could not instantiate {name}: {e}")
-
-        return metadata_list
+        """Metadata of every module, read from the registry without importing the processors"""
+        return [definition.metadata for definition in self.__loaded_modules.values()]
 
     @property
     def metadata_dict(self) -> list[dict]:
@@ -546,40 +326,99 @@ class ClinicalTrial:
         capitalized_words = [word.capitalize() for word in words]
         return " ".join(capitalized_words)
 
+    def __get_processor(self, module_name: str) -> BaseProcessor:
+        """
+        Get the long-lived instance of a processor, creating it on first use.
+        Each processor gets its own copy of the classifier config because `get_classifier_config_or_default` writes the
+        resolved classifier path back into it.
+        """
+
+        processor = self.__processors.get(module_name)
+        if processor is not None:
+            return processor
+
+        with self.__processors_lock:
+            if module_name not in self.__processors:
+                instance = self.__get_processor_class(module_name=module_name)()
+                instance.set_config(replace(self.classifier_config))
+                self.__processors[module_name] = instance
+
+        return self.__processors[module_name]
+
     def get_module(self, module_name: str) -> BaseProcessor:
         if module_name not in self.__loaded_modules:
             raise Exception("Invalid module")
 
-        instance = self.__loaded_modules[module_name]()
-        instance.set_config(self.classifier_config)
+        return self.__get_processor(module_name=module_name)
 
-        return instance
+    def warm_up(self, exclude_modules: list[str] = []) -> dict[str, float]:
+        """
+        Instantiate every processor, load its models and compile the rule based matchers, so that documents processed
+        afterwards only pay for inference. Call this once per process, e.g. when a Celery worker process starts.
 
-    def __run_module(self, module_instance: BaseProcessor, document: Document, config: ClassifierConfig, accumulator_dict: dict[str, Any]):
-        start_time = time.time()
-        self.logger.info(f"Module {module_instance.module_name} run started")
-        self.event.notify(EventData(type="message", data=f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Module {self.human_readable(module_instance.module_name)} run started"))
+        Returns: Time in seconds spent loading the models of each module
+        """
 
-        if "config" in inspect.signature(obj=module_instance.process).parameters:
-            result = module_instance.process(document=document, config=config)
-        else:
-            result = module_instance.process(document=document)
+        load_times: dict[str, float] = {}
+        required_products: set[str] = set()
+        for module_name in self.__loaded_modules:
+            if module_name in exclude_modules:
+                continue
 
-        accumulator_dict[module_instance.module_name] = result
+            start_time = time.time()
+            processor = self.__get_processor(module_name=module_name)
+            processor.load_models(config=processor.config)
+            load_times[module_name] = time.time() - start_time
+            required_products.update(processor.requires)
 
-        end_time = time.time()
-        execution_time = end_time - start_time
+            self.logger.info(f"Module {module_name} warmed up in {load_times[module_name]} seconds")
+
+        load_products(names=required_products)
+
+        # * The rule based matchers are compiled on first use, or loaded from the matcher cache
+        from clinicaltrials.matcher_cache import compile_matchers
+
+        for matcher_name, compile_time in compile_matchers().items():
+            self.logger.info(f"Matcher {matcher_name} compiled in {compile_time} seconds")
 
-        self.logger.info(f"Module {module_instance.module_name} run complete in {execution_time} seconds")
+        return load_times
+
+    def __notify_module_started(self, module_name: str) -> None:
+        self.logger.info(f"Module {module_name} run started")
+        self.event.notify(EventData(type="message", data=f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Module {self.human_readable(module_name)} run started"))
+
+    def __notify_module_completed(self, module_name: str, execution_time: float, num_documents: int = 1, degraded: bool = False) -> None:
+        self.logger.info(f"Module {module_name} run complete in {execution_time} seconds{' (degraded)' if degraded else ''}")
+        self.__record_cost(node=module_name + DEGRADED_COST_SUFFIX if degraded else module_name, execution_time=execution_time / num_documents)
 
         # * Notify about the run completion
         self.event.notify(
             EventData(
                 type="message",
-                data=f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Module {self.human_readable(module_instance.module_name)} run complete in {execution_time} seconds",
+                data=f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Module {self.human_readable(module_name)} run complete in {execution_time} seconds",
             )
         )
 
+        self.__increment_progress()
+
+    def __skip_module(self, module_name: str) -> dict[str, Any]:
+        """
+        Report a module that was not run because the run was out of time, and return its result marker.
+        """
+
+        self.logger.warning(f"Module {module_name} skipped, the run is out of time")
+        self.event.notify(
+            EventData(
+                type="message",
+                data=f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Module {self.human_readable(module_name)} skipped to finish in time",
+            )
+        )
+
+        self.__increment_progress()
+
+        return {"status": "skipped"}
+
+    def __increment_progress(self) -> None:
         # * Increment the run completed modules counter
         self.__run_completed_modules += 1
 
@@ -589,37 +428,635 @@ class ClinicalTrial:
             self.logger.info(f"Completion: {progress:.2f}%")
             self.event.notify(EventData(type="completion_progress", data=progress))
 
-        return accumulator_dict
+    def __run_module(
+        self, module_instance: BaseProcessor, document: Document, config: ClassifierConfig | None, degraded: bool = False, given_up: ThreadEvent | None = None
+    ) -> tuple[Any, float]:
+        start_time = time.time()
+        self.__notify_module_started(module_name=module_instance.module_name)
+
+        try:
+            result = run_processor(module_instance=module_instance, document=document, config=config, degraded=degraded)
+        except RunCancelledError:
+            if given_up is not None and given_up.is_set():
+                # * Stopped at its next page after the run gave up on it, the time it ran for is a lower bound of its cost
+                self.logger.info(f"Module {module_instance.module_name} stopped after {time.time() - start_time} seconds, the run gave up on it")
+                self.__record_cost(node=module_instance.module_name + DEGRADED_COST_SUFFIX if degraded else module_instance.module_name, execution_time=time.time() - start_time)
+            raise
+
+        end_time = time.time()
+        execution_time = end_time - start_time
+
+        if given_up is not None and given_up.is_set():
+            # * Already reported as skipped by a run that has returned, so only its cost is kept for the next plans
+            self.logger.info(f"Module {module_instance.module_name} finished in {execution_time} seconds, after the run gave up on it")
+            self.__record_cost(node=module_instance.module_name + DEGRADED_COST_SUFFIX if degraded else module_instance.module_name, execution_time=execution_time)
+        else:
+            self.__notify_module_completed(module_name=module_instance.module_name, execution_time=execution_time, degraded=degraded)
+
+        return result, execution_time
+
+    def __get_process_pool(self, max_workers: int, exclude_modules: list[str]) -> ProcessPoolExecutor:
+        """
+        Get the process pool of this ClinicalTrial, creating it on first use.
+        The models are loaded before the pool forks, so the workers share them with the parent through copy-on-write
+        instead of each loading its own copy.
+        """
+
+        global _pool_clinical_trial
+
+        if self.__process_pool is not None and self.__process_pool_workers == max_workers:
+            return self.__process_pool
+
+        self.shutdown()
+        self.warm_up(exclude_modules=exclude_modules)
+
+        # * Forked workers inherit this reference, spawned workers build their own ClinicalTrial in `_init_pool_worker`
+        _pool_clinical_trial = self
+
+        start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        mp_context = multiprocessing.get_context(start_method)
+
+        # * Handed to the workers when they start, so that they can stream each module result back as it completes and
+        # * stop when the run they work on is cancelled
+        self.__result_queue = mp_context.Queue()
+        self.__cancel_event = mp_context.Event()
+        self.__process_pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=mp_context,
+            initializer=_init_pool_worker,
+            initargs=(self.classifier_config, self.__result_queue, self.__cancel_event),
+        )
+        self.__process_pool_workers = max_workers
+
+        return self.__process_pool
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker processes used by the "processes" execution mode, if any.
+        """
+
+        if self.__process_pool is not None:
+            self.__process_pool.shutdown()
+            self.__process_pool = None
+            self.__process_pool_workers = None
+            self.__result_queue = None
+            self.__cancel_event = None
+
+    @property
+    def costs(self) -> dict[str, float]:
+        """
+        Smoothed execution time in seconds of each module and shared product (prefixed with "product:") measured on the
+        documents processed so far.
+        """
+
+        return dict(self.__costs)
+
+    def set_costs(self, costs: dict[str, float]) -> None:
+        """
+        Seed the execution times used for scheduling, e.g. with the `costs` saved from an earlier process.
+        """
+
+        self.__costs.update(costs)
+
+    def __record_cost(self, node: str, execution_time: float) -> None:
+        previous_cost = self.__costs.get(node)
+        self.__costs[node] = execution_time if previous_cost is None else COST_SMOOTHING * execution_time + (1 - COST_SMOOTHING) * previous_cost
+
+    def __get_cost(self, node: str) -> float:
+        # * Work that was never timed is assumed to be as expensive as the slowest known work, so it is not left to last
+        return self.__costs.get(node, max(self.__costs.values(), default=0.0))
+
+    def __plan_node(self, node: str, deadline_at: float | None, start_at: float | None = None) -> RunPlan:
+        """
+        Decide how to run a node that starts at `start_at` (now by default) so that the run ends before `deadline_at`.
+        A node that is not expected to finish in time runs in its degraded mode if it has one that fits, or is skipped.
+        """
+
+        if deadline_at is None:
+            return "full"
+
+        start_at = time.time() if start_at is None else start_at
+        if start_at + self.__get_cost(node) <= deadline_at:
+            return "full"
+
+        if not node.startswith(PRODUCT_KEY_PREFIX) and self.__get_processor(module_name=node).can_degrade:
+            # * A degraded mode that was never timed is assumed to fit, as it exists to be cheap
+            if start_at + self.__costs.get(node + DEGRADED_COST_SUFFIX, 0.0) <= deadline_at:
+                return "degraded"
+
+        return "skipped"
+
+    def __get_plan_cost(self, node: str, plan: RunPlan) -> float:
+        if plan == "skipped":
+            return 0.0
+
+        if plan == "degraded":
+            return self.__costs.get(node + DEGRADED_COST_SUFFIX, 0.0)
+
+        return self.__get_cost(node)
+
+    def __build_graph(self, module_names: list[str]) -> dict[str, set[str]]:
+        """
+        Dependency graph of a run, mapping each node to the nodes it waits for. The nodes are the modules and the shared
+        products they require.
+        """
+
+        graph: dict[str, set[str]] = {}
+        for module_name in module_names:
+            product_nodes = set()
+            for product_name in self.__get_processor_class(module_name=module_name).requires:
+                if product_name not in PRODUCTS:
+                    raise KeyError(f"Module {module_name} requires unknown product {product_name}")
+
+                product_nodes.add(PRODUCT_KEY_PREFIX + product_name)
+                graph.setdefault(PRODUCT_KEY_PREFIX + product_name, set())
+
+            graph[module_name] = product_nodes
+
+        return graph
+
+    def __get_priorities(self, graph: dict[str, set[str]]) -> dict[str, float]:
+        """
+        Priority of each node: its own cost plus the most expensive chain of nodes waiting for it. Starting the nodes with
+        the highest priority first shortens the critical path of the run.
+        """
+
+        dependents: dict[str, list[str]] = {node: [] for node in graph}
+        for node, dependencies in graph.items():
+            for dependency in dependencies:
+                dependents[dependency].append(node)
+
+        priorities: dict[str, float] = {}
+
+        def get_priority(node: str) -> float:
+            if node not in priorities:
+                priorities[node] = self.__get_cost(node) + max((get_priority(dependent) for dependent in dependents[node]), default=0.0)
+            return priorities[node]
+
+        for node in graph:
+            get_priority(node)
+
+        return priorities
+
+    def __get_deadline_priorities(self, graph: dict[str, set[str]]) -> dict[str, tuple[bool, float]]:
+        """
+        Priority of each node when the run has a time budget: the high value modules first and, among them, the cheapest
+        first, so that as many results as possible are in before the deadline. A product gets the highest priority of
+        the modules that require it.
+        """
+
+        priorities: dict[str, tuple[bool, float]] = {
+            node: (self.__get_processor(module_name=node).is_high_value, -self.__get_cost(node)) for node in graph if not node.startswith(PRODUCT_KEY_PREFIX)
+        }
+
+        for node, dependencies in graph.items():
+            for dependency in dependencies:
+                priorities[dependency] = max(priorities.get(dependency, (False, -float("inf"))), priorities[node])
+
+        return priorities
+
+    def __run_node(
+        self, node: str, document: Document, config: ClassifierConfig | None, plan: RunPlan = "full", given_up: ThreadEvent | None = None
+    ) -> tuple[Any, float] | None:
+        """
+        Run one node of the graph as planned. Returns the result and execution time of a module, or None for a product.
+        A skipped product is not built here, the modules that require it build it themselves if they still run. Once
+        `given_up` is set, the node stops at its next page and a module that finishes sends no event.
+        """
+
+        with run_scope(given_up=given_up):
+            document.raise_if_cancelled()
+
+            if node.startswith(PRODUCT_KEY_PREFIX):
+                if plan != "skipped":
+                    start_time = time.time()
+                    get_product(document=document, name=node.removeprefix(PRODUCT_KEY_PREFIX))
+                    self.__record_cost(node=node, execution_time=time.time() - start_time)
+                return None
+
+            if plan == "skipped":
+                return self.__skip_module(module_name=node), 0.0
+
+            module_instance = self.__get_processor(module_name=node)
+            return self.__run_module(
+                module_instance=module_instance, document=document, config=module_instance.config or config, degraded=plan == "degraded", given_up=given_up
+            )
+
+    def __iter_graph(
+        self, graph: dict[str, set[str]], document: Document, config: ClassifierConfig | None, max_workers: int | None, deadline_at: float | None = None
+    ) -> ModuleResults:
+        """
+        Run the nodes of the graph, serially if `max_workers` is 1 and in a thread pool otherwise. A node starts as soon
+        as the nodes it waits for are done, the ones with the highest priority first. Yields each module as it finishes.
+
+        With a `deadline_at`, each node is planned just before it starts and the modules still running at the deadline
+        are given up on and reported as skipped. Their threads stop at the next page they check for cancellation, and send
+        no events if they finish before that.
+        """
+
+        priorities: dict[str, Any] = self.__get_priorities(graph=graph) if deadline_at is None else self.__get_deadline_priorities(graph=graph)
+        waiting_for = {node: set(dependencies) for node, dependencies in graph.items()}
+
+        def pop_ready_nodes() -> list[str]:
+            ready_nodes = sorted([node for node, dependencies in waiting_for.items() if not dependencies], key=lambda node: priorities[node], reverse=True)
+            for node in ready_nodes:
+                del waiting_for[node]
+            return ready_nodes
+
+        def complete(node: str) -> None:
+            for dependencies in waiting_for.values():
+                dependencies.discard(node)
+
+        if max_workers == 1:
+            while waiting_for:
+                for node in pop_ready_nodes():
+                    outcome = self.__run_node(node=node, document=document, config=config, plan=self.__plan_node(node=node, deadline_at=deadline_at))
+                    complete(node=node)
+                    if outcome is not None:
+                        yield node, outcome[0], outcome[1]
+            return
+
+        executor = ThreadPoolExecutor(max_workers=max_workers or len(graph))
+        given_up = ThreadEvent()
+        try:
+            running: dict[Future, str] = {}
+            while waiting_for or running:
+                for node in pop_ready_nodes():
+                    plan = self.__plan_node(node=node, deadline_at=deadline_at)
+                    if plan == "skipped":
+                        outcome = self.__run_node(node=node, document=document, config=config, plan=plan)
+                        complete(node=node)
+                        if outcome is not None:
+                            yield node, outcome[0], outcome[1]
+                        continue
+
+                    running[executor.submit(self.__run_node, node, document, config, plan, given_up)] = node
+
+                # * Skipped nodes may have made more nodes ready
+                if not running:
+                    continue
+
+                timeout = None if deadline_at is None else max(0.0, deadline_at - time.time())
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    # * Out of time: the results of the modules still running or waiting are given up on, and the running ones
+                    # * stop at their next page
+                    given_up.set()
+                    for node in list(running.values()) + list(waiting_for):
+                        if not node.startswith(PRODUCT_KEY_PREFIX):
+                            yield node, self.__skip_module(module_name=node), 0.0
+                    return
+
+                for future in done:
+                    node = running.pop(future)
+                    outcome = future.result()
+                    complete(node=node)
+                    if outcome is not None:
+                        yield node, outcome[0], outcome[1]
+        finally:
+            # * Without a deadline the run always waits for its modules, with one it does not wait for the abandoned ones
+            executor.shutdown(wait=deadline_at is None, cancel_futures=True)
+
+    def __assign_to_workers(self, module_names: list[str], num_workers: int) -> list[list[str]]:
+        """
+        Split the modules between the worker processes. Modules that require the same product go to the same worker, so
+        that the product is built once, and the groups are handed out most expensive first to the least loaded worker.
+        Shared products are sent to every worker with the document, so they do not group their modules.
+        """
+
+        # * Each group is the set of products it requires and its modules
+        groups: list[tuple[set[str], list[str]]] = []
+        for module_name in module_names:
+            products = set(self.__get_processor_class(module_name=module_name).requires) - SHARED_PRODUCTS
+            modules = [module_name]
+            for group in [group for group in groups if group[0] & products]:
+                groups.remove(group)
+                products |= group[0]
+                modules = group[1] + modules
+
+            groups.append((products, modules))
+
+        priorities = self.__get_priorities(graph=self.__build_graph(module_names=module_names))
+
+        def get_group_cost(group: tuple[set[str], list[str]]) -> float:
+            products, modules = group
+            return sum(self.__get_cost(module_name) for module_name in modules) + sum(self.__get_cost(PRODUCT_KEY_PREFIX + product_name) for product_name in products)
+
+        loads = [0.0] * num_workers
+        assignments: list[list[str]] = [[] for _ in range(num_workers)]
+        for group in sorted(groups, key=get_group_cost, reverse=True):
+            worker = loads.index(min(loads))
+            assignments[worker].extend(group[1])
+            loads[worker] += get_group_cost(group)
+
+        return [sorted(assigned, key=lambda module_name: -priorities[module_name]) for assigned in assignments if assigned]
+
+    def __iter_modules_in_processes(self, module_names: list[str], document: Document, max_workers: int | None, deadline_at: float | None = None) -> ModuleResults:
+        """
+        Run the modules in the process pool and yield each module as its worker reports it. With a `deadline_at`, the
+        modules of each worker are planned when they are sent, from the expected time at which each one starts, and the
+        modules not reported by the deadline are given up on and reported as skipped.
+        """
+
+        num_workers = max_workers or cpu_count() or 1
+
+        # * The workers report through a single queue, so only one document at a time runs in the pool
+        with self.__process_run_lock:
+            process_pool = self.__get_process_pool(max_workers=num_workers, exclude_modules=[key for key in self.__loaded_modules if key not in module_names])
+            result_queue = cast(Any, self.__result_queue)
+
+            # * The document is tokenised and its shared products are built once here, then it is sent to the workers
+            for product_name in SHARED_PRODUCTS & {product_name for module_name in module_names for product_name in self.__get_processor_class(module_name=module_name).requires}:
+                start_time = time.time()
+                get_product(document=document, name=product_name)
+                self.__record_cost(node=PRODUCT_KEY_PREFIX + product_name, execution_time=time.time() - start_time)
+
+            document_id = str(uuid.uuid4())
+            document_bytes = document.to_bytes()
+
+            futures = []
+            plans: dict[str, RunPlan] = {}
+            for module_chunk in self.__assign_to_workers(module_names=module_names, num_workers=num_workers):
+                start_at = time.time()
+                planned_chunk: list[tuple[str, RunPlan]] = []
+                for module_name in module_chunk:
+                    plans[module_name] = self.__plan_node(node=module_name, deadline_at=deadline_at, start_at=start_at)
+                    start_at += self.__get_plan_cost(node=module_name, plan=plans[module_name])
+
+                    if plans[module_name] == "skipped":
+                        yield module_name, self.__skip_module(module_name=module_name), 0.0
+                        continue
+
+                    self.__notify_module_started(module_name=module_name)
+                    planned_chunk.append((module_name, plans[module_name]))
+
+                if planned_chunk:
+                    futures.append(process_pool.submit(_run_modules_in_worker, planned_chunk, document_id, document_bytes))
+
+            # * Each worker puts every module result on the queue as soon as it has it
+            remaining_modules = {module_name for module_name, plan in plans.items() if plan != "skipped"}
+            while remaining_modules:
+                if document.cancellation_token is not None and document.cancellation_token.is_cancelled():
+                    self.__stop_workers(futures=futures)
+                    raise RunCancelledError("The run was cancelled")
+
+                if deadline_at is not None and time.time() >= deadline_at:
+                    # * Out of time: the modules still running are stopped and their results given up on
+                    self.__stop_workers(futures=futures)
+                    for module_name in [module_name for module_name in module_names if module_name in remaining_modules]:
+                        yield module_name, self.__skip_module(module_name=module_name), 0.0
+                    return
+
+                try:
+                    result_document_id, node, result, execution_time = result_queue.get(timeout=0.1)
+                except Empty:
+                    for future in futures:
+                        if future.done() and future.exception() is not None:
+                            raise cast(BaseException, future.exception())
+                    continue
+
+                # * Left over from an earlier document whose results were not all consumed
+                if result_document_id != document_id:
+                    continue
+
+                if node.startswith(PRODUCT_KEY_PREFIX):
+                    self.__record_cost(node=node, execution_time=execution_time)
+                    continue
+
+                remaining_modules.discard(node)
+                self.__notify_module_completed(module_name=node, execution_time=execution_time, degraded=plans[node] == "degraded")
+
+                yield node, result, execution_time
+
+    def __stop_workers(self, futures: list[Future]) -> None:
+        """
+        Stop the modules running in the process pool between pages, wait for the workers and drop the results they put
+        on the queue, so that the pool is free for the next document.
+        """
+
+        result_queue = cast(Any, self.__result_queue)
+        cancel_event = cast(Any, self.__cancel_event)
+
+        cancel_event.set()
+        try:
+            wait(futures)
+        finally:
+            cancel_event.clear()
+
+        while True:
+            try:
+                result_queue.get_nowait()
+            except Empty:
+                break
+
+    def run_iter(
+        self,
+        document: Document,
+        config: ClassifierConfig | None = None,
+        exclude_modules: list[str] = [],
+        execution_mode: ExecutionMode = "serial",
+        max_workers: int | None = None,
+        time_budget: float | None = None,
+        cancellation_token: CancellationToken | None = None,
+    ) -> ModuleResults:
+        """
+        Run all modules on a document and yield `(module_name, result, execution_time)` for each module as soon as it
+        finishes, so that callers can use the fast modules while the slow ones are still running. The parameters are the
+        same as for `run_all`.
+        """
+
+        if execution_mode not in ("serial", "threads", "processes"):
+            raise ValueError(f"Invalid execution mode {execution_mode}")
+
+        deadline_at = None if time_budget is None else time.time() + time_budget
+
+        # * The token is only set for this run, so that a later run of the same document does not see it
+        previous_cancellation_token = document.cancellation_token
+        if cancellation_token is not None:
+            document.cancellation_token = cancellation_token
+
+        try:
+            document.raise_if_cancelled()
+
+            hot_modules = [key for key in self.__loaded_modules if key not in exclude_modules]
+            self.logger.info(f"Running {len(hot_modules)} modules")
+
+            self.__run_completed_modules = 0
+
+            if execution_mode == "processes":
+                yield from self.__iter_modules_in_processes(module_names=hot_modules, document=document, max_workers=max_workers, deadline_at=deadline_at)
+            else:
+                graph = self.__build_graph(module_names=hot_modules)
+                yield from self.__iter_graph(
+                    graph=graph, document=document, config=config, max_workers=1 if execution_mode == "serial" else max_workers, deadline_at=deadline_at
+                )
+        finally:
+            document.cancellation_token = previous_cancellation_token
 
     def run_all(
-        self, document: Document, config: ClassifierConfig | None = None, parallel: bool = False, exclude_modules: list[str] = [], file_buffer: bytes | None = None
+        self,
+        document: Document,
+        config: ClassifierConfig | None = None,
+        parallel: bool = False,
+        exclude_modules: list[str] = [],
+        file_buffer: bytes | None = None,
+        execution_mode: ExecutionMode | None = None,
+        max_workers: int | None = None,
+        time_budget: float | None = None,
+        cancellation_token: CancellationToken | None = None,
     ) -> dict[str, Any]:
-        hot_modules = {key: value for key, value in self.__loaded_modules.items() if key not in exclude_modules}
-        self.logger.info(f"Running {len(hot_modules.keys())} modules")
+        """
+        Run all modules on a document. The modules and the shared products they require are scheduled as a dependency
+        graph: each product is built once, before the modules that require it, and the most expensive work according to
+        the timings of earlier documents starts first.
+
+        Parameters:
+        - parallel: Legacy switch, same as `execution_mode="threads"`.
+        - execution_mode: "serial" runs the modules one after the other, "threads" runs them in a thread pool and
+                          "processes" spreads them over a pool of worker processes, which avoids the GIL for the CPU
+                          bound matchers. Defaults to "threads" if `parallel` is set, else "serial".
+        - max_workers: Size of the thread or process pool. Defaults to one thread per module, or one process per CPU.
+        - time_budget: Seconds the run may take, e.g. what is left of the task time limit. The high value modules run
+                       first, and the modules that are not expected to finish in time run in their cheaper degraded mode,
+                       with `"status": "degraded"` in their result, or are skipped, with `{"status": "skipped"}` as
+                       their result. The expected time of a module comes from the timings of earlier documents.
+        - cancellation_token: Token to stop the run early. Once it is cancelled, the run stops before the next module or
+                              page and raises `RunCancelledError`.
+        """
+
+        if execution_mode is None:
+            execution_mode = "threads" if parallel else "serial"
 
         accumulator_dict: dict[str, Any] = {}
-        if parallel:
-            threads: list[Thread] = []
+        for module_name, result, _ in self.run_iter(
+            document=document,
+            config=config,
+            exclude_modules=exclude_modules,
+            execution_mode=execution_mode,
+            max_workers=max_workers,
+            time_budget=time_budget,
+            cancellation_token=cancellation_token,
+        ):
+            accumulator_dict[module_name] = result
+
+        # * Add highlights to the pdf
+        if file_buffer is not None:
+            pass
+
+        # * Keep the order of the modules independent of the order in which they finished
+        return {module_name: accumulator_dict[module_name] for module_name in self.__loaded_modules if module_name in accumulator_dict}
+
+    def run_batch(
+        self, documents: list[Document], config: ClassifierConfig | None = None, exclude_modules: list[str] = [], batch_size: int = 32
+    ) -> list[dict[str, Any]]:
+        """
+        Run all modules on many documents, e.g. when importing a back catalogue of protocols. The pages of a batch are
+        tokenised together with `nlp.pipe`, and each module runs once per batch so that the classifiers predict on the
+        stacked features of all its documents instead of one row at a time.
 
-            for module in hot_modules.values():
-                module_instance = module()
-                thread = Thread(target=self.__run_module, args=(module_instance, document, self.classifier_config or config, accumulator_dict))
-                threads.append(thread)
-                thread.start()
+        Parameters:
+        - batch_size: Number of documents processed together.
 
-            for thread in threads:
-                thread.join()
+        Returns: One result per document, in the same form as the result of `run_all`
+        """
 
-        else:
-            for module in hot_modules.values():
-                module_instance = module()
-                self.__run_module(module_instance=module_instance, document=document, config=self.classifier_config or config, accumulator_dict=accumulator_dict)
+        hot_modules = [key for key in self.__loaded_modules if key not in exclude_modules]
+        self.logger.info(f"Running {len(hot_modules)} modules on {len(documents)} documents")
 
-            # * Add highlights to the pdf
-            if file_buffer is not None:
-                pass
+        from clinicaltrials.document_context import DocumentContext
 
-        return accumulator_dict
+        results: list[dict[str, Any]] = []
+        for batch_start in range(0, len(documents), batch_size):
+            batch = documents[batch_start:batch_start + batch_size]
+            DocumentContext.tokenise_batch(contexts=[document.context for document in batch])
+
+            self.__run_completed_modules = 0
+
+            batch_results: list[dict[str, Any]] = [{} for _ in batch]
+            for module_name in hot_modules:
+                module_instance = self.__get_processor(module_name=module_name)
+
+                start_time = time.time()
+                self.__notify_module_started(module_name=module_name)
+
+                for document_results, result in zip(batch_results, module_instance.process_batch(documents=batch, config=module_instance.config or config)):
+                    document_results[module_name] = result
+
+                self.__notify_module_completed(module_name=module_name, execution_time=time.time() - start_time, num_documents=len(batch))
+
+            results.extend(batch_results)
+
+        return results
+
+
+def run_processor(module_instance: BaseProcessor, document: Document, config: ClassifierConfig | None, degraded: bool = False) -> Any:
+    """
+    Run one processor on a document, passing the config if its `process` accepts one. With `degraded`, the cheaper
+    `process_degraded` is run instead and its result is marked with `"status": "degraded"`.
+    """
+
+    if degraded:
+        result = module_instance.process_degraded(document=document, config=config)
+        if isinstance(result, dict):
+            result["status"] = "degraded"
+        return result
+
+    if "config" in inspect.signature(obj=module_instance.process).parameters:
+        return module_instance.process(document=document, config=config)
+
+    return module_instance.process(document=document)
+
+
+# * ClinicalTrial used by the workers of a process pool, the queue they report results on, the event set when their
+# * run is cancelled and the document they are currently working on
+_pool_clinical_trial: ClinicalTrial | None = None
+_pool_result_queue: Any = None
+_pool_cancel_event: Any = None
+_pool_document: tuple[str, Document] | None = None
+
+
+def _init_pool_worker(classifier_config: ClassifierConfig, result_queue: Any, cancel_event: Any) -> None:
+    global _pool_clinical_trial, _pool_result_queue, _pool_cancel_event
+
+    _pool_result_queue = result_queue
+    _pool_cancel_event = cancel_event
+
+    if _pool_clinical_trial is None:
+        # * Spawned workers do not share memory with the parent, so they load their own models
+        _pool_clinical_trial = ClinicalTrial(classifier_config=classifier_config)
+        _pool_clinical_trial.warm_up()
+
+
+def _run_modules_in_worker(planned_modules: list[tuple[str, RunPlan]], document_id: str, document_bytes: bytes) -> None:
+    """
+    Run modules in a worker process, each as planned by the parent, and put `(document_id, node, result,
+    execution_time)` on the result queue after each one. Products are reported with a None result, so that the parent
+    can record how long they took.
+    """
+
+    global _pool_document
+
+    if _pool_document is None or _pool_document[0] != document_id:
+        _pool_document = (document_id, Document.from_bytes(data=document_bytes))
+        _pool_document[1].cancellation_token = CancellationToken(event=_pool_cancel_event)
+
+    document = _pool_document[1]
+    ct = cast(ClinicalTrial, _pool_clinical_trial)
+
+    for module_name, plan in planned_modules:
+        document.raise_if_cancelled()
+        module_instance = ct.get_module(module_name=module_name)
+
+        for product_name in module_instance.requires:
+            if not has_product(document=document, name=product_name):
+                start_time = time.time()
+                get_product(document=document, name=product_name)
+                _pool_result_queue.put((document_id, PRODUCT_KEY_PREFIX + product_name, None, time.time() - start_time))
+
+        start_time = time.time()
+        result = run_processor(module_instance=module_instance, document=document, config=module_instance.config, degraded=plan == "degraded")
+        _pool_result_queue.put((document_id, module_name, result, time.time() - start_time))
 
 
 class CoreUtil:
@@ -643,6 +1080,8 @@ class CoreUtil:
 
     @staticmethod
     def download_file(url: str, save_path: str) -> bool:
+        import requests
+
         logging.getLogger().info(f"Downloading {url} to {save_path}")
         with requests.get(url, stream=True) as response:
             if response.status_code == 200:
@@ -1,10 +1,11 @@
 import re
 
+import numpy as np
 import pycountry
 
-from clinicaltrials.country.country_named_entity_recognition_spacy import find_countries_in_tokens
-from clinicaltrials.country.demonym_finder import find_demonyms
-from clinicaltrials.country.phone_number_finder import find_phone_numbers
+from clinicaltrials.country.country_matcher import country_matcher
+from clinicaltrials.resources import nlp
+from clinicaltrials.token_features import TokenArrays
 
 # List of low to medium income countries.
 LMIC_COUNTRIES = {"AF",
@@ -333,59 +334,70 @@ EMAIL_TLDS = {"ad",
 get_tld_regex = re.compile(r"[a-z]\.(" + "|".join(EMAIL_TLDS) + r")(?:\b|$|/)")
 
 
-def extract_features(docs: list):
+# * Country of each email and url domain, looked up once
+tld_to_country_code = {tld: pycountry.countries.lookup(tld).alpha_2 for tld in EMAIL_TLDS}
+
+
+def find_email_and_url_countries(token_arrays: TokenArrays) -> list[list[tuple[str, int, int, str]]]:
+    """
+    Countries of the email addresses and urls of a document, from their top level domains.
+
+    :param token_arrays: Token arrays of the document.
+    :return: For each page, the matches as tuples of the country code, the start and end token of the match and its type,
+        "url" or "email", in token order.
+    """
+
+    # * Whether a token looks like a url or an email depends on its text only, so each distinct token is checked once
+    orth_to_match = {}
+    for orth in np.unique(token_arrays.orth).tolist():
+        lexeme = nlp.vocab[orth]
+        if lexeme.like_url or lexeme.like_email:
+            tld_matches = [m.groups(0) for m in get_tld_regex.finditer(lexeme.orth_)]
+            if len(tld_matches) > 0:
+                orth_to_match[orth] = (tld_to_country_code[tld_matches[0][0]], "url" if lexeme.like_url else "email")
+
+    page_matches = [[] for _ in range(token_arrays.num_pages)]
+    for token_idx in np.flatnonzero(np.isin(token_arrays.orth, np.fromiter(orth_to_match, dtype=np.uint64))).tolist():
+        page_no = int(token_arrays.page[token_idx])
+        token_no = token_idx - int(token_arrays.page_offsets[page_no])
+        country_code, match_type = orth_to_match[int(token_arrays.orth[token_idx])]
+        page_matches[page_no].append((country_code, token_no, token_no + 1, match_type))
+
+    return page_matches
+
+
+def extract_features(docs: list, token_arrays: TokenArrays):
     country_to_pages = {}
 
     contexts = {}
 
     annotations = []
 
+    country_evidence = country_matcher.find(docs)
+    email_and_url_matches = find_email_and_url_countries(token_arrays=token_arrays)
+
     for page_no, doc in enumerate(docs):
-        country_matches = find_countries_in_tokens(doc)
-
-        demonym_matches = find_demonyms(doc)
-
-        phone_number_matches = find_phone_numbers(doc)
-
-        all_matches = []
-        for country in country_matches:
-            all_matches.append((country[0].alpha_2, country[1][1], country[1][2], "country"))
-        for demonym in demonym_matches:
-            all_matches.append((demonym[0], demonym[1][1], demonym[1][2], "demonym"))
-        for phone_number in phone_number_matches:
-            all_matches.append((phone_number[0], phone_number[1][1], phone_number[1][2], "phone"))
-
-        for token in doc:
-            if token.like_url or token.like_email:
-                tld_matches = [m.groups(0) for m in get_tld_regex.finditer(token.text)]
-                if len(tld_matches) > 0:
-                    tld = tld_matches[0][0]
-                    if tld in EMAIL_TLDS:
-                        if token.like_url:
-                            type = "url"
-                        else:
-                            type = "email"
-                        all_matches.append(
-                            (pycountry.countries.lookup(tld).alpha_2, token.i, token.i + 1, type))
+        all_matches = country_evidence[page_no] + email_and_url_matches[page_no]
+
+        if len(all_matches) == 0:
+            continue
+
+        page_offset = int(token_arrays.page_offsets[page_no])
+        token_starts = token_arrays.idx[page_offset:page_offset + len(doc)]
+        token_ends = token_starts + token_arrays.length[page_offset:page_offset + len(doc)]
 
         for country_alpha_2, match_start_tok_idx, match_end_tok_idx, match_type in all_matches:
             if country_alpha_2 not in country_to_pages:
                 country_to_pages[country_alpha_2] = []
 
-            match_start_char = doc[match_start_tok_idx].idx
-            match_end_char = doc[match_end_tok_idx - 1].idx + len(doc[match_end_tok_idx - 1])
+            match_start_char = int(token_starts[match_start_tok_idx])
+            match_end_char = int(token_ends[match_end_tok_idx - 1])
 
             match_text = doc[match_start_tok_idx:match_end_tok_idx].text
 
-            start = match_start_tok_idx - 10
-            end = match_end_tok_idx + 10
-            if start < 0:
-                start = 0
-            if end > len(doc) - 1:
-                end = len(doc)
-
-            context = doc[start:end].text
-            context_clean = re.sub(r'\S+', ' ', context).strip()
+            # * The context of the match used to be the 10 tokens around it with every run of non-space characters
+            # * replaced by a space, then stripped, which always leaves an empty string, so only the page is recorded
+            context_clean = ""
 
             if country_alpha_2 not in contexts:
                 contexts[country_alpha_2] = ""
@@ -401,14 +413,15 @@ def extract_features(docs: list):
 
 class CountryExtractorRuleBased:
 
-    def process(self, docs: list) -> tuple:
+    def process(self, docs: list, token_arrays: TokenArrays) -> tuple:
         """
         Identify the countries the trial takes place in.
 
-        :param pages: List of string content of each page.
+        :param docs: List of the tokenised pages.
+        :param token_arrays: Token arrays of the tokenised pages.
         :return: The prediction (list of strings of Alpha-2 codes) and a map from each country code to the pages it's mentioned in.
         """
-        country_to_matches, contexts, annotations = extract_features(docs)
+        country_to_matches, contexts, annotations = extract_features(docs, token_arrays)
 
         country_to_pages = {}
         for country, matches in country_to_matches.items():
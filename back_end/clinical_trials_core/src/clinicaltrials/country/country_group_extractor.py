@@ -2,6 +2,8 @@ from os.path import exists
 
 import spacy
 
+from clinicaltrials.textcat import make_doc, predict_cats
+
 
 # Current best model: Expt16
 class CountryGroupExtractor:
@@ -25,22 +27,9 @@ class CountryGroupExtractor:
             print("Warning! Country group classifier not loaded.")
             return {"prediction": "Error"}
 
-        first_10_pages = tokenised_pages[:10]
-
-        combined_tokens = []
-        combined_ws = []
-        for doc in first_10_pages:
-            combined_tokens.extend([t.text for t in doc])
-            combined_ws.extend([t.whitespace_ for t in doc])
-        doc = spacy.tokens.doc.Doc(self.nlp.vocab, words=combined_tokens, spaces=combined_ws)
-
-        for component_name, component in self.nlp.components:
-            if component_name == "textcat":
-                component(doc)
-        # text = " ".join([doc.text for doc in first_10_pages])
-        # doc = self.nlp(text)
+        doc = make_doc(vocab=self.nlp.vocab, tokenised_pages=tokenised_pages[:10])
 
-        prediction_proba = dict(doc.cats)
+        prediction_proba = predict_cats(nlp=self.nlp, docs=[doc])[0]
 
         prediction = max(prediction_proba, key=prediction_proba.get)
 
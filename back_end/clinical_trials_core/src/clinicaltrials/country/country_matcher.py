@@ -0,0 +1,164 @@
+"""
+country_matcher.py
+
+A single matcher for the evidence of the rule based country extractor: country names, demonyms of study subjects, e.g.
+"Samoan males", and international dialling codes after a telephone word, e.g. "tel +44". The patterns of
+`country_named_entity_recognition_spacy`, `demonym_finder` and `phone_number_finder` are compiled into one PhraseMatcher
+over the lowercase tokens, so each page is scanned once instead of with five PhraseMatchers, and the label of every
+pattern is resolved ahead of time to its evidence type and country code, so a match needs no pycountry lookup.
+
+The matches are the same as those of `find_countries_in_tokens`, `find_demonyms` and `find_phone_numbers` on each page.
+Country names are case sensitive, so a country name match is only kept if its tokens are verbatim those of the name.
+
+Usage:
+    from clinicaltrials.country.country_matcher import country_matcher
+    for country_code, start, end, evidence_type in country_matcher.find(docs)[page_no]:
+        print(country_code, evidence_type, docs[page_no][start:end])
+"""
+
+from spacy.attrs import ORTH
+from spacy.tokens import Doc
+
+from clinicaltrials.country import country_named_entity_recognition_spacy, demonym_finder, phone_number_finder
+from clinicaltrials.matcher_cache import LazyMatcher
+from clinicaltrials.resources import nlp
+
+# * A few names are shared by two countries. The matcher keeps the country that the country name PhraseMatcher reported
+SHARED_NAME_COUNTRY_CODES = {"Congo": "CG", "Korea": "KR", "Virgin Islands": "VG"}
+
+# * Evidence types that only decide which country names are kept, see `find_countries_in_tokens`
+GEORGIA = "georgia"
+EXCLUSION = "exclusion"
+
+
+class CountryMatcher:
+    """
+    PhraseMatcher of all the patterns, with a lookup table from the hash of each match label to its evidence type and
+    country code.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.__matcher = LazyMatcher(name=name, attr="LOWER")
+        self.__labels: dict[int, tuple[str, str | None]] = {}
+        # * Verbatim hash ids of the tokens of the case sensitive patterns of each label
+        self.__case_sensitive_patterns: dict[int, set[tuple[int, ...]]] = {}
+
+    def add(self, evidence_type: str, country_code: str | None, surface_forms: list[str], is_case_sensitive: bool = False) -> None:
+        """
+        Add patterns to the matcher.
+
+        :param evidence_type: Type of the matches of the patterns.
+        :param country_code: Alpha-2 code of the matches, None for the patterns that are not evidence of a country.
+        :param surface_forms: Texts of the patterns.
+        :param is_case_sensitive: Whether the tokens have to match verbatim rather than lowercase.
+        """
+
+        label = evidence_type if country_code is None else f"{evidence_type}_{country_code}"
+        self.__matcher.add(label, surface_forms)
+
+        label_hash = nlp.vocab.strings[label]
+        self.__labels[label_hash] = (evidence_type, country_code)
+        if is_case_sensitive:
+            self.__case_sensitive_patterns.setdefault(label_hash, set()).update(
+                tuple(token.orth for token in doc) for doc in nlp.tokenizer.pipe(surface_forms)
+            )
+
+    def find(self, docs: list[Doc]) -> list[list[tuple[str, int, int, str]]]:
+        """
+        Find the evidence of countries in a document.
+
+        :param docs: Tokenised pages of the document.
+        :return: For each page, the matches as tuples of the country code, the start and end token of the match and the
+            evidence type, "country", "demonym" or "phone". The country names kept by the rules of
+            `find_countries_in_tokens` come first, then the demonyms, then the dialling codes, as the extractor lists them.
+        """
+
+        evidence = []
+        for page_no, doc in enumerate(docs):
+            matches: dict[str, list[tuple[int, int, str | None]]] = {}
+            orths = None
+            for label_hash, start, end in self.__matcher(doc):
+                evidence_type, country_code = self.__labels[label_hash]
+                case_sensitive_patterns = self.__case_sensitive_patterns.get(label_hash)
+                if case_sensitive_patterns is not None:
+                    if orths is None:
+                        orths = doc.to_array(ORTH).tolist()
+                    if tuple(orths[start:end]) not in case_sensitive_patterns:
+                        continue
+                matches.setdefault(evidence_type, []).append((start, end, country_code))
+
+            page_evidence = []
+            if "country" in matches:
+                country_names = _resolve_country_names(
+                    matches=matches["country"], exclusion_matches=matches.get(EXCLUSION, []), georgia_matches=matches.get(GEORGIA, [])
+                )
+                page_evidence.extend((country_code, start, end, "country") for start, end, country_code in country_names)
+            for evidence_type in ("demonym", "phone"):
+                page_evidence.extend((country_code, start, end, evidence_type) for start, end, country_code in matches.get(evidence_type, []))
+            evidence.append(page_evidence)
+
+        return evidence
+
+
+def _resolve_country_names(matches: list[tuple], exclusion_matches: list[tuple], georgia_matches: list[tuple]) -> list[tuple]:
+    """
+    Country names of a page as `find_countries_in_tokens` keeps them: the longest names first, skipping the names that
+    overlap a longer one or "guinea pig", and Georgia only near a term about the country.
+    """
+
+    tokens_already_used = set()
+    for start, end, _ in exclusion_matches:
+        tokens_already_used.update(range(start, end))
+
+    georgia_indices = {idx for start, end, _ in georgia_matches for idx in (start, end)}
+
+    country_names = []
+    for start, end, country_code in sorted(matches, key=lambda match: match[1] - match[0], reverse=True):
+        if any(idx in tokens_already_used for idx in range(start, end)):
+            continue
+
+        if country_code == "GE" and min([min(abs(idx - start), abs(idx - end)) for idx in georgia_indices], default=999999) > 3:
+            continue
+
+        country_names.append((start, end, country_code))
+        tokens_already_used.update(range(start, end))
+
+    return country_names
+
+
+def build_country_matcher() -> CountryMatcher:
+    """
+    Compile the patterns of the country names, demonyms and dialling codes into one matcher.
+    """
+
+    country_matcher = CountryMatcher(name="country_evidence")
+
+    # * Each name is kept under one country, see `SHARED_NAME_COUNTRY_CODES`
+    name_to_country_code = {}
+    for country_code, surface_forms in country_named_entity_recognition_spacy.patterns.items():
+        for surface_form in surface_forms:
+            if name_to_country_code.get(surface_form, country_code) != country_code:
+                name_to_country_code[surface_form] = SHARED_NAME_COUNTRY_CODES[surface_form]
+            else:
+                name_to_country_code[surface_form] = country_code
+
+    country_to_names = {}
+    for surface_form, country_code in name_to_country_code.items():
+        country_to_names.setdefault(country_code, []).append(surface_form)
+
+    for country_code, surface_forms in country_to_names.items():
+        country_matcher.add(evidence_type="country", country_code=country_code, surface_forms=surface_forms, is_case_sensitive=True)
+
+    country_matcher.add(evidence_type=GEORGIA, country_code=None, surface_forms=sorted(country_named_entity_recognition_spacy.georgia_country_terms))
+    country_matcher.add(evidence_type=EXCLUSION, country_code=None, surface_forms=country_named_entity_recognition_spacy.exclusion_terms)
+
+    for country_code, surface_forms in demonym_finder.patterns.items():
+        country_matcher.add(evidence_type="demonym", country_code=country_code, surface_forms=surface_forms)
+
+    for country_code, surface_forms in phone_number_finder.patterns.items():
+        country_matcher.add(evidence_type="phone", country_code=country_code, surface_forms=surface_forms)
+
+    return country_matcher
+
+
+country_matcher = build_country_matcher()
@@ -1,8 +1,8 @@
 import re
 
 import pycountry
-from spacy.matcher import PhraseMatcher
 
+from clinicaltrials.matcher_cache import LazyMatcher
 from clinicaltrials.resources import nlp
 
 extra_synonyms = {"VN": {"Vietnam"}, "US": {"USA", "the US", "U.S", "U.S.", "U.S.A."},
@@ -81,6 +81,9 @@ georgia_country_terms = {"country", "caucasus", "sakartvelo", "kartvelian", "oss
                          "sighnaghi",
                          "tsageri"}
 
+# Mentions of Guinea that are not the country
+exclusion_terms = ["guinea pig", "guinea pigs"]
+
 patterns = {}
 
 alpha_2_to_obj = {}
@@ -103,19 +106,19 @@ for country_code, synonyms in extra_synonyms.items():
         if name not in patterns[country_code]:
             patterns[country_code].append(name)
 
-phrase_matcher = PhraseMatcher(nlp.vocab)
-phrase_matcher_lower_case = PhraseMatcher(nlp.vocab, attr="LOWER")
-phrase_matcher_georgia = PhraseMatcher(nlp.vocab, attr="LOWER")
-phrase_matcher_exclusion = PhraseMatcher(nlp.vocab, attr="LOWER")
+phrase_matcher = LazyMatcher(name="country_names", attr="ORTH")
+phrase_matcher_lower_case = LazyMatcher(name="country_names_lower_case", attr="LOWER")
+phrase_matcher_georgia = LazyMatcher(name="country_names_georgia", attr="LOWER")
+phrase_matcher_exclusion = LazyMatcher(name="country_names_exclusion", attr="LOWER")
 
 for pattern_name, pattern_surface_forms in patterns.items():
-    phrase_matcher.add(pattern_name, nlp.pipe(pattern_surface_forms))
+    phrase_matcher.add(pattern_name, pattern_surface_forms)
 
 for pattern_name, pattern_surface_forms in patterns.items():
-    phrase_matcher_lower_case.add(pattern_name, nlp.pipe([x.lower() for x in pattern_surface_forms]))
+    phrase_matcher_lower_case.add(pattern_name, [x.lower() for x in pattern_surface_forms])
 
-phrase_matcher_georgia.add("georgia", nlp.pipe(georgia_country_terms))
-phrase_matcher_exclusion.add("exclusion", nlp.pipe(["guinea pig", "guinea pigs"]))
+phrase_matcher_georgia.add("georgia", georgia_country_terms)
+phrase_matcher_exclusion.add("exclusion", exclusion_terms)
 
 
 def find_countries_in_tokens(doc, is_ignore_case=False, is_georgia_probably_the_country: bool = False):
@@ -1,6 +1,6 @@
 import pycountry
-from spacy.matcher import PhraseMatcher
 
+from clinicaltrials.matcher_cache import LazyMatcher
 from clinicaltrials.resources import nlp
 
 demonym_to_country_code = {'aruban': 'AW',
@@ -262,10 +262,10 @@ for demonym, country_code in demonym_to_country_code.items():
     for people_synonym in people_words:
         patterns[country_code].append(f"{demonym} {people_synonym}")  # Afghan people, Uzbek women, etc
 
-phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+phrase_matcher = LazyMatcher(name="demonym_finder", attr="LOWER")
 
 for pattern_name, pattern_surface_forms in patterns.items():
-    phrase_matcher.add(pattern_name, nlp.pipe(pattern_surface_forms))
+    phrase_matcher.add(pattern_name, pattern_surface_forms)
 
 
 def find_demonyms(doc) -> list:
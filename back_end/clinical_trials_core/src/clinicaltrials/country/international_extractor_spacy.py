@@ -2,6 +2,8 @@ from os.path import exists
 
 import spacy
 
+from clinicaltrials.textcat import make_doc, predict_cats
+
 
 # Current best model: Expt11
 class InternationalExtractorSpacy:
@@ -25,20 +27,9 @@ class InternationalExtractorSpacy:
             print("Warning! International classifier not loaded.")
             return {"prediction": "Error"}
 
-        first_3_pages = tokenised_pages[:3]
-
-        combined_tokens = []
-        combined_ws = []
-        for doc in first_3_pages:
-            combined_tokens.extend([t.text for t in doc])
-            combined_ws.extend([t.whitespace_ for t in doc])
-        doc = spacy.tokens.doc.Doc(self.nlp.vocab, words=combined_tokens, spaces=combined_ws)
-
-        for component_name, component in self.nlp.components:
-            if component_name == "textcat":
-                component(doc)
+        doc = make_doc(vocab=self.nlp.vocab, tokenised_pages=tokenised_pages[:3])
 
-        prediction_proba = doc.cats["1"]
+        prediction_proba = predict_cats(nlp=self.nlp, docs=[doc])[0]["1"]
 
         is_international_pred = int(prediction_proba > 0.5)
 
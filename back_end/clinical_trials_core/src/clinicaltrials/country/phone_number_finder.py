@@ -1,8 +1,8 @@
 import re
 
 import pycountry
-from spacy.matcher import PhraseMatcher
 
+from clinicaltrials.matcher_cache import LazyMatcher
 from clinicaltrials.resources import nlp
 
 dialling_codes = [["+1204", "CA"],
@@ -262,10 +262,10 @@ codes_and_countries = [
 #     r"(?i)(?:tel|call|phone|telephone|fax|efax|facsimile|office hours|out of hours|helpline|mobile|switchboard)(?: (?:direct|number|call|no))?(?:\W+\w+)?\W+\+\d{1,3}[ -]?\d+[- ]?\d*[- ]?\d*\b")
 
 
-phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+phrase_matcher = LazyMatcher(name="phone_number_finder", attr="LOWER")
 
 for pattern_name, pattern_surface_forms in patterns.items():
-    phrase_matcher.add(pattern_name, nlp.pipe(pattern_surface_forms))
+    phrase_matcher.add(pattern_name, pattern_surface_forms)
 
 def find_phone_numbers(doc) -> list:
     """
@@ -1,8 +1,7 @@
 import json
 
-from spacy.matcher import PhraseMatcher
-
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, MetadataOption, Page
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
+from clinicaltrials.match_engine import match_engine
 from clinicaltrials.resources import nlp
 
 patterns = dict()
@@ -24,31 +23,25 @@ patterns["citations"] = ["et al", "recent study"]
 context_matcher_names = {"design", "citations", "weak_context"}
 design_pattern_matcher_names = {"crossover", "factorial", "other", "adaptive"}
 
-phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
-
-for pattern_name, pattern_surface_forms in patterns.items():
-    phrase_matcher.add(pattern_name, nlp.pipe(pattern_surface_forms))
+match_engine.add_phrase_patterns(namespace="design", patterns=patterns)
 
 
 class Design(BaseProcessor):
+    requires = ("page_matches",)
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(id="design", name="Design", feature_type="categorical",
-                        options=[MetadataOption(label="crossover", value="crossover"),
-                                 MetadataOption(label="factorial", value="factorial"),
-                                 MetadataOption(label="adaptive", value="adaptive"),
-                                 MetadataOption(label="other", value="other"), ])
-
     def process(self, document: Document, config: ClassifierConfig | None = None):
         candidates = []
         annotations = []
         occurrence_to_pages = {}
 
+        page_matches = match_engine.get_matches(document=document, namespace="design")
+
         for page_no, doc in enumerate(document.tokenised_pages):
-            matches = list(phrase_matcher(doc))
+            document.raise_if_cancelled()
+            matches = list(page_matches[page_no])
 
             context_indices = {}
             for context in context_matcher_names:
@@ -0,0 +1,424 @@
+"""
+document.py
+
+The document the processors analyse: its pages, with their text and tables, the PDF they were read from, and the
+cancellation token of the run processing it. spaCy is only loaded when the document is first tokenised, so a document
+can be built without loading the processors or the NLP stack.
+
+Usage:
+    from clinicaltrials.document import Document, Page
+    document = Document(pages=[Page(page_number=1, content="...")], file_buffer=pdf_bytes)
+"""
+
+import logging
+import multiprocessing
+import pickle as pkl
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from io import BytesIO
+from os import cpu_count, path
+from threading import Event as ThreadEvent
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Callable, Iterator, TypeAlias, cast
+
+from clinicaltrials.products import PRODUCT_KEY_PREFIX, SHARED_PRODUCTS, get_product, has_product
+
+if TYPE_CHECKING:
+    from spacy.tokens import Doc
+
+    from clinicaltrials.document_context import DocumentContext
+
+Table: TypeAlias = list[list[str | None]]
+Tables: TypeAlias = list[list[list[str | None]]]
+
+# * Fewest pages each worker process reads when the pages of a PDF are read in parallel. Below twice this, starting
+# * the workers and parsing the PDF in each of them costs more than it saves, so the pages are read serially
+MIN_PAGES_PER_PDF_WORKER = 25
+
+
+class RunCancelledError(Exception):
+    """Raised inside a run whose cancellation token has been cancelled."""
+
+
+class CancellationToken:
+    """
+    Lets the caller of a run stop it once it has started. ClinicalTrial checks the token before each module and the
+    processors check it between pages, through `Document.raise_if_cancelled`, so a cancelled run stops within about a
+    page of work. Subclasses can override `is_cancelled` to also look for a cancellation requested elsewhere.
+    """
+
+    def __init__(self, event: Any = None) -> None:
+        # * Any Event-like object, e.g. a multiprocessing Event shared with worker processes
+        self._event = event if event is not None else ThreadEvent()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self.is_cancelled():
+            raise RunCancelledError("The run was cancelled")
+
+
+# * Event of the run that the current thread runs a module for, set once the run gives up on its modules at the deadline.
+# * It is kept per thread, not on the document, because the threads a run has given up on outlive the run, and the
+# * document can be in another run by then
+_thread_run = threading.local()
+
+
+@contextmanager
+def run_scope(given_up: ThreadEvent | None) -> Iterator[None]:
+    """
+    Make `Document.raise_if_cancelled` raise in the current thread once `given_up` is set, so that a module the run has
+    given up on stops at its next page instead of running to the end.
+    """
+
+    previous_given_up = getattr(_thread_run, "given_up", None)
+    _thread_run.given_up = given_up
+    try:
+        yield
+    finally:
+        _thread_run.given_up = previous_given_up
+
+
+@dataclass
+class PageAnnotation:
+    text: str
+    type: str
+    page_no: int
+    subtype: str
+    end_char: int
+    start_char: int
+
+    @staticmethod
+    def from_dict(data: dict[str, Any]) -> "PageAnnotation":
+        return PageAnnotation(
+            text=data.get("text", ""),
+            type=data.get("type", ""),
+            page_no=data.get("page_no", 0),
+            subtype=data.get("subtype", ""),
+            end_char=data.get("end_char", 0),
+            start_char=data.get("start_char", 0),
+        )
+
+
+class PageMarker:
+    __words_to_highlight: list[str] = []
+
+    def add_highlight(self, word: str):
+        self.__words_to_highlight.append(word)
+
+    def delete_highlight(self, word: str):
+        self.__words_to_highlight.remove(word)
+
+    @property
+    def markers(self):
+        return self.__words_to_highlight
+
+
+@dataclass
+class Page:
+    page_number: int
+    content: str
+
+    """
+    List of 2d Matrices
+    table -> row -> cell
+    """
+    tables: list[Table] = field(default_factory=lambda: [], repr=False, compare=False)
+
+    marker: PageMarker = PageMarker()
+
+    # * Tables behind the `tables` property, compared instead of it so that comparing pages does not read their PDF
+    _tables: list[Table] = field(init=False, repr=False)
+
+    # * Reads the tables of the page from the PDF of its document the first time they are read, set by `Document`
+    _table_loader: Callable[[], None] | None = field(default=None, init=False, repr=False, compare=False)
+
+    # * Held while the tables are read from the PDF, so that the other threads reading them wait for them
+    _table_lock: Lock = field(default_factory=Lock, init=False, repr=False, compare=False)
+
+    @property
+    def are_tables_loaded(self) -> bool:
+        """
+        Whether the tables of the page are known without reading them from the PDF.
+        """
+
+        return self._table_loader is None
+
+
+def _get_page_tables(page: Page) -> list[Table]:
+    if page._table_loader is not None:
+        with page._table_lock:
+            table_loader = page._table_loader
+            if table_loader is not None:
+                table_loader()
+                # * Only once the tables are read, a read that failed is tried again by the next one
+                page._table_loader = None
+
+    return page._tables
+
+
+def _set_page_tables(page: Page, tables: list[Table]) -> None:
+    page._tables = tables
+    page._table_loader = None
+
+
+# * A property rather than a plain field, so that the tables of a document built with its PDF are extracted when read
+Page.tables = property(_get_page_tables, _set_page_tables)  # type: ignore[assignment]
+
+
+class Document:
+    """
+    Class representing document object for clinical trails. Created after parsing the document
+    """
+
+    pages: list[Page]
+    metadata: dict | None = None
+
+    def __init__(self, pages: list[Page], metadata: dict | None = None, file_buffer: bytes | None = None):
+        self.logger = logging.getLogger()
+        self.logger.name = __class__.__name__
+
+        self.pages = pages
+        self.metadata = metadata
+
+        self.__context: "DocumentContext | None" = None
+        self.__context_lock = Lock()
+
+        # * Set by `ClinicalTrial.run_all` for the duration of a run
+        self.cancellation_token: CancellationToken | None = None
+
+        self.file_buffer = file_buffer
+
+    @property
+    def file_buffer(self) -> bytes | None:
+        """
+        PDF of the document. The tables of a page without tables are only extracted from it when they are read, and the
+        `table_cells` product only extracts those of the Schedule of Events pages.
+        """
+
+        return self.__file_buffer
+
+    @file_buffer.setter
+    def file_buffer(self, file_buffer: bytes | None) -> None:
+        self.__file_buffer = file_buffer or None
+
+        for page_idx, page in enumerate(self.pages):
+            with page._table_lock:
+                if page.are_tables_loaded and page._tables:
+                    continue
+                if self.__file_buffer is None:
+                    page._table_loader = None
+                else:
+                    page._table_loader = lambda page_idx=page_idx: self.extract_tables(file_buffer=cast(bytes, self.file_buffer), page_indices=[page_idx])
+
+    @staticmethod
+    def pdf_to_document(pdf_path: str, max_workers: int | None = 1) -> "Document":
+        """
+        Read the text and the tables of every page of a PDF.
+
+        :param pdf_path: Path of the PDF.
+        :param max_workers: Number of worker processes reading the pages, one per CPU if None. Short PDFs are read serially.
+        """
+
+        from pdfplumber import open as pdfplumber_open
+
+        with open(path.abspath(pdf_path), "rb") as pdf_file:
+            file_buffer = pdf_file.read()
+
+        with pdfplumber_open(path_or_fp=BytesIO(file_buffer)) as pdf_buffer:
+            num_pages = len(pdf_buffer.pages)
+            metadata: dict | None = pdf_buffer.metadata
+
+        pdf_pages = read_pdf_pages(file_buffer=file_buffer, page_indices=list(range(num_pages)), extract_text=True, max_workers=max_workers)
+        pages = [Page(page_number=page_idx + 1, content=cast(str, content), tables=tables) for page_idx, (content, tables) in enumerate(pdf_pages)]
+
+        return Document(pages, metadata=metadata)
+
+    @property
+    def context(self) -> "DocumentContext":
+        """
+        Shared analysis context of the document. It is created once per document and reused by every processor, so the
+        document is only tokenised once even when the modules run in parallel.
+        """
+
+        if self.__context is None:
+            from clinicaltrials.document_context import DocumentContext
+
+            with self.__context_lock:
+                if self.__context is None:
+                    self.__context = DocumentContext(page_contents=[page.content for page in self.pages])
+
+        return self.__context
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialise the pages together with the already tokenised context (as a spaCy DocBin) and the shared products
+        built so far, so that a worker process can rebuild the document without tokenising it again.
+        """
+
+        return pkl.dumps(
+            {
+                "pages": [(page.page_number, page.content, page.tables if page.are_tables_loaded else []) for page in self.pages],
+                "metadata": self.metadata,
+                "file_buffer": self.file_buffer,
+                "context": self.context.to_bytes(),
+                "products": {name: get_product(document=self, name=name) for name in SHARED_PRODUCTS if has_product(document=self, name=name)},
+            }
+        )
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "Document":
+        """
+        Rebuild a document serialised with `to_bytes`.
+        """
+
+        from clinicaltrials.document_context import DocumentContext
+
+        document_data = pkl.loads(data)
+
+        document = Document(
+            pages=[Page(page_number=page_number, content=content, tables=tables) for page_number, content, tables in document_data["pages"]],
+            metadata=document_data["metadata"],
+            file_buffer=document_data["file_buffer"],
+        )
+        document.__context = DocumentContext.from_bytes(page_contents=[page.content for page in document.pages], data=document_data["context"])
+
+        for name, value in document_data["products"].items():
+            document.__context.get_or_build(PRODUCT_KEY_PREFIX + name, lambda value=value: value)
+
+        return document
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Raise `RunCancelledError` if the run processing the document has been cancelled, or if it has given up on the
+        module running in this thread, see `run_scope`. Processors call this between pages.
+        """
+
+        if self.cancellation_token is not None:
+            self.cancellation_token.raise_if_cancelled()
+
+        given_up = getattr(_thread_run, "given_up", None)
+        if given_up is not None and given_up.is_set():
+            raise RunCancelledError("The run gave up on this module")
+
+    def invalidate_context(self) -> None:
+        """
+        Drop the cached analysis context. Call this after changing the content of the pages.
+        """
+
+        with self.__context_lock:
+            self.__context = None
+
+    @property
+    def tokenised_pages(self) -> list["Doc"]:
+        """
+        Process the raw text of each page in the document with spaCy and return a list of spaCy Doc objects.
+        The Docs are cached in the document context, so the document is only tokenised once.
+        We replace all newlines and multiple spaces with single spaces, because otherwise spaCy makes them into a new token which interferes with matching.
+
+        Returns: List of Docs, where each Doc corresponds to a page
+        """
+
+        return self.context.docs
+
+    def extract_tables(self, file_buffer: bytes, page_indices: list[int] | None = None, max_workers: int | None = 1) -> None:
+        """
+        Extract the tables of the pages from the PDF with pdfplumber.
+
+        :param file_buffer: PDF of the document.
+        :param page_indices: Indices of the pages to extract the tables of, all the pages by default.
+        :param max_workers: Number of worker processes extracting the tables, one per CPU if None. The tables of a few
+            pages are extracted serially.
+        """
+
+        from pdfplumber import open as pdfplumber_open
+
+        with pdfplumber_open(path_or_fp=BytesIO(file_buffer)) as pdf_buffer:
+            num_pages = len(pdf_buffer.pages)
+
+        if num_pages != len(self.pages):
+            self.logger.warning("Mismatch between file buffer and pages provided")
+            return
+
+        page_indices = list(range(num_pages)) if page_indices is None else page_indices
+        self.logger.debug(f"Extracting tables from {len(page_indices)} pages")
+
+        pdf_pages = read_pdf_pages(
+            file_buffer=file_buffer, page_indices=page_indices, extract_text=False, max_workers=max_workers, raise_if_cancelled=self.raise_if_cancelled
+        )
+        for page_idx, (_, tables) in zip(page_indices, pdf_pages):
+            self.pages[page_idx].tables = tables
+
+
+def _read_pdf_page_range(file_buffer: bytes, page_indices: list[int], extract_text: bool, raise_if_cancelled: Callable[[], None] | None = None) -> list[tuple[str | None, Tables]]:
+    """
+    Read pages of a PDF with pdfplumber, in a worker process or in the caller.
+
+    :return: The text, None unless `extract_text`, and the tables of each page.
+    """
+
+    from pdfplumber import open as pdfplumber_open
+
+    pdf_pages = []
+    with pdfplumber_open(path_or_fp=BytesIO(file_buffer)) as pdf_buffer:
+        for page_idx in page_indices:
+            if raise_if_cancelled is not None:
+                raise_if_cancelled()
+            page = pdf_buffer.pages[page_idx]
+            pdf_pages.append((page.extract_text() if extract_text else None, page.extract_tables()))
+            # * Drop the parsed layout of the page, otherwise pdfplumber keeps every page read in memory
+            page.close()
+
+    return pdf_pages
+
+
+def read_pdf_pages(
+    file_buffer: bytes, page_indices: list[int], extract_text: bool, max_workers: int | None = 1, raise_if_cancelled: Callable[[], None] | None = None
+) -> list[tuple[str | None, Tables]]:
+    """
+    Read pages of a PDF, in parallel when there are enough of them. The pages are split into consecutive ranges of
+    `MIN_PAGES_PER_PDF_WORKER` pages, the worker processes open the PDF from its bytes and read a range at a time, and
+    the pages are returned in the order of `page_indices`.
+
+    :param file_buffer: PDF.
+    :param page_indices: Indices of the pages to read.
+    :param extract_text: Whether to extract the text of the pages as well as their tables.
+    :param max_workers: Number of worker processes, one per CPU if None. 1 reads the pages in the calling process.
+    :param raise_if_cancelled: Called between pages when they are read serially, and between ranges when they are read
+        in parallel.
+    :return: The text, None unless `extract_text`, and the tables of each page.
+    """
+
+    num_workers = min(max_workers or cpu_count() or 1, len(page_indices) // MIN_PAGES_PER_PDF_WORKER)
+
+    # * Daemon processes, e.g. the workers of a multiprocessing Pool, cannot start processes of their own
+    if num_workers < 2 or multiprocessing.current_process().daemon:
+        return _read_pdf_page_range(file_buffer=file_buffer, page_indices=page_indices, extract_text=extract_text, raise_if_cancelled=raise_if_cancelled)
+
+    # * Small ranges rather than one per worker, so that a cancelled read stops after about a range
+    page_ranges = [page_indices[start : start + MIN_PAGES_PER_PDF_WORKER] for start in range(0, len(page_indices), MIN_PAGES_PER_PDF_WORKER)]
+
+    start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+    process_pool = ProcessPoolExecutor(max_workers=num_workers, mp_context=multiprocessing.get_context(start_method))
+    try:
+        futures = [process_pool.submit(_read_pdf_page_range, file_buffer, page_range, extract_text) for page_range in page_ranges]
+
+        pdf_pages = []
+        for future in futures:
+            if raise_if_cancelled is not None:
+                raise_if_cancelled()
+            pdf_pages.extend(future.result())
+    except BaseException:
+        # * Neither wait for the ranges being read nor start the others
+        process_pool.shutdown(wait=False, cancel_futures=True)
+        raise
+
+    process_pool.shutdown()
+
+    return pdf_pages
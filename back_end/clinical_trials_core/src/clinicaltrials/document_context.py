@@ -0,0 +1,277 @@
+"""
+document_context.py
+
+A per-document analysis context. The document is tokenised with spaCy exactly once and the derived views that the
+processors need (flattened token stream, page offsets, lowercase and norm arrays, NumPy token arrays, numeric mentions,
+inverted token indexes) are built once on first access and then shared by every processor, including when modules run in
+parallel threads.
+
+Usage:
+    context = document.context
+    for token_idx, token in enumerate(context.tokens):
+        page_no = context.page_of(token_idx)
+"""
+
+import re
+from bisect import bisect_right
+from threading import Lock, RLock
+from typing import Any, Callable, Literal, TypeAlias
+
+from spacy.tokens import Doc, DocBin, Token
+
+from clinicaltrials.numeric_mentions import NumericMentions
+from clinicaltrials.resources import nlp as spacy_nlp
+from clinicaltrials.token_features import TokenArrays, TokenIndex
+
+WHITESPACE_REGEX = re.compile(r"\s+")
+
+# * "normalised" is the whitespace normalised tokenisation of `Document.tokenised_pages`. "compatible" keeps the raw page
+# * text, so newlines and runs of spaces stay as tokens, as the older classifiers were trained on.
+TokenisationMode: TypeAlias = Literal["normalised", "compatible"]
+
+# * Token attributes that can be indexed with `get_token_index`
+TokenAttribute: TypeAlias = Literal["orth", "norm", "lower"]
+
+
+class DocumentContext:
+    """
+    Shared, lazily built analysis state for one document. All views are read-only once built and each is guarded by
+    its own lock so that concurrent processors build each view at most once.
+    """
+
+    def __init__(self, page_contents: list[str]) -> None:
+        self.__page_contents = page_contents
+        self.__lock = Lock()
+        self.__view_locks: dict[str, RLock] = {}
+        self.__views: dict[str, Any] = {}
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialise the tokenised pages as a spaCy DocBin, so that another process can rebuild the context without
+        tokenising the document again. The compatible tokenisation is only included if it has already been built.
+        """
+
+        doc_bin = DocBin(docs=self.docs)
+        if "raw_docs" in self.__views:
+            for doc in self.raw_docs:
+                doc_bin.add(doc)
+
+        return doc_bin.to_bytes()
+
+    @staticmethod
+    def from_bytes(page_contents: list[str], data: bytes) -> "DocumentContext":
+        """
+        Rebuild a context serialised with `to_bytes`.
+
+        :param page_contents: Raw text of each page, as passed to the original context.
+        :param data: Output of `to_bytes`.
+        :return: A context whose tokenised pages are already built.
+        """
+
+        docs = list(DocBin().from_bytes(data).get_docs(spacy_nlp.vocab))
+        num_pages = len(page_contents)
+
+        context = DocumentContext(page_contents=page_contents)
+        context.get_or_build("docs", lambda: docs[:num_pages])
+        if len(docs) > num_pages:
+            context.get_or_build("raw_docs", lambda: docs[num_pages:])
+
+        return context
+
+    @staticmethod
+    def tokenise_batch(contexts: list["DocumentContext"], batch_size: int = 256) -> None:
+        """
+        Tokenise the pages of several documents in one `nlp.pipe` call, which is faster than tokenising the documents
+        one by one. Contexts that are already tokenised are left alone.
+
+        :param contexts: Contexts of the documents.
+        :param batch_size: Number of pages spaCy processes at a time.
+        """
+
+        contexts = [context for context in contexts if not context.has_view("docs")]
+        page_contents = [WHITESPACE_REGEX.sub(" ", content) for context in contexts for content in context.__page_contents]
+        docs = list(spacy_nlp.pipe(page_contents, batch_size=batch_size))
+
+        offset = 0
+        for context in contexts:
+            num_pages = context.num_pages
+            context.get_or_build("docs", lambda: docs[offset:offset + num_pages])
+            offset += num_pages
+
+    def get_or_build(self, key: str, builder: Callable[[], Any]) -> Any:
+        """
+        Return the view stored under `key`, building it with `builder` on first access.
+
+        :param key: Name of the view.
+        :param builder: Zero argument callable that builds the view.
+        :return: The cached view.
+        """
+
+        if key in self.__views:
+            return self.__views[key]
+
+        # * One lock per view, so that building an expensive view does not block the other views
+        with self.__lock:
+            view_lock = self.__view_locks.setdefault(key, RLock())
+
+        with view_lock:
+            if key not in self.__views:
+                self.__views[key] = builder()
+
+        return self.__views[key]
+
+    def has_view(self, key: str) -> bool:
+        """
+        Whether the view stored under `key` has already been built.
+        """
+
+        return key in self.__views
+
+    @property
+    def docs(self) -> list[Doc]:
+        """
+        One spaCy Doc per page. We replace all newlines and multiple spaces with single spaces, because otherwise spaCy
+        makes them into a new token which interferes with matching.
+        """
+
+        return self.get_or_build("docs", lambda: list(spacy_nlp.pipe([WHITESPACE_REGEX.sub(" ", content) for content in self.__page_contents])))
+
+    @property
+    def raw_docs(self) -> list[Doc]:
+        """
+        One spaCy Doc per page of the page text exactly as parsed, without whitespace normalisation. This reproduces the
+        token boundaries of `nlp(page.content)` that the Phase, SampleSize, NumArms and Sap classifiers were trained on.
+        """
+
+        return self.get_or_build("raw_docs", lambda: list(spacy_nlp.pipe(self.__page_contents)))
+
+    def get_docs(self, tokenisation: TokenisationMode = "normalised") -> list[Doc]:
+        """
+        Tokenised pages for the given tokenisation mode.
+
+        :param tokenisation: "normalised" for the shared token stream, "compatible" for the raw page tokenisation.
+        :return: List of Docs, where each Doc corresponds to a page.
+        """
+
+        if tokenisation == "compatible":
+            return self.raw_docs
+
+        return self.docs
+
+    @property
+    def token_arrays(self) -> TokenArrays:
+        """NumPy arrays of the token attributes of the flattened stream, see `clinicaltrials.token_features`."""
+
+        return self.get_token_arrays()
+
+    def get_token_arrays(self, tokenisation: TokenisationMode = "normalised") -> TokenArrays:
+        """
+        NumPy arrays of the token attributes for the given tokenisation mode.
+        """
+
+        if tokenisation == "compatible":
+            return self.get_or_build("raw_token_arrays", lambda: TokenArrays.from_docs(self.raw_docs))
+
+        return self.get_or_build("token_arrays", lambda: TokenArrays.from_docs(self.docs))
+
+    @property
+    def numeric_mentions(self) -> NumericMentions:
+        """The numbers of the flattened stream and their values, see `clinicaltrials.numeric_mentions`."""
+
+        return self.get_numeric_mentions()
+
+    def get_numeric_mentions(self, tokenisation: TokenisationMode = "normalised") -> NumericMentions:
+        """
+        The numbers of the flattened stream for the given tokenisation mode.
+        """
+
+        if tokenisation == "compatible":
+            return self.get_or_build("raw_numeric_mentions", lambda: NumericMentions(token_arrays=self.get_token_arrays(tokenisation="compatible")))
+
+        return self.get_or_build("numeric_mentions", lambda: NumericMentions(token_arrays=self.token_arrays))
+
+    def get_token_index(self, attribute: TokenAttribute = "norm", tokenisation: TokenisationMode = "normalised") -> TokenIndex:
+        """
+        Inverted index from the hash ids of a token attribute to the positions of the tokens in the flattened stream,
+        for looking up keywords without scanning the document.
+
+        :param attribute: "orth" for the verbatim text, "norm" for `token.norm_` or "lower" for `token.lower_`.
+        :param tokenisation: "normalised" for the shared token stream, "compatible" for the raw page tokenisation.
+        """
+
+        prefix = "raw_" if tokenisation == "compatible" else ""
+        return self.get_or_build(f"{prefix}token_index_{attribute}",
+                                 lambda: TokenIndex(hash_ids=getattr(self.get_token_arrays(tokenisation=tokenisation), attribute)))
+
+    @property
+    def page_offsets(self) -> list[int]:
+        """
+        Index into the flattened token stream where each page starts. Has one extra trailing entry holding the total
+        token count, so page `i` spans `tokens[page_offsets[i]:page_offsets[i + 1]]`.
+        """
+
+        def build() -> list[int]:
+            offsets = [0]
+            for doc in self.docs:
+                offsets.append(offsets[-1] + len(doc))
+            return offsets
+
+        return self.get_or_build("page_offsets", build)
+
+    @property
+    def tokens(self) -> list[Token]:
+        """All tokens of the document, page after page."""
+
+        return self.get_or_build("tokens", lambda: [token for doc in self.docs for token in doc])
+
+    @property
+    def texts(self) -> list[str]:
+        """Verbatim text of every token in the flattened stream."""
+
+        return self.get_or_build("texts", lambda: [token.text for token in self.tokens])
+
+    @property
+    def lower(self) -> list[str]:
+        """Lowercase text of every token in the flattened stream."""
+
+        return self.get_or_build("lower", lambda: [token.lower_ for token in self.tokens])
+
+    @property
+    def norms(self) -> list[str]:
+        """spaCy norm of every token in the flattened stream."""
+
+        return self.get_or_build("norms", lambda: [token.norm_ for token in self.tokens])
+
+    @property
+    def token_pages(self) -> list[int]:
+        """Zero based page number of every token in the flattened stream."""
+
+        def build() -> list[int]:
+            token_pages = []
+            for page_no, doc in enumerate(self.docs):
+                token_pages.extend([page_no] * len(doc))
+            return token_pages
+
+        return self.get_or_build("token_pages", build)
+
+    @property
+    def num_pages(self) -> int:
+        return len(self.__page_contents)
+
+    @property
+    def num_tokens(self) -> int:
+        return self.page_offsets[-1]
+
+    def page_of(self, token_idx: int) -> int:
+        """
+        Zero based page number of a position in the flattened token stream.
+        """
+
+        return bisect_right(self.page_offsets, token_idx) - 1
+
+    def page_tokens(self, page_no: int) -> list[Token]:
+        """
+        Tokens of one page as a slice of the flattened stream.
+        """
+
+        return self.tokens[self.page_offsets[page_no]:self.page_offsets[page_no + 1]]
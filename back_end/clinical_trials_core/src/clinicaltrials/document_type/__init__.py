@@ -2,9 +2,8 @@ import json
 import operator
 from collections import Counter
 
-from spacy.matcher import PhraseMatcher
-
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, MetadataOption, Page
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
+from clinicaltrials.match_engine import match_engine
 from clinicaltrials.resources import nlp
 
 patterns = dict()
@@ -15,28 +14,22 @@ patterns["protocol"] = ["protocol", "clinical investigation plan", "follow-up pl
 patterns["development_plan"] = ["development plan", "target product profile"]
 patterns["sap"] = ["statistical", "sap"]
 patterns["icf"] = ["icf", "consent", "assent"]  # "informed consent form",
-phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
-
-for pattern_name, pattern_surface_forms in patterns.items():
-    phrase_matcher.add(pattern_name, nlp.pipe(pattern_surface_forms))
+match_engine.add_phrase_patterns(namespace="document_type", patterns=patterns)
 
 
 class DocumentType(BaseProcessor):
+    requires = ("page_matches",)
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(id="document_type", name="Document Type", feature_type="categorical",
-                        options=[MetadataOption(label="Protocol", value="protocol"),
-                                 MetadataOption(label="SAP", value="sap"), MetadataOption(label="ICF", value="icf"),
-                                 MetadataOption(label="Development plan", value="development_plan"), ])
-
     def process(self, document: Document, config: ClassifierConfig | None = None):
 
         candidates = Counter()
+        page_matches = match_engine.get_matches(document=document, namespace="document_type")
         for page_no, doc in enumerate(document.tokenised_pages):
-            matches = list(phrase_matcher(doc))
+            document.raise_if_cancelled()
+            matches = list(page_matches[page_no])
 
             for phrase_match in matches:
                 matcher_name = nlp.vocab.strings[phrase_match[0]]
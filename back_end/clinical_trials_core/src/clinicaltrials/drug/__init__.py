@@ -1,33 +1,24 @@
-import bz2
 import json
-import pickle as pkl
 from collections import Counter
 
-from drug_named_entity_recognition import find_drugs
-
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, Page
+from clinicaltrials import model_store
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
+from clinicaltrials.products import get_product
 
 
 class Drug(BaseProcessor):
+    requires = ("drug_mentions",)
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-        self.model = None
-
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(id="drug", name="Drug", feature_type="text")
+    def load_models(self, config: ClassifierConfig | None = None) -> None:
+        model_store.get_model("drug", config=config or self.config)
 
     def process(self, document: Document, config: ClassifierConfig | None = None):
-        config = self.get_classifier_config_or_default(config=config)
+        model = model_store.get_model("drug", config=config or self.config)
 
-        path_to_classifier = config.path_to_classifier
-
-        if not self.model:
-            with bz2.open(path_to_classifier, "rb") as f:
-                self.model = pkl.load(f)
-
-        model_text, model_reg = self.model
+        model_text, model_reg = model
         occurrence_to_pages = {}
 
         ctr = Counter()
@@ -35,16 +26,13 @@ class Drug(BaseProcessor):
         contexts = {}
         num_pages = {}
         annotations = []
+        drug_mentions = get_product(document=document, name="drug_mentions")
         for page_no, doc in enumerate(document.tokenised_pages):
-            all_matches = find_drugs([t.text for t in doc], is_ignore_case=True)
-
-            matched_tokens = set()
-            for d, start, end in all_matches:
-                for token_idx in range(start, end + 1):
-                    matched_tokens.add(token_idx)
+            document.raise_if_cancelled()
+            matched_tokens = drug_mentions.get_token_indices(page_no)
 
-            for d in all_matches:
-                drug_name = d[0]["name"]
+            for mention in drug_mentions.get_page(page_no):
+                drug_name = mention.drug["name"]
                 ctr[drug_name] += 1
                 if drug_name not in first_mentions:
                     first_mentions[drug_name] = page_no
@@ -53,8 +41,8 @@ class Drug(BaseProcessor):
 
                 num_pages[drug_name].add(page_no)
 
-                start = d[1] - 10
-                end = d[2] + 10
+                start = mention.start - 10
+                end = mention.end + 10
                 if start < 0: start = 0
                 if end > len(doc): end = len(doc)
 
@@ -62,10 +50,10 @@ class Drug(BaseProcessor):
                     if idx not in matched_tokens:
                         contexts[drug_name] += " " + doc[idx].norm_
 
-                match_start_char = doc[d[1]].idx
-                match_end_char = doc[d[2]].idx + len(doc[d[2]].text)
-                match_text = doc[d[1]:d[2]].text
-                value = d[0]
+                match_start_char = doc[mention.start].idx
+                match_end_char = doc[mention.end].idx + len(doc[mention.end].text)
+                match_text = doc[mention.start:mention.end].text
+                value = mention.drug
                 annotations.append(
                     {"type": "drug", "page_no": page_no,
                      "start_char": match_start_char,
@@ -0,0 +1,133 @@
+"""
+drug_mentions.py
+
+The drug mentions of a document, found once per document with the drug dictionary of `drug_named_entity_recognition`
+and shared by the processors that need drug context, such as Drug and Regimen, through the "drug_mentions" product.
+
+`find_drugs` looks up every token and every pair of adjacent tokens of a page in the dictionary. A protocol repeats the
+same words many times, so the index looks up each distinct token and each distinct pair of tokens once, in a single
+`find_drugs` call, and only visits the positions where a drug was found. The mentions are the same as those of calling
+`find_drugs` on the tokens of each page.
+
+Usage:
+    drug_mentions = get_product(document=document, name="drug_mentions")
+    for mention in drug_mentions.get_page(page_no):
+        print(mention.drug["name"], mention.start, mention.end)
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+import numpy as np
+
+from clinicaltrials.resources import nlp
+from clinicaltrials.token_features import TokenArrays
+
+# * Put between the texts looked up together, so that two texts never form a two word drug name. No drug name contains it
+SEPARATOR = "\x00"
+
+
+@dataclass(frozen=True)
+class DrugMention:
+    page_no: int
+    start: int  # * Index of the first token of the mention in its page
+    end: int  # * Index of the last token of the mention in its page, inclusive as in `find_drugs`
+    drug: dict  # * Record of the drug in the dictionary, e.g. its name, synonyms, MeSH and DrugBank ids
+
+
+def find_drug_records(texts: list[str], find_drugs: Callable[..., list[tuple]]) -> list[list[dict]]:
+    """
+    Drug records matching each text, where a text is a token or two tokens joined by a space.
+
+    :param texts: Texts to look up.
+    :param find_drugs: `drug_named_entity_recognition.find_drugs`.
+    :return: One list of records per text, empty if the text is not a drug name.
+    """
+
+    interleaved = [SEPARATOR] * (2 * len(texts))
+    interleaved[0::2] = texts
+
+    records = [[] for _ in texts]
+    for drug, start, _ in find_drugs(interleaved):
+        records[start // 2].append(drug)
+
+    return records
+
+
+class DrugMentions:
+    """
+    Drug mentions of a document, by page. Within a page the mentions are in the order of `find_drugs`: the two token
+    mentions first, then the single token mentions, each in token order.
+    """
+
+    def __init__(self, mentions: list[DrugMention], num_pages: int) -> None:
+        self.mentions = mentions
+        self.__page_mentions: list[list[DrugMention]] = [[] for _ in range(num_pages)]
+        for mention in mentions:
+            self.__page_mentions[mention.page_no].append(mention)
+
+    @staticmethod
+    def find(token_arrays: TokenArrays, find_drugs: Callable[..., list[tuple]]) -> "DrugMentions":
+        """
+        Find the drug mentions of a document.
+
+        :param token_arrays: Token arrays of the document.
+        :param find_drugs: `drug_named_entity_recognition.find_drugs`.
+        """
+
+        unique_orths, word_ids = np.unique(token_arrays.orth, return_inverse=True)
+        word_texts = [nlp.vocab.strings[int(orth)] for orth in unique_orths]
+        num_words = len(word_texts)
+
+        # * Pairs of adjacent tokens on the same page, identified by the ids of their two words
+        pair_positions = np.flatnonzero(token_arrays.page[:-1] == token_arrays.page[1:])
+        unique_pair_keys, pair_ids = np.unique(word_ids[pair_positions] * num_words + word_ids[pair_positions + 1], return_inverse=True)
+        pair_texts = [word_texts[pair_key // num_words] + " " + word_texts[pair_key % num_words] for pair_key in unique_pair_keys.tolist()]
+
+        pair_records = find_drug_records(texts=pair_texts, find_drugs=find_drugs)
+        word_records = find_drug_records(texts=word_texts, find_drugs=find_drugs)
+
+        is_pair_drug = np.array([len(records) > 0 for records in pair_records], dtype=bool)
+        is_word_drug = np.array([len(records) > 0 for records in word_records], dtype=bool)
+
+        page_offsets = token_arrays.page_offsets
+        pair_mentions = []
+        is_in_pair = np.zeros(len(token_arrays), dtype=bool)
+        pair_hits = np.flatnonzero(is_pair_drug[pair_ids])
+        for token_idx, pair_id in zip(pair_positions[pair_hits].tolist(), pair_ids[pair_hits].tolist()):
+            page_no = int(token_arrays.page[token_idx])
+            token_no = token_idx - int(page_offsets[page_no])
+            for drug in pair_records[pair_id]:
+                pair_mentions.append(DrugMention(page_no=page_no, start=token_no, end=token_no + 1, drug=dict(drug)))
+            is_in_pair[token_idx:token_idx + 2] = True
+
+        # * As in `find_drugs`, the tokens of a two token mention are not looked up on their own
+        word_mentions = []
+        for token_idx in np.flatnonzero(is_word_drug[word_ids] & ~is_in_pair).tolist():
+            page_no = int(token_arrays.page[token_idx])
+            token_no = token_idx - int(page_offsets[page_no])
+            for drug in word_records[word_ids[token_idx]]:
+                word_mentions.append(DrugMention(page_no=page_no, start=token_no, end=token_no, drug=dict(drug)))
+
+        mentions = sorted(pair_mentions + word_mentions, key=lambda mention: mention.page_no)
+        return DrugMentions(mentions=mentions, num_pages=token_arrays.num_pages)
+
+    def __len__(self) -> int:
+        return len(self.mentions)
+
+    def __iter__(self) -> Iterator[DrugMention]:
+        return iter(self.mentions)
+
+    def get_page(self, page_no: int) -> list[DrugMention]:
+        """
+        Drug mentions of a page.
+        """
+
+        return self.__page_mentions[page_no]
+
+    def get_token_indices(self, page_no: int) -> set[int]:
+        """
+        Indices of the tokens of a page that are part of a drug mention.
+        """
+
+        return {token_idx for mention in self.__page_mentions[page_no] for token_idx in range(mention.start, mention.end + 1)}
@@ -1,12 +1,12 @@
-import bz2
 import json
-import re
 
 import numpy as np
-from spacy.matcher import Matcher
 
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, Page
+from clinicaltrials import model_store
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
 from clinicaltrials.duration.duration_nb import get_text_snippets_for_nb
+from clinicaltrials.match_engine import match_engine
+from clinicaltrials.proximity import sorted_positions, window_distance
 from clinicaltrials.resources import nlp
 
 import pickle as pkl
@@ -28,108 +28,6 @@ patterns["study duration"].extend(["will be followed for"])
 
 patterns["age"] = ["age", "ages", "aged", "old", "older", "young", "younger"]
 
-num_lookup = {"one": 1,
-              "two": 2,
-              "three": 3,
-              "four": 4,
-              "five": 5,
-              "six": 6,
-              "seven": 7,
-              "eight": 8,
-              "nine": 9,
-              "ten": 10,
-              "eleven": 11,
-              "twelve": 12,
-              "thirteen": 13,
-              "fourteen": 14,
-              "fifteen": 15,
-              "sixteen": 16,
-              "seventeen": 17,
-              "eighteen": 18,
-              "nineteen": 19,
-              "twenty": 20,
-              "twenty-one": 21,
-              "twenty-two": 22,
-              "twenty-three": 23,
-              "twenty-four": 24,
-              "twenty-five": 25,
-              "twenty-six": 26,
-              "twenty-seven": 27,
-              "twenty-eight": 28,
-              "twenty-nine": 29,
-              "thirty": 30,
-              "thirty-one": 31,
-              "thirty-two": 32,
-              "thirty-three": 33,
-              "thirty-four": 34,
-              "thirty-five": 35,
-              "thirty-six": 36,
-              "thirty-seven": 37,
-              "thirty-eight": 38,
-              "thirty-nine": 39,
-              "forty": 40,
-              "forty-one": 41,
-              "forty-two": 42,
-              "forty-three": 43,
-              "forty-four": 44,
-              "forty-five": 45,
-              "forty-six": 46,
-              "forty-seven": 47,
-              "forty-eight": 48,
-              "forty-nine": 49,
-              "fifty": 50,
-              "fifty-one": 51,
-              "fifty-two": 52,
-              "fifty-three": 53,
-              "fifty-four": 54,
-              "fifty-five": 55,
-              "fifty-six": 56,
-              "fifty-seven": 57,
-              "fifty-eight": 58,
-              "fifty-nine": 59,
-              "sixty": 60,
-              "sixty-one": 61,
-              "sixty-two": 62,
-              "sixty-three": 63,
-              "sixty-four": 64,
-              "sixty-five": 65,
-              "sixty-six": 66,
-              "sixty-seven": 67,
-              "sixty-eight": 68,
-              "sixty-nine": 69,
-              "seventy": 70,
-              "seventy-one": 71,
-              "seventy-two": 72,
-              "seventy-three": 73,
-              "seventy-four": 74,
-              "seventy-five": 75,
-              "seventy-six": 76,
-              "seventy-seven": 77,
-              "seventy-eight": 78,
-              "seventy-nine": 79,
-              "eighty": 80,
-              "eighty-one": 81,
-              "eighty-two": 82,
-              "eighty-three": 83,
-              "eighty-four": 84,
-              "eighty-five": 85,
-              "eighty-six": 86,
-              "eighty-seven": 87,
-              "eighty-eight": 88,
-              "eighty-nine": 89,
-              "ninety": 90,
-              "ninety-one": 91,
-              "ninety-two": 92,
-              "ninety-three": 93,
-              "ninety-four": 94,
-              "ninety-five": 95,
-              "ninety-six": 96,
-              "ninety-seven": 97,
-              "ninety-eight": 98,
-              "ninety-nine": 99}
-
-matcher = Matcher(nlp.vocab)
-
 for feature_name, feature_patterns in patterns.items():
     patterns = []
     for feature_pattern in feature_patterns:
@@ -154,37 +52,32 @@ for feature_name, feature_patterns in patterns.items():
                 else:
                     pattern.append({"LOWER": word})
             patterns.append(pattern)
-    matcher.add(feature_name, patterns)
-
-re_num = re.compile(r"^\d+$")
+    match_engine.add_token_patterns(namespace="duration", label=feature_name, patterns=patterns)
 
 
 class Duration(BaseProcessor):
+    requires = ("page_matches",)
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-        self.model = None
-
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(id="duration", name="Duration in years", feature_type="numeric", is_tertile=True)
+    def load_models(self, config: ClassifierConfig | None = None) -> None:
+        model_store.get_model("duration", config=config or self.config)
 
     def process(self, document: Document, config: ClassifierConfig | None = None):
 
-        config = self.get_classifier_config_or_default(config=config)
-
-        path_to_classifier = config.path_to_classifier
-
-        if not self.model:
-            with bz2.open(path_to_classifier, "rb") as f:
-                self.model = pkl.load(f)
+        model = model_store.get_model("duration", config=config or self.config)
 
         candidates = []  # will be a list of tuples containing data: cohort value, distance to mention of duration, distance to mention of human age
         annotations = []
         occurrence_to_pages = {}
 
+        page_matches = match_engine.get_matches(document=document, namespace="duration")
+
+        numeric_mentions = document.context.numeric_mentions
         for page_no, doc in enumerate(document.tokenised_pages):
-            matches = matcher(doc)
+            document.raise_if_cancelled()
+            matches = list(page_matches[page_no])
 
             duration_token_indices = set()
             age_token_indices = set()
@@ -198,19 +91,18 @@ class Duration(BaseProcessor):
                     age_token_indices.add(phrase_match[1])
                     age_token_indices.add(phrase_match[2])
 
+            duration_positions = sorted_positions(duration_token_indices)
+            age_positions = sorted_positions(age_token_indices)
+
             for phrase_match in matches:
                 matcher_name = nlp.vocab.strings[phrase_match[0]]
 
                 if matcher_name == "time":
                     candidate_value_numeric = None
                     for i in range(phrase_match[1], phrase_match[2]):
-                        if doc[i].like_num:
-                            if doc[i].norm_ in num_lookup:
-                                candidate_value_numeric = num_lookup[doc[i].norm_]
-                            elif re_num.match(doc[i].norm_):
-                                candidate_value_numeric = int(doc[i].text)
-                            else:
-                                continue
+                        token_value = numeric_mentions.get_value(page_no=page_no, token_no=i)
+                        if token_value is not None:
+                            candidate_value_numeric = token_value
                     if not candidate_value_numeric:
                         continue
                     candidate_value_text = doc[phrase_match[1]:phrase_match[2]].text.lower()
@@ -230,26 +122,12 @@ class Duration(BaseProcessor):
                     else:
                         candidate_value_years = None
 
-                    min_dist = 1000
-                    min_dist_age = 1000
-                    start = phrase_match[1] - 10
-                    end = phrase_match[2] + 10
-                    if start < 0:
-                        start = 0
-                    if end > len(doc):
-                        end = len(doc)
-
-                    for j in range(start, end):
-                        if j in duration_token_indices:
-                            if j < phrase_match[1]:
-                                min_dist = min([abs(j - phrase_match[1]), min_dist])
-                            else:
-                                min_dist = min([abs(j - phrase_match[2]), min_dist])
-                        if j in age_token_indices:
-                            if j < phrase_match[1]:
-                                min_dist_age = min([abs(j - phrase_match[1]), min_dist_age])
-                            else:
-                                min_dist_age = min([abs(j - phrase_match[2]), min_dist_age])
+                    min_dist = window_distance(positions=duration_positions, start=phrase_match[1], end=phrase_match[2], window=10, length=len(doc))
+                    if min_dist is None:
+                        min_dist = 1000
+                    min_dist_age = window_distance(positions=age_positions, start=phrase_match[1], end=phrase_match[2], window=10, length=len(doc))
+                    if min_dist_age is None:
+                        min_dist_age = 1000
 
                     if min_dist < 1000 and candidate_value_years is not None:
                         candidates.append(
@@ -276,8 +154,8 @@ class Duration(BaseProcessor):
 
         all_relevant_strings, contexts_this_file = get_text_snippets_for_nb(document.tokenised_pages)
         input_for_nb = " ".join(all_relevant_strings)
-        nb_prediction = self.model.predict([input_for_nb])[0]
-        nb_prediction_conf = self.model.predict_proba([input_for_nb])[0]
+        nb_prediction = model.predict([input_for_nb])[0]
+        nb_prediction_conf = model.predict_proba([input_for_nb])[0]
 
         if len(candidates) > 0:
             candidates = sorted(candidates, key=lambda x: x[1] * 0.87718219
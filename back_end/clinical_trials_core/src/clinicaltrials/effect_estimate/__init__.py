@@ -1,14 +1,14 @@
-import bz2
 import json
-import pickle as pkl
 import re
 
 import numpy as np
 import pandas as pd
 from sklearn.pipeline import make_pipeline
 
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, MetadataOption, Page
+from clinicaltrials import model_store
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
 from clinicaltrials.logs_collector import LogsCollector
+from clinicaltrials.resources import nlp
 
 # Should be shared with training code
 
@@ -24,6 +24,10 @@ for n in range(1, 101):
 
 WINDOW_SIZE = 20
 
+# * Words that end the effect estimate keywords highlighted for display, e.g. "ratio" of "hazard ratio"
+KEYWORD_LAST_WORDS = ["size", "sizes", "estimate", "estimates", "estimator", "reduction", "reductions", "detect", "ratio", "ratios",
+                      "risk", "risks", "efficacy", "effectiveness", "d", "h"]
+
 
 def transform_tokens(list_of_lists_of_tokens, vectoriser):
     token_counts = np.zeros((len(list_of_lists_of_tokens), len(vectoriser.vocabulary_)))
@@ -67,23 +71,13 @@ def iterate_tokens(tokenised_pages):
 
 
 class EffectEstimate(BaseProcessor):
+    is_high_value = True
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-        self.model = None
-
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(
-            id="effect_estimate",
-            name="Effect Estimate",
-            feature_type="yesno",
-            default_weights={"cost": 0.0, "risk": 16.0},
-            options=[
-                MetadataOption(label="no", value=0),
-                MetadataOption(label="yes", value=1),
-            ],
-        )
+    def load_models(self, config: ClassifierConfig | None = None) -> None:
+        model_store.get_model("effect_estimate", config=config or self.config)
 
     def process(self, document: Document, config: ClassifierConfig | None = None):
         """
@@ -108,31 +102,59 @@ class EffectEstimate(BaseProcessor):
         :return: The prediction (str) and a map from effect estimate to the pages it's mentioned in.
         """
 
-        logs_collector = LogsCollector()
-        config = self.get_classifier_config_or_default(config=config)
-        path_to_classifier = config.path_to_classifier
+        return self.process_batch(documents=[document], config=config)[0]
 
-        if not self.model:
-            with bz2.open(path_to_classifier, "rb") as f:
-                self.model = pkl.load(f)
+    def process_batch(self, documents: list[Document], config: ClassifierConfig | None = None) -> list[dict]:
+        """
+        Identify the effect estimate of several documents. The contexts of the candidate numbers of all documents are
+        stacked so that the classifier runs once for the whole batch.
+        """
 
-        vectoriser = self.model.named_steps["countvectorizer"]
-        transformer = self.model.named_steps["tfidftransformer"]
-        nb = self.model.named_steps["multinomialnb"]
-        vocabulary = {v: k for k, v in vectoriser.vocabulary_.items()}
+        model = model_store.get_model("effect_estimate", config=config or self.config)
+
+        vectoriser = model.named_steps["countvectorizer"]
+        transformer = model.named_steps["tfidftransformer"]
+        nb = model.named_steps["multinomialnb"]
 
         shorter_pipeline = make_pipeline(transformer, nb)
 
-        tokenised_pages = document.tokenised_pages
+        candidates = [self.__find_candidates(document=document) for document in documents]
 
-        all_tokens = list(iterate_tokens(tokenised_pages))
+        all_contexts = [context for _, contexts, _, _ in candidates for context in contexts]
+        if len(all_contexts) > 0:
+            X_test = transform_tokens(all_contexts, vectoriser)
+
+            all_y_pred = shorter_pipeline.predict(X_test)
+
+            all_y_pred_proba = shorter_pipeline.predict_proba(X_test)[:, 1]
+
+        results = []
+        offset = 0
+        for document, (instances, contexts, page_nos, token_idxs) in zip(documents, candidates):
+            num_candidates = len(contexts)
+            if num_candidates > 0:
+                y_pred = all_y_pred[offset:offset + num_candidates]
+                y_pred_proba = all_y_pred_proba[offset:offset + num_candidates]
+            else:
+                y_pred = y_pred_proba = None
+            offset += num_candidates
+
+            results.append(self.__make_result(document, instances, page_nos, token_idxs, y_pred, y_pred_proba))
+
+        return results
+
+    def __find_candidates(self, document: Document) -> tuple[list, list, list, list]:
+        """
+        Find the numbers in the document that could be an effect estimate, with the context the classifier needs.
+        """
+
+        all_tokens = list(iterate_tokens(document.tokenised_pages))
 
         instances = []
         contexts = []
         page_nos = []
         token_idxs = []
 
-        logs_collector.add("Searching for an effect estimate...")
         for idx, (page_no, token_no, token) in enumerate(all_tokens):
             token = token.text.lower()
             if NUMBERS_REGEX.match(token) or token in NUMBERS_IN_WORDS:
@@ -154,14 +176,19 @@ class EffectEstimate(BaseProcessor):
                     page_nos.append(page_no)
                     token_idxs.append(idx)
 
-        page_to_probas = [0] * len(tokenised_pages)
-        if len(contexts) > 0:
-            X_test = transform_tokens(contexts, vectoriser)
+        return instances, contexts, page_nos, token_idxs
+
+    def __make_result(self, document: Document, instances: list, page_nos: list, token_idxs: list, y_pred, y_pred_proba) -> dict:
+        logs_collector = LogsCollector()
 
-            y_pred = shorter_pipeline.predict(X_test)
+        tokenised_pages = document.tokenised_pages
+
+        all_tokens = list(iterate_tokens(tokenised_pages))
 
-            y_pred_proba = shorter_pipeline.predict_proba(X_test)[:, 1]
+        logs_collector.add("Searching for an effect estimate...")
 
+        page_to_probas = [0] * len(tokenised_pages)
+        if len(instances) > 0:
             df_result = pd.DataFrame({"token_idx": token_idxs, "token": instances, "page_no": page_nos, "y_pred": y_pred, "y_pred_proba": y_pred_proba})
 
             # hack: make it more lenient because there were very few positive examples in the training set.
@@ -224,60 +251,68 @@ class EffectEstimate(BaseProcessor):
 
         # Add in some hard coded keywords for display purposes only
         # The presence of these keywords alone does not affect the classifier's output, as they are meaningless without a numerical value.
-        last_token = None
-        for page_no, doc in enumerate(tokenised_pages):
-            for token_idx, token in enumerate(doc):
-                token_orig = token.text
-                token = token.norm_
-
-                effect_estimate_type = None
-                effect_estimate_length = 1
-
-                if last_token == "effect" and token in {"size", "sizes"}:
-                    effect_estimate_type = "effect size"
-                    effect_estimate_length = 2
-                elif last_token == "effect" and token in {"estimate", "estimates", "estimator"}:
-                    effect_estimate_type = "effect estimate"
-                    effect_estimate_length = 2
-                elif token in {"reduction", "reductions"}:
-                    effect_estimate_type = "reduction"
-                elif token in {"detect"}:
-                    effect_estimate_type = "detect"
-                elif last_token in {"odds", "hazard", "risk"} and token in {"ratio", "ratios"}:
-                    effect_estimate_type = "odds/hazard/risk ratio"
-                    effect_estimate_length = 2
-                elif (last_token in {"relative"} and token in {"risk", "risks"}) or token_orig == "RR":
-                    effect_estimate_type = "relative risk/RR"
-                    effect_estimate_length = 2
-                elif last_token in {"prevention"} and token in {"efficacy", "effectiveness"}:
-                    effect_estimate_type = "prevention efficacy/effectiveness"
-                    effect_estimate_length = 2
-                elif last_token in {"cohens", "cohen's", "cohen’s"} and token in {"d", "h"}:
-                    effect_estimate_type = "Cohen's d/h"
-                    effect_estimate_length = 2
-
-                if effect_estimate_type is not None:
-                    effect_estimate_to_pages[effect_estimate_type].append(page_no)
-                    start_token_idx = token_idx - effect_estimate_length + 1
-                    end_token_idx = token_idx + 1
-                    match_start_char = doc[start_token_idx].idx
-                    if end_token_idx < len(doc):
-                        match_end_char = doc[end_token_idx].idx
-                    else:
-                        match_end_char = len(doc.text)
-                    match_text = doc[start_token_idx:end_token_idx].text
-                    annotations.append(
-                        {
-                            "type": "effect_estimate",
-                            "subtype": effect_estimate_type,
-                            "page_no": page_no,
-                            "start_char": match_start_char,
-                            "end_char": match_end_char,
-                            "text": match_text,
-                        }
-                    )
-
-                last_token = token
+        # The keywords are looked up by their last word, and the word before it is read from the token arrays.
+        document.raise_if_cancelled()
+        token_arrays = document.context.token_arrays
+        keyword_positions = np.union1d(
+            document.context.get_token_index(attribute="norm").find(KEYWORD_LAST_WORDS),
+            document.context.get_token_index(attribute="orth").find(["RR"]),
+        )
+        for position in keyword_positions:
+            page_no = int(token_arrays.page[position])
+            doc = tokenised_pages[page_no]
+            token_idx = int(position - token_arrays.page_offsets[page_no])
+            token_orig = token_arrays.text(position)
+            token = nlp.vocab.strings[int(token_arrays.norm[position])]
+            # * The previous token of the document, which is on an earlier page for the first token of a page
+            last_token = nlp.vocab.strings[int(token_arrays.norm[position - 1])] if position > 0 else None
+
+            effect_estimate_type = None
+            effect_estimate_length = 1
+
+            if last_token == "effect" and token in {"size", "sizes"}:
+                effect_estimate_type = "effect size"
+                effect_estimate_length = 2
+            elif last_token == "effect" and token in {"estimate", "estimates", "estimator"}:
+                effect_estimate_type = "effect estimate"
+                effect_estimate_length = 2
+            elif token in {"reduction", "reductions"}:
+                effect_estimate_type = "reduction"
+            elif token in {"detect"}:
+                effect_estimate_type = "detect"
+            elif last_token in {"odds", "hazard", "risk"} and token in {"ratio", "ratios"}:
+                effect_estimate_type = "odds/hazard/risk ratio"
+                effect_estimate_length = 2
+            elif (last_token in {"relative"} and token in {"risk", "risks"}) or token_orig == "RR":
+                effect_estimate_type = "relative risk/RR"
+                effect_estimate_length = 2
+            elif last_token in {"prevention"} and token in {"efficacy", "effectiveness"}:
+                effect_estimate_type = "prevention efficacy/effectiveness"
+                effect_estimate_length = 2
+            elif last_token in {"cohens", "cohen's", "cohen’s"} and token in {"d", "h"}:
+                effect_estimate_type = "Cohen's d/h"
+                effect_estimate_length = 2
+
+            if effect_estimate_type is not None:
+                effect_estimate_to_pages[effect_estimate_type].append(page_no)
+                start_token_idx = token_idx - effect_estimate_length + 1
+                end_token_idx = token_idx + 1
+                match_start_char = doc[start_token_idx].idx
+                if end_token_idx < len(doc):
+                    match_end_char = doc[end_token_idx].idx
+                else:
+                    match_end_char = len(doc.text)
+                match_text = doc[start_token_idx:end_token_idx].text
+                annotations.append(
+                    {
+                        "type": "effect_estimate",
+                        "subtype": effect_estimate_type,
+                        "page_no": page_no,
+                        "start_char": match_start_char,
+                        "end_char": match_end_char,
+                        "text": match_text,
+                    }
+                )
 
         ret = {
             "prediction": is_effect_estimate,
@@ -1,10 +1,9 @@
-import bz2
 import json
-import pickle as pkl
 
 import numpy as np
-from spacy.matcher import PhraseMatcher
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, MetadataOption, Page
+from clinicaltrials import model_store
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
+from clinicaltrials.match_engine import match_engine
 from clinicaltrials.resources import nlp
 
 patterns = dict()
@@ -15,45 +14,28 @@ patterns["eligibility"] = ["eligibility", "eligible", "inclusion", "exclusion",
                            "girls",
                            "gender", "sex"]
 
-phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
-
-for pattern_name, pattern_surface_forms in patterns.items():
-    phrase_matcher.add(pattern_name, nlp.pipe(pattern_surface_forms))
+match_engine.add_phrase_patterns(namespace="gender", patterns=patterns)
 
 
 class Gender(BaseProcessor):
+    requires = ("page_matches",)
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-        self.model = None
-
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(
-            id="gender",
-            name="Gender",
-            feature_type="categorical",
-            options=[
-                MetadataOption(label="none", value=0),
-                MetadataOption(label="male", value=1),
-                MetadataOption(label="female", value=2),
-            ]
-        )
+    def load_models(self, config: ClassifierConfig | None = None) -> None:
+        model_store.get_model("gender", config=config or self.config)
 
     def process(self, document: Document, config: ClassifierConfig | None = None):
-        config = self.get_classifier_config_or_default(config=config)
-
-        path_to_classifier = config.path_to_classifier
-
-        if not self.model:
-            with bz2.open(path_to_classifier, "rb") as f:
-                self.model = pkl.load(f)
+        model = model_store.get_model("gender", config=config or self.config)
 
         annotations = []
         texts = []
         occurrence_to_pages = {}
+        page_matches = match_engine.get_matches(document=document, namespace="gender")
         for page_no, doc in enumerate(document.tokenised_pages):
-            matches = list(phrase_matcher(doc))
+            document.raise_if_cancelled()
+            matches = list(page_matches[page_no])
 
             for phrase_match in matches:
                 matcher_name = nlp.vocab.strings[phrase_match[0]]
@@ -84,7 +66,7 @@ class Gender(BaseProcessor):
 
         X = " ".join(texts)
 
-        y_pred_proba = self.model.predict_proba([X])
+        y_pred_proba = model.predict_proba([X])
 
         prediction = int(np.argmax(y_pred_proba[0]))
 
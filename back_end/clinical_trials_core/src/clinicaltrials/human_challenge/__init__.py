@@ -1,7 +1,7 @@
 import json
 
-from spacy.matcher import PhraseMatcher
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, Page, MetadataOption
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
+from clinicaltrials.match_engine import match_engine
 from clinicaltrials.resources import nlp
 
 patterns = dict()
@@ -14,23 +14,15 @@ patterns["explicit"] = ["human challenge study", "human challenge studies", "hum
                         "challenge virus", "challenge dose", "challenge dosage", "challenge strain"]
 patterns["implicit"] = ["human challenge"]
 
-phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
-
-for pattern_name, pattern_surface_forms in patterns.items():
-    phrase_matcher.add(pattern_name, nlp.pipe(pattern_surface_forms))
+match_engine.add_phrase_patterns(namespace="human_challenge", patterns=patterns)
 
 
 class HumanChallenge(BaseProcessor):
+    requires = ("page_matches",)
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(id="human_challenge", name="Healthy", feature_type="yesno", options=[
-            MetadataOption(label="no", value=0),
-            MetadataOption(label="yes", value=1),
-        ])
-
     def process(self, document: Document, config: ClassifierConfig | None = None):
         """
         Identify if this trial is a human challenge study. https://en.wikipedia.org/wiki/Human_challenge_study
@@ -44,8 +36,11 @@ class HumanChallenge(BaseProcessor):
         annotations = []
         occurrence_to_pages = {}
 
+        page_matches = match_engine.get_matches(document=document, namespace="human_challenge")
+
         for page_no, doc in enumerate(document.tokenised_pages):
-            matches = list(phrase_matcher(doc))
+            document.raise_if_cancelled()
+            matches = list(page_matches[page_no])
 
             for phrase_match in matches:
                 matcher_name = nlp.vocab.strings[phrase_match[0]]
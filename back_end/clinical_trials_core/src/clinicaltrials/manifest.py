@@ -0,0 +1,110 @@
+"""
+manifest.py
+
+A versioned JSON manifest of the modules `ClinicalTrial` runs and their metadata, generated from the processors at build
+time and shipped with the package. Services that only need to list the modules or present their metadata, such as the
+API, load the manifest instead of building a `ClinicalTrial`.
+
+The manifest is checked against the processors by the test suite. After adding a processor or changing its metadata,
+regenerate it with:
+    python -m clinicaltrials.manifest
+
+Usage:
+    from clinicaltrials.manifest import load_manifest
+    manifest = load_manifest()
+    modules = manifest.modules
+"""
+
+import json
+from dataclasses import dataclass
+from os import path
+from typing import Any
+
+from clinicaltrials.metadata import Metadata, MetadataOption
+
+# * Bump when the format of the manifest changes
+MANIFEST_FORMAT_VERSION = 1
+
+MANIFEST_PATH = path.join(path.dirname(path.abspath(__file__)), "metadata_manifest.json")
+
+
+@dataclass(frozen=True)
+class Manifest:
+    format_version: int
+    core_version: str
+    modules: list[str]
+    metadata_dict: list[dict]
+
+    @property
+    def metadata(self) -> list[Metadata]:
+        return [metadata_from_dict(metadata_dict=metadata_dict) for metadata_dict in self.metadata_dict]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "format_version": self.format_version,
+            "core_version": self.core_version,
+            "modules": self.modules,
+            "metadata": self.metadata_dict,
+        }
+
+
+def metadata_from_dict(metadata_dict: dict) -> Metadata:
+    """
+    Rebuild a `Metadata` from the output of `Metadata.to_dict`.
+    """
+
+    fields = dict(metadata_dict)
+    if fields["feature_type"] != "key_value_list":
+        fields["options"] = [MetadataOption(**option) for option in fields.get("options", [])]
+
+    return Metadata(**fields)
+
+
+def build_manifest() -> Manifest:
+    """
+    Build the manifest from the modules of `ClinicalTrial` and the metadata of their processors.
+    """
+
+    from clinicaltrials.core import ClinicalTrial, __version__
+
+    ct = ClinicalTrial()
+    return Manifest(format_version=MANIFEST_FORMAT_VERSION, core_version=__version__, modules=ct.modules, metadata_dict=ct.metadata_dict)
+
+
+def write_manifest(manifest_path: str = MANIFEST_PATH) -> Manifest:
+    manifest = build_manifest()
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest.to_dict(), f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+    return manifest
+
+
+def load_manifest(manifest_path: str = MANIFEST_PATH) -> Manifest:
+    """
+    Load the manifest.
+
+    Raises:
+        ValueError: If the manifest was written in another format version.
+    """
+
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest_dict = json.load(f)
+
+    if manifest_dict.get("format_version") != MANIFEST_FORMAT_VERSION:
+        raise ValueError(
+            f"Metadata manifest {manifest_path} has format version {manifest_dict.get('format_version')}, expected {MANIFEST_FORMAT_VERSION}. "
+            "Regenerate it with `python -m clinicaltrials.manifest`"
+        )
+
+    return Manifest(
+        format_version=manifest_dict["format_version"],
+        core_version=manifest_dict["core_version"],
+        modules=manifest_dict["modules"],
+        metadata_dict=manifest_dict["metadata"],
+    )
+
+
+if __name__ == "__main__":
+    written_manifest = write_manifest()
+    print(f"Wrote the metadata of {len(written_manifest.modules)} modules to {MANIFEST_PATH}")
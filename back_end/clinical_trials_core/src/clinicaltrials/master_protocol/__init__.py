@@ -1,6 +1,5 @@
-from spacy.matcher import PhraseMatcher
-
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, MetadataOption, Page
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
+from clinicaltrials.match_engine import match_engine
 from clinicaltrials.resources import nlp
 
 patterns = dict()
@@ -14,35 +13,25 @@ patterns["master_protocol"] = ['basket design', 'basket designs', 'basket extens
                                'umbrella sub-studies', 'umbrella sub-study', 'umbrella substudies', 'umbrella substudy',
                                'umbrella trial', 'umbrella trials']
 
-phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
-
-for pattern_name, pattern_surface_forms in patterns.items():
-    phrase_matcher.add(pattern_name, nlp.pipe(pattern_surface_forms))
+match_engine.add_phrase_patterns(namespace="master_protocol", patterns=patterns)
 
 
 class MasterProtocol(BaseProcessor):
+    requires = ("page_matches",)
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(id="master_protocol",
-                        name="Trial is a master protocol or a subset or derivative of a master protocol",
-                        feature_type="yesno",
-                        options=[
-                            MetadataOption(label="no", value=0),
-                            MetadataOption(label="yes", value=1),
-                        ]
-                        )
-
     def process(self, document: Document, config: ClassifierConfig | None = None):
         prediction = "no"
         annotations = []
         occurrence_to_pages = {}
+        page_matches = match_engine.get_matches(document=document, namespace="master_protocol")
         for page_no, doc in enumerate(document.tokenised_pages):
+            document.raise_if_cancelled()
             if page_no > 3:  # master protocol should be mentioned in the first few pages.
                 continue
-            matches = list(phrase_matcher(doc))
+            matches = list(page_matches[page_no])
 
             for phrase_match in matches:
                 matcher_name = nlp.vocab.strings[phrase_match[0]]
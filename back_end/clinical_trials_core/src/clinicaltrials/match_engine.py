@@ -0,0 +1,156 @@
+"""
+match_engine.py
+
+A single match engine for the rule based processors. Each processor registers its phrase or token patterns under a
+namespace of its own. The engine merges the patterns of all namespaces into one PhraseMatcher per token attribute and
+one Matcher, so every page of a document is scanned once however many processors there are, and each processor reads
+the matches of its own namespace, labelled as it registered them, exactly as if it had run its own matcher.
+
+The matches of a document are the shared product "page_matches" (see `clinicaltrials.products`), so they are computed
+once per document, before the processors that require them. The combined matchers are compiled on first use and cached
+on disk (see `clinicaltrials.matcher_cache`).
+
+Usage:
+    from clinicaltrials.match_engine import match_engine
+    match_engine.add_phrase_patterns(namespace="design", patterns={"crossover": ["crossover", "cross-over"]})
+
+    page_matches = match_engine.get_matches(document=document, namespace="design")
+    for page_no, doc in enumerate(document.tokenised_pages):
+        for match_id, start, end in page_matches[page_no]:
+            matcher_name = nlp.vocab.strings[match_id]
+"""
+
+from threading import Lock
+from typing import TYPE_CHECKING, Any, TypeAlias
+
+from clinicaltrials.matcher_cache import LazyMatcher
+from clinicaltrials.products import get_product, product
+from clinicaltrials.resources import nlp
+
+if TYPE_CHECKING:
+    from clinicaltrials.core import Document
+
+# * `(match_id, start, end)` as returned by spaCy matchers, with the match id of the label registered by the processor
+Match: TypeAlias = tuple[int, int, int]
+
+# * Labels are stored in the combined matchers as "<namespace>::<label>"
+NAMESPACE_SEPARATOR = "::"
+
+# * Key of the combined Matcher of the token patterns
+TOKEN_PATTERNS = "TOKEN_PATTERNS"
+
+
+class MatchEngine:
+    """
+    Combined matchers of all registered namespaces. A namespace holds either phrase patterns of one token attribute or
+    token patterns, so that its matches come out of a single matcher, in the order that matcher returns them.
+    """
+
+    def __init__(self) -> None:
+        self.__lock = Lock()
+
+        # * Combined matchers, keyed by the token attribute of the phrase patterns or by TOKEN_PATTERNS
+        self.__matchers: dict[str, LazyMatcher] = {}
+
+        # * Matcher key of each namespace, and namespace and label id of each namespaced label id
+        self.__namespaces: dict[str, str] = {}
+        self.__labels: dict[int, tuple[str, int]] = {}
+
+    @property
+    def namespaces(self) -> set[str]:
+        return set(self.__namespaces)
+
+    def add_phrase_patterns(self, namespace: str, patterns: dict[str, list[str]], attr: str = "LOWER") -> None:
+        """
+        Register phrase patterns, as for `PhraseMatcher(nlp.vocab, attr=attr).add(label, nlp.pipe(surface_forms))`.
+
+        :param namespace: Namespace of the patterns, usually the module name.
+        :param patterns: Surface forms of each label.
+        :param attr: Token attribute to match on.
+        """
+
+        with self.__lock:
+            matcher = self.__get_matcher(namespace=namespace, matcher_key=attr)
+            for label, surface_forms in patterns.items():
+                matcher.add(self.__add_label(namespace=namespace, label=label), surface_forms)
+
+    def add_token_patterns(self, namespace: str, label: str, patterns: list[list[dict[str, Any]]]) -> None:
+        """
+        Register token patterns, as for `Matcher(nlp.vocab).add(label, patterns)`.
+
+        :param namespace: Namespace of the patterns, usually the module name.
+        :param label: Label of the matches.
+        :param patterns: Token patterns in the spaCy Matcher format.
+        """
+
+        with self.__lock:
+            matcher = self.__get_matcher(namespace=namespace, matcher_key=TOKEN_PATTERNS)
+            matcher.add(self.__add_label(namespace=namespace, label=label), patterns)
+
+    def __get_matcher(self, namespace: str, matcher_key: str) -> LazyMatcher:
+        if self.__namespaces.setdefault(namespace, matcher_key) != matcher_key:
+            raise ValueError(f"Namespace {namespace} already holds patterns of another matcher, use a namespace per matcher")
+
+        if matcher_key not in self.__matchers:
+            attr = None if matcher_key == TOKEN_PATTERNS else matcher_key
+            self.__matchers[matcher_key] = LazyMatcher(name=f"match_engine_{matcher_key.lower()}", attr=attr)
+
+        return self.__matchers[matcher_key]
+
+    def __add_label(self, namespace: str, label: str) -> str:
+        key = f"{namespace}{NAMESPACE_SEPARATOR}{label}"
+        self.__labels[nlp.vocab.strings.add(key)] = (namespace, nlp.vocab.strings.add(label))
+        return key
+
+    def match(self, document: "Document") -> dict[str, list[list[Match]]]:
+        """
+        Run the combined matchers once over each page of the document.
+
+        :param document: The document.
+        :return: Matches of each namespace on each page.
+        """
+
+        with self.__lock:
+            matchers = list(self.__matchers.values())
+            labels = dict(self.__labels)
+            page_matches: dict[str, list[list[Match]]] = {namespace: [[] for _ in range(len(document.pages))] for namespace in self.__namespaces}
+
+        for page_no, doc in enumerate(document.tokenised_pages):
+            document.raise_if_cancelled()
+            for matcher in matchers:
+                for key_id, start, end in matcher(doc):
+                    namespace, label_id = labels[key_id]
+                    page_matches[namespace][page_no].append((label_id, start, end))
+
+        return page_matches
+
+    def get_matches(self, document: "Document", namespace: str) -> list[list[Match]]:
+        """
+        Matches of one namespace on each page of a document.
+
+        :param document: The document.
+        :param namespace: Namespace the patterns were registered under.
+        :return: One list of `(match_id, start, end)` per page, where `match_id` is the id of the registered label.
+        """
+
+        if namespace not in self.__namespaces:
+            raise KeyError(f"Unknown match namespace {namespace}")
+
+        page_matches = get_product(document=document, name="page_matches")
+        if namespace not in page_matches:
+            # * Registered after the matches of this document were computed
+            page_matches[namespace] = self.match(document=document)[namespace]
+
+        return page_matches[namespace]
+
+
+match_engine = MatchEngine()
+
+
+@product("page_matches", shared=True)
+def build_page_matches(document: "Document") -> dict[str, list[list[Match]]]:
+    """
+    Matches of every namespace registered with the match engine on each page. Used by the rule based processors.
+    """
+
+    return match_engine.match(document=document)
@@ -0,0 +1,234 @@
+"""
+matcher_cache.py
+
+spaCy matchers that are compiled on first use and cached on disk. spaCy validates every token pattern added to a
+Matcher, which takes several seconds for the thousands of patterns generated by Regimen, NumSites and SampleSize, and
+phrase patterns have to be tokenised before they can be added to a PhraseMatcher. A `LazyMatcher` only collects its
+patterns when they are added, so importing the processors, e.g. to read their metadata, does not compile anything.
+
+The first time a `LazyMatcher` is used it loads the compiled matcher from the cache directory, where it is stored under
+a hash of its pattern definitions, or compiles it and writes it there. A change to the patterns, or to the spaCy
+version, changes the hash, so a stale matcher is never loaded.
+
+Usage:
+    from clinicaltrials.matcher_cache import LazyMatcher
+    matcher = LazyMatcher(name="sample_size")
+    matcher.add("total", [[{"LIKE_NUM": True}, {"LOWER": "patients"}]])
+    matches = matcher(doc)
+"""
+
+import hashlib
+import json
+import logging
+import pickle as pkl
+import time
+from glob import glob
+from os import makedirs, path, remove, replace
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from typing import Any, BinaryIO
+
+import spacy
+from spacy.matcher import Matcher, PhraseMatcher
+from spacy.tokens import Doc
+
+from clinicaltrials.resources import nlp
+from clinicaltrials.utils import get_default_classifier_storage_path
+
+# * Bump when the format of the cache files changes
+CACHE_FORMAT_VERSION = 1
+
+# * Directory of the cache files, defaults to a folder in the classifier storage path
+_cache_dir: str | None = None
+
+# * Every matcher created, so that they can all be compiled when a process warms up
+_matchers: list["LazyMatcher"] = []
+
+
+def get_cache_dir() -> str:
+    return _cache_dir or path.join(get_default_classifier_storage_path(), "matcher_cache")
+
+
+def set_cache_dir(cache_dir: str | None) -> None:
+    """
+    Set the directory the compiled matchers are cached in. None restores the default.
+    """
+
+    global _cache_dir
+    _cache_dir = cache_dir
+
+
+def compile_matchers() -> dict[str, float]:
+    """
+    Compile every matcher that has not been compiled yet, loading it from the cache where possible.
+
+    Returns: Time in seconds spent compiling each matcher
+    """
+
+    compile_times: dict[str, float] = {}
+    for matcher in list(_matchers):
+        if not matcher.is_compiled:
+            start_time = time.time()
+            matcher.compile()
+            compile_times[matcher.name] = time.time() - start_time
+
+    return compile_times
+
+
+class _VocabPickler(pkl.Pickler):
+    """
+    Pickles a matcher without the shared vocab, which is large and must be the vocab of `nlp` when loaded.
+    """
+
+    def persistent_id(self, obj: Any) -> str | None:
+        return "vocab" if obj is nlp.vocab else None
+
+
+class _VocabUnpickler(pkl.Unpickler):
+    def persistent_load(self, pid: str) -> Any:
+        if pid != "vocab":
+            raise pkl.UnpicklingError(f"Unknown persistent id {pid}")
+        return nlp.vocab
+
+
+class LazyMatcher:
+    """
+    A spaCy Matcher, or PhraseMatcher if `attr` is given, that is compiled on first use. Token patterns are added as
+    for `Matcher.add` and phrase patterns as lists of surface forms, which are tokenised with `nlp` when compiling.
+    """
+
+    def __init__(self, name: str, attr: str | None = None) -> None:
+        """
+        :param name: Name of the matcher, unique among the matchers, used for its cache file.
+        :param attr: Token attribute of a PhraseMatcher, or None for a token Matcher.
+        """
+
+        self.name = name
+        self.attr = attr
+        self.__lock = Lock()
+        self.__patterns: list[tuple[str, list[Any]]] = []
+        self.__matcher: Matcher | PhraseMatcher | None = None
+
+        _matchers.append(self)
+
+    def add(self, key: str, patterns: list[Any]) -> None:
+        """
+        Add patterns under a match label. Adding patterns to a compiled matcher discards it, so that it is compiled
+        again, under its new hash, the next time it is used.
+
+        :param key: Label of the matches.
+        :param patterns: Token patterns, or surface forms for a PhraseMatcher.
+        """
+
+        # * A cached matcher is loaded with the hash of the label only, so the label is added to the vocab here for the
+        # * processors to look it up
+        nlp.vocab.strings.add(key)
+
+        with self.__lock:
+            self.__patterns.append((key, list(patterns)))
+            self.__matcher = None
+
+    def __call__(self, doc: Doc) -> list[tuple[int, int, int]]:
+        return self.matcher(doc)
+
+    def __len__(self) -> int:
+        return len(self.__patterns)
+
+    @property
+    def is_compiled(self) -> bool:
+        return self.__matcher is not None
+
+    @property
+    def matcher(self) -> Matcher | PhraseMatcher:
+        matcher = self.__matcher
+        if matcher is None:
+            matcher = self.compile()
+
+        return matcher
+
+    @property
+    def cache_key(self) -> str:
+        """
+        Hash of everything the compiled matcher depends on: the patterns, the matcher type and the spaCy version.
+        """
+
+        patterns = self.__patterns
+        if self.attr is not None:
+            # * The order of the surface forms of a label does not change the matches, and is not stable when they come
+            # * from a set, so it is left out of the hash
+            patterns = [(key, sorted(surface_forms)) for key, surface_forms in patterns]
+
+        definition = [CACHE_FORMAT_VERSION, spacy.__version__, nlp.lang, self.attr, patterns]
+        return hashlib.sha256(json.dumps(definition, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+    @property
+    def cache_path(self) -> str:
+        return path.join(get_cache_dir(), f"{self.name}-{self.cache_key}.pkl")
+
+    def compile(self) -> Matcher | PhraseMatcher:
+        """
+        Compile the matcher, or load it from the cache if it was compiled from the same patterns before.
+        """
+
+        with self.__lock:
+            if self.__matcher is None:
+                cache_path = self.cache_path
+                matcher = self.__load(cache_path=cache_path)
+                if matcher is None:
+                    matcher = self.__build()
+                    self.__save(matcher=matcher, cache_path=cache_path)
+                self.__matcher = matcher
+
+            return self.__matcher
+
+    def __build(self) -> Matcher | PhraseMatcher:
+        if self.attr is None:
+            matcher = Matcher(nlp.vocab)
+            for key, patterns in self.__patterns:
+                matcher.add(key, patterns)
+            return matcher
+
+        matcher = PhraseMatcher(nlp.vocab, attr=self.attr)
+        for key, surface_forms in self.__patterns:
+            matcher.add(key, list(nlp.pipe(surface_forms)))
+        return matcher
+
+    def __load(self, cache_path: str) -> Matcher | PhraseMatcher | None:
+        if not path.exists(cache_path):
+            return None
+
+        try:
+            with open(cache_path, "rb") as f:
+                return _VocabUnpickler(f).load()
+        except Exception as e:
+            logging.getLogger().warning(f"Failed to load cached matcher {cache_path}, compiling it instead: {e}")
+            return None
+
+    def __save(self, matcher: Matcher | PhraseMatcher, cache_path: str) -> None:
+        cache_dir = path.dirname(cache_path)
+
+        try:
+            makedirs(cache_dir, exist_ok=True)
+            with NamedTemporaryFile(dir=cache_dir, suffix=".tmp", delete=False) as f:
+                self.__dump(matcher=matcher, f=f)
+            # * Replace atomically, as several worker processes may compile the same matcher at once
+            replace(f.name, cache_path)
+
+            for stale_path in glob(path.join(cache_dir, f"{self.name}-*.pkl")):
+                if stale_path != cache_path:
+                    remove(stale_path)
+        except OSError as e:
+            logging.getLogger().warning(f"Failed to cache matcher {self.name}: {e}")
+
+    @staticmethod
+    def __dump(matcher: Matcher | PhraseMatcher, f: BinaryIO) -> None:
+        if isinstance(matcher, PhraseMatcher):
+            _VocabPickler(f).dump(matcher)
+            return
+
+        # * The patterns were validated when they were compiled, so the cached Matcher skips validation when loaded
+        matcher.validate = False
+        try:
+            _VocabPickler(f).dump(matcher)
+        finally:
+            matcher.validate = True
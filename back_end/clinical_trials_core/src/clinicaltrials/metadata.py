@@ -0,0 +1,129 @@
+"""
+metadata.py
+
+Static description of what each processor predicts and how the front end presents it. Declared apart from the processors
+so that it can be read without importing them (see `clinicaltrials.registry`).
+"""
+
+from dataclasses import asdict, dataclass, field
+from typing import Literal
+
+
+@dataclass
+class MetadataOption:
+    label: str
+    value: str | int
+
+
+@dataclass
+class Metadata:
+    id: str
+    name: str
+    feature_type: Literal[
+        "text",
+        "yesno",
+        "categorical",
+        "numeric",
+        "multiple_numeric",
+        "multi_label",
+        "key_value_list",
+        "numeric_range"
+    ]
+    options: list[MetadataOption] | list[dict[str, str]] = field(default_factory=list)
+    default_weights: dict[str, float] = field(default_factory=dict)
+
+    required_condition: str | None = field(default=None)  # The condition specific for this module
+    is_tertile: bool = field(default=False)  # If True, the tertile nodes will be created for the module
+    has_multiple_predictions: bool = field(default=False)  # If True, the prediction from the module is expected to be a dictionary with multiple prediction values
+
+    def __post_init__(self):
+        # * Ensure "cost" and "risk" are in default_weights with default values if not provided
+        self.default_weights.setdefault("cost", 0.0)
+        self.default_weights.setdefault("risk", 0.0)
+
+        self.validate()
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def get_description(self, selected_value):
+        if self.id == "gender":
+            genders = [x for x in self.options if x.value == selected_value]
+            if len(genders) > 0:
+                return genders[0].label
+            else:
+                return selected_value
+        if self.feature_type in ["numeric", "yesno"] or self.id == "phase":
+            return self.name
+        if self.feature_type == "multi_label":
+            if isinstance(selected_value, list) and selected_value:
+                return ", ".join(str(value) for value in selected_value)
+            return "_"
+        if isinstance(selected_value, list):
+            return ", ".join(str(value) for value in selected_value)
+        return str(selected_value) if selected_value is not None else "_"
+
+    def get_value(self, selected_value, prediction):
+        if self.id != "phase" and self.feature_type in ["categorical", "multi_label", "numeric_range"]:
+            if selected_value or isinstance(selected_value, list):
+                return 1
+            return 0
+        if self.feature_type == "yesno":
+            if selected_value in ["yes", "no"]:
+                return 1 if selected_value == "yes" else 0
+
+        if selected_value:
+            return selected_value
+        return prediction
+
+    def validate(self):
+        """
+        Validate the options based on the feature_type.
+
+        Raises:
+            ValueError: If feature_type is 'key_value_list' and any option is not a dictionary.
+            ValueError: If feature_type is not 'key_value_list' and any option is not an instance of MetadataOption.
+
+        Examples:
+            >>> # Valid example for feature_type 'key_value_list'
+            >>> metadata = Metadata(
+            >>>     id="123",
+            >>>     name="Example Metadata",
+            >>>     feature_type="key_value_list",
+            >>>     options=[{"key1": "value1"}, {"key2": "value2"}]
+            >>> )
+            >>> metadata.validate()  # Should pass without error
+
+            >>> # Invalid example for feature_type 'key_value_list'
+            >>> metadata = Metadata(
+            >>>     id="123",
+            >>>     name="Example Metadata",
+            >>>     feature_type="key_value_list",
+            >>>     options=[MetadataOption(label="Option1", value="Value1")]
+            >>> )
+            >>> metadata.validate()  # Should raise ValueError
+
+            >>> # Valid example for feature_type 'categorical'
+            >>> metadata = Metadata(
+            >>>     id="123",
+            >>>     name="Example Metadata",
+            >>>     feature_type="categorical",
+            >>>     options=[MetadataOption(label="Option1", value="Value1")]
+            >>> )
+            >>> metadata.validate()  # Should pass without error
+
+            >>> # Invalid example for feature_type 'categorical'
+            >>> metadata = Metadata(
+            >>>     id="123",
+            >>>     name="Example Metadata",
+            >>>     feature_type="categorical",
+            >>>     options=[{"key1": "value1"}, {"key2": "value2"}]
+            >>> )
+            >>> metadata.validate()  # Should raise ValueError
+        """
+        if self.feature_type == "key_value_list":
+            if not all(isinstance(option, dict) for option in self.options):
+                raise ValueError("All options must be dictionaries for key_value_list feature type")
+        else:
+            if not all(isinstance(option, MetadataOption) for option in self.options):
+                raise ValueError(f"All options must be MetadataOption instances for {self.feature_type} feature type")
@@ -1,67 +1,333 @@
 import bz2
 import logging
+import sys
 import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from importlib import import_module
+from os import path, scandir
 from pickle import load as pickle_load
-from typing import Any, cast
+from typing import TYPE_CHECKING, Any, Callable, cast
 
-from clinicaltrials.core import __get_logger
-from clinicaltrials.country.country_ensemble_extractor import CountryEnsembleExtractor
-from clinicaltrials.country.country_group_extractor import CountryGroupExtractor
-from clinicaltrials.country.international_extractor_naive_bayes import InternationalExtractorNaiveBayes
-from clinicaltrials.country.international_extractor_spacy import InternationalExtractorSpacy
+import numpy as np
+from scipy.sparse import issparse
+from spacy.language import Language
 
-country_group_extractor = None
-international_extractor = None
-international_extractor_nb = None
-country_ensemble_extractor = None
-age_model: Any | None = None
+from clinicaltrials import core
+from clinicaltrials.core import ClassifierConfig, __get_logger
+from clinicaltrials.utils import get_default_classifier_storage_path
 
-_model_load_lock = threading.Lock()
+if TYPE_CHECKING:
+    from clinicaltrials.country.country_ensemble_extractor import CountryEnsembleExtractor
+    from clinicaltrials.country.country_group_extractor import CountryGroupExtractor
+    from clinicaltrials.country.international_extractor_naive_bayes import InternationalExtractorNaiveBayes
+    from clinicaltrials.country.international_extractor_spacy import InternationalExtractorSpacy
+
+_model_load_lock = threading.RLock()
+_download_lock = threading.Lock()
 logger = __get_logger(log_level=logging.DEBUG)
 
 
+def load_pickle(path_to_classifier: str) -> Any:
+    with bz2.open(path_to_classifier, "rb") as f:
+        return pickle_load(f)
+
+
+def load_extractor(module_name: str, class_name: str) -> Callable[[str], Any]:
+    """
+    Loader of a model wrapped in an extractor class. The module of the extractor is only imported when the model is
+    loaded, so that importing the store does not import every extractor and its dependencies.
+    """
+
+    def load(path_to_classifier: str) -> Any:
+        return getattr(import_module(module_name), class_name)(path_to_classifier)
+
+    return load
+
+
+@dataclass(frozen=True)
+class ModelDefinition:
+    """
+    Where a model lives and how to load it.
+    `classifier_key` is the CLASSIFIER_BIN entry the file is downloaded with, `file_name` is relative to the classifier storage path.
+    """
+
+    classifier_key: str
+    file_name: str
+    loader: Callable[[str], Any] = load_pickle
+
+
+MODEL_DEFINITIONS: dict[str, ModelDefinition] = {
+    "condition": ModelDefinition(classifier_key="condition", file_name="condition_classifier.pkl.bz2"),
+    "vaccine": ModelDefinition(classifier_key="vaccine", file_name="vaccine_classifier.pkl.bz2"),
+    "intervention_type": ModelDefinition(classifier_key="intervention_type", file_name="intervention_classifier.pkl.bz2"),
+    "effect_estimate": ModelDefinition(classifier_key="effect_estimate", file_name="effect_estimate_classifier.pkl.bz2"),
+    "simulation": ModelDefinition(classifier_key="simulation", file_name="simulation_classifier.pkl.bz2"),
+    "sample_size": ModelDefinition(classifier_key="sample_size", file_name="num_subjects_classifier.pkl.bz2"),
+    "healthy": ModelDefinition(classifier_key="healthy", file_name="healthy_classifier.pkl.bz2"),
+    "gender": ModelDefinition(classifier_key="gender", file_name="gender_classifier.pkl.bz2"),
+    "age": ModelDefinition(classifier_key="age", file_name="age_classifier.pkl.bz2"),
+    "child": ModelDefinition(classifier_key="child", file_name="child_classifier.pkl.bz2"),
+    "placebo": ModelDefinition(classifier_key="placebo", file_name="placebo_classifier.pkl.bz2"),
+    "drug": ModelDefinition(classifier_key="drug", file_name="drug_classifier.pkl.bz2"),
+    "duration": ModelDefinition(classifier_key="duration", file_name="duration_nb_classifier.pkl.bz2"),
+    "idfs_wordcloud": ModelDefinition(classifier_key="idfs_wordcloud", file_name="idfs_for_word_cloud.pkl.bz2"),
+    # * Contents of phase.zip
+    "phase_rule_based": ModelDefinition(
+        classifier_key="phase", file_name="phase_rf_classifier.pkl.bz2", loader=load_extractor("clinicaltrials.phase.phase_extractor_rule_based", "PhaseExtractorRuleBased")
+    ),
+    "phase_spacy": ModelDefinition(
+        classifier_key="phase", file_name="spacy-textcat-phase-04-model-best", loader=load_extractor("clinicaltrials.phase.phase_extractor_spacy", "PhaseExtractorSpacy")
+    ),
+    # * Contents of sap.zip
+    "sap": ModelDefinition(classifier_key="sap", file_name="sap_classifier.pkl.bz2", loader=load_extractor("clinicaltrials.sap.sap_extractor", "SapExtractor")),
+    "sap_document_level": ModelDefinition(
+        classifier_key="sap",
+        file_name="sap_classifier_document_level.pkl.bz2",
+        loader=load_extractor("clinicaltrials.sap.sap_extractor_document_level_naive_bayes", "SapExtractorDocumentLevel"),
+    ),
+    # * Contents of arms.zip
+    "num_arms_nb": ModelDefinition(
+        classifier_key="num_arms",
+        file_name="arms_classifier_document_level.pkl.bz2",
+        loader=load_extractor("clinicaltrials.num_arms.num_arms_extractor_naive_bayes", "NumArmsExtractorNaiveBayes"),
+    ),
+    "num_arms_spacy": ModelDefinition(
+        classifier_key="num_arms", file_name="spacy-textcat-arms-21-model-best", loader=load_extractor("clinicaltrials.num_arms.num_arms_extractor_spacy", "NumArmsExtractorSpacy")
+    ),
+    # * Contents of country.zip
+    "country_group": ModelDefinition(
+        classifier_key="country", file_name="spacy-textcat-country-16-model-best", loader=load_extractor("clinicaltrials.country.country_group_extractor", "CountryGroupExtractor")
+    ),
+    "international": ModelDefinition(
+        classifier_key="country",
+        file_name="spacy-textcat-international-11-model-best",
+        loader=load_extractor("clinicaltrials.country.international_extractor_spacy", "InternationalExtractorSpacy"),
+    ),
+    "international_nb": ModelDefinition(
+        classifier_key="country",
+        file_name="international_classifier.pkl.bz2",
+        loader=load_extractor("clinicaltrials.country.international_extractor_naive_bayes", "InternationalExtractorNaiveBayes"),
+    ),
+    "country_ensemble": ModelDefinition(
+        classifier_key="country", file_name="country_ensemble_model.pkl.bz2", loader=load_extractor("clinicaltrials.country.country_ensemble_extractor", "CountryEnsembleExtractor")
+    ),
+}
+
+# * Loaded models in least recently used order, with their estimated resident size in bytes
+_models: OrderedDict[str, Any] = OrderedDict()
+_model_sizes: dict[str, int] = {}
+_model_locks: dict[str, threading.Lock] = {name: threading.Lock() for name in MODEL_DEFINITIONS}
+
+# * Set by initialize_models, used when a model is requested without a config
+_storage_path: str | None = None
+_memory_budget: int | None = None
+
+
 @dataclass(frozen=True)
 class ClinicalModel:
     """
     Dataclass representing clinical trial models with lazy loading
     """
 
-    country_group_extractor: CountryGroupExtractor
-    international_extractor: InternationalExtractorSpacy
-    international_extractor_nb: InternationalExtractorNaiveBayes
-    country_ensemble_extractor: CountryEnsembleExtractor
+    country_group_extractor: "CountryGroupExtractor"
+    international_extractor: "InternationalExtractorSpacy"
+    international_extractor_nb: "InternationalExtractorNaiveBayes"
+    country_ensemble_extractor: "CountryEnsembleExtractor"
     age_model: Any
 
 
-def initialize_models(path_to_classifier: str) -> None:
+def _get_disk_size(file_path: str) -> int:
+    if path.isfile(file_path):
+        return path.getsize(file_path)
+
+    total = 0
+    if path.isdir(file_path):
+        for entry in scandir(file_path):
+            total += entry.stat().st_size if entry.is_file() else _get_disk_size(entry.path)
+
+    return total
+
+
+def _get_object_size(obj: Any, seen: dict[int, Any]) -> int:
     """
-    Loads the models if they are not already loaded
-    This function is idempotent: calling it multiple times
-    will load the models only once.
+    Approximate deep size of an object graph. spaCy pipelines are skipped, they are accounted for by the size of
+    their model directory instead. `seen` keeps a reference to every visited object, so that the ids of temporary
+    objects such as pickled states are not reused while walking.
     """
-    logger.info(f"Initializing models from disk @ {path_to_classifier}...")
 
-    global country_group_extractor, international_extractor, international_extractor_nb, country_ensemble_extractor, age_model
+    if id(obj) in seen or isinstance(obj, (type, Language)) or callable(obj) and not hasattr(obj, "__dict__"):
+        return 0
+    seen[id(obj)] = obj
+
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes + sys.getsizeof(obj)
+    if issparse(obj):
+        return sum(getattr(obj, attr).nbytes for attr in ("data", "indices", "indptr") if hasattr(obj, attr))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_get_object_size(key, seen) + _get_object_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_get_object_size(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += _get_object_size(vars(obj), seen)
+    else:
+        # * Extension types such as the sklearn tree keep their arrays in the pickled state
+        try:
+            state = obj.__getstate__()
+        except Exception:
+            state = None
+        if isinstance(state, dict):
+            size += _get_object_size(state, seen)
+
+    return size
+
+
+def _resolve_model_path(name: str, config: ClassifierConfig | None) -> str:
+    """
+    Path of a model. An explicit `path_to_classifier` is either the model file itself or the directory that contains
+    it, otherwise the model is looked up in the classifier storage path and downloaded if it is not there yet.
+    """
+
+    definition = MODEL_DEFINITIONS[name]
+
+    if config and config.path_to_classifier:
+        if path.isdir(config.path_to_classifier):
+            return f"{config.path_to_classifier.rstrip('/')}/{definition.file_name}"
+        return config.path_to_classifier
+
+    storage_path = config.classifier_storage_path if config else _storage_path or get_default_classifier_storage_path()
+    model_path = f"{storage_path.rstrip('/')}/{definition.file_name}"
+
+    # * Models sharing an archive can be requested from several threads, download the archive only once
+    with _download_lock:
+        if not path.exists(model_path):
+            core.CoreUtil.sync_classifier_models(config=ClassifierConfig(path_to_classifier="", classifier_storage_path=storage_path), key=definition.classifier_key)
+
+    return model_path
+
+
+def _evict(keep: str) -> None:
+    """
+    Drop least recently used models until the loaded models fit into the memory budget. Must hold `_model_load_lock`.
+    """
 
-    if all(m is not None for m in [country_group_extractor, international_extractor, international_extractor_nb, country_ensemble_extractor, age_model]):
+    if _memory_budget is None:
         return
 
+    while sum(_model_sizes.values()) > _memory_budget and len(_models) > 1:
+        name = next(iter(_models))
+        if name == keep:
+            _models.move_to_end(name)
+            name = next(iter(_models))
+
+        del _models[name]
+        size = _model_sizes.pop(name)
+        logger.info(f"Evicted model {name} ({size / 1024 / 1024:.1f} MB) to stay within the memory budget")
+
+
+def get_model(name: str, config: ClassifierConfig | None = None) -> Any:
+    """
+    Get a model from the store, loading it on first use.
+
+    :param name: Key of MODEL_DEFINITIONS.
+    :param config: Optional classifier config, defaults to the path the store was initialised with.
+    :return: The loaded model.
+    """
+
+    if name not in MODEL_DEFINITIONS:
+        raise KeyError(f"Unknown model {name}")
+
+    with _model_load_lock:
+        if name in _models:
+            _models.move_to_end(name)
+            return _models[name]
+
+    # * Load outside of the registry lock so that different models can load in parallel
+    with _model_locks[name]:
+        with _model_load_lock:
+            if name in _models:
+                _models.move_to_end(name)
+                return _models[name]
+
+        model_path = _resolve_model_path(name=name, config=config)
+        logger.info(f"Loading model {name} from {model_path}")
+        model = MODEL_DEFINITIONS[name].loader(model_path)
+
+        size = _get_object_size(model, {})
+        if path.isdir(model_path):
+            size += _get_disk_size(model_path)
+
+        with _model_load_lock:
+            _models[name] = model
+            _model_sizes[name] = size
+            _evict(keep=name)
+
+        logger.info(f"Loaded model {name} ({size / 1024 / 1024:.1f} MB)")
+
+    return model
+
+
+def get_model_sizes() -> dict[str, int]:
+    """
+    Estimated resident size in bytes of every loaded model.
+    """
+
     with _model_load_lock:
-        if all(m is not None for m in [country_group_extractor, international_extractor, international_extractor_nb, country_ensemble_extractor, age_model]):
-            return
+        return dict(_model_sizes)
+
+
+def set_memory_budget(memory_budget: int | None) -> None:
+    """
+    Set the memory budget in bytes for the loaded models. When the loaded models exceed it, the least recently used
+    models are evicted and loaded again the next time they are needed. `None` disables eviction.
+    """
+
+    global _memory_budget
+
+    with _model_load_lock:
+        _memory_budget = memory_budget
+        if _models:
+            _evict(keep=next(reversed(_models)))
+
+
+def unload_models() -> None:
+    with _model_load_lock:
+        _models.clear()
+        _model_sizes.clear()
+
+
+def initialize_models(path_to_classifier: str, model_names: list[str] | None = None, max_workers: int | None = None) -> None:
+    """
+    Loads the models if they are not already loaded
+    This function is idempotent: calling it multiple times
+    will load the models only once.
+
+    :param path_to_classifier: Classifier storage path.
+    :param model_names: Models to load, defaults to all of MODEL_DEFINITIONS.
+    :param max_workers: Number of threads used to load the models in parallel.
+    """
+    global _storage_path
+
+    logger.info(f"Initializing models from disk @ {path_to_classifier}...")
+
+    _storage_path = path_to_classifier
+    config = ClassifierConfig(path_to_classifier="", classifier_storage_path=path_to_classifier)
 
-        logger.info(f"Initializing models from {path_to_classifier}")
+    names = model_names if model_names is not None else list(MODEL_DEFINITIONS.keys())
 
-        country_group_extractor = CountryGroupExtractor(f"{path_to_classifier}/spacy-textcat-country-16-model-best")
-        international_extractor = InternationalExtractorSpacy(f"{path_to_classifier}/spacy-textcat-international-11-model-best")
-        international_extractor_nb = InternationalExtractorNaiveBayes(f"{path_to_classifier}/international_classifier.pkl.bz2")
-        country_ensemble_extractor = CountryEnsembleExtractor(f"{path_to_classifier}/country_ensemble_model.pkl.bz2")
+    # * Download each archive once before the parallel load, so that models sharing a zip don't download it twice
+    for classifier_key in dict.fromkeys(MODEL_DEFINITIONS[name].classifier_key for name in names):
+        file_names = [MODEL_DEFINITIONS[name].file_name for name in names if MODEL_DEFINITIONS[name].classifier_key == classifier_key]
+        if not all(path.exists(f"{path_to_classifier.rstrip('/')}/{file_name}") for file_name in file_names):
+            core.CoreUtil.sync_classifier_models(config=config, key=classifier_key)
 
-        with bz2.open(f"{path_to_classifier}/age_classifier.pkl.bz2", "rb") as f:
-            age_model = pickle_load(f)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(lambda name: get_model(name=name, config=config), names))
 
-        logger.info("All models initialized successfully")
+    logger.info(f"All models initialized successfully, {sum(get_model_sizes().values()) / 1024 / 1024:.1f} MB resident")
 
 
 def get_models() -> ClinicalModel:
@@ -69,13 +335,13 @@ def get_models() -> ClinicalModel:
     Returns initialized models as a dataclass instance
     Uses cast with string type references to avoid imports
     """
-    if any(m is None for m in [country_group_extractor, international_extractor, international_extractor_nb, country_ensemble_extractor, age_model]):
+    if _storage_path is None:
         raise ValueError("Models not initialized. Call initialize_models() first.")
 
     return ClinicalModel(
-        country_group_extractor=cast(CountryGroupExtractor, country_group_extractor),
-        international_extractor=cast(InternationalExtractorSpacy, international_extractor),
-        international_extractor_nb=cast(InternationalExtractorNaiveBayes, international_extractor_nb),
-        country_ensemble_extractor=cast(CountryEnsembleExtractor, country_ensemble_extractor),
-        age_model=age_model,
+        country_group_extractor=cast("CountryGroupExtractor", get_model("country_group")),
+        international_extractor=cast("InternationalExtractorSpacy", get_model("international")),
+        international_extractor_nb=cast("InternationalExtractorNaiveBayes", get_model("international_nb")),
+        country_ensemble_extractor=cast("CountryEnsembleExtractor", get_model("country_ensemble")),
+        age_model=get_model("age"),
     )
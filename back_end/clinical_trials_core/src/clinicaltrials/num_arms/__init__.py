@@ -2,43 +2,40 @@ import json
 import re
 import traceback
 
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, Page
+from clinicaltrials import model_store
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
+from clinicaltrials.document_context import TokenisationMode
 from clinicaltrials.logs_collector import LogsCollector
 from clinicaltrials.num_arms.num_arms_extractor import NumArmsExtractor
-from clinicaltrials.num_arms.num_arms_extractor_naive_bayes import NumArmsExtractorNaiveBayes
-from clinicaltrials.num_arms.num_arms_extractor_spacy import NumArmsExtractorSpacy
-from clinicaltrials.resources import nlp
 
 
 class NumArms(BaseProcessor):
+    is_high_value = True
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-        self.num_arms_extractor_nb = None
-        self.num_arms_extractor_spacy = None
-        self.num_arms_extractor = None
+        # * The classifiers were trained on the unnormalised page tokenisation
+        self.tokenisation: TokenisationMode = "compatible"
+
+        self.num_arms_extractor = NumArmsExtractor()
 
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(id="num_arms", name="Number of investigational arms in the trial", feature_type="numeric",
-                        default_weights={"cost": 0.0, "risk": 2.0})
+    def load_models(self, config: ClassifierConfig | None = None) -> None:
+        for model_name in ("num_arms_nb", "num_arms_spacy"):
+            model_store.get_model(model_name, config=config or self.config)
 
     def process(self, document: Document, config: ClassifierConfig | None = None):
         logs_collector = LogsCollector()
-        config = self.get_classifier_config_or_default(config=config)
-        path_to_classifier = config.path_to_classifier
-
-        if not self.num_arms_extractor_nb:
-            self.num_arms_extractor_nb = NumArmsExtractorNaiveBayes(
-                f"{path_to_classifier}/arms_classifier_document_level.pkl.bz2")
-            self.num_arms_extractor_spacy = NumArmsExtractorSpacy(
-                f"{path_to_classifier}/spacy-textcat-arms-21-model-best")
-            self.num_arms_extractor = NumArmsExtractor()
+        num_arms_extractor_nb = model_store.get_model("num_arms_nb", config=config or self.config)
+        num_arms_extractor_spacy = model_store.get_model("num_arms_spacy", config=config or self.config)
 
-        tokenised_pages = [list(nlp(page.content)) for page in document.pages]
+        tokenised_pages = document.context.get_docs(tokenisation=self.tokenisation)
+        token_arrays = document.context.get_token_arrays(tokenisation=self.tokenisation)
 
         try:
-            num_arms_to_pages_nb = self.num_arms_extractor_nb.process(tokenised_pages)
+            num_arms_to_pages_nb = num_arms_extractor_nb.process(
+                tokenised_pages, token_arrays, document.context.get_token_index(attribute="lower", tokenisation=self.tokenisation)
+            )
             logs_collector.add(f"Naive Bayes arms prediction probabilities: {num_arms_to_pages_nb['proba']}.")
         except:
             logs_collector.add("Error extracting number of arms!")
@@ -46,7 +43,9 @@ class NumArms(BaseProcessor):
             print(traceback.format_exc())
 
         try:
-            num_arms_to_pages_spacy = self.num_arms_extractor_spacy.process(tokenised_pages)
+            num_arms_to_pages_spacy = num_arms_extractor_spacy.process(
+                tokenised_pages, token_arrays, document.context.get_token_index(attribute="norm", tokenisation=self.tokenisation)
+            )
             logs_collector.add(f"Spacy arms prediction probabilities: {num_arms_to_pages_spacy['proba']}.")
         except:
             logs_collector.add("Error extracting number of arms!")
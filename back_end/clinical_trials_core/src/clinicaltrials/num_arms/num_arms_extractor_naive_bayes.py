@@ -5,6 +5,9 @@ from os.path import exists
 
 import numpy as np
 
+from clinicaltrials.resources import nlp
+from clinicaltrials.token_features import TokenArrays, TokenIndex
+
 is_number_regex = re.compile(r"^\d+$")
 
 
@@ -27,11 +30,13 @@ class NumArmsExtractorNaiveBayes:
 
         self.vocabulary = {v: k for k, v in self.vectoriser.vocabulary_.items()}
 
-    def process(self, tokenised_pages: list) -> tuple:
+    def process(self, tokenised_pages: list, token_arrays: TokenArrays, token_index: TokenIndex) -> tuple:
         """
         Identify whether the trial takes place in multiple countries.
 
         :param tokenised_pages: List of lists of tokens of each page.
+        :param token_arrays: Token arrays of the same tokenisation as `tokenised_pages`.
+        :param token_index: Index of the lowercase tokens of the same tokenisation as `tokenised_pages`.
         :return: The prediction (str) and a map from condition to the pages it's mentioned in.
         """
         if self.model is None:
@@ -81,10 +86,8 @@ class NumArmsExtractorNaiveBayes:
             if len(informative_terms) > 50:
                 break
 
-        for page_no, tokens in enumerate(tokenised_pages):
-            for token in tokens:
-                if token.text.lower() in arms_to_pages:
-                    arms_to_pages[token.text.lower()].append(page_no)
+        for token_idx in token_index.find(list(arms_to_pages)):
+            arms_to_pages[nlp.vocab.strings[int(token_arrays.lower[token_idx])]].append(int(token_arrays.page[token_idx]))
 
         # Remove any stopwords which accidentally got in there.
         for w in ["to"]:
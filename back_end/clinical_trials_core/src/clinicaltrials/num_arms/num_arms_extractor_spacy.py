@@ -1,4 +1,11 @@
 import re
+from os.path import exists
+
+import numpy as np
+import spacy
+
+from clinicaltrials.textcat import predict_cats
+from clinicaltrials.token_features import TokenArrays, TokenIndex
 
 word2num = {"one": 1,
             "two": 2,
@@ -49,10 +56,6 @@ ALL_INTERESTING_TERMS = INTERESTING_TERMS_ANY_CONTEXT.union(INTERESTING_TERMS_MU
 ARM_TERMS = {"arm", "armed",
              "arms", "cohort", "cohorts", "group", "groups"}
 
-from os.path import exists
-
-import spacy
-
 
 # Current best model: Expt21
 class NumArmsExtractorSpacy:
@@ -65,11 +68,13 @@ class NumArmsExtractorSpacy:
             return
         self.nlp = spacy.load(path_to_classifier)
 
-    def process(self, tokenised_pages: list) -> tuple:
+    def process(self, tokenised_pages: list, token_arrays: TokenArrays, token_index: TokenIndex) -> tuple:
         """
         Identify number of arms in the trial.
 
         :param tokenised_pages: List of lists of tokens of each page.
+        :param token_arrays: Token arrays of the same tokenisation as `tokenised_pages`.
+        :param token_index: Index of the norms of the tokens of the same tokenisation as `tokenised_pages`.
         :return: The prediction (str) and a map from arms to the pages it's mentioned in.
         """
         if self.nlp is None:
@@ -78,47 +83,45 @@ class NumArmsExtractorSpacy:
 
         num_arms_to_pages = {}
         text = ""
+        is_include = [np.zeros(len(tokens), dtype=bool) for tokens in tokenised_pages]
+        for position in token_index.find(ALL_INTERESTING_TERMS):
+            page_no = int(token_arrays.page[position])
+            tokens = tokenised_pages[page_no]
+            idx = int(position - token_arrays.page_offsets[page_no])
+            lc_tok = tokens[idx].norm_
+            next_tok = None
+            if idx < len(tokens) - 1:
+                next_tok = tokens[idx + 1]
+            prev_tok = None
+            if idx > 0:
+                prev_tok = tokens[idx - 1]
+            antepenultimate_tok = None
+            if idx > 1:
+                antepenultimate_tok = tokens[idx - 2]
+
+            if lc_tok in ARM_TERMS:
+                if lc_tok not in num_arms_to_pages:
+                    num_arms_to_pages[lc_tok] = []
+                num_arms_to_pages[lc_tok].append(page_no)
+
+            to_include = True
+            # Override the "interesting terms" list by using some context dependent information.
+            if lc_tok == "n" and next_tok is not None and next_tok not in {"=", ">", "<", "≥"}:
+                to_include = False
+            if idx > 1 and lc_tok in INTERESTING_TERMS_MUST_BE_PRECEDED_BY_NUMBER and not (
+                    is_number.match(prev_tok.text) or is_number.match(
+                antepenultimate_tok.text) or prev_tok.norm in word2num or antepenultimate_tok.norm in word2num):
+                to_include = False
+
+            if to_include:
+                is_include[page_no][max(idx - 15, 0):idx + 15] = True
+
         for page_no, tokens in enumerate(tokenised_pages):
-            is_include = [False] * len(tokens)
-            for idx, tok in enumerate(tokens):
-                lc_tok = tok.norm_
-                next_tok = None
-                if idx < len(tokens) - 1:
-                    next_tok = tokens[idx + 1]
-                prev_tok = None
-                if idx > 0:
-                    prev_tok = tokens[idx - 1]
-                antepenultimate_tok = None
-                if idx > 1:
-                    antepenultimate_tok = tokens[idx - 2]
-
-                if lc_tok in ALL_INTERESTING_TERMS:
-                    if lc_tok in ARM_TERMS:
-                        if lc_tok not in num_arms_to_pages:
-                            num_arms_to_pages[lc_tok] = []
-                        num_arms_to_pages[lc_tok].append(page_no)
-
-                    to_include = True
-                    # Override the "interesting terms" list by using some context dependent information.
-                    if lc_tok == "n" and next_tok is not None and next_tok not in {"=", ">", "<", "≥"}:
-                        to_include = False
-                    if idx > 1 and lc_tok in INTERESTING_TERMS_MUST_BE_PRECEDED_BY_NUMBER and not (
-                            is_number.match(prev_tok.text) or is_number.match(
-                        antepenultimate_tok.text) or prev_tok.norm in word2num or antepenultimate_tok.norm in word2num):
-                        to_include = False
-
-                    if to_include:
-                        for token_index in range(idx - 15, idx + 15):
-                            if token_index >= 0 and token_index < len(tokens):
-                                is_include[token_index] = True
-
-            for idx, tok in enumerate(tokens):
-                if is_include[idx]:
-                    text += tok.text + " "
-
-        doc = self.nlp(text)
-
-        prediction_proba = dict(doc.cats)
+            for idx in np.flatnonzero(is_include[page_no]):
+                text += tokens[idx].text + " "
+
+        # * The text is tokenised by the classifier, as the tokens joined by spaces do not always tokenise as they were
+        prediction_proba = predict_cats(nlp=self.nlp, docs=[self.nlp.make_doc(text)])[0]
 
         prediction = max(prediction_proba, key=prediction_proba.get)
 
@@ -1,25 +1,24 @@
 import json
 from collections import Counter
 
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, Page
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
+from clinicaltrials.products import get_product
 
 
 class NumInterventionsPerVisit(BaseProcessor):
+    requires = ("table_cells",)
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(id="num_interventions_per_visit", name="Number of interventions or investigations per visit, according to the Schedule of Events", feature_type="numeric", )
-
     def process(self, document: Document, config: ClassifierConfig | None = None):
         num_interventions_per_visit = 0
         occurrence_to_pages = {}
-        for page_no, page in enumerate(document.pages):
-            if len(page.tables) > 0:
+        for page_no, tables in enumerate(get_product(document=document, name="table_cells")):
+            if len(tables) > 0:
                 ctr_total = Counter()
                 col_counters = {}
-                for table in page.tables:
+                for table in tables:
                     for row in table:
                         for col_idx, cell in enumerate(row):
                             if col_idx not in col_counters:
@@ -27,8 +26,6 @@ class NumInterventionsPerVisit(BaseProcessor):
                             col_counter = col_counters[col_idx]
                             if cell is None:
                                 continue
-                            if cell.upper().startswith("X") or cell.startswith("✓") or cell.startswith("×"):
-                                cell = "X"
                             ctr_total[cell] += 1
                             col_counter[cell] += 1
                             if col_counter["X"] > 0:
@@ -1,33 +1,27 @@
 import json
 from collections import Counter
 
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, MetadataOption, Page
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
+from clinicaltrials.products import get_product
 
 
 class NumInterventionsTotal(BaseProcessor):
+    requires = ("table_cells",)
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(id="num_interventions_total", name="Number of interventions or investigations for each subject, according to the Schedule of Events", feature_type="numeric",
-                        default_weights={"cost":62.6,"risk":0.0})
-
-
-
     def process(self, document: Document, config: ClassifierConfig | None = None):
         num_interventions_all_visits = 0
         occurrence_to_pages = {}
-        for page_no, page in enumerate(document.pages):
-            if len(page.tables) > 0:
+        for page_no, tables in enumerate(get_product(document=document, name="table_cells")):
+            if len(tables) > 0:
                 ctr_total = Counter()
-                for table in page.tables:
+                for table in tables:
                     for row in table:
                         for col_idx, cell in enumerate(row):
                             if cell is None:
                                 continue
-                            if cell.upper().startswith("X") or cell.startswith("✓") or cell.startswith("×"):
-                                cell = "X"
                             ctr_total[cell] += 1
 
                             match_text_norm = "Schedule of events"
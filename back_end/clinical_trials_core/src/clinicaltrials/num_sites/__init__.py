@@ -2,9 +2,10 @@ import json
 import re
 
 import numpy as np
-from spacy.matcher import Matcher
 
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, Page
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
+from clinicaltrials.match_engine import match_engine
+from clinicaltrials.numeric_mentions import SMALL_NUMBER_VOCABULARY
 from clinicaltrials.resources import nlp
 
 patterns = dict()
@@ -56,8 +57,6 @@ patterns["phone"] = []
 for phone in ["phone", "telephone", "tel", "contact number"]:
     patterns["phone"].extend([f"{phone} #", f"{phone}: #", f"{phone} +#", f"{phone}: +#"])
 
-matcher = Matcher(nlp.vocab)
-
 for feature_name, feature_patterns in patterns.items():
     subpatterns = []
     for feature_pattern in feature_patterns:
@@ -82,41 +81,14 @@ for feature_name, feature_patterns in patterns.items():
                 else:
                     pattern.append({"LOWER": word})
             subpatterns.append(pattern)
-    matcher.add(feature_name, subpatterns)
-
-word2num = {"one": 1,
-            "two": 2,
-            "three": 3,
-            "four": 4,
-            "five": 5,
-            "six": 6,
-            "seven": 7,
-            "eight": 8,
-            "nine": 9,
-            "ten": 10,
-            "eleven": 11,
-            "twelve": 12,
-            "thirteen": 13,
-            "fourteen": 14,
-            "fifteen": 15,
-            "sixteen": 16,
-            "seventeen": 17,
-            "eighteen": 18,
-            "nineteen": 19,
-            "both": 2,
-            "single": 2}
-
-re_num = re.compile(r"^\d+$")
-
+    match_engine.add_token_patterns(namespace="num_sites", label=feature_name, patterns=subpatterns)
 
 class NumSites(BaseProcessor):
+    requires = ("page_matches",)
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(id="num_sites", name="Number of investigational sites in the trial", feature_type="numeric", is_tertile=True)
-
     def process(self, document: Document, config: ClassifierConfig | None = None):
         candidates = []  # will be a list of tuples containing data: cohort value, is explicitly mentioning cohort size, distance to mention of cohort
         num_mentions_multi_site = 0
@@ -125,9 +97,13 @@ class NumSites(BaseProcessor):
         annotations = []
         occurrence_to_pages = {}
 
+        page_matches = match_engine.get_matches(document=document, namespace="num_sites")
+
+        numeric_mentions = document.context.numeric_mentions
         for page_no, doc in enumerate(document.tokenised_pages):
+            document.raise_if_cancelled()
 
-            matches = matcher(doc)
+            matches = list(page_matches[page_no])
 
             if "single-site trial" in doc.text:
                 print(1)
@@ -161,11 +137,9 @@ class NumSites(BaseProcessor):
                 candidate_value_numeric = None
 
                 for i in range(phrase_match[1], phrase_match[2]):
-                    if doc[i].like_num:
-                        if doc[i].norm_ in word2num:
-                            candidate_value_numeric = word2num[doc[i].norm_]
-                        elif re_num.match(doc[i].norm_):
-                            candidate_value_numeric = int(doc[i].text)
+                    token_value = numeric_mentions.get_value(page_no=page_no, token_no=i, vocabulary=SMALL_NUMBER_VOCABULARY)
+                    if token_value is not None:
+                        candidate_value_numeric = token_value
 
                 if not candidate_value_numeric:
                     continue
@@ -1,30 +1,25 @@
 import json
 
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, Page
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
+from clinicaltrials.products import get_product
 
 
 class NumVisits(BaseProcessor):
+    requires = ("table_cells",)
 
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(id="num_visits", name="Number of visits per subject", feature_type="numeric", is_tertile=True)
-
     def process(self, document: Document, config: ClassifierConfig | None = None):
         num_visits = 0
         occurrence_to_pages = {}
-        for page_no, page in enumerate(document.pages):
-            if len(page.tables) > 0:
-                for table in page.tables:
+        for page_no, tables in enumerate(get_product(document=document, name="table_cells")):
+            if len(tables) > 0:
+                for table in tables:
                     for row in table:
                         is_valid_row = 0
                         for cell in row:
-                            if cell is None:
-                                continue
-                            if cell.upper().startswith("X") or cell.startswith("✓") or cell.startswith("×"):
-                                cell = "X"
+                            if cell == "X":
                                 is_valid_row = 1
                         num_visits += is_valid_row
 
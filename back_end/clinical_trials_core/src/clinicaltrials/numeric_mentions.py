@@ -0,0 +1,227 @@
+"""
+numeric_mentions.py
+
+The numbers mentioned in a document, parsed once per document. Every token that is a plain integer ("12"), an integer
+with thousands separators ("1,200") or a number word ("twelve") gets its value, and ranges of two numbers ("10-20",
+"10 - 20", "10 to 20") are listed with their bounds. The processors that read numbers out of their matches, e.g. Age,
+Duration or SampleSize, look the values up here instead of parsing the tokens with their own regex and lookup table.
+A processor that has always read a narrower set of numbers, e.g. number words only up to nineteen, passes its own
+`NumberVocabulary`, whose values are computed once per document on first use.
+
+The values are computed per distinct string of the document rather than per token, so a long document costs little
+more than its vocabulary.
+
+Usage:
+    numeric_mentions = document.context.numeric_mentions
+    value = numeric_mentions.get_value(page_no=page_no, token_no=token_no)
+    small_value = numeric_mentions.get_value(page_no=page_no, token_no=token_no, vocabulary=SMALL_NUMBER_VOCABULARY)
+"""
+
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+from clinicaltrials.resources import nlp
+from clinicaltrials.token_features import TokenArrays
+
+WORD_NUMBERS = {"one": 1,
+                "two": 2,
+                "three": 3,
+                "four": 4,
+                "five": 5,
+                "six": 6,
+                "seven": 7,
+                "eight": 8,
+                "nine": 9,
+                "ten": 10,
+                "eleven": 11,
+                "twelve": 12,
+                "thirteen": 13,
+                "fourteen": 14,
+                "fifteen": 15,
+                "sixteen": 16,
+                "seventeen": 17,
+                "eighteen": 18,
+                "nineteen": 19}
+for tens_word, tens in [("twenty", 20), ("thirty", 30), ("forty", 40), ("fifty", 50), ("sixty", 60), ("seventy", 70), ("eighty", 80), ("ninety", 90)]:
+    WORD_NUMBERS[tens_word] = tens
+    for unit_word, unit in list(WORD_NUMBERS.items())[:9]:
+        WORD_NUMBERS[f"{tens_word}-{unit_word}"] = tens + unit
+
+PLAIN_NUMBER_REGEX = re.compile(r"^[0-9]+$")
+GROUPED_NUMBER_REGEX = re.compile(r"^[1-9][0-9]{0,2}(?:,[0-9]{3})+$")
+RANGE_REGEX = re.compile(r"^([0-9]+)[-–]([0-9]+)$")
+
+# * Tokens between the two numbers of a range
+RANGE_SEPARATORS = {"-", "–", "to"}
+
+
+def parse_number(text: str, allow_grouped: bool = True) -> int | None:
+    """
+    Value of a plain integer, an integer with thousands separators or a number word.
+
+    :param text: Text of the number, e.g. "12", "1,200" or "Twelve".
+    :param allow_grouped: Whether integers with thousands separators are parsed.
+    :return: The value, or None if the text is not a number.
+    """
+
+    if PLAIN_NUMBER_REGEX.match(text):
+        return int(text)
+    if allow_grouped and GROUPED_NUMBER_REGEX.match(text):
+        return int(text.replace(",", ""))
+
+    return WORD_NUMBERS.get(text.lower())
+
+
+@dataclass(frozen=True, eq=False)
+class NumberVocabulary:
+    """
+    The tokens a processor reads as numbers: number words, looked up by norm, and numbers written with digits, matched
+    on the verbatim text. The commas of the digits are dropped from the value.
+    """
+
+    word_numbers: dict[str, int]
+    digits_regex: re.Pattern
+
+    def parse(self, text: str) -> int | None:
+        """
+        Value of a number word or of digits in this vocabulary, or None if the text is not one.
+        """
+
+        if text.lower() in self.word_numbers:
+            return self.word_numbers[text.lower()]
+
+        return self.parse_digits(text=text)
+
+    def parse_digits(self, text: str) -> int | None:
+        if self.digits_regex.match(text):
+            return int(text.replace(",", ""))
+
+        return None
+
+
+DEFAULT_VOCABULARY = NumberVocabulary(word_numbers=WORD_NUMBERS, digits_regex=re.compile(f"{PLAIN_NUMBER_REGEX.pattern}|{GROUPED_NUMBER_REGEX.pattern}"))
+
+# * Number words up to nineteen and plain integers, as NumSites and CohortSize read them
+SMALL_NUMBER_VOCABULARY = NumberVocabulary(word_numbers={word: value for word, value in WORD_NUMBERS.items() if value < 20}, digits_regex=re.compile(r"^\d+$"))
+
+
+@dataclass(frozen=True)
+class NumericRange:
+    page_no: int
+    start: int  # * Token index of the first token of the range in its page
+    end: int  # * Token index after the last token of the range in its page
+    low: int
+    high: int
+
+
+class NumericMentions:
+    """
+    Index of the numbers of a document, built from its token arrays.
+    """
+
+    def __init__(self, token_arrays: TokenArrays) -> None:
+        self.__page_offsets = token_arrays.page_offsets
+
+        # * Number words are looked up by norm, as the processors did with `token.norm_`, and digits by verbatim text
+        unique_norms, self.__norm_inverse = np.unique(token_arrays.norm, return_inverse=True)
+        self.__unique_norms = [nlp.vocab.strings[int(norm)] for norm in unique_norms]
+        unique_orths, self.__orth_inverse = np.unique(token_arrays.orth, return_inverse=True)
+        self.__unique_texts = [nlp.vocab.strings[int(orth)] for orth in unique_orths]
+
+        self.values = self.__parse_values(vocabulary=DEFAULT_VOCABULARY)
+        self.__vocabulary_values: dict[NumberVocabulary, np.ndarray] = {}
+
+        unique_is_grouped = np.array(["," in text for text in self.__unique_texts], dtype=bool)
+        self.is_grouped = ~np.isnan(self.values) & unique_is_grouped[self.__orth_inverse] if len(unique_orths) > 0 else np.zeros(len(token_arrays), dtype=bool)
+
+        self.ranges = self.__find_ranges(token_arrays=token_arrays, unique_texts=self.__unique_texts, orth_inverse=self.__orth_inverse)
+
+    def __parse_values(self, vocabulary: NumberVocabulary) -> np.ndarray:
+        values = np.full(len(self.__norm_inverse), np.nan)
+        if len(values) == 0:
+            return values
+
+        word_values = np.array([vocabulary.word_numbers.get(norm, np.nan) for norm in self.__unique_norms], dtype=np.float64)[self.__norm_inverse]
+        is_word = ~np.isnan(word_values)
+        values[is_word] = word_values[is_word]
+
+        digit_values = np.array([vocabulary.parse_digits(text=text) if text[:1].isdigit() else None for text in self.__unique_texts], dtype=np.float64)[self.__orth_inverse]
+        is_digits = ~np.isnan(digit_values) & ~is_word
+        values[is_digits] = digit_values[is_digits]
+
+        return values
+
+    def get_vocabulary_values(self, vocabulary: NumberVocabulary) -> np.ndarray:
+        """
+        Value of each token of the flattened stream in the given vocabulary, NaN if it is not a number there.
+        """
+
+        # * Two threads may both parse a vocabulary the first time it is used, which only costs time
+        if vocabulary not in self.__vocabulary_values:
+            self.__vocabulary_values[vocabulary] = self.__parse_values(vocabulary=vocabulary)
+
+        return self.__vocabulary_values[vocabulary]
+
+    def __find_ranges(self, token_arrays: TokenArrays, unique_texts: list[str], orth_inverse: np.ndarray) -> list[NumericRange]:
+        ranges = []
+
+        # * Ranges within one token, such as "10–20", which spaCy does not split
+        for unique_idx, text in enumerate(unique_texts):
+            range_match = RANGE_REGEX.match(text)
+            if range_match is None:
+                continue
+            for token_idx in np.flatnonzero(orth_inverse == unique_idx):
+                page_no = int(token_arrays.page[token_idx])
+                token_no = int(token_idx - self.__page_offsets[page_no])
+                ranges.append(NumericRange(page_no=page_no, start=token_no, end=token_no + 1, low=int(range_match.group(1)), high=int(range_match.group(2))))
+
+        # * Ranges of three tokens on the same page, such as "10 - 20" or "ten to twenty"
+        separator_ids = np.array([nlp.vocab.strings[separator] for separator in RANGE_SEPARATORS], dtype=np.uint64)
+        is_number = ~np.isnan(self.values)
+        starts = np.flatnonzero(is_number[:-2] & np.isin(token_arrays.lower[1:-1], separator_ids) & is_number[2:]) if len(is_number) > 2 else []
+        for token_idx in starts:
+            page_no = int(token_arrays.page[token_idx])
+            if token_arrays.page[token_idx + 2] != page_no:
+                continue
+            token_no = int(token_idx - self.__page_offsets[page_no])
+            ranges.append(NumericRange(page_no=page_no, start=token_no, end=token_no + 3, low=int(self.values[token_idx]), high=int(self.values[token_idx + 2])))
+
+        ranges.sort(key=lambda numeric_range: (numeric_range.page_no, numeric_range.start))
+        return ranges
+
+    def get_value(self, page_no: int, token_no: int, allow_grouped: bool = False, vocabulary: NumberVocabulary | None = None) -> int | None:
+        """
+        Value of a token, or None if it is not a number.
+
+        :param page_no: Zero based page number.
+        :param token_no: Index of the token in its page.
+        :param allow_grouped: Whether integers with thousands separators, such as "1,200", count as numbers.
+        :param vocabulary: Numbers the caller reads, instead of every number of the index. `allow_grouped` is then
+            ignored, the vocabulary decides which digits are numbers.
+        """
+
+        return self.value_at(token_idx=int(self.__page_offsets[page_no]) + token_no, allow_grouped=allow_grouped, vocabulary=vocabulary)
+
+    def value_at(self, token_idx: int, allow_grouped: bool = False, vocabulary: NumberVocabulary | None = None) -> int | None:
+        """
+        Value of a token given by its position in the flattened token stream, see `get_value`.
+        """
+
+        if vocabulary is not None:
+            value = self.get_vocabulary_values(vocabulary=vocabulary)[token_idx]
+            return None if np.isnan(value) else int(value)
+
+        value = self.values[token_idx]
+        if np.isnan(value) or (self.is_grouped[token_idx] and not allow_grouped):
+            return None
+
+        return int(value)
+
+    def get_ranges(self, page_no: int) -> list[NumericRange]:
+        """
+        Ranges of numbers on a page, in token order.
+        """
+
+        return [numeric_range for numeric_range in self.ranges if numeric_range.page_no == page_no]
@@ -4,30 +4,24 @@ import traceback
 
 import numpy as np
 
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, MetadataOption, Page
+from clinicaltrials import model_store
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
+from clinicaltrials.document_context import TokenisationMode
 from clinicaltrials.logs_collector import LogsCollector
-from clinicaltrials.phase.phase_extractor_rule_based import PhaseExtractorRuleBased
-from clinicaltrials.phase.phase_extractor_spacy import PhaseExtractorSpacy
-from clinicaltrials.resources import nlp
 
 
 class Phase(BaseProcessor):
+    is_high_value = True
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-        self.phase_extractor_rule_based = None
-        self.phase_extractor_spacy = None
+        # * The classifiers were trained on the unnormalised page tokenisation
+        self.tokenisation: TokenisationMode = "compatible"
 
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(id="phase", name="Phase", feature_type="categorical",
-                        options=[MetadataOption(label="Early Phase 1", value="early_phase_1"),
-                                 MetadataOption(label="1", value="1"), MetadataOption(label="1.5", value="1.5"),
-                                 MetadataOption(label="2", value="2"), MetadataOption(label="2.5", value="2.5"),
-                                 MetadataOption(label="3", value="3"), MetadataOption(label="3.5", value="3.5"),
-                                 MetadataOption(label="4", value="4"),
-                                 MetadataOption(label="Unknown", value="unknown"), ],
-                        default_weights={"cost": 0.0, "risk": 5.0})
+    def load_models(self, config: ClassifierConfig | None = None) -> None:
+        for model_name in ("phase_rule_based", "phase_spacy"):
+            model_store.get_model(model_name, config=config or self.config)
 
     def process(self, document: Document, config: ClassifierConfig | None = None):
         """
@@ -36,30 +30,38 @@ class Phase(BaseProcessor):
         :return: The prediction (str) and a map from phase to the pages it's mentioned in.
         """
 
-        logs_collector = LogsCollector()
-        config = self.get_classifier_config_or_default(config=config)
-        path_to_classifier = config.path_to_classifier
+        return self.__process(document=document, config=config, use_spacy=True)
+
+    def process_degraded(self, document: Document, config: ClassifierConfig | None = None):
+        """
+        Identify the trial phase with the rule based extractor only, without the spaCy text classifier.
+        """
+
+        return self.__process(document=document, config=config, use_spacy=False)
 
-        if not self.phase_extractor_rule_based:
-            self.phase_extractor_rule_based = PhaseExtractorRuleBased(
-                f"{path_to_classifier}/phase_rf_classifier.pkl.bz2")
-            self.phase_extractor_spacy = PhaseExtractorSpacy(f"{path_to_classifier}/spacy-textcat-phase-04-model-best")
+    def __process(self, document: Document, config: ClassifierConfig | None, use_spacy: bool):
+        logs_collector = LogsCollector()
+        phase_extractor_rule_based = model_store.get_model("phase_rule_based", config=config or self.config)
 
-        tokenised_pages = [list(nlp(page.content)) for page in document.pages]
         spacy_docs = document.tokenised_pages
-        print("Initializing phase random Forest classifier", path_to_classifier)
 
         logs_collector.add("Searching for a phase...")
         try:
-            phase_to_pages = self.phase_extractor_rule_based.process(spacy_docs)
+            phase_to_pages = phase_extractor_rule_based.process(spacy_docs)
             logs_collector.add(f"This looks like a Phase {phase_to_pages['prediction']} trial.")
         except:
             phase_to_pages = {"prediction": 0}
             logs_collector.add("The tool was unable to identify a trial phase. An error occurred.")
             print(traceback.format_exc())
 
+        if not use_spacy:
+            phase_to_pages["logs"] = logs_collector.get()
+            return phase_to_pages
+
         try:
-            phase_to_pages_spacy = self.phase_extractor_spacy.process(tokenised_pages)
+            phase_extractor_spacy = model_store.get_model("phase_spacy", config=config or self.config)
+            tokenised_pages = document.context.get_docs(tokenisation=self.tokenisation)
+            phase_to_pages_spacy = phase_extractor_spacy.process(tokenised_pages)
             logs_collector.add(f"Neural network thought it was a Phase {phase_to_pages_spacy['prediction']} trial.")
             combined_scores = {}
             if len(phase_to_pages["probas"]) > 0:
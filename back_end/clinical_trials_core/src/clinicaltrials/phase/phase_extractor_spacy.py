@@ -3,6 +3,8 @@ from os.path import exists
 
 import spacy
 
+from clinicaltrials.textcat import predict_cats
+
 # TODO: exclusion pattern for recent, recently etc, within 5 words
 phase_map = {"Early Phase 1": 0.5, "Not Applicable": 0, "Phase 1": 1, "Phase 1/Phase 2": 1.5, "Phase 2": 2, "Phase 2/Phase 3": 2.5, "Phase 3": 3, "Phase 4": 4}
 
@@ -32,13 +34,14 @@ class PhaseExtractorSpacy:
             if page_no >= 3:
                 break
             text += " ".join([t.text for t in tokens]) + " "
-        doc = self.nlp(text)
+        # * The text is tokenised by the classifier, as the tokens joined by spaces do not always tokenise as they were
+        cats = predict_cats(nlp=self.nlp, docs=[self.nlp.make_doc(text)])[0]
 
         prediction_proba = {}
         for phase_str, phase_float in phase_map.items():
             clean_name = "Phase " + str(phase_float)
             clean_name = re.sub(r"\.0$", "", clean_name)
-            prediction_proba[clean_name] = doc.cats[phase_str]
+            prediction_proba[clean_name] = cats[phase_str]
 
         prediction = max(prediction_proba, key=prediction_proba.get)
 
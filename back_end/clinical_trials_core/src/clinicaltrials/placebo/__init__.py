@@ -1,32 +1,18 @@
-import bz2
 import json
-import pickle as pkl
 
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, Page, MetadataOption
-from clinicaltrials.resources import nlp
+from clinicaltrials import model_store
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
 
 
 class Placebo(BaseProcessor):
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-        self.model = None
-
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(id="placebo", name="Trial has placebo arm", feature_type="yesno", options=[
-            MetadataOption(label="no", value=0),
-            MetadataOption(label="yes", value=1),
-        ])
+    def load_models(self, config: ClassifierConfig | None = None) -> None:
+        model_store.get_model("placebo", config=config or self.config)
 
     def process(self, document: Document, config: ClassifierConfig | None = None):
-        config = self.get_classifier_config_or_default(config=config)
-
-        path_to_classifier = config.path_to_classifier
-
-        if not self.model:
-            with bz2.open(path_to_classifier, "rb") as f:
-                self.model = pkl.load(f)
+        model = model_store.get_model("placebo", config=config or self.config)
 
         X = []
         ctr = 0
@@ -36,8 +22,8 @@ class Placebo(BaseProcessor):
 
         annotations = []
 
-        for page_no, page in enumerate(document.tokenised_pages):
-            doc = nlp(page)
+        for page_no, doc in enumerate(document.tokenised_pages):
+            document.raise_if_cancelled()
             for tok in doc:
                 if tok.lower_ == "placebo":
                     ctr += 1
@@ -59,8 +45,8 @@ class Placebo(BaseProcessor):
 
         X.append([ctr, first_occurrence_page_no])
 
-        y_pred = self.model.predict(X)
-        y_pred_proba = self.model.predict_proba(X)
+        y_pred = model.predict(X)
+        y_pred_proba = model.predict_proba(X)
         probas_list = list(y_pred_proba[:, 1])
 
         prediction = int(y_pred[0])
@@ -0,0 +1,130 @@
+"""
+products.py
+
+Intermediate products that several processors need, such as the drug mentions or the normalised table cells. A
+processor declares the products it uses in `requires`, `ClinicalTrial` schedules every product as a node of its own
+that runs before the processors depending on it, and the result is cached in the document context so it is computed
+once per document.
+
+Usage:
+    from clinicaltrials.products import get_product
+    drug_mentions = get_product(document=document, name="drug_mentions")
+"""
+
+from typing import TYPE_CHECKING, Any, Callable
+
+from clinicaltrials.schedule_of_events import find_schedule_of_events_pages
+
+if TYPE_CHECKING:
+    from clinicaltrials.document import Document
+    from clinicaltrials.drug_mentions import DrugMentions
+
+PRODUCTS: dict[str, Callable[["Document"], Any]] = {}
+
+# * Functions that load the resources a product needs, so that a process can load them before its first document
+PRODUCT_LOADERS: dict[str, Callable[[], Any]] = {}
+
+# * Products that are cheap to build but required by many processors. In the "processes" execution mode they are built
+# * once by the parent and sent to every worker with the document, instead of tying their processors to one worker
+SHARED_PRODUCTS: set[str] = set()
+
+# * Products are stored in the document context under this prefix, which is also used for their nodes in the schedule
+PRODUCT_KEY_PREFIX = "product:"
+
+
+def product(name: str, shared: bool = False, loader: Callable[[], Any] | None = None) -> Callable[[Callable[["Document"], Any]], Callable[["Document"], Any]]:
+    """
+    Register a function that builds a product from a document. Shared products must be picklable. `loader` loads the
+    resources the builder needs ahead of the first document, see `load_products`.
+    """
+
+    def register(builder: Callable[["Document"], Any]) -> Callable[["Document"], Any]:
+        PRODUCTS[name] = builder
+        if shared:
+            SHARED_PRODUCTS.add(name)
+        if loader is not None:
+            PRODUCT_LOADERS[name] = loader
+        return builder
+
+    return register
+
+
+def get_product(document: "Document", name: str) -> Any:
+    """
+    Get a product of a document, building it on first access. Products are shared between processors and must not be
+    modified by them.
+
+    :param document: The document.
+    :param name: Name of the product.
+    :return: The cached product.
+    """
+
+    if name not in PRODUCTS:
+        raise KeyError(f"Unknown product {name}")
+
+    return document.context.get_or_build(PRODUCT_KEY_PREFIX + name, lambda: PRODUCTS[name](document))
+
+
+def load_products(names: set[str]) -> None:
+    """
+    Load the resources of the given products, e.g. when a worker process warms up.
+    """
+
+    for name in names:
+        if name in PRODUCT_LOADERS:
+            PRODUCT_LOADERS[name]()
+
+
+def has_product(document: "Document", name: str) -> bool:
+    """
+    Whether a product of the document has already been built.
+    """
+
+    return document.context.has_view(PRODUCT_KEY_PREFIX + name)
+
+
+def load_drug_dictionary() -> Callable[..., list[tuple]]:
+    """
+    Import the drug named entity recogniser, which loads its drug dictionary. This takes seconds, so it is only done by
+    the processes that find drug mentions, not by every process importing the processors.
+    """
+
+    from drug_named_entity_recognition import find_drugs
+
+    return find_drugs
+
+
+@product("drug_mentions", loader=load_drug_dictionary)
+def build_drug_mentions(document: "Document") -> "DrugMentions":
+    """
+    Drug mentions of the document, see `clinicaltrials.drug_mentions`. Used by Drug and Regimen.
+    """
+
+    from clinicaltrials.drug_mentions import DrugMentions
+
+    return DrugMentions.find(token_arrays=document.context.token_arrays, find_drugs=load_drug_dictionary())
+
+
+@product("table_cells")
+def build_table_cells(document: "Document") -> list[list[list[list[str | None]]]]:
+    """
+    Tables of each page with every tick mark ("X", "✓", "×") normalised to "X". Used by the Schedule of Events
+    processors NumVisits, NumInterventionsPerVisit and NumInterventionsTotal.
+
+    When the document has its PDF, the tables are extracted here, and only from the pages that the text based detector
+    of `clinicaltrials.schedule_of_events` picks, so pdfplumber does not run unless one of these processors is
+    scheduled, and then not on every page. The other pages have no tables here unless they were already read.
+    """
+
+    if document.file_buffer is not None:
+        document.extract_tables(
+            file_buffer=document.file_buffer, page_indices=find_schedule_of_events_pages(page_contents=[page.content for page in document.pages])
+        )
+
+    def normalise(cell: str | None) -> str | None:
+        if cell is not None and (cell.upper().startswith("X") or cell.startswith("✓") or cell.startswith("×")):
+            return "X"
+        return cell
+
+    return [[[[normalise(cell) for cell in row] for row in table] for table in page.tables] if page.are_tables_loaded else [] for page in document.pages]
+
@@ -0,0 +1,119 @@
+"""
+proximity.py
+
+Distances between token positions, for the "distance to X" features of the rule based processors. The positions of a
+word or of a group of matches are kept as a sorted NumPy array, so the nearest occurrence to a position is found with a
+binary search instead of comparing every pair of positions, which is quadratic in the number of occurrences on long
+protocols mentioning words such as "patients" or "total" hundreds of times.
+
+All functions return None when there is no occurrence to measure a distance to, and leave it to the caller to turn that
+into its default distance (often 1000).
+
+Usage:
+    from clinicaltrials.proximity import nearest_distance, sorted_positions
+    distance = nearest_distance(positions=sorted_positions(token_indexes["total"]), targets=sorted_positions(token_indexes["60"]))
+"""
+
+from typing import Iterable
+
+import numpy as np
+
+
+def sorted_positions(positions: Iterable[int]) -> np.ndarray:
+    """
+    Sorted array of token positions, e.g. from a set of match boundaries.
+    """
+
+    return np.array(sorted(positions), dtype=np.int64)
+
+
+def _nearest(positions: np.ndarray, targets: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    For every target, the index in `positions` of the nearest position, the lower one on a tie, and its distance.
+    """
+
+    right = np.searchsorted(positions, targets)
+    left = np.clip(right - 1, 0, len(positions) - 1)
+    right = np.clip(right, 0, len(positions) - 1)
+
+    left_distances = np.abs(targets - positions[left])
+    right_distances = np.abs(positions[right] - targets)
+    is_left = left_distances <= right_distances
+
+    return np.where(is_left, left, right), np.where(is_left, left_distances, right_distances)
+
+
+def nearest_distance(positions: np.ndarray, targets: np.ndarray) -> int | None:
+    """
+    Smallest distance between a position and a target.
+
+    :param positions: Sorted positions.
+    :param targets: Positions to measure from, in any order.
+    :return: The distance, or None if either array is empty.
+    """
+
+    if len(positions) == 0 or len(targets) == 0:
+        return None
+
+    _, distances = _nearest(positions=positions, targets=np.asarray(targets, dtype=np.int64))
+    return int(distances.min())
+
+
+def nearest_pair(positions: np.ndarray, targets: np.ndarray) -> tuple[int, int, int] | None:
+    """
+    The closest pair of a position and a target. On a tie the pair with the lowest target, then the lowest position,
+    wins.
+
+    :param positions: Sorted positions.
+    :param targets: Sorted positions to measure from.
+    :return: The distance, the target and the position, or None if either array is empty.
+    """
+
+    if len(positions) == 0 or len(targets) == 0:
+        return None
+
+    nearest, distances = _nearest(positions=positions, targets=targets)
+    target_idx = int(np.argmin(distances))
+    return int(distances[target_idx]), int(targets[target_idx]), int(positions[nearest[target_idx]])
+
+
+def distance_to_span(positions: np.ndarray, start: int, end: int, before_only: bool = False) -> int | None:
+    """
+    Smallest distance between a position and either boundary of a span, as `min(abs(i - start), abs(i - end))`.
+
+    :param positions: Sorted positions.
+    :param start: Start of the span.
+    :param end: End of the span.
+    :param before_only: Only count the positions before the start of the span.
+    """
+
+    if before_only:
+        positions = positions[:np.searchsorted(positions, start)]
+
+    return nearest_distance(positions=positions, targets=np.array([start, end], dtype=np.int64))
+
+
+def window_distance(positions: np.ndarray, start: int, end: int, window: int, length: int) -> int | None:
+    """
+    Distance to the nearest position within `window` tokens of a span, measured from the start of the span for the
+    positions before it and from the end of the span for the others.
+
+    :param positions: Sorted positions.
+    :param start: Start of the span.
+    :param end: End of the span.
+    :param window: Number of tokens searched on either side of the span.
+    :param length: Number of tokens of the page, which bounds the window.
+    """
+
+    lower_idx, start_idx, upper_idx = np.searchsorted(positions, [max(start - window, 0), start, min(end + window, length)])
+
+    distances = []
+    if start_idx > lower_idx:
+        distances.append(start - int(positions[start_idx - 1]))
+    if upper_idx > start_idx:
+        end_idx = int(np.clip(np.searchsorted(positions, end), start_idx, upper_idx - 1))
+        distances.append(abs(int(positions[end_idx]) - end))
+        if end_idx > start_idx:
+            distances.append(abs(int(positions[end_idx - 1]) - end))
+
+    return min(distances) if distances else None
@@ -1,8 +1,8 @@
 import json
 import re
 
-from spacy.matcher import PhraseMatcher
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, MetadataOption, Page
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
+from clinicaltrials.match_engine import match_engine
 from clinicaltrials.resources import nlp
 
 patterns = dict()
@@ -36,31 +36,23 @@ for number_group in [("1", "one", "single"), ("2", "two"), ("3", "three"), ("mul
             for step in ["step", "stage"]:
                 patterns[pattern_key].append(f"{number}{hyphen}{step}")
 
-phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
-
-for pattern_name, pattern_surface_forms in patterns.items():
-    phrase_matcher.add(pattern_name, nlp.pipe(pattern_surface_forms))
+match_engine.add_phrase_patterns(namespace="randomisation", patterns=patterns)
 
 
 class Randomisation(BaseProcessor):
+    requires = ("page_matches",)
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(id="randomisation", name="Randomisation", feature_type="categorical",
-                        options=[MetadataOption(label="none", value="none"),
-                                 MetadataOption(label="simple", value="simple"),
-                                 MetadataOption(label="intra-operative", value="intra-operative"),
-                                 MetadataOption(label="cluster", value="cluster"),
-                                 MetadataOption(label="crossover", value="crossover"), ])
-
     def process(self, document: Document, config: ClassifierConfig | None = None):
         candidates = []
         annotations = []
         occurrence_to_pages = {}
+        page_matches = match_engine.get_matches(document=document, namespace="randomisation")
         for page_no, doc in enumerate(document.tokenised_pages):
-            matches = list(phrase_matcher(doc))
+            document.raise_if_cancelled()
+            matches = list(page_matches[page_no])
 
             context_indices = {}
             for context in context_matcher_names:
@@ -1,10 +1,10 @@
 import json
 import re
 
-from drug_named_entity_recognition import find_drugs
-from spacy.matcher import PhraseMatcher, Matcher
-
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, Page
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
+from clinicaltrials.match_engine import match_engine
+from clinicaltrials.products import get_product
+from clinicaltrials.proximity import distance_to_span, sorted_positions
 from clinicaltrials.resources import nlp
 
 """
@@ -14,108 +14,6 @@ From:
 Essential Pharmacokinetics, 2015
 """
 
-re_num = re.compile(r"^\d+$")
-
-num_lookup = {"one": 1,
-              "two": 2,
-              "three": 3,
-              "four": 4,
-              "five": 5,
-              "six": 6,
-              "seven": 7,
-              "eight": 8,
-              "nine": 9,
-              "ten": 10,
-              "eleven": 11,
-              "twelve": 12,
-              "thirteen": 13,
-              "fourteen": 14,
-              "fifteen": 15,
-              "sixteen": 16,
-              "seventeen": 17,
-              "eighteen": 18,
-              "nineteen": 19,
-              "twenty": 20,
-              "twenty-one": 21,
-              "twenty-two": 22,
-              "twenty-three": 23,
-              "twenty-four": 24,
-              "twenty-five": 25,
-              "twenty-six": 26,
-              "twenty-seven": 27,
-              "twenty-eight": 28,
-              "twenty-nine": 29,
-              "thirty": 30,
-              "thirty-one": 31,
-              "thirty-two": 32,
-              "thirty-three": 33,
-              "thirty-four": 34,
-              "thirty-five": 35,
-              "thirty-six": 36,
-              "thirty-seven": 37,
-              "thirty-eight": 38,
-              "thirty-nine": 39,
-              "forty": 40,
-              "forty-one": 41,
-              "forty-two": 42,
-              "forty-three": 43,
-              "forty-four": 44,
-              "forty-five": 45,
-              "forty-six": 46,
-              "forty-seven": 47,
-              "forty-eight": 48,
-              "forty-nine": 49,
-              "fifty": 50,
-              "fifty-one": 51,
-              "fifty-two": 52,
-              "fifty-three": 53,
-              "fifty-four": 54,
-              "fifty-five": 55,
-              "fifty-six": 56,
-              "fifty-seven": 57,
-              "fifty-eight": 58,
-              "fifty-nine": 59,
-              "sixty": 60,
-              "sixty-one": 61,
-              "sixty-two": 62,
-              "sixty-three": 63,
-              "sixty-four": 64,
-              "sixty-five": 65,
-              "sixty-six": 66,
-              "sixty-seven": 67,
-              "sixty-eight": 68,
-              "sixty-nine": 69,
-              "seventy": 70,
-              "seventy-one": 71,
-              "seventy-two": 72,
-              "seventy-three": 73,
-              "seventy-four": 74,
-              "seventy-five": 75,
-              "seventy-six": 76,
-              "seventy-seven": 77,
-              "seventy-eight": 78,
-              "seventy-nine": 79,
-              "eighty": 80,
-              "eighty-one": 81,
-              "eighty-two": 82,
-              "eighty-three": 83,
-              "eighty-four": 84,
-              "eighty-five": 85,
-              "eighty-six": 86,
-              "eighty-seven": 87,
-              "eighty-eight": 88,
-              "eighty-nine": 89,
-              "ninety": 90,
-              "ninety-one": 91,
-              "ninety-two": 92,
-              "ninety-three": 93,
-              "ninety-four": 94,
-              "ninety-five": 95,
-              "ninety-six": 96,
-              "ninety-seven": 97,
-              "ninety-eight": 98,
-              "ninety-nine": 99}
-
 patterns = dict()
 
 # Patterns such as "bid" which are well known by pharmacists
@@ -172,18 +70,13 @@ patterns["context_regimen"] = ["regimen", "regimens", "treatment", "treatments",
 
 # end contexts
 
-phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")  # Takes strings, very fast: https://spacy.io/api/phrasematcher
-
-for key, terms in patterns.items():
-    phrase_matcher_phrases = list(nlp.pipe(terms))
-    phrase_matcher.add(key, phrase_matcher_phrases)
+match_engine.add_phrase_patterns(namespace="regimen_phrases", patterns=patterns)
 
 # Dynamic matching
 numerator = ["x", "×", "times", "time", "doses", "dose", "tablet", "tablets", "infusion", "infusions", "injection",
              "injections", "treatment", "treatments", "g", "mg", "l", "ml", "once", "twice", "thrice", "caps",
              "capsule", "capsules", "cap"]
 
-matcher = Matcher(nlp.vocab)
 matcher_code_to_patterns = {}
 for time_period_code, time_periods_group in time_periods.items():
 
@@ -262,24 +155,17 @@ for time_period_code, time_periods_group in time_periods.items():
     matcher_code_to_patterns[matcher_code].append(pattern)
 
 for matcher_code, patterns in matcher_code_to_patterns.items():
-    matcher.add(matcher_code, patterns)
+    match_engine.add_token_patterns(namespace="regimen_patterns", label=matcher_code, patterns=patterns)
 
 context_matcher_names = {"drug_name", "context_regimen"}
 
 
 class Regimen(BaseProcessor):
+    requires = ("drug_mentions", "page_matches")
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(
-            id="regimen",
-            name="Regimen",
-            feature_type="multiple_numeric",
-            has_multiple_predictions=True,
-        )
-
     def process(self, document: Document, config: ClassifierConfig | None = None):
         candidates = []
         annotations = []
@@ -287,12 +173,17 @@ class Regimen(BaseProcessor):
         prediction = {"days_between_doses": 0, "multiple_doses_per_day": 0, "doses_per_day": 0}
         occurrence_to_pages = {}
 
+        drug_mentions = get_product(document=document, name="drug_mentions")
+        page_phrase_matches = match_engine.get_matches(document=document, namespace="regimen_phrases")
+        page_pattern_matches = match_engine.get_matches(document=document, namespace="regimen_patterns")
+        numeric_mentions = document.context.numeric_mentions
         for page_no, doc in enumerate(document.tokenised_pages):
+            document.raise_if_cancelled()
             candidates_this_page = []
 
-            matches = list(phrase_matcher(doc))
+            matches = list(page_phrase_matches[page_no])
 
-            matches.extend(matcher(doc))
+            matches.extend(page_pattern_matches[page_no])
 
             context_indices = {}
             for context in context_matcher_names:
@@ -304,22 +195,19 @@ class Regimen(BaseProcessor):
                     context_indices[matcher_name].add(phrase_match[1])
                     context_indices[matcher_name].add(phrase_match[2])
 
-            drug_matches = find_drugs([t.text for t in doc], is_ignore_case=True)
-            for d, start, end in drug_matches:
-                for token_idx in range(start, end + 1):
-                    context_indices["drug_name"].add(token_idx)
+            context_indices["drug_name"].update(drug_mentions.get_token_indices(page_no))
+
+            context_positions = {context: sorted_positions(token_indices) for context, token_indices in context_indices.items()}
 
             for phrase_match in matches:
                 matcher_name = nlp.vocab.strings[phrase_match[0]]
 
                 distances = {}
                 for context in context_matcher_names:
-                    diff = 1000
-                    for i in context_indices[context]:
-                        if context in {"until", "maximum"} and i >= phrase_match[1]:
-                            continue  # "until" is always on the left
-                        diff = min([diff, abs(i - phrase_match[1]), abs(i - phrase_match[2])])
-                    distances[context] = diff
+                    # * "until" is always on the left
+                    diff = distance_to_span(positions=context_positions[context], start=phrase_match[1], end=phrase_match[2],
+                                            before_only=context in {"until", "maximum"})
+                    distances[context] = 1000 if diff is None else min(diff, 1000)
 
                 if matcher_name.startswith("regimen_specific"):
 
@@ -338,11 +226,9 @@ class Regimen(BaseProcessor):
                     if "x" in frequency:
                         value = None
                         for i in range(phrase_match[1], phrase_match[2]):
-                            if doc[i].like_num and "." not in doc[i].text:
-                                if doc[i].norm_ in num_lookup:
-                                    value = num_lookup[doc[i].norm_]
-                                elif re_num.match(doc[i].text):
-                                    value = int(doc[i].text)
+                            token_value = numeric_mentions.get_value(page_no=page_no, token_no=i)
+                            if token_value is not None:
+                                value = token_value
 
                         if value is None:
                             value = 1
@@ -1,6 +1,5 @@
-from spacy.matcher import PhraseMatcher
-
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, Page
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
+from clinicaltrials.match_engine import match_engine
 from clinicaltrials.resources import nlp
 
 patterns = dict()
@@ -13,28 +12,17 @@ patterns["context_regimen"] = ["culture", "cultures", "cycle", "cycles", "dosage
                                "infusion", "infusions", "injection", "injections", "receive", "regimen", "regimens",
                                "treatment", "treatments"]
 
-phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")  # Takes strings, very fast: https://spacy.io/api/phrasematcher
-
-for key, terms in patterns.items():
-    phrase_matcher_phrases = list(nlp.pipe(terms))
-    phrase_matcher.add(key, phrase_matcher_phrases)
+match_engine.add_phrase_patterns(namespace="regimen_duration", patterns=patterns)
 
 context_matcher_names = {"context_regimen", "until"}
 
 
 class RegimenDuration(BaseProcessor):
+    requires = ("page_matches",)
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(
-            id="regimen_duration",
-            name="Regimen duration is open",
-            feature_type="multiple_numeric",
-            has_multiple_predictions=True,
-        )
-
     def process(self, document: Document, config: ClassifierConfig | None = None):
         candidates = []
         annotations = []
@@ -42,8 +30,11 @@ class RegimenDuration(BaseProcessor):
         prediction = {"until_progression": 0}
         occurrence_to_pages = {}
 
+        page_matches = match_engine.get_matches(document=document, namespace="regimen_duration")
+
         for page_no, doc in enumerate(document.tokenised_pages):
-            matches = list(phrase_matcher(doc))
+            document.raise_if_cancelled()
+            matches = list(page_matches[page_no])
 
             context_indices = {}
             for context in context_matcher_names:
@@ -0,0 +1,722 @@
+"""
+registry.py
+
+The processors that `ClinicalTrial` runs, by module name: the import path of each processor class and its static
+metadata. The processor packages build their patterns and load libraries such as sklearn, pandas or pycountry when they
+are imported, so a processor is only imported when it is first used. Listing the modules or reading their metadata
+imports none of them.
+
+To add a processor, add its definition here. Its module name must be the snake case of its class name.
+
+Usage:
+    from clinicaltrials.registry import PROCESSORS
+    metadata = PROCESSORS["phase"].metadata
+    processor_class = PROCESSORS["phase"].load()
+"""
+
+from dataclasses import dataclass
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+from clinicaltrials.metadata import Metadata, MetadataOption
+
+if TYPE_CHECKING:
+    from clinicaltrials.core import BaseProcessor
+
+
+@dataclass(frozen=True)
+class ProcessorDefinition:
+    """
+    Where a processor lives and what it predicts.
+    `import_path` is "<module>:<class name>", as in entry points.
+    """
+
+    import_path: str
+    metadata: Metadata
+
+    def load(self) -> type["BaseProcessor"]:
+        """
+        Import the processor class.
+        """
+
+        module_path, class_name = self.import_path.split(":")
+        return getattr(import_module(module_path), class_name)
+
+
+PROCESSORS: dict[str, ProcessorDefinition] = {
+    "drug": ProcessorDefinition(
+        import_path="clinicaltrials.drug:Drug",
+        metadata=Metadata(
+            id="drug",
+            name="Drug",
+            feature_type="text",
+        ),
+    ),
+    "phase": ProcessorDefinition(
+        import_path="clinicaltrials.phase:Phase",
+        metadata=Metadata(
+            id="phase",
+            name="Phase",
+            feature_type="categorical",
+            options=[
+                MetadataOption(label="Early Phase 1", value="early_phase_1"),
+                MetadataOption(label="1", value="1"),
+                MetadataOption(label="1.5", value="1.5"),
+                MetadataOption(label="2", value="2"),
+                MetadataOption(label="2.5", value="2.5"),
+                MetadataOption(label="3", value="3"),
+                MetadataOption(label="3.5", value="3.5"),
+                MetadataOption(label="4", value="4"),
+                MetadataOption(label="Unknown", value="unknown"),
+            ],
+            default_weights={"cost": 0.0, "risk": 5.0},
+        ),
+    ),
+    "condition": ProcessorDefinition(
+        import_path="clinicaltrials.condition:Condition",
+        metadata=Metadata(
+            id="condition",
+            name="Condition",
+            feature_type="categorical",
+            options=[
+                MetadataOption(label="HIV", value="HIV"),
+                MetadataOption(label="Tuberculosis", value="TB"),
+                MetadataOption(label="COVID", value="COVID"),
+                MetadataOption(label="Influenza", value="INFLUENZA"),
+                MetadataOption(label="Malaria", value="MAL"),
+                MetadataOption(label="Enteric and diarrheal diseases", value="EDD"),
+                MetadataOption(label="Neglected tropical diseases", value="NTD"),
+                MetadataOption(label="Polio", value="POL"),
+                MetadataOption(label="Diabetes", value="DIABETES"),
+                MetadataOption(label="Pneumonia", value="PNE"),
+                MetadataOption(label="Hypertension (see full product)", value="HYPERTENSION"),
+                MetadataOption(label="Motor neurone disease (see full product)", value="MND"),
+                MetadataOption(label="Multiple sclerosis (see full product)", value="MS"),
+                MetadataOption(label="Obesity (see full product)", value="OBESITY"),
+                MetadataOption(label="Sickle cell anemia (see full product)", value="SICKLE"),
+                MetadataOption(label="Stroke (see full product)", value="STROKE"),
+                MetadataOption(label="Cystic fibrosis (see full product)", value="CF"),
+                MetadataOption(label="Cancer (see full product)", value="CANCER"),
+                MetadataOption(label="Other (see full product)", value="other"),
+            ],
+        ),
+    ),
+    "country": ProcessorDefinition(
+        import_path="clinicaltrials.country:Country",
+        metadata=Metadata(
+            id="country",
+            name="Country",
+            feature_type="multi_label",
+            options=[
+                MetadataOption(label="Aruba", value="AW"),
+                MetadataOption(label="Afghanistan", value="AF"),
+                MetadataOption(label="Angola", value="AO"),
+                MetadataOption(label="Anguilla", value="AI"),
+                MetadataOption(label="Åland Islands", value="AX"),
+                MetadataOption(label="Albania", value="AL"),
+                MetadataOption(label="Andorra", value="AD"),
+                MetadataOption(label="United Arab Emirates", value="AE"),
+                MetadataOption(label="Argentina", value="AR"),
+                MetadataOption(label="Armenia", value="AM"),
+                MetadataOption(label="American Samoa", value="AS"),
+                MetadataOption(label="Antarctica", value="AQ"),
+                MetadataOption(label="French Southern Territories", value="TF"),
+                MetadataOption(label="Antigua and Barbuda", value="AG"),
+                MetadataOption(label="Australia", value="AU"),
+                MetadataOption(label="Austria", value="AT"),
+                MetadataOption(label="Azerbaijan", value="AZ"),
+                MetadataOption(label="Burundi", value="BI"),
+                MetadataOption(label="Belgium", value="BE"),
+                MetadataOption(label="Benin", value="BJ"),
+                MetadataOption(label="Bonaire, Sint Eustatius and Saba", value="BQ"),
+                MetadataOption(label="Burkina Faso", value="BF"),
+                MetadataOption(label="Bangladesh", value="BD"),
+                MetadataOption(label="Bulgaria", value="BG"),
+                MetadataOption(label="Bahrain", value="BH"),
+                MetadataOption(label="Bahamas", value="BS"),
+                MetadataOption(label="Bosnia and Herzegovina", value="BA"),
+                MetadataOption(label="Saint Barthélemy", value="BL"),
+                MetadataOption(label="Belarus", value="BY"),
+                MetadataOption(label="Belize", value="BZ"),
+                MetadataOption(label="Bermuda", value="BM"),
+                MetadataOption(label="Bolivia, Plurinational State of", value="BO"),
+                MetadataOption(label="Brazil", value="BR"),
+                MetadataOption(label="Barbados", value="BB"),
+                MetadataOption(label="Brunei Darussalam", value="BN"),
+                MetadataOption(label="Bhutan", value="BT"),
+                MetadataOption(label="Bouvet Island", value="BV"),
+                MetadataOption(label="Botswana", value="BW"),
+                MetadataOption(label="Central African Republic", value="CF"),
+                MetadataOption(label="Canada", value="CA"),
+                MetadataOption(label="Cocos (Keeling) Islands", value="CC"),
+                MetadataOption(label="Switzerland", value="CH"),
+                MetadataOption(label="Chile", value="CL"),
+                MetadataOption(label="China", value="CN"),
+                MetadataOption(label="Côte d'Ivoire", value="CI"),
+                MetadataOption(label="Cameroon", value="CM"),
+                MetadataOption(label="Congo, The Democratic Republic of the", value="CD"),
+                MetadataOption(label="Congo", value="CG"),
+                MetadataOption(label="Cook Islands", value="CK"),
+                MetadataOption(label="Colombia", value="CO"),
+                MetadataOption(label="Comoros", value="KM"),
+                MetadataOption(label="Cabo Verde", value="CV"),
+                MetadataOption(label="Costa Rica", value="CR"),
+                MetadataOption(label="Cuba", value="CU"),
+                MetadataOption(label="Curaçao", value="CW"),
+                MetadataOption(label="Christmas Island", value="CX"),
+                MetadataOption(label="Cayman Islands", value="KY"),
+                MetadataOption(label="Cyprus", value="CY"),
+                MetadataOption(label="Czechia", value="CZ"),
+                MetadataOption(label="Germany", value="DE"),
+                MetadataOption(label="Djibouti", value="DJ"),
+                MetadataOption(label="Dominica", value="DM"),
+                MetadataOption(label="Denmark", value="DK"),
+                MetadataOption(label="Dominican Republic", value="DO"),
+                MetadataOption(label="Algeria", value="DZ"),
+                MetadataOption(label="Ecuador", value="EC"),
+                MetadataOption(label="Egypt", value="EG"),
+                MetadataOption(label="Eritrea", value="ER"),
+                MetadataOption(label="Western Sahara", value="EH"),
+                MetadataOption(label="Spain", value="ES"),
+                MetadataOption(label="Estonia", value="EE"),
+                MetadataOption(label="Ethiopia", value="ET"),
+                MetadataOption(label="Finland", value="FI"),
+                MetadataOption(label="Fiji", value="FJ"),
+                MetadataOption(label="Falkland Islands (Malvinas)", value="FK"),
+                MetadataOption(label="France", value="FR"),
+                MetadataOption(label="Faroe Islands", value="FO"),
+                MetadataOption(label="Micronesia, Federated States of", value="FM"),
+                MetadataOption(label="Gabon", value="GA"),
+                MetadataOption(label="United Kingdom", value="GB"),
+                MetadataOption(label="Georgia", value="GE"),
+                MetadataOption(label="Guernsey", value="GG"),
+                MetadataOption(label="Ghana", value="GH"),
+                MetadataOption(label="Gibraltar", value="GI"),
+                MetadataOption(label="Guinea", value="GN"),
+                MetadataOption(label="Guadeloupe", value="GP"),
+                MetadataOption(label="Gambia", value="GM"),
+                MetadataOption(label="Guinea-Bissau", value="GW"),
+                MetadataOption(label="Equatorial Guinea", value="GQ"),
+                MetadataOption(label="Greece", value="GR"),
+                MetadataOption(label="Grenada", value="GD"),
+                MetadataOption(label="Greenland", value="GL"),
+                MetadataOption(label="Guatemala", value="GT"),
+                MetadataOption(label="French Guiana", value="GF"),
+                MetadataOption(label="Guam", value="GU"),
+                MetadataOption(label="Guyana", value="GY"),
+                MetadataOption(label="Hong Kong", value="HK"),
+                MetadataOption(label="Heard Island and McDonald Islands", value="HM"),
+                MetadataOption(label="Honduras", value="HN"),
+                MetadataOption(label="Croatia", value="HR"),
+                MetadataOption(label="Haiti", value="HT"),
+                MetadataOption(label="Hungary", value="HU"),
+                MetadataOption(label="Indonesia", value="ID"),
+                MetadataOption(label="Isle of Man", value="IM"),
+                MetadataOption(label="India", value="IN"),
+                MetadataOption(label="British Indian Ocean Territory", value="IO"),
+                MetadataOption(label="Ireland", value="IE"),
+                MetadataOption(label="Iran, Islamic Republic of", value="IR"),
+                MetadataOption(label="Iraq", value="IQ"),
+                MetadataOption(label="Iceland", value="IS"),
+                MetadataOption(label="Israel", value="IL"),
+                MetadataOption(label="Italy", value="IT"),
+                MetadataOption(label="Jamaica", value="JM"),
+                MetadataOption(label="Jersey", value="JE"),
+                MetadataOption(label="Jordan", value="JO"),
+                MetadataOption(label="Japan", value="JP"),
+                MetadataOption(label="Kazakhstan", value="KZ"),
+                MetadataOption(label="Kenya", value="KE"),
+                MetadataOption(label="Kyrgyzstan", value="KG"),
+                MetadataOption(label="Cambodia", value="KH"),
+                MetadataOption(label="Kiribati", value="KI"),
+                MetadataOption(label="Saint Kitts and Nevis", value="KN"),
+                MetadataOption(label="Korea, Republic of", value="KR"),
+                MetadataOption(label="Kuwait", value="KW"),
+                MetadataOption(label="Lao People's Democratic Republic", value="LA"),
+                MetadataOption(label="Lebanon", value="LB"),
+                MetadataOption(label="Liberia", value="LR"),
+                MetadataOption(label="Libya", value="LY"),
+                MetadataOption(label="Saint Lucia", value="LC"),
+                MetadataOption(label="Liechtenstein", value="LI"),
+                MetadataOption(label="Sri Lanka", value="LK"),
+                MetadataOption(label="Lesotho", value="LS"),
+                MetadataOption(label="Lithuania", value="LT"),
+                MetadataOption(label="Luxembourg", value="LU"),
+                MetadataOption(label="Latvia", value="LV"),
+                MetadataOption(label="Macao", value="MO"),
+                MetadataOption(label="Saint Martin (French part)", value="MF"),
+                MetadataOption(label="Morocco", value="MA"),
+                MetadataOption(label="Monaco", value="MC"),
+                MetadataOption(label="Moldova, Republic of", value="MD"),
+                MetadataOption(label="Madagascar", value="MG"),
+                MetadataOption(label="Maldives", value="MV"),
+                MetadataOption(label="Mexico", value="MX"),
+                MetadataOption(label="Marshall Islands", value="MH"),
+                MetadataOption(label="North Macedonia", value="MK"),
+                MetadataOption(label="Mali", value="ML"),
+                MetadataOption(label="Malta", value="MT"),
+                MetadataOption(label="Myanmar", value="MM"),
+                MetadataOption(label="Montenegro", value="ME"),
+                MetadataOption(label="Mongolia", value="MN"),
+                MetadataOption(label="Northern Mariana Islands", value="MP"),
+                MetadataOption(label="Mozambique", value="MZ"),
+                MetadataOption(label="Mauritania", value="MR"),
+                MetadataOption(label="Montserrat", value="MS"),
+                MetadataOption(label="Martinique", value="MQ"),
+                MetadataOption(label="Mauritius", value="MU"),
+                MetadataOption(label="Malawi", value="MW"),
+                MetadataOption(label="Malaysia", value="MY"),
+                MetadataOption(label="Mayotte", value="YT"),
+                MetadataOption(label="Namibia", value="NA"),
+                MetadataOption(label="New Caledonia", value="NC"),
+                MetadataOption(label="Niger", value="NE"),
+                MetadataOption(label="Norfolk Island", value="NF"),
+                MetadataOption(label="Nigeria", value="NG"),
+                MetadataOption(label="Nicaragua", value="NI"),
+                MetadataOption(label="Niue", value="NU"),
+                MetadataOption(label="Netherlands", value="NL"),
+                MetadataOption(label="Norway", value="NO"),
+                MetadataOption(label="Nepal", value="NP"),
+                MetadataOption(label="Nauru", value="NR"),
+                MetadataOption(label="New Zealand", value="NZ"),
+                MetadataOption(label="Oman", value="OM"),
+                MetadataOption(label="Pakistan", value="PK"),
+                MetadataOption(label="Panama", value="PA"),
+                MetadataOption(label="Pitcairn", value="PN"),
+                MetadataOption(label="Peru", value="PE"),
+                MetadataOption(label="Philippines", value="PH"),
+                MetadataOption(label="Palau", value="PW"),
+                MetadataOption(label="Papua New Guinea", value="PG"),
+                MetadataOption(label="Poland", value="PL"),
+                MetadataOption(label="Puerto Rico", value="PR"),
+                MetadataOption(label="Korea, Democratic People's Republic of", value="KP"),
+                MetadataOption(label="Portugal", value="PT"),
+                MetadataOption(label="Paraguay", value="PY"),
+                MetadataOption(label="Palestine, State of", value="PS"),
+                MetadataOption(label="French Polynesia", value="PF"),
+                MetadataOption(label="Qatar", value="QA"),
+                MetadataOption(label="Réunion", value="RE"),
+                MetadataOption(label="Romania", value="RO"),
+                MetadataOption(label="Russian Federation", value="RU"),
+                MetadataOption(label="Rwanda", value="RW"),
+                MetadataOption(label="Saudi Arabia", value="SA"),
+                MetadataOption(label="Sudan", value="SD"),
+                MetadataOption(label="Senegal", value="SN"),
+                MetadataOption(label="Singapore", value="SG"),
+                MetadataOption(label="South Georgia and the South Sandwich Islands", value="GS"),
+                MetadataOption(label="Saint Helena, Ascension and Tristan da Cunha", value="SH"),
+                MetadataOption(label="Svalbard and Jan Mayen", value="SJ"),
+                MetadataOption(label="Solomon Islands", value="SB"),
+                MetadataOption(label="Sierra Leone", value="SL"),
+                MetadataOption(label="El Salvador", value="SV"),
+                MetadataOption(label="San Marino", value="SM"),
+                MetadataOption(label="Somalia", value="SO"),
+                MetadataOption(label="Saint Pierre and Miquelon", value="PM"),
+                MetadataOption(label="Serbia", value="RS"),
+                MetadataOption(label="South Sudan", value="SS"),
+                MetadataOption(label="Sao Tome and Principe", value="ST"),
+                MetadataOption(label="Suriname", value="SR"),
+                MetadataOption(label="Slovakia", value="SK"),
+                MetadataOption(label="Slovenia", value="SI"),
+                MetadataOption(label="Sweden", value="SE"),
+                MetadataOption(label="Eswatini", value="SZ"),
+                MetadataOption(label="Sint Maarten (Dutch part)", value="SX"),
+                MetadataOption(label="Seychelles", value="SC"),
+                MetadataOption(label="Syrian Arab Republic", value="SY"),
+                MetadataOption(label="Turks and Caicos Islands", value="TC"),
+                MetadataOption(label="Chad", value="TD"),
+                MetadataOption(label="Togo", value="TG"),
+                MetadataOption(label="Thailand", value="TH"),
+                MetadataOption(label="Tajikistan", value="TJ"),
+                MetadataOption(label="Tokelau", value="TK"),
+                MetadataOption(label="Turkmenistan", value="TM"),
+                MetadataOption(label="Timor-Leste", value="TL"),
+                MetadataOption(label="Tonga", value="TO"),
+                MetadataOption(label="Trinidad and Tobago", value="TT"),
+                MetadataOption(label="Tunisia", value="TN"),
+                MetadataOption(label="Turkey", value="TR"),
+                MetadataOption(label="Tuvalu", value="TV"),
+                MetadataOption(label="Taiwan, Province of China", value="TW"),
+                MetadataOption(label="Tanzania, United Republic of", value="TZ"),
+                MetadataOption(label="Uganda", value="UG"),
+                MetadataOption(label="Ukraine", value="UA"),
+                MetadataOption(label="United States Minor Outlying Islands", value="UM"),
+                MetadataOption(label="Uruguay", value="UY"),
+                MetadataOption(label="United States", value="US"),
+                MetadataOption(label="Uzbekistan", value="UZ"),
+                MetadataOption(label="Holy See (Vatican City State)", value="VA"),
+                MetadataOption(label="Saint Vincent and the Grenadines", value="VC"),
+                MetadataOption(label="Venezuela, Bolivarian Republic of", value="VE"),
+                MetadataOption(label="Virgin Islands, British", value="VG"),
+                MetadataOption(label="Virgin Islands, U.S.", value="VI"),
+                MetadataOption(label="Viet Nam", value="VN"),
+                MetadataOption(label="Vanuatu", value="VU"),
+                MetadataOption(label="Wallis and Futuna", value="WF"),
+                MetadataOption(label="Samoa", value="WS"),
+                MetadataOption(label="Yemen", value="YE"),
+                MetadataOption(label="South Africa", value="ZA"),
+                MetadataOption(label="Zambia", value="ZM"),
+                MetadataOption(label="Zimbabwe", value="ZW"),
+            ],
+        ),
+    ),
+    "effect_estimate": ProcessorDefinition(
+        import_path="clinicaltrials.effect_estimate:EffectEstimate",
+        metadata=Metadata(
+            id="effect_estimate",
+            name="Effect Estimate",
+            feature_type="yesno",
+            default_weights={"cost": 0.0, "risk": 16.0},
+            options=[
+                MetadataOption(label="no", value=0),
+                MetadataOption(label="yes", value=1),
+            ],
+        ),
+    ),
+    "simulation": ProcessorDefinition(
+        import_path="clinicaltrials.simulation:Simulation",
+        metadata=Metadata(
+            id="simulation",
+            name="Simulation",
+            feature_type="yesno",
+            options=[
+                MetadataOption(label="no", value=0),
+                MetadataOption(label="yes", value=1),
+            ],
+        ),
+    ),
+    "sample_size": ProcessorDefinition(
+        import_path="clinicaltrials.sample_size:SampleSize",
+        metadata=Metadata(
+            id="sample_size",
+            name="Number of subjects",
+            feature_type="numeric",
+            default_weights={"cost": 0.0, "risk": 0.0},
+            is_tertile=True,
+        ),
+    ),
+    "sap": ProcessorDefinition(
+        import_path="clinicaltrials.sap:Sap",
+        metadata=Metadata(
+            id="sap",
+            name="Protocol has Statistical Analysis Plan",
+            feature_type="yesno",
+            default_weights={"cost": 0.0, "risk": 26.0},
+            options=[
+                MetadataOption(label="no", value=0),
+                MetadataOption(label="yes", value=1),
+            ],
+        ),
+    ),
+    "num_arms": ProcessorDefinition(
+        import_path="clinicaltrials.num_arms:NumArms",
+        metadata=Metadata(
+            id="num_arms",
+            name="Number of investigational arms in the trial",
+            feature_type="numeric",
+            default_weights={"cost": 0.0, "risk": 2.0},
+        ),
+    ),
+    "cohort_size": ProcessorDefinition(
+        import_path="clinicaltrials.cohort_size:CohortSize",
+        metadata=Metadata(
+            id="cohort_size",
+            name="Cohort Size",
+            feature_type="numeric",
+        ),
+    ),
+    "biobank": ProcessorDefinition(
+        import_path="clinicaltrials.biobank:Biobank",
+        metadata=Metadata(
+            id="biobank",
+            name="Biobank",
+            feature_type="yesno",
+            options=[
+                MetadataOption(label="no", value=0),
+                MetadataOption(label="yes", value=1),
+            ],
+        ),
+    ),
+    "num_sites": ProcessorDefinition(
+        import_path="clinicaltrials.num_sites:NumSites",
+        metadata=Metadata(
+            id="num_sites",
+            name="Number of investigational sites in the trial",
+            feature_type="numeric",
+            is_tertile=True,
+        ),
+    ),
+    "duration": ProcessorDefinition(
+        import_path="clinicaltrials.duration:Duration",
+        metadata=Metadata(
+            id="duration",
+            name="Duration in years",
+            feature_type="numeric",
+            is_tertile=True,
+        ),
+    ),
+    "num_visits": ProcessorDefinition(
+        import_path="clinicaltrials.num_visits:NumVisits",
+        metadata=Metadata(
+            id="num_visits",
+            name="Number of visits per subject",
+            feature_type="numeric",
+            is_tertile=True,
+        ),
+    ),
+    "num_interventions_per_visit": ProcessorDefinition(
+        import_path="clinicaltrials.num_interventions_per_visit:NumInterventionsPerVisit",
+        metadata=Metadata(
+            id="num_interventions_per_visit",
+            name="Number of interventions or investigations per visit, according to the Schedule of Events",
+            feature_type="numeric",
+        ),
+    ),
+    "num_interventions_total": ProcessorDefinition(
+        import_path="clinicaltrials.num_interventions_total:NumInterventionsTotal",
+        metadata=Metadata(
+            id="num_interventions_total",
+            name="Number of interventions or investigations for each subject, according to the Schedule of Events",
+            feature_type="numeric",
+            default_weights={"cost": 62.6, "risk": 0.0},
+        ),
+    ),
+    "design": ProcessorDefinition(
+        import_path="clinicaltrials.design:Design",
+        metadata=Metadata(
+            id="design",
+            name="Design",
+            feature_type="categorical",
+            options=[
+                MetadataOption(label="crossover", value="crossover"),
+                MetadataOption(label="factorial", value="factorial"),
+                MetadataOption(label="adaptive", value="adaptive"),
+                MetadataOption(label="other", value="other"),
+            ],
+        ),
+    ),
+    "consent": ProcessorDefinition(
+        import_path="clinicaltrials.consent:Consent",
+        metadata=Metadata(
+            id="consent",
+            name="Consent",
+            feature_type="categorical",
+            options=[
+                MetadataOption(label="none", value="none"),
+                MetadataOption(label="consent", value="consent"),
+                MetadataOption(label="assent", value="assent"),
+            ],
+        ),
+    ),
+    "randomisation": ProcessorDefinition(
+        import_path="clinicaltrials.randomisation:Randomisation",
+        metadata=Metadata(
+            id="randomisation",
+            name="Randomisation",
+            feature_type="categorical",
+            options=[
+                MetadataOption(label="none", value="none"),
+                MetadataOption(label="simple", value="simple"),
+                MetadataOption(label="intra-operative", value="intra-operative"),
+                MetadataOption(label="cluster", value="cluster"),
+                MetadataOption(label="crossover", value="crossover"),
+            ],
+        ),
+    ),
+    "control_negative": ProcessorDefinition(
+        import_path="clinicaltrials.control_negative:ControlNegative",
+        metadata=Metadata(
+            id="control_negative",
+            name="Control Negative",
+            feature_type="yesno",
+            options=[
+                MetadataOption(label="no", value=0),
+                MetadataOption(label="yes", value=1),
+            ],
+        ),
+    ),
+    "healthy": ProcessorDefinition(
+        import_path="clinicaltrials.healthy:Healthy",
+        metadata=Metadata(
+            id="healthy",
+            name="Healthy",
+            feature_type="yesno",
+            options=[
+                MetadataOption(label="no", value=0),
+                MetadataOption(label="yes", value=1),
+            ],
+        ),
+    ),
+    "gender": ProcessorDefinition(
+        import_path="clinicaltrials.gender:Gender",
+        metadata=Metadata(
+            id="gender",
+            name="Gender",
+            feature_type="categorical",
+            options=[
+                MetadataOption(label="none", value=0),
+                MetadataOption(label="male", value=1),
+                MetadataOption(label="female", value=2),
+            ],
+        ),
+    ),
+    "age": ProcessorDefinition(
+        import_path="clinicaltrials.age:Age",
+        metadata=Metadata(
+            id="age",
+            name="Age",
+            feature_type="multiple_numeric",
+            has_multiple_predictions=True,
+        ),
+    ),
+    "child": ProcessorDefinition(
+        import_path="clinicaltrials.child:Child",
+        metadata=Metadata(
+            id="child",
+            name="Child",
+            feature_type="yesno",
+            options=[
+                MetadataOption(label="no", value=0),
+                MetadataOption(label="yes", value=1),
+            ],
+        ),
+    ),
+    "placebo": ProcessorDefinition(
+        import_path="clinicaltrials.placebo:Placebo",
+        metadata=Metadata(
+            id="placebo",
+            name="Trial has placebo arm",
+            feature_type="yesno",
+            options=[
+                MetadataOption(label="no", value=0),
+                MetadataOption(label="yes", value=1),
+            ],
+        ),
+    ),
+    "regimen": ProcessorDefinition(
+        import_path="clinicaltrials.regimen:Regimen",
+        metadata=Metadata(
+            id="regimen",
+            name="Regimen",
+            feature_type="multiple_numeric",
+            has_multiple_predictions=True,
+        ),
+    ),
+    "interim": ProcessorDefinition(
+        import_path="clinicaltrials.interim:Interim",
+        metadata=Metadata(
+            id="interim",
+            name="Trial has interim review",
+            feature_type="yesno",
+            options=[
+                MetadataOption(label="no", value=0),
+                MetadataOption(label="yes", value=1),
+            ],
+        ),
+    ),
+    "document_type": ProcessorDefinition(
+        import_path="clinicaltrials.document_type:DocumentType",
+        metadata=Metadata(
+            id="document_type",
+            name="Document Type",
+            feature_type="categorical",
+            options=[
+                MetadataOption(label="Protocol", value="protocol"),
+                MetadataOption(label="SAP", value="sap"),
+                MetadataOption(label="ICF", value="icf"),
+                MetadataOption(label="Development plan", value="development_plan"),
+            ],
+        ),
+    ),
+    "vaccine": ProcessorDefinition(
+        import_path="clinicaltrials.vaccine:Vaccine",
+        metadata=Metadata(
+            id="vaccine",
+            name="Vaccine",
+            feature_type="yesno",
+            options=[
+                MetadataOption(label="no", value=0),
+                MetadataOption(label="yes", value=1),
+            ],
+        ),
+    ),
+    "intervention_type": ProcessorDefinition(
+        import_path="clinicaltrials.intervention_type:InterventionType",
+        metadata=Metadata(
+            id="intervention_type",
+            name="Type of intervention under investigation in the trial",
+            feature_type="categorical",
+            options=[
+                MetadataOption(label="behavioral", value="behavioral"),
+                MetadataOption(label="biological", value="biological"),
+                MetadataOption(label="combination product", value="combination_product"),
+                MetadataOption(label="device", value="device"),
+                MetadataOption(label="diagnostic test", value="diagnostic_test"),
+                MetadataOption(label="dietary supplement", value="dietary_supplement"),
+                MetadataOption(label="drug", value="drug"),
+                MetadataOption(label="genetic", value="genetic"),
+                MetadataOption(label="cell", value="cell"),
+                MetadataOption(label="procedure", value="procedure"),
+                MetadataOption(label="radiation", value="radiation"),
+                MetadataOption(label="other", value="other"),
+            ],
+        ),
+    ),
+    "overnight_stay": ProcessorDefinition(
+        import_path="clinicaltrials.overnight_stay:OvernightStay",
+        metadata=Metadata(
+            id="overnight_stay",
+            name="Trial involves overnight stay",
+            feature_type="yesno",
+            options=[
+                MetadataOption(label="no", value=0),
+                MetadataOption(label="yes", value=1),
+            ],
+        ),
+    ),
+    "human_challenge": ProcessorDefinition(
+        import_path="clinicaltrials.human_challenge:HumanChallenge",
+        metadata=Metadata(
+            id="human_challenge",
+            name="Healthy",
+            feature_type="yesno",
+            options=[
+                MetadataOption(label="no", value=0),
+                MetadataOption(label="yes", value=1),
+            ],
+        ),
+    ),
+    "regimen_duration": ProcessorDefinition(
+        import_path="clinicaltrials.regimen_duration:RegimenDuration",
+        metadata=Metadata(
+            id="regimen_duration",
+            name="Regimen duration is open",
+            feature_type="multiple_numeric",
+            has_multiple_predictions=True,
+        ),
+    ),
+    "master_protocol": ProcessorDefinition(
+        import_path="clinicaltrials.master_protocol:MasterProtocol",
+        metadata=Metadata(
+            id="master_protocol",
+            name="Trial is a master protocol or a subset or derivative of a master protocol",
+            feature_type="yesno",
+            options=[
+                MetadataOption(label="no", value=0),
+                MetadataOption(label="yes", value=1),
+            ],
+        ),
+    ),
+    "platform_trial": ProcessorDefinition(
+        import_path="clinicaltrials.platform_trial:PlatformTrial",
+        metadata=Metadata(
+            id="master_protocol",
+            name="Trial is part of a platform trial",
+            feature_type="yesno",
+            options=[
+                MetadataOption(label="no", value=0),
+                MetadataOption(label="yes", value=1),
+            ],
+        ),
+    ),
+}
@@ -1,4 +1,3 @@
-import bz2
 import json
 import pickle as pkl
 import re
@@ -7,11 +6,15 @@ from collections import Counter
 import numpy as np
 import pandas as pd
 import spacy
-from spacy.matcher import Matcher
 
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, Page
+from clinicaltrials import model_store
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
 from clinicaltrials.country.demonym_finder import demonym_to_country_code
+from clinicaltrials.document_context import TokenisationMode
 from clinicaltrials.logs_collector import LogsCollector
+from clinicaltrials.matcher_cache import LazyMatcher
+from clinicaltrials.numeric_mentions import NumberVocabulary, NumericMentions
+from clinicaltrials.proximity import nearest_distance, sorted_positions
 from clinicaltrials.resources import nlp
 
 
@@ -112,12 +115,13 @@ FEATURE_NAMES.append("last_page_no")
 FEATURE_NAMES.append("num_occurrences")
 FEATURE_NAMES.append("magnitude")
 
-matcher = Matcher(nlp.vocab)
+matcher = LazyMatcher(name="sample_size")
 
-num_regex = re.compile(r"(?i)^(?:[1-9]\d*,?\d+|\d|twenty|thirty|forty|fifty|sixty|seventy|eighty|ninety)$")
-
-num_lookup = {"twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60, "seventy": 70, "eighty": 80,
-              "ninety": 90}
+# * Digits with at most one comma, which may be misplaced as in "12,34", and the decade number words
+number_vocabulary = NumberVocabulary(
+    word_numbers={"twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90},
+    digits_regex=re.compile(r"^(?:[1-9]\d*,?\d+|\d)$"),
+)
 
 ABSOLUTE_MINIMUM = 8
 ABSOLUTE_MAXIMUM = 1000000
@@ -150,7 +154,7 @@ for feature_name, feature_patterns in patterns.items():
 # Exclude things that are clearly not sample size, e.g. 50 ml
 # We must be careful with the negative matcher as this is very hard to debug.
 # Anything excluded with this pattern is excluded right at the beginning of the process. So SI units are a good example as they give us 100% confidence it's not the sample size under discussion.
-negative_matcher = Matcher(nlp.vocab)
+negative_matcher = LazyMatcher(name="sample_size_negative")
 negative_patterns = []
 negative_patterns.append([{"LIKE_NUM": True}, {"LOWER": {
     "IN": ["fold", "gy", "cycles", "doses", "mci", "ci", "mg", "kg", "ml", "l", "g", "kg", "mg", "s", "days", "months",
@@ -242,7 +246,7 @@ negative_patterns.append([{"LOWER": {
 negative_matcher.add("MASK", negative_patterns)
 
 
-def extract_features(tokenised_pages: list):
+def extract_features(tokenised_pages: list, numeric_mentions: NumericMentions):
     annotations = []
     features = {}
     num_subjects_to_pages = {}
@@ -291,12 +295,10 @@ def extract_features(tokenised_pages: list):
 
         for token_idx in range(phrase_match[1], phrase_match[2]):
             page_no, token_no, token = all_tokens[token_idx]
-            if num_regex.match(token.text):
+            parsed = numeric_mentions.value_at(token_idx=token_idx, vocabulary=number_vocabulary)
+            if parsed is not None:
                 value = re.sub(r",", "", token.text)
 
-                parsed = num_lookup.get(value.lower())
-                if not parsed:
-                    parsed = int(value)
                 if parsed < ABSOLUTE_MINIMUM or parsed > ABSOLUTE_MAXIMUM:
                     value = None
                     continue
@@ -338,19 +340,15 @@ def extract_features(tokenised_pages: list):
                  "end_char": match_end_char, "text": match_text,
                  "value": {"sample_size": value}})
 
+    distance_feature_positions = {distance_feature: sorted_positions(token_indexes.get(distance_feature, set())) for distance_feature in patterns_without_number}
     for candidate in features:
+        candidate_positions = sorted_positions(token_indexes[candidate])
         for distance_feature in patterns_without_number:
-            min_dist = -1
-            for i in token_indexes[candidate]:
-                for j in token_indexes.get(distance_feature, set()):
-                    if min_dist == -1 or abs(i - j) < min_dist:
-                        min_dist = abs(i - j)
-            if min_dist == -1 or min_dist > 1000:
+            min_dist = nearest_distance(positions=distance_feature_positions[distance_feature], targets=candidate_positions)
+            if min_dist is None or min_dist > 1000:
                 min_dist = 1000
             features[candidate][distance_feature] = min_dist
-        n = num_lookup.get(candidate.lower())
-        if not n:
-            n = int(re.sub(r"\D.+$", "", candidate))
+        n = number_vocabulary.parse(candidate)
         features[candidate]["magnitude"] = min(n, 50)
 
     candidates = []
@@ -371,16 +369,16 @@ def extract_features(tokenised_pages: list):
 
 
 class SampleSize(BaseProcessor):
+    is_high_value = True
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
 
-        self.model = None
+        # * The classifiers were trained on the unnormalised page tokenisation
+        self.tokenisation: TokenisationMode = "compatible"
 
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(id="sample_size", name="Number of subjects", feature_type="numeric",
-                        default_weights={"cost": 0.0, "risk": 0.0}, is_tertile=True
-                        )
+    def load_models(self, config: ClassifierConfig | None = None) -> None:
+        model_store.get_model("sample_size", config=config or self.config)
 
     def process(self, document: Document, config: ClassifierConfig | None = None):
         """
@@ -404,18 +402,34 @@ class SampleSize(BaseProcessor):
         :return: The prediction (int) and a map from numbers to the pages it's mentioned in.
         """
 
-        logs_collector = LogsCollector()
-        config = self.get_classifier_config_or_default(config=config)
+        return self.process_batch(documents=[document], config=config)[0]
 
-        path_to_classifier = config.path_to_classifier
+    def process_batch(self, documents: list[Document], config: ClassifierConfig | None = None) -> list[dict]:
+        """
+        Identify the number of subjects of several documents. The candidate features of all documents are stacked so
+        that the classifier runs once for the whole batch.
+        """
 
-        if not self.model:
-            with bz2.open(path_to_classifier, "rb") as f:
-                self.model = pkl.load(f)
+        model = model_store.get_model("sample_size", config=config or self.config)
 
-        tokenised_pages = [list(nlp(page.content)) for page in document.pages]
+        features = [
+            extract_features(document.context.get_docs(tokenisation=self.tokenisation), document.context.get_numeric_mentions(tokenisation=self.tokenisation))
+            for document in documents
+        ]
 
-        df_instances, num_subjects_to_pages, contexts, annotations = extract_features(tokenised_pages)
+        candidate_features = [df_instances[FEATURE_NAMES] for df_instances, _, _, _ in features if len(df_instances) > 0]
+        all_probas = model.predict_proba(pd.concat(candidate_features))[:, 1] if candidate_features else np.zeros(0)
+
+        results = []
+        offset = 0
+        for df_instances, num_subjects_to_pages, contexts, annotations in features:
+            results.append(self.__make_result(df_instances, num_subjects_to_pages, contexts, annotations, probas=all_probas[offset:offset + len(df_instances)]))
+            offset += len(df_instances)
+
+        return results
+
+    def __make_result(self, df_instances: pd.DataFrame, num_subjects_to_pages: dict, contexts: dict, annotations: list, probas: np.ndarray) -> dict:
+        logs_collector = LogsCollector()
 
         if len(df_instances) == 0:
             return {"prediction": 0, "pages": {}, "context": [],
@@ -423,7 +437,6 @@ class SampleSize(BaseProcessor):
 
         logs_collector.add("Searching for a number of subjects...")
 
-        probas = self.model.predict_proba(df_instances[FEATURE_NAMES])[:, 1]
         winning_index = np.argmax(probas)
         score = np.max(probas)
 
@@ -461,9 +474,7 @@ class SampleSize(BaseProcessor):
             if "per arm" in v or "in each arm" in v or "per cohort" in v or "in each cohort" in v or "per group" in v or "in each group" in v or "in each of the cohorts" in v or "in each of the arms" in v:
                 is_per_arm.append(k)
 
-        int_prediction = num_lookup.get(num_subjects.lower(), None)
-        if not int_prediction:
-            int_prediction = int(num_subjects)
+        int_prediction = number_vocabulary.parse(num_subjects)
 
         logs_collector.add(f"It looks like the trial has {int_prediction} participants.")
 
@@ -1,47 +1,35 @@
 import json
 import traceback
 
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, MetadataOption, Page
+from clinicaltrials import model_store
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
+from clinicaltrials.document_context import TokenisationMode
 from clinicaltrials.logs_collector import LogsCollector
-from clinicaltrials.resources import nlp
-from clinicaltrials.sap.sap_extractor import SapExtractor
-from clinicaltrials.sap.sap_extractor_document_level_naive_bayes import SapExtractorDocumentLevel
 
 
 class Sap(BaseProcessor):
+    is_high_value = True
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
-        self.sap_extractor_document_level = None
-        self.sap_extractor = None
 
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(
-            id="sap",
-            name="Protocol has Statistical Analysis Plan",
-            feature_type="yesno",
-            default_weights={"cost": 0.0, "risk": 26.0},
-            options=[
-                MetadataOption(label="no", value=0),
-                MetadataOption(label="yes", value=1),
-            ],
-        )
+        # * The classifiers were trained on the unnormalised page tokenisation
+        self.tokenisation: TokenisationMode = "compatible"
+
+    def load_models(self, config: ClassifierConfig | None = None) -> None:
+        for model_name in ("sap", "sap_document_level"):
+            model_store.get_model(model_name, config=config or self.config)
 
     def process(self, document: Document, config: ClassifierConfig | None = None):
         logs_collector = LogsCollector()
-        config = self.get_classifier_config_or_default(config=config)
-
-        path_to_classifier = config.path_to_classifier
-
-        if not self.sap_extractor_document_level:
-            self.sap_extractor_document_level = SapExtractorDocumentLevel(f"{path_to_classifier}/sap_classifier_document_level.pkl.bz2")
+        sap_extractor = model_store.get_model("sap", config=config or self.config)
+        sap_extractor_document_level = model_store.get_model("sap_document_level", config=config or self.config)
 
-            self.sap_extractor = SapExtractor(f"{path_to_classifier}/sap_classifier.pkl.bz2")
-        tokenised_pages = [list(nlp(page.content)) for page in document.pages]
+        token_arrays = document.context.get_token_arrays(tokenisation=self.tokenisation)
 
         logs_collector.add("Searching for a statistical analysis plan...")
         try:
-            sap_to_pages = self.sap_extractor.process(tokenised_pages)
+            sap_to_pages = sap_extractor.process(token_arrays, document.context.get_token_index(attribute="lower", tokenisation=self.tokenisation))
             if sap_to_pages["prediction"] == 1:
                 logs_collector.add("It looks like the authors have included their statistical analysis plan in the protocol.")
             elif sap_to_pages["prediction"] == -1:
@@ -50,7 +38,7 @@ class Sap(BaseProcessor):
                 logs_collector.add("It does not look like the protocol contains a statistical analysis plan.")
 
             logs_collector.add("Testing top pages for SAP with document level SAP Naive Bayes model to refine SAP prediction.")
-            sap_to_pages_document_level = self.sap_extractor_document_level.process(tokenised_pages)
+            sap_to_pages_document_level = sap_extractor_document_level.process(token_arrays)
             logs_collector.add(
                 "Document level Naive Bayes model found SAP score " + str(sap_to_pages_document_level["prediction"]) + " with score " + str(sap_to_pages_document_level["score"])
             )
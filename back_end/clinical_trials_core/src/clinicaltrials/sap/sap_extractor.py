@@ -4,6 +4,10 @@ from os.path import exists
 
 import numpy as np
 
+from clinicaltrials.informative_terms import get_term_scores
+from clinicaltrials.resources import nlp
+from clinicaltrials.token_features import TokenArrays, TokenIndex, get_term_index
+
 
 # Shared between training and inference code
 def derive_feature(f):
@@ -25,11 +29,12 @@ class SapExtractor:
 
         self.vocabulary = {v: k for k, v in self.vectoriser.vocabulary_.items()}
 
-    def process(self, tokenised_pages: list) -> tuple:
+    def process(self, token_arrays: TokenArrays, token_index: TokenIndex) -> tuple:
         """
         Identify whether the trial has a completed SAP.
 
-        :param tokenised_pages: List of lists of tokens of each page.
+        :param token_arrays: Token arrays of the document.
+        :param token_index: Index of the lowercase tokens of the document, from the same tokenisation as `token_arrays`.
         :return: The prediction (str) and a map from condition to the pages it's mentioned in.
         """
 
@@ -37,19 +42,13 @@ class SapExtractor:
             print("Warning! SAP classifier not loaded.")
             return {"prediction": -1}
 
-        page_to_probas = []
-
-        for tokens in tokenised_pages:
-            token_counts = np.zeros((1, len(self.vectoriser.vocabulary_)))
-            for token in tokens:
-                token_lower = token.text.lower()
-                if token_lower in self.vectoriser.vocabulary_:
-                    token_counts[0, self.vectoriser.vocabulary_[token_lower]] += 1
+        term_index = get_term_index(self.vectoriser)
 
-            transformed_document = self.transformer.transform(token_counts)
-
-            prediction_probas = self.nb.predict_proba(transformed_document)[0]
-            page_to_probas.append(float(prediction_probas[1]))
+        # * The token counts of every page, one row per page, are classified at once
+        page_to_probas = []
+        if token_arrays.num_pages > 0:
+            page_token_counts = term_index.count(hash_ids=token_arrays.lower, rows=token_arrays.page, num_rows=token_arrays.num_pages)
+            page_to_probas = [float(prediction_probas[1]) for prediction_probas in self.nb.predict_proba(self.transformer.transform(page_token_counts))]
 
         """
         import pandas as pd
@@ -79,23 +78,12 @@ class SapExtractor:
         # Make a pseudo-document of these candidate SAP pages only and run it through the classifier.
         top_quartile_probas = np.quantile(page_to_probas, 0.75)
 
-        token_counts = np.zeros((1, len(self.vectoriser.vocabulary_)))
-
-        for page_no, tokens in enumerate(tokenised_pages):
-            if page_to_probas[page_no] >= top_quartile_probas:
-                for token in tokens:
-                    token_lower = token.text.lower()
-                    if token_lower in self.vectoriser.vocabulary_:
-                        token_counts[0, self.vectoriser.vocabulary_[token_lower]] += 1
+        is_top_quartile_page = np.asarray(page_to_probas) >= top_quartile_probas
+        token_counts = term_index.count(hash_ids=token_arrays.lower[is_top_quartile_page[token_arrays.page]])
 
         transformed_document = self.transformer.transform(token_counts)
 
-        probas = np.zeros((transformed_document.shape[1]))
-        for i in range(transformed_document.shape[1]):
-            zeros = np.zeros(transformed_document.shape)
-            zeros[0, i] = transformed_document[0, i]
-            proba = self.nb.predict_log_proba(zeros)
-            probas[i] = proba[0, 1]
+        probas = get_term_scores(nb=self.nb, transformed_document=transformed_document, class_idx=1)
 
         sap_to_pages = {}
         for vocab_idx in np.argsort(-probas):
@@ -103,10 +91,8 @@ class SapExtractor:
             if len(sap_to_pages) > 20:
                 break
 
-        for page_no, tokens in enumerate(tokenised_pages):
-            for token in tokens:
-                if token.text.lower() in sap_to_pages:
-                    sap_to_pages[token.text.lower()].append(page_no)
+        for token_idx in token_index.find(list(sap_to_pages)):
+            sap_to_pages[nlp.vocab.strings[int(token_arrays.lower[token_idx])]].append(int(token_arrays.page[token_idx]))
 
         # prediction_idx = int(np.argmax(prediction_probas))
         #
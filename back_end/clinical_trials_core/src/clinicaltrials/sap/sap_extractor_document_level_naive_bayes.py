@@ -2,7 +2,7 @@ import bz2
 import pickle as pkl
 from os.path import exists
 
-import numpy as np
+from clinicaltrials.token_features import TokenArrays, get_term_index
 
 # Best model: Model 3
 
@@ -23,23 +23,18 @@ class SapExtractorDocumentLevel:
 
         self.vocabulary = {v: k for k, v in self.vectoriser.vocabulary_.items()}
 
-    def process(self, tokenised_pages: list) -> tuple:
+    def process(self, token_arrays: TokenArrays) -> tuple:
         """
         Identify whether the trial has a SAP.
 
-        :param tokenised_pages: List of lists of tokens of each page.
+        :param token_arrays: Token arrays of the document.
         :return: The prediction (str) and a map from condition to the pages it's mentioned in.
         """
         if self.model is None:
             print("Warning! SAP document level classifier not loaded.")
             return {"prediction": "Error"}
 
-        token_counts = np.zeros((1, len(self.vectoriser.vocabulary_)))
-        for page_no, tokens in enumerate(tokenised_pages):
-            for token_idx, token in enumerate(tokens):
-                token_lower = token.text.lower()
-                if token_lower in self.vectoriser.vocabulary_:
-                    token_counts[0, self.vectoriser.vocabulary_[token_lower]] += 1
+        token_counts = get_term_index(self.vectoriser).count(hash_ids=token_arrays.lower)
         transformed_document = self.transformer.transform(token_counts)
         prediction_proba = self.nb.predict_proba(transformed_document)[0][1]
 
@@ -0,0 +1,63 @@
+"""
+schedule_of_events.py
+
+Cheap text based detector of the pages that may hold a Schedule of Events table. Extracting the tables of a page with
+pdfplumber takes far longer than reading its text, and only the Schedule of Events processors use the tables, so the
+tables are only extracted from the pages picked here, see the `table_cells` product.
+
+A page is picked if its text has a row of tick marks ("X", "✓", "×", as the `table_cells` product normalises them), a
+header row of visits, days, weeks or months followed by their numbers, e.g. "Visit: 1 2 3 4" or "Day: D0 D7 D14", or a
+title such as "Schedule of Assessments".
+
+Usage:
+    from clinicaltrials.schedule_of_events import find_schedule_of_events_pages
+    page_indices = find_schedule_of_events_pages(page_contents=[page.content for page in document.pages])
+"""
+
+import re
+
+# * A tick mark with an optional footnote number, e.g. "X10", as a word of its own
+tick_mark_regex = re.compile(r"(?<!\S)[Xx✓✔×]\d{0,2}(?!\S)")
+
+visit_header_regex = re.compile(
+    r"^[ \t]*(?:visits?|days?|weeks?|months?|study (?:day|week)s?)\b[ \t]*[:.]?(?:[ \t]+(?:[A-Za-z]{1,2}[ \t]?)?-?\d+(?:\.\d+)?\b){3,}",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+title_regex = re.compile(r"\b(?:schedule|table|flow ?chart) of (?:study )?(?:events|assessments|activities|procedures|visits)\b", re.IGNORECASE)
+
+# * Tick marks on a line, or on a page when the text of each cell is on a line of its own, that make a row of a table
+MIN_TICK_MARKS_PER_LINE = 2
+MIN_TICK_MARKS_PER_PAGE = 4
+
+
+def is_schedule_of_events_page(content: str) -> bool:
+    """
+    Whether the text of a page looks like it holds a Schedule of Events table.
+    """
+
+    if not content:
+        return False
+
+    if title_regex.search(content) is not None or visit_header_regex.search(content) is not None:
+        return True
+
+    num_tick_marks = 0
+    for line in content.splitlines():
+        num_line_tick_marks = len(tick_mark_regex.findall(line))
+        if num_line_tick_marks >= MIN_TICK_MARKS_PER_LINE:
+            return True
+        num_tick_marks += num_line_tick_marks
+
+    return num_tick_marks >= MIN_TICK_MARKS_PER_PAGE
+
+
+def find_schedule_of_events_pages(page_contents: list[str]) -> list[int]:
+    """
+    Indices of the pages that may hold a Schedule of Events table.
+
+    :param page_contents: Text of each page.
+    :return: Indices of the candidate pages, in page order.
+    """
+
+    return [page_idx for page_idx, content in enumerate(page_contents) if is_schedule_of_events_page(content)]
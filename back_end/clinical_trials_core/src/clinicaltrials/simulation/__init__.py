@@ -1,11 +1,14 @@
-import bz2
 import json
-import pickle as pkl
 
+import numpy as np
 import pandas as pd
 
-from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Metadata, Page, MetadataOption
+from clinicaltrials import model_store
+from clinicaltrials.core import BaseProcessor, ClassifierConfig, Document, Page
 from clinicaltrials.logs_collector import LogsCollector
+from clinicaltrials.proximity import nearest_pair
+from clinicaltrials.resources import nlp
+from clinicaltrials.token_features import TokenArrays, TokenIndex
 
 FEATURE_NAMES = ["simulate-power", "scenarios-power", "simulate-sample", "scenarios-sample", "simulate-sample size", "scenarios-sample size"]
 
@@ -16,7 +19,7 @@ def iterate_tokens(tokenised_pages):
             yield page_no, token_no, token
 
 
-def extract_features(docs):
+def extract_features(docs: list, token_arrays: TokenArrays, token_index: TokenIndex):
     key_words = [
         ["simulate", "simulates", "simulated", "simulating", "simulation", "simulations"],
         ["scenarios"],
@@ -25,33 +28,24 @@ def extract_features(docs):
         ["sample size", ("sample", "size"), ("sample", "sizes")],
     ]
 
-    page_and_token_idx_to_token_idx_in_whole_pdf = {}
-    token_idx_in_whole_pdf = 0
-    all_tokens = []
-    for page_no, doc in enumerate(docs):
-        for token in doc:
-            page_and_token_idx_to_token_idx_in_whole_pdf[(page_no, token.i)] = token_idx_in_whole_pdf
-            token_idx_in_whole_pdf += 1
-            all_tokens.append((page_no, token.i, token))
-
     annotations = []
-    token_indexes = {}
+    positions = {}
     simulation_to_pages = {}
     for key_word_list in key_words:
         canonical = key_word_list[0]
-        synonyms = set(key_word_list)
-        token_indexes[canonical] = set()
-        simulation_to_pages[canonical] = []
-        for page_no, doc in enumerate(docs):
-            for token in doc:
-                if token.norm_ in synonyms:
-                    token_idx_in_whole_pdf = page_and_token_idx_to_token_idx_in_whole_pdf[(page_no, token.i)]
-                    token_indexes[canonical].add(token_idx_in_whole_pdf)
-                    simulation_to_pages[canonical].append(page_no)
-                if type(key_word_list[-1]) is tuple and token.i < len(doc) - 1 and (token.norm_, doc[token.i + 1].norm_) in synonyms:
-                    token_idx_in_whole_pdf = page_and_token_idx_to_token_idx_in_whole_pdf[(page_no, token.i)]
-                    token_indexes[canonical].add(token_idx_in_whole_pdf)
-                    simulation_to_pages[canonical].append(page_no)
+        keyword_positions = [token_index.find([key_word for key_word in key_word_list if type(key_word) is str])]
+        # * Two word synonyms are looked up by their first word, which must be followed by the second on the same page
+        for first_word, second_word in [key_word for key_word in key_word_list if type(key_word) is tuple]:
+            first_positions = token_index.find([first_word])
+            first_positions = first_positions[first_positions < len(token_arrays) - 1]
+            is_followed = (token_arrays.norm[first_positions + 1] == np.uint64(nlp.vocab.strings[second_word])) & (
+                token_arrays.page[first_positions + 1] == token_arrays.page[first_positions]
+            )
+            keyword_positions.append(first_positions[is_followed])
+        keyword_positions = np.sort(np.concatenate(keyword_positions), kind="stable")
+
+        positions[canonical] = np.unique(keyword_positions)
+        simulation_to_pages[canonical] = token_arrays.page[keyword_positions].tolist()
 
     feat = []
 
@@ -62,15 +56,11 @@ def extract_features(docs):
     for feature in FEATURE_NAMES:
         feat1, feat2 = feature.split("-")
 
-        min_dist = -1
-        winning_i = None
-        winning_j = None
-        for i in token_indexes[feat1]:
-            for j in token_indexes[feat2]:
-                if min_dist == -1 or abs(i - j) < min_dist:
-                    min_dist = abs(i - j)
-                    winning_i = i
-                    winning_j = j
+        nearest = nearest_pair(positions=positions[feat2], targets=positions[feat1])
+        if nearest is None:
+            min_dist = -1
+        else:
+            min_dist, winning_i, winning_j = nearest
 
         if min_dist == -1 or min_dist > 1000:
             min_dist = 1000
@@ -78,13 +68,15 @@ def extract_features(docs):
         else:
             orig_start_context = min([winning_i, winning_j])
             orig_end_context = max([winning_i, winning_j])
-            page_no = all_tokens[winning_i][0]
+            page_no = int(token_arrays.page[winning_i])
             contexts[f"Occurrence of “{feat1}” within {min_dist} tokens from “{feat2}”"] = f"Page {page_no + 1}: "
 
-            match_start_char = all_tokens[winning_i][2].idx - 50
+            match_start_char = int(token_arrays.idx[winning_i]) - 50
             if match_start_char < 0:
                 match_start_char = 0
             match_end_char = match_start_char + 50
+            # * The snippet has always been cut from the text of the last page
+            doc = docs[-1]
             if match_end_char > len(doc.text) - 1:
                 match_end_char = len(doc.text) - 1
             match_text = doc.text[match_start_char:match_end_char]
@@ -97,21 +89,13 @@ def extract_features(docs):
 
 
 class Simulation(BaseProcessor):
+    is_high_value = True
+
     def __init__(self) -> None:
         super().__init__(module_name=__class__.__name__)
-        self.model = None
-
-    @property
-    def metadata(self) -> Metadata:
-        return Metadata(
-            id="simulation",
-            name="Simulation",
-            feature_type="yesno",
-            options=[
-                MetadataOption(label="no", value=0),
-                MetadataOption(label="yes", value=1),
-            ],
-        )
+
+    def load_models(self, config: ClassifierConfig | None = None) -> None:
+        model_store.get_model("simulation", config=config or self.config)
 
     def process(self, document: Document, config: ClassifierConfig | None = None):
         """
@@ -121,11 +105,7 @@ class Simulation(BaseProcessor):
         """
 
         logs_collector = LogsCollector()
-        config = self.get_classifier_config_or_default(config=config)
-        path_to_classifier = config.path_to_classifier
-
-        with bz2.open(path_to_classifier, "rb") as f:
-            self.model = pkl.load(f)
+        model = model_store.get_model("simulation", config=config or self.config)
 
         # tokenised_pages = [list(nlp(page.content)) for page in document.pages]
         #
@@ -133,7 +113,9 @@ class Simulation(BaseProcessor):
         #
         # all_tokens = list(iterate_tokens(lc_tokenised_pages))
 
-        feat, simulation_to_pages, contexts, feature_pages, annotations = extract_features(document.tokenised_pages)
+        feat, simulation_to_pages, contexts, feature_pages, annotations = extract_features(
+            document.tokenised_pages, token_arrays=document.context.token_arrays, token_index=document.context.get_token_index(attribute="norm")
+        )
 
         logs_collector.add("Searching for any mentions of simulation...")
 
@@ -147,7 +129,7 @@ class Simulation(BaseProcessor):
                     lst.append(feat[feature_idx])
             df[feature_name] = lst
 
-        prediction_idx = self.model.predict(df.iloc[0:1])[0]
+        prediction_idx = model.predict(df.iloc[0:1])[0]
 
         if int(prediction_idx) == 1:
             logs_collector.add("The authors probably used simulation for sample size.")
@@ -156,7 +138,7 @@ class Simulation(BaseProcessor):
         else:
             logs_collector.add("It does not look like the authors used simulation for sample size.")
 
-        probabilities = [p[1] for p in self.model.predict_proba(df)]
+        probabilities = [p[1] for p in model.predict_proba(df)]
 
         probability_of_simulation = probabilities[0]
 
@@ -0,0 +1,58 @@
+"""
+textcat.py
+
+Inference with the spaCy text classifiers of Country, Phase and NumArms. Each classifier is a pipeline loaded from disk,
+of which only the textcat component is run, on Docs made from the tokens the processors already have, so that the
+pages are not tokenised again and no other component of the pipeline runs. Several Docs of one classifier are classified
+in batches with the `pipe` of the component. The scores are the same as those of running the pipeline on each text.
+
+The Docs are made in the vocab of the classifier rather than the shared vocab of `clinicaltrials.resources.nlp`, since
+the lexical features of the model, e.g. the norms, are looked up in its own vocab.
+
+Usage:
+    doc = make_doc(vocab=classifier_nlp.vocab, tokenised_pages=tokenised_pages[:10])
+    cats = predict_cats(nlp=classifier_nlp, docs=[doc])[0]
+"""
+
+from spacy.attrs import ORTH, SPACY
+from spacy.language import Language
+from spacy.tokens import Doc
+from spacy.vocab import Vocab
+
+TEXTCAT = "textcat"
+
+
+def make_doc(vocab: Vocab, tokenised_pages: list[Doc]) -> Doc:
+    """
+    One Doc of the tokens of several pages, with the trailing whitespace of each token, so that the pages are joined
+    as they were tokenised.
+
+    :param vocab: Vocab of the classifier.
+    :param tokenised_pages: Pages to join.
+    """
+
+    words = []
+    spaces = []
+    for page in tokenised_pages:
+        if len(page) == 0:
+            continue
+        attributes = page.to_array([ORTH, SPACY])
+        words.extend(page.vocab.strings[orth] for orth in attributes[:, 0].tolist())
+        spaces.extend(attributes[:, 1].astype(bool).tolist())
+
+    return Doc(vocab, words=words, spaces=spaces)
+
+
+def predict_cats(nlp: Language, docs: list[Doc], batch_size: int = 32) -> list[dict[str, float]]:
+    """
+    Category scores of Docs, running the textcat component of the pipeline only.
+
+    :param nlp: Textcat pipeline of the classifier.
+    :param docs: Docs in the vocab of the pipeline, e.g. from `make_doc` or `nlp.make_doc`.
+    :param batch_size: Number of Docs classified at a time.
+    :return: Scores of each category for each Doc.
+    """
+
+    textcat = nlp.get_pipe(TEXTCAT)
+
+    return [dict(doc.cats) for doc in textcat.pipe(docs, batch_size=batch_size)]
@@ -0,0 +1,186 @@
+"""
+token_features.py
+
+Token attributes of a document as contiguous NumPy arrays, so that the processors can count and look up tokens with
+vectorised operations instead of reading `token.norm_`, `token.text.lower()` or `token.idx` token by token in Python.
+Strings are represented by their spaCy hash ids, which are the keys of `nlp.vocab.strings`.
+
+`TermIndex` turns the tokens into the sparse document-term matrix of a vectoriser vocabulary, which the TF-IDF and Naive
+Bayes steps of the bag-of-words classifiers take as is. `TokenIndex` finds the occurrences of keywords without scanning the
+document.
+
+Usage:
+    arrays = document.context.token_arrays
+    term_index = get_term_index(vectoriser)
+    token_counts = term_index.count(hash_ids=arrays.norm)
+    positions = document.context.get_token_index(attribute="norm").find(["placebo", "placebos"])
+"""
+
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Iterable
+from weakref import WeakKeyDictionary
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from spacy.attrs import IDX, IS_PUNCT, LENGTH, LIKE_NUM, LOWER, NORM, ORTH
+from spacy.tokens import Doc
+
+from clinicaltrials.resources import nlp
+
+TOKEN_ATTRIBUTES = [ORTH, NORM, LOWER, LIKE_NUM, IS_PUNCT, IDX, LENGTH]
+
+
+@dataclass(frozen=True)
+class TokenArrays:
+    """
+    One entry per token of the flattened token stream, page after page. The arrays are shared by the processors and
+    must not be modified.
+    """
+
+    orth: np.ndarray  # * Hash id of the verbatim text
+    norm: np.ndarray  # * Hash id of `token.norm_`
+    lower: np.ndarray  # * Hash id of `token.lower_`, which is `token.text.lower()`
+    like_num: np.ndarray
+    is_punct: np.ndarray
+    idx: np.ndarray  # * Character offset of the token in its page
+    length: np.ndarray  # * Number of characters of the token
+    page: np.ndarray  # * Zero based page number
+    page_offsets: np.ndarray  # * Where each page starts, with the token count as trailing entry
+
+    @staticmethod
+    def from_docs(docs: list[Doc]) -> "TokenArrays":
+        """
+        Build the arrays from the tokenised pages of a document.
+        """
+
+        page_lengths = np.array([len(doc) for doc in docs], dtype=np.int64)
+        page_offsets = np.zeros(len(docs) + 1, dtype=np.int64)
+        np.cumsum(page_lengths, out=page_offsets[1:])
+
+        if page_offsets[-1] > 0:
+            attributes = np.concatenate([doc.to_array(TOKEN_ATTRIBUTES) for doc in docs if len(doc) > 0])
+        else:
+            attributes = np.zeros((0, len(TOKEN_ATTRIBUTES)), dtype=np.uint64)
+
+        return TokenArrays(
+            orth=attributes[:, 0],
+            norm=attributes[:, 1],
+            lower=attributes[:, 2],
+            like_num=attributes[:, 3].astype(bool),
+            is_punct=attributes[:, 4].astype(bool),
+            idx=attributes[:, 5].astype(np.int64),
+            length=attributes[:, 6].astype(np.int64),
+            page=np.repeat(np.arange(len(docs), dtype=np.int64), page_lengths),
+            page_offsets=page_offsets,
+        )
+
+    def __len__(self) -> int:
+        return len(self.orth)
+
+    @property
+    def num_pages(self) -> int:
+        return len(self.page_offsets) - 1
+
+    def text(self, token_idx: int) -> str:
+        """
+        Verbatim text of a token.
+        """
+
+        return nlp.vocab.strings[int(self.orth[token_idx])]
+
+
+class TermIndex:
+    """
+    Maps hash ids of tokens to the columns of a vocabulary, such as the `vocabulary_` of a fitted CountVectorizer.
+    """
+
+    def __init__(self, vocabulary: dict[str, int]) -> None:
+        hash_ids = np.array([nlp.vocab.strings[term] for term in vocabulary], dtype=np.uint64)
+        columns = np.array(list(vocabulary.values()), dtype=np.int64)
+
+        order = np.argsort(hash_ids)
+        self.__hash_ids = hash_ids[order]
+        self.__columns = columns[order]
+        self.num_terms = int(columns.max()) + 1 if len(columns) > 0 else 0
+
+    def lookup(self, hash_ids: np.ndarray) -> np.ndarray:
+        """
+        Column of each hash id, or -1 where the term is not in the vocabulary.
+        """
+
+        if len(self.__hash_ids) == 0:
+            return np.full(len(hash_ids), -1, dtype=np.int64)
+
+        positions = np.searchsorted(self.__hash_ids, hash_ids)
+        positions[positions == len(self.__hash_ids)] = 0
+        return np.where(self.__hash_ids[positions] == hash_ids, self.__columns[positions], -1)
+
+    def count(self, hash_ids: np.ndarray, rows: np.ndarray | None = None, num_rows: int = 1) -> csr_matrix:
+        """
+        Count the occurrences of the vocabulary terms, as the document-term matrix of a CountVectorizer.
+
+        :param hash_ids: Hash ids of the tokens.
+        :param rows: Row of the output that each token is counted in, e.g. its page. All tokens are counted in row 0 if None.
+        :param num_rows: Number of rows of the output.
+        :return: Float CSR matrix of shape (num_rows, num_terms).
+        """
+
+        columns = self.lookup(hash_ids=hash_ids)
+        in_vocabulary = columns >= 0
+        columns = columns[in_vocabulary]
+        rows = rows[in_vocabulary] if rows is not None else np.zeros(len(columns), dtype=np.int64)
+
+        # * Duplicate cells are summed when the matrix is converted to CSR
+        return csr_matrix((np.ones(len(columns), dtype=np.float64), (rows, columns)), shape=(num_rows, self.num_terms))
+
+
+# * Term indexes of the vectorisers loaded, released with their vectoriser
+_term_indexes: WeakKeyDictionary = WeakKeyDictionary()
+_term_indexes_lock = Lock()
+
+
+def get_term_index(vectoriser: Any) -> TermIndex:
+    """
+    Term index of the vocabulary of a fitted vectoriser, built once per vectoriser.
+    """
+
+    with _term_indexes_lock:
+        term_index = _term_indexes.get(vectoriser)
+        if term_index is None:
+            term_index = TermIndex(vocabulary=vectoriser.vocabulary_)
+            _term_indexes[vectoriser] = term_index
+
+    return term_index
+
+
+class TokenIndex:
+    """
+    Inverted index of one token attribute: for every distinct hash id, the sorted positions of its tokens in the
+    flattened token stream. The processors look up the occurrences of their keywords here, in time proportional to the
+    number of occurrences rather than to the length of the document.
+    """
+
+    def __init__(self, hash_ids: np.ndarray) -> None:
+        order = np.argsort(hash_ids, kind="stable")
+        self.__hash_ids, starts = np.unique(hash_ids[order], return_index=True)
+        self.__starts = np.append(starts, len(order))
+        self.__positions = order
+
+    def find(self, terms: Iterable[str]) -> np.ndarray:
+        """
+        Positions of the tokens whose attribute is one of the terms, in token order.
+        """
+
+        positions = []
+        for term_hash_id in {np.uint64(nlp.vocab.strings[term]) for term in terms}:
+            term_idx = int(np.searchsorted(self.__hash_ids, term_hash_id))
+            if term_idx < len(self.__hash_ids) and self.__hash_ids[term_idx] == term_hash_id:
+                positions.append(self.__positions[self.__starts[term_idx]:self.__starts[term_idx + 1]])
+
+        if len(positions) == 0:
+            return np.zeros(0, dtype=np.int64)
+        if len(positions) == 1:
+            return positions[0]
+
+        return np.sort(np.concatenate(positions))
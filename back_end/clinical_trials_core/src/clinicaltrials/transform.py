@@ -1,7 +1,7 @@
 from typing import Any
 
 from clinicaltrials.constants import LMIC_COUNTRIES
-from clinicaltrials.core import Metadata
+from clinicaltrials.metadata import Metadata
 from clinicaltrials.enums import TrialRiskLevel, TrialSize
 from clinicaltrials.schemas import CTNode, WeightProfileBase
 from clinicaltrials.utils import find_matching_tertile_by_priority, list_has_2_items_or_more, list_has_1_item_or_more
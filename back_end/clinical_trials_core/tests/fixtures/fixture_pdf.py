@@ -0,0 +1,32 @@
+"""
+Minimal PDFs built in memory, for the tests of the table extraction.
+"""
+
+
+def make_pdf(pages: list[tuple[list[str], list[list[str]]]]) -> bytes:
+    # * Minimal PDF: the lines of text of each page, and a table drawn as a grid of ruling lines under them
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", "", "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for lines, table in pages:
+        commands = [f"BT /F1 10 Tf 50 {780 - 14 * idx} Td ({line}) Tj ET" for idx, line in enumerate(lines)]
+        top = 760 - 14 * len(lines)
+        for row_idx, row in enumerate(table):
+            for col_idx, cell in enumerate(row):
+                x, y = 50 + 90 * col_idx, top - 20 * (row_idx + 1)
+                commands.append(f"{x} {y} 90 20 re S BT /F1 10 Tf {x + 5} {y + 6} Td ({cell}) Tj ET")
+        stream = "\n".join(commands)
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {len(objects)} 0 R /Resources << /Font << /F1 3 0 R >> >> >>")
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{page_id} 0 R' for page_id in page_ids)}] /Count {len(page_ids)} >>"
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for idx, obj in enumerate(objects):
+        offsets.append(len(pdf))
+        pdf += f"{idx + 1} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref_offset = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    pdf += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("latin-1")
+    return pdf
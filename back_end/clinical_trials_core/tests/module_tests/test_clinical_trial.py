@@ -0,0 +1,430 @@
+import sys
+
+sys.path.append("..")
+sys.path.append("../src/")
+
+import os
+import tempfile
+import time
+import unittest
+from dataclasses import replace
+from os import cpu_count
+
+from clinicaltrials import model_store
+from clinicaltrials.biobank import Biobank
+from clinicaltrials.core import CancellationToken, ClinicalTrial, Document, Page, RunCancelledError
+from clinicaltrials.design import Design
+from clinicaltrials.products import PRODUCTS
+
+
+def make_document() -> Document:
+    return Document(
+        pages=[
+            Page(
+                content="A Phase II randomised, double-blind, placebo-controlled trial of drug X in 120 healthy adult volunteers aged 18 to 45 years in Kenya.",
+                page_number=1,
+            ),
+            Page(
+                content="Participants will be randomised 1:1 to two arms and followed up for 12 months. The sample size of 120 participants gives 80% power.",
+                page_number=2,
+            ),
+        ]
+    )
+
+
+# * Modules backed by a downloaded classifier, left out where only the rule based matchers are exercised
+MODEL_MODULES = [
+    "age", "child", "condition", "country", "drug", "duration", "effect_estimate", "gender", "healthy",
+    "intervention_type", "num_arms", "phase", "placebo", "sample_size", "sap", "simulation", "vaccine",
+]
+
+
+class TestClinicalTrial(unittest.TestCase):
+    def test_processors_are_reused(self):
+        ct = ClinicalTrial()
+        self.assertIs(ct.get_module("placebo"), ct.get_module("placebo"))
+
+    def test_processors_have_own_config(self):
+        ct = ClinicalTrial()
+        self.assertIsNot(ct.get_module("placebo").config, ct.get_module("drug").config)
+
+    def test_warm_latency(self):
+        # * Record every model load, the store keeps the loaded models for every ClinicalTrial of the process
+        model_store.unload_models()
+        loaded_models = []
+        model_definitions = dict(model_store.MODEL_DEFINITIONS)
+        for name, definition in model_definitions.items():
+            model_store.MODEL_DEFINITIONS[name] = replace(
+                definition, loader=lambda path_to_classifier, name=name, loader=definition.loader: loaded_models.append(name) or loader(path_to_classifier)
+            )
+
+        try:
+            # * Before: a fresh set of processors per document, so every document loads every model again
+            start_time = time.time()
+            cold_result = ClinicalTrial().run_all(document=make_document())
+            cold_time = time.time() - start_time
+            num_cold_loads = len(loaded_models)
+
+            ct = ClinicalTrial()
+            ct.warm_up()
+
+            # * After: the long-lived processors only run inference
+            start_time = time.time()
+            warm_result = ct.run_all(document=make_document())
+            warm_time = time.time() - start_time
+        finally:
+            model_store.MODEL_DEFINITIONS.update(model_definitions)
+
+        print(f"Per document latency: {cold_time:.3f}s -> {warm_time:.3f}s")
+
+        self.assertEqual(set(cold_result.keys()), set(warm_result.keys()))
+        self.assertLess(0, num_cold_loads)
+        self.assertEqual(sorted(set(loaded_models)), sorted(loaded_models))
+        self.assertEqual(num_cold_loads, len(loaded_models))
+
+
+class TestExecutionModes(unittest.TestCase):
+    def setUp(self):
+        self.ct = ClinicalTrial()
+
+    def tearDown(self):
+        self.ct.shutdown()
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            self.ct.run_all(document=make_document(), execution_mode="gpu")
+
+    def test_modes_give_same_result(self):
+        serial_result = self.ct.run_all(document=make_document(), exclude_modules=MODEL_MODULES, execution_mode="serial")
+        threads_result = self.ct.run_all(document=make_document(), exclude_modules=MODEL_MODULES, execution_mode="threads")
+        processes_result = self.ct.run_all(document=make_document(), exclude_modules=MODEL_MODULES, execution_mode="processes", max_workers=2)
+
+        self.assertEqual(serial_result, threads_result)
+        self.assertEqual(serial_result, processes_result)
+        self.assertEqual(list(serial_result.keys()), list(processes_result.keys()))
+
+    def test_progress_reaches_all_modules(self):
+        progress = []
+        self.ct.event.subscribe(lambda event_data: progress.append(event_data.data) if event_data.type == "completion_progress" else None)
+        self.ct.run_all(document=make_document(), exclude_modules=MODEL_MODULES, execution_mode="processes", max_workers=2)
+
+        self.assertEqual(len(self.ct.modules) - len(MODEL_MODULES), len(progress))
+
+    def test_speedup_against_core_count(self):
+        pages = make_document().pages * 50
+
+        start_time = time.time()
+        serial_result = self.ct.run_all(document=Document(pages=pages), exclude_modules=MODEL_MODULES, execution_mode="serial")
+        serial_time = time.time() - start_time
+
+        num_workers = 1
+        while num_workers <= (cpu_count() or 1):
+            # * The first run forks the pool, time the second one
+            self.ct.run_all(document=Document(pages=pages[:2]), exclude_modules=MODEL_MODULES, execution_mode="processes", max_workers=num_workers)
+
+            start_time = time.time()
+            processes_result = self.ct.run_all(document=Document(pages=pages), exclude_modules=MODEL_MODULES, execution_mode="processes", max_workers=num_workers)
+            processes_time = time.time() - start_time
+
+            print(f"{num_workers} workers: {serial_time:.3f}s -> {processes_time:.3f}s, speedup {serial_time / processes_time:.2f}x")
+
+            self.assertEqual(serial_result, processes_result)
+            num_workers *= 2
+
+
+class TestRunIter(unittest.TestCase):
+    def setUp(self):
+        self.ct = ClinicalTrial()
+
+    def tearDown(self):
+        self.ct.shutdown()
+
+    def test_yields_every_module(self):
+        expected_result = self.ct.run_all(document=make_document(), exclude_modules=MODEL_MODULES)
+
+        for execution_mode in ["serial", "threads", "processes"]:
+            results = {}
+            for module_name, result, execution_time in self.ct.run_iter(document=make_document(), exclude_modules=MODEL_MODULES, execution_mode=execution_mode):
+                self.assertNotIn(module_name, results)
+                self.assertGreaterEqual(execution_time, 0)
+                results[module_name] = result
+
+            self.assertEqual(expected_result, results)
+
+    def test_first_result_before_last_module_runs(self):
+        started = []
+        self.ct.event.subscribe(lambda event_data: started.append(event_data.data) if "run started" in str(event_data.data) else None)
+
+        results = self.ct.run_iter(document=make_document(), exclude_modules=MODEL_MODULES, execution_mode="serial")
+        next(results)
+
+        self.assertEqual(1, len(started))
+        results.close()
+
+
+class TestScheduling(unittest.TestCase):
+    TABLE_MODULES = ["num_visits", "num_interventions_per_visit", "num_interventions_total"]
+
+    def setUp(self):
+        self.ct = ClinicalTrial()
+        self.exclude_modules = [module_name for module_name in self.ct.modules if module_name not in self.TABLE_MODULES + ["design"]]
+
+    def test_product_built_once(self):
+        build_table_cells = PRODUCTS["table_cells"]
+        calls = []
+
+        def counting_build_table_cells(document):
+            calls.append(document)
+            return build_table_cells(document)
+
+        PRODUCTS["table_cells"] = counting_build_table_cells
+        try:
+            self.ct.run_all(document=make_document(), exclude_modules=self.exclude_modules, execution_mode="threads")
+        finally:
+            PRODUCTS["table_cells"] = build_table_cells
+
+        self.assertEqual(1, len(calls))
+
+    def test_costs_recorded(self):
+        self.ct.run_all(document=make_document(), exclude_modules=self.exclude_modules)
+        self.assertEqual(set(self.TABLE_MODULES + ["design", "product:table_cells", "product:page_matches"]), set(self.ct.costs.keys()))
+
+    def test_most_expensive_first(self):
+        started = []
+        self.ct.event.subscribe(lambda event_data: started.append(event_data.data) if "run started" in str(event_data.data) else None)
+        self.ct.set_costs({"num_visits": 0.1, "num_interventions_per_visit": 0.2, "num_interventions_total": 0.3, "design": 1.0, "product:table_cells": 0.5})
+        result = self.ct.run_all(document=make_document(), exclude_modules=self.exclude_modules)
+
+        self.assertEqual(
+            ["Design", "Num Interventions Total", "Num Interventions Per Visit", "Num Visits"],
+            [message.split(" - Module ")[1].removesuffix(" run started") for message in started],
+        )
+        self.assertEqual([module_name for module_name in self.ct.modules if module_name not in self.exclude_modules], list(result.keys()))
+
+
+class TestTimeBudget(unittest.TestCase):
+    MODULES = ["biobank", "consent", "design"]
+
+    def setUp(self):
+        self.ct = ClinicalTrial()
+        self.exclude_modules = [module_name for module_name in self.ct.modules if module_name not in self.MODULES]
+
+    def test_no_budget_runs_every_module(self):
+        result = self.ct.run_all(document=make_document(), exclude_modules=self.exclude_modules, time_budget=None)
+        self.assertTrue(all("status" not in module_result for module_result in result.values()))
+
+    def test_expensive_module_skipped(self):
+        self.ct.set_costs({"biobank": 0.01, "consent": 0.01, "design": 100.0})
+
+        for execution_mode in ("serial", "threads"):
+            result = self.ct.run_all(document=make_document(), exclude_modules=self.exclude_modules, execution_mode=execution_mode, time_budget=10)
+            self.assertEqual({"status": "skipped"}, result["design"])
+            self.assertNotIn("status", result["consent"])
+
+    def test_expensive_module_degraded(self):
+        Design.process_degraded = lambda self, document, config=None: {"prediction": 0, "pages": {}}
+        try:
+            self.ct.set_costs({"biobank": 0.01, "consent": 0.01, "design": 100.0})
+            result = self.ct.run_all(document=make_document(), exclude_modules=self.exclude_modules, time_budget=10)
+        finally:
+            del Design.process_degraded
+
+        self.assertEqual("degraded", result["design"]["status"])
+        self.assertIn("design:degraded", self.ct.costs)
+
+    def test_high_value_first(self):
+        started = []
+        self.ct.event.subscribe(lambda event_data: started.append(event_data.data) if "run started" in str(event_data.data) else None)
+        self.ct.set_costs({"biobank": 0.3, "consent": 0.1, "design": 0.2})
+
+        Biobank.is_high_value = True
+        try:
+            self.ct.run_all(document=make_document(), exclude_modules=self.exclude_modules, time_budget=10)
+        finally:
+            del Biobank.is_high_value
+
+        self.assertEqual(
+            ["Biobank", "Consent", "Design"], [message.split(" - Module ")[1].removesuffix(" run started") for message in started]
+        )
+
+    def test_running_module_given_up_at_deadline(self):
+        process = Design.process
+
+        def slow_process(self, document, config=None):
+            time.sleep(1)
+            return process(self, document=document, config=config)
+
+        messages = []
+        self.ct.event.subscribe(lambda event_data: messages.append(event_data.data))
+
+        Design.process = slow_process
+        try:
+            start_time = time.time()
+            result = self.ct.run_all(document=make_document(), exclude_modules=self.exclude_modules, execution_mode="threads", time_budget=0.3)
+            print(f"Run with a slow module given up in {time.time() - start_time:.3f}s")
+            num_messages = len(messages)
+
+            # * The thread of the module runs on, but sends no event once the run has given up on it
+            time.sleep(1.5)
+        finally:
+            Design.process = process
+
+        self.assertEqual({"status": "skipped"}, result["design"])
+        self.assertEqual(num_messages, len(messages))
+        self.assertIn("design", self.ct.costs)
+
+    def test_running_module_stopped_at_deadline_in_threads(self):
+        process = Design.process
+        pages_read = []
+
+        def slow_process(self, document, config=None):
+            for page_idx in range(15):
+                document.raise_if_cancelled()
+                pages_read.append(page_idx)
+                time.sleep(0.1)
+            return process(self, document=document, config=config)
+
+        document = make_document()
+        Design.process = slow_process
+        try:
+            result = self.ct.run_all(document=document, exclude_modules=self.exclude_modules, execution_mode="threads", time_budget=0.5)
+            time.sleep(2)
+        finally:
+            Design.process = process
+
+        self.assertEqual({"status": "skipped"}, result["design"])
+        self.assertLess(len(pages_read), 15)
+        self.assertIn("design", self.ct.costs)
+
+        # * Only the threads of the run that gave up are stopped, the document can be used by another run
+        document.raise_if_cancelled()
+
+    def test_running_module_stopped_at_deadline_in_processes(self):
+        process = Design.process
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            finished_path = os.path.join(tmp_dir, "finished")
+
+            def slow_process(self, document, config=None):
+                for _ in range(15):
+                    document.raise_if_cancelled()
+                    time.sleep(0.1)
+                open(finished_path, "w").close()
+                return process(self, document=document, config=config)
+
+            # * The workers fork with the slow processor
+            Design.process = slow_process
+            try:
+                result = self.ct.run_all(document=make_document(), exclude_modules=self.exclude_modules, execution_mode="processes", max_workers=2, time_budget=0.5)
+                time.sleep(2)
+            finally:
+                Design.process = process
+                self.ct.shutdown()
+
+            self.assertEqual({"status": "skipped"}, result["design"])
+            self.assertFalse(os.path.exists(finished_path))
+
+
+class TestCancellation(unittest.TestCase):
+    def setUp(self):
+        self.ct = ClinicalTrial()
+        self.exclude_modules = MODEL_MODULES
+
+    def tearDown(self):
+        self.ct.shutdown()
+
+    def test_cancelled_before_run(self):
+        cancellation_token = CancellationToken()
+        cancellation_token.cancel()
+
+        with self.assertRaises(RunCancelledError):
+            self.ct.run_all(document=make_document(), exclude_modules=self.exclude_modules, cancellation_token=cancellation_token)
+
+    def test_document_reused_after_cancelled_run(self):
+        document = make_document()
+        cancellation_token = CancellationToken()
+        cancellation_token.cancel()
+
+        with self.assertRaises(RunCancelledError):
+            self.ct.run_all(document=document, exclude_modules=self.exclude_modules, cancellation_token=cancellation_token)
+
+        self.assertIsNone(document.cancellation_token)
+        result = self.ct.run_all(document=document, exclude_modules=self.exclude_modules)
+        self.assertEqual(len(self.ct.modules) - len(self.exclude_modules), len(result))
+
+    def test_processor_stops_between_pages(self):
+        document = make_document()
+        document.cancellation_token = CancellationToken()
+        document.cancellation_token.cancel()
+
+        with self.assertRaises(RunCancelledError):
+            Design().process(document=document)
+
+    def test_cancelled_during_run(self):
+        for execution_mode in ("serial", "threads", "processes"):
+            cancellation_token = CancellationToken()
+            completed = []
+
+            def cancel_after_first_module(event_data):
+                if "run complete" in str(event_data.data):
+                    completed.append(event_data.data)
+                    cancellation_token.cancel()
+
+            self.ct.event.subscribe(cancel_after_first_module)
+            try:
+                with self.assertRaises(RunCancelledError):
+                    self.ct.run_all(
+                        document=make_document(),
+                        exclude_modules=self.exclude_modules,
+                        execution_mode=execution_mode,
+                        max_workers=2,
+                        cancellation_token=cancellation_token,
+                    )
+            finally:
+                self.ct.event.unsubscribe(cancel_after_first_module)
+
+            self.assertLess(len(completed), len(self.ct.modules) - len(self.exclude_modules))
+
+        # * The workers are free for the next document once a run has been cancelled
+        result = self.ct.run_all(document=make_document(), exclude_modules=self.exclude_modules, execution_mode="processes", max_workers=2)
+        self.assertEqual(len(self.ct.modules) - len(self.exclude_modules), len(result))
+
+
+class TestRunBatch(unittest.TestCase):
+    # * Modules that stack the features of a batch and predict once
+    BATCH_MODULES = ["condition", "effect_estimate", "sample_size"]
+
+    def setUp(self):
+        self.ct = ClinicalTrial()
+
+    def make_documents(self, num_documents: int) -> list[Document]:
+        return [Document(pages=make_document().pages * 5) for _ in range(num_documents)]
+
+    def test_batch_matches_run_all(self):
+        batch_results = self.ct.run_batch(documents=self.make_documents(num_documents=5), exclude_modules=MODEL_MODULES, batch_size=2)
+        single_results = [self.ct.run_all(document=document, exclude_modules=MODEL_MODULES) for document in self.make_documents(num_documents=5)]
+
+        self.assertEqual(single_results, batch_results)
+
+    def test_batch_throughput(self):
+        exclude_modules = [module_name for module_name in self.ct.modules if module_name not in self.BATCH_MODULES]
+        self.ct.warm_up()
+
+        start_time = time.time()
+        single_results = [self.ct.run_all(document=document, exclude_modules=exclude_modules) for document in self.make_documents(num_documents=64)]
+        single_throughput = len(single_results) / (time.time() - start_time) * 60
+
+        start_time = time.time()
+        batch_results = self.ct.run_batch(documents=self.make_documents(num_documents=64), exclude_modules=exclude_modules)
+        batch_throughput = len(batch_results) / (time.time() - start_time) * 60
+
+        print(f"Throughput: {single_throughput:.0f} -> {batch_throughput:.0f} documents per minute")
+
+        for single_result, batch_result in zip(single_results, batch_results):
+            self.assertEqual(single_result["condition"]["prediction"], batch_result["condition"]["prediction"])
+            self.assertEqual(single_result["sample_size"]["prediction"], batch_result["sample_size"]["prediction"])
+            self.assertEqual(single_result["effect_estimate"]["prediction"], batch_result["effect_estimate"]["prediction"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import sys
+
+sys.path.append("..")
+sys.path.append("../src/")
+
+import random
+import time
+import unittest
+
+from clinicaltrials.core import Document, Page
+from clinicaltrials.country.country_extractor_rule_based import find_email_and_url_countries, get_tld_regex
+from clinicaltrials.country.country_matcher import country_matcher
+from clinicaltrials.country.country_named_entity_recognition_spacy import find_countries_in_tokens
+from clinicaltrials.country.demonym_finder import find_demonyms
+from clinicaltrials.country.phone_number_finder import find_phone_numbers
+
+PROTOCOL_WORDS = ("This multicentre trial will recruit Zimbabwean women and South African adults in the UK , the USA , the uk , "
+                  "Georgia and Congo . Contact the study office : tel +44 20 7946 0000 or phone: +1 212 555 0100 , Tel: +33 1 . "
+                  "Guinea pigs were not used in Guinea . Tbilisi is in the Caucasus , Georgia . Korea and Virgin Islands sites , "
+                  "United Kingdom , United States , Democratic Republic of the Congo , Tunisians and Samoan males , number +7 495 "
+                  "the patients will receive treatment for 12 weeks and are followed up every month").split()
+
+# * Most of the words of a protocol are not evidence of a country
+FILLER_WORDS = "the patients will receive treatment for 12 weeks and are followed up every month by the study team".split()
+
+
+def make_protocol(num_pages: int, words_per_page: int, seed: int = 0, filler_rate: float = 0.0) -> Document:
+    random_state = random.Random(seed)
+    pages = []
+    for page_no in range(num_pages):
+        words = [random_state.choice(FILLER_WORDS if random_state.random() < filler_rate else PROTOCOL_WORDS) for _ in range(words_per_page)]
+        pages.append(Page(content=" ".join(words), page_number=page_no + 1))
+    return Document(pages=pages)
+
+
+def find_per_page(document: Document) -> list[list[tuple]]:
+    # * The matching before the single matcher: a PhraseMatcher per type of evidence on every page
+    evidence = []
+    for doc in document.tokenised_pages:
+        page_evidence = [(country.alpha_2, match[1], match[2], "country") for country, match in find_countries_in_tokens(doc)]
+        page_evidence.extend((country_code, match[1], match[2], "demonym") for country_code, match in find_demonyms(doc))
+        page_evidence.extend((country_code, match[1], match[2], "phone") for country_code, match in find_phone_numbers(doc))
+        evidence.append(page_evidence)
+    return evidence
+
+
+class TestCountryMatcher(unittest.TestCase):
+    def test_same_as_finders(self):
+        for seed in range(10):
+            document = make_protocol(num_pages=4, words_per_page=200, seed=seed)
+            self.assertEqual(find_per_page(document), country_matcher.find(document.tokenised_pages))
+
+    def test_evidence(self):
+        document = Document(pages=[Page(content="Samoan males in the UK, the uk and Georgia. Call +44 20", page_number=1),
+                                   Page(content="Georgia, in the Caucasus, not guinea pigs", page_number=2)])
+        self.assertEqual([[("GB", 4, 5, "country"), ("WS", 0, 2, "demonym"), ("GB", 11, 13, "phone")], [("GE", 0, 1, "country")]],
+                         country_matcher.find(document.tokenised_pages))
+
+    def test_shared_names(self):
+        document = Document(pages=[Page(content="Korea , Congo and Virgin Islands", page_number=1)])
+        self.assertEqual(["VG", "KR", "CG"], [country_code for country_code, _, _, _ in country_matcher.find(document.tokenised_pages)[0]])
+
+    def test_email_and_url_countries(self):
+        document = Document(pages=[Page(content="no contact", page_number=1),
+                                   Page(content="Write to trial@example.de or see www.trial.org.za", page_number=2)])
+        self.assertEqual([[], [("DE", 2, 3, "email"), ("ZA", 5, 6, "url")]], find_email_and_url_countries(token_arrays=document.context.token_arrays))
+
+    def test_speedup(self):
+        document = make_protocol(num_pages=300, words_per_page=500, filler_rate=0.95)
+        docs = document.tokenised_pages
+        token_arrays = document.context.token_arrays
+        find_per_page(make_protocol(num_pages=1, words_per_page=10))
+        country_matcher.find(docs[:1])
+
+        start_time = time.time()
+        find_per_page(document)
+        # * The email and url domains were looked up token by token
+        for doc in docs:
+            for token in doc:
+                if token.like_url or token.like_email:
+                    get_tld_regex.findall(token.text)
+        per_page_time = time.time() - start_time
+
+        start_time = time.time()
+        country_matcher.find(docs)
+        find_email_and_url_countries(token_arrays=token_arrays)
+        matcher_time = time.time() - start_time
+
+        print(f"Country evidence of a {len(token_arrays)} token protocol: {per_page_time:.3f}s -> {matcher_time:.3f}s")
+
+        self.assertLess(matcher_time, per_page_time)
+
+    def test_empty_document(self):
+        document = Document(pages=[])
+        self.assertEqual([], country_matcher.find(document.tokenised_pages))
+        self.assertEqual([], find_email_and_url_countries(token_arrays=document.context.token_arrays))
+
+
+if __name__ == "__main__":
+    unittest.main()
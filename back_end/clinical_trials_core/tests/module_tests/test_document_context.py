@@ -0,0 +1,127 @@
+import sys
+
+sys.path.append("..")
+sys.path.append("../src/")
+
+import unittest
+from collections import Counter
+from threading import Thread
+from unittest.mock import patch
+
+from clinicaltrials.core import ClinicalTrial, Document, Page
+from clinicaltrials.document_context import DocumentContext
+from clinicaltrials.resources import nlp
+
+ct = ClinicalTrial()
+
+
+def make_document() -> Document:
+    return Document(
+        pages=[
+            Page(content="The placebo group of 6 patients\nreceived  drug TID.", page_number=1),
+            Page(content="", page_number=2),
+            Page(content="Follow up at Week 12.", page_number=3),
+        ]
+    )
+
+
+class TestDocumentContext(unittest.TestCase):
+    def test_tokenised_once(self):
+        document = make_document()
+        self.assertIs(document.tokenised_pages, document.tokenised_pages)
+        self.assertIs(document.context, document.context)
+
+    def test_whitespace_normalised(self):
+        document = make_document()
+        self.assertNotIn("\n", [token.text for token in document.tokenised_pages[0]])
+
+    def test_flattened_views(self):
+        context = make_document().context
+        self.assertEqual([0, 10, 10, 16], context.page_offsets)
+        self.assertEqual(context.num_tokens, len(context.tokens))
+        self.assertEqual("placebo", context.lower[1])
+        self.assertEqual("week", context.norms[13])
+        self.assertEqual([0] * 10 + [2] * 6, context.token_pages)
+        self.assertEqual(context.token_pages, [context.page_of(i) for i in range(context.num_tokens)])
+        self.assertEqual(["Follow", "up", "at", "Week", "12", "."], [token.text for token in context.page_tokens(2)])
+
+    def test_parallel_access(self):
+        document = make_document()
+        results = []
+        threads = [Thread(target=lambda: results.append(document.tokenised_pages)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_serialisation(self):
+        document = make_document()
+        document.context.get_docs(tokenisation="compatible")
+        copy = Document.from_bytes(data=document.to_bytes())
+
+        self.assertEqual([page.content for page in document.pages], [page.content for page in copy.pages])
+        self.assertEqual(document.context.texts, copy.context.texts)
+        self.assertEqual(document.context.norms, copy.context.norms)
+        self.assertEqual(
+            [token.text for doc in document.context.raw_docs for token in doc],
+            [token.text for doc in copy.context.raw_docs for token in doc],
+        )
+
+    def test_tokenise_batch(self):
+        documents = [make_document(), make_document()]
+        DocumentContext.tokenise_batch(contexts=[document.context for document in documents])
+
+        for document in documents:
+            self.assertTrue(document.context.has_view("docs"))
+            self.assertEqual(make_document().context.texts, document.context.texts)
+
+    def test_invalidate(self):
+        document = make_document()
+        tokenised_pages = document.tokenised_pages
+        document.pages[1].content = "Placebo"
+        document.invalidate_context()
+        self.assertIsNot(tokenised_pages, document.tokenised_pages)
+        self.assertEqual("Placebo", document.tokenised_pages[1].text)
+
+
+class TestSharedTokenisation(unittest.TestCase):
+    # * Phase, SampleSize, NumArms and Sap used to tokenise the raw page text themselves
+    LEGACY_RAW_TOKENISATIONS = 4
+
+    def setUp(self):
+        page_content = "The  sample size\nis 120 participants randomised 1:1 to placebo or\n\nactive drug. " * 40
+        self.pages = [Page(content=f"Page {i + 1}\n\n{page_content}", page_number=i + 1) for i in range(60)]
+
+    def test_compatible_tokenisation_matches_legacy(self):
+        document = Document(pages=self.pages)
+        raw_docs = document.context.get_docs(tokenisation="compatible")
+        for page, doc in zip(self.pages, raw_docs):
+            self.assertEqual([t.text for t in nlp(page.content)], [t.text for t in doc])
+
+        self.assertIs(raw_docs, document.context.get_docs(tokenisation="compatible"))
+        self.assertIs(document.tokenised_pages, document.context.get_docs())
+
+    def test_raw_pages_tokenised_once(self):
+        document = Document(pages=self.pages)
+        make_doc = nlp.make_doc
+        tokenised_texts = []
+
+        def counting_make_doc(text):
+            tokenised_texts.append(text)
+            return make_doc(text)
+
+        # * Every tokenisation of a page, by `nlp(...)` or `nlp.pipe(...)`, goes through `make_doc`
+        with patch.object(nlp, "make_doc", counting_make_doc):
+            for module_name in ("phase", "sample_size", "num_arms", "sap", "placebo"):
+                ct.get_module(module_name).process(document=document)
+
+        raw_tokenisations = Counter(text for text in tokenised_texts if text in {page.content for page in self.pages})
+        print(f"Raw tokenisations of each page: {self.LEGACY_RAW_TOKENISATIONS} -> {max(raw_tokenisations.values())}")
+
+        self.assertEqual({page.content: 1 for page in self.pages}, raw_tokenisations)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import sys
+
+sys.path.append("..")
+sys.path.append("../src/")
+
+import random
+import time
+import unittest
+
+from drug_named_entity_recognition import find_drugs
+
+from clinicaltrials.core import Document, Page
+from clinicaltrials.drug_mentions import DrugMention, DrugMentions
+from clinicaltrials.products import get_product
+
+PROTOCOL_WORDS = ("Patients randomised to Axitinib 5 mg twice daily or placebo will receive paracetamol as needed . The primary "
+                  "endpoint is progression-free survival , assessed every 8 weeks until disease progression . Adverse events of "
+                  "pembrolizumab and Vitamin C are graded using CTCAE v5.0 . Aspirin , ibuprofen and folic acid are permitted "
+                  "concomitant medications , VITAMIN D3 and acetylsalicylic acid are not").split()
+
+
+def make_protocol(num_pages: int, words_per_page: int, seed: int = 0) -> Document:
+    random_state = random.Random(seed)
+    pages = []
+    for page_no in range(num_pages):
+        words = [random_state.choice(PROTOCOL_WORDS) for _ in range(words_per_page)]
+        pages.append(Page(content=" ".join(words), page_number=page_no + 1))
+    return Document(pages=pages)
+
+
+def find_drugs_per_page(document: Document) -> list[list[tuple]]:
+    # * The lookup before the index: `find_drugs` on the tokens of every page
+    return [find_drugs([token.text for token in doc], is_ignore_case=True) for doc in document.tokenised_pages]
+
+
+class TestDrugMentions(unittest.TestCase):
+    def test_same_as_find_drugs_per_page(self):
+        for seed in range(5):
+            document = make_protocol(num_pages=4, words_per_page=300, seed=seed)
+            drug_mentions = DrugMentions.find(token_arrays=document.context.token_arrays, find_drugs=find_drugs)
+
+            for page_no, page_drug_mentions in enumerate(find_drugs_per_page(document)):
+                self.assertEqual(page_drug_mentions, [(mention.drug, mention.start, mention.end) for mention in drug_mentions.get_page(page_no)])
+
+    def test_mentions(self):
+        document = Document(pages=[Page(content="Axitinib and folic acid", page_number=1), Page(content="", page_number=2), Page(content="no drugs", page_number=3)])
+        drug_mentions = get_product(document=document, name="drug_mentions")
+
+        self.assertEqual(["Folic Acid", "Axitinib"], [mention.drug["name"] for mention in drug_mentions.get_page(0)])
+        self.assertEqual([(0, 2, 3), (0, 0, 0)], [(mention.page_no, mention.start, mention.end) for mention in drug_mentions])
+        self.assertEqual({0, 2, 3}, drug_mentions.get_token_indices(0))
+        self.assertEqual([], drug_mentions.get_page(1))
+        self.assertIsInstance(drug_mentions.mentions[0], DrugMention)
+        self.assertIs(drug_mentions, get_product(document=document, name="drug_mentions"))
+
+    def test_two_word_drug_not_split_across_pages(self):
+        document = Document(pages=[Page(content="daily folic", page_number=1), Page(content="acid", page_number=2)])
+        drug_mentions = DrugMentions.find(token_arrays=document.context.token_arrays, find_drugs=find_drugs)
+        self.assertEqual([[], []], [[mention.drug["name"] for mention in drug_mentions.get_page(page_no)] for page_no in range(2)])
+
+    def test_speedup(self):
+        document = make_protocol(num_pages=300, words_per_page=500)
+        token_arrays = document.context.token_arrays
+
+        start_time = time.time()
+        find_drugs_per_page(document)
+        per_page_time = time.time() - start_time
+
+        start_time = time.time()
+        drug_mentions = DrugMentions.find(token_arrays=token_arrays, find_drugs=find_drugs)
+        index_time = time.time() - start_time
+
+        print(f"Drug mentions of a {len(token_arrays)} token protocol: {per_page_time:.3f}s -> {index_time:.3f}s ({len(drug_mentions)} mentions)")
+
+        self.assertLess(index_time, per_page_time)
+
+    def test_empty_document(self):
+        drug_mentions = DrugMentions.find(token_arrays=Document(pages=[]).context.token_arrays, find_drugs=find_drugs)
+        self.assertEqual(0, len(drug_mentions))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import sys
+
+sys.path.append("..")
+sys.path.append("../src/")
+
+import time
+import unittest
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfTransformer
+from sklearn.naive_bayes import MultinomialNB
+
+from clinicaltrials.informative_terms import get_term_scores
+
+
+def get_term_scores_per_term(nb, transformed_document, class_idx: int) -> np.ndarray:
+    # * The implementation before the closed form: one predict_log_proba call per vocabulary term
+    probas = np.zeros((transformed_document.shape[1]))
+    for i in range(transformed_document.shape[1]):
+        zeros = np.zeros(transformed_document.shape)
+        zeros[0, i] = transformed_document[0, i]
+        proba = nb.predict_log_proba(zeros)
+        probas[i] = proba[0, class_idx]
+    return probas
+
+
+def make_model(num_classes: int, num_terms: int) -> tuple:
+    random_state = np.random.RandomState(0)
+    token_counts = random_state.poisson(0.3, (200, num_terms))
+    transformer = TfidfTransformer().fit(token_counts)
+    nb = MultinomialNB().fit(transformer.transform(token_counts), random_state.randint(0, num_classes, 200))
+    transformed_document = transformer.transform(random_state.poisson(0.2, (1, num_terms)))
+    return nb, transformed_document
+
+
+class TestInformativeTerms(unittest.TestCase):
+    def test_same_ranking_as_per_term_loop(self):
+        for num_classes in (2, 12):
+            nb, transformed_document = make_model(num_classes=num_classes, num_terms=500)
+            for class_idx in range(num_classes):
+                expected = get_term_scores_per_term(nb=nb, transformed_document=transformed_document, class_idx=class_idx)
+                scores = get_term_scores(nb=nb, transformed_document=transformed_document, class_idx=class_idx)
+
+                np.testing.assert_array_equal(expected, scores)
+                np.testing.assert_array_equal(np.argsort(-expected), np.argsort(-scores))
+
+    def test_dense_document(self):
+        nb, transformed_document = make_model(num_classes=3, num_terms=100)
+        np.testing.assert_array_equal(
+            get_term_scores(nb=nb, transformed_document=transformed_document, class_idx=1),
+            get_term_scores(nb=nb, transformed_document=transformed_document.toarray(), class_idx=1),
+        )
+
+    def test_speedup(self):
+        nb, transformed_document = make_model(num_classes=2, num_terms=3000)
+
+        start_time = time.time()
+        get_term_scores_per_term(nb=nb, transformed_document=transformed_document, class_idx=1)
+        per_term_time = time.time() - start_time
+
+        start_time = time.time()
+        get_term_scores(nb=nb, transformed_document=transformed_document, class_idx=1)
+        closed_form_time = time.time() - start_time
+
+        # * Only reported, the timings vary with the load of the machine and the scores are checked by the tests above
+        print(f"Informative terms of a 3000 term vocabulary: {per_term_time:.3f}s -> {closed_form_time:.4f}s")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import sys
+
+sys.path.append("..")
+sys.path.append("../src/")
+
+import os
+import tempfile
+import unittest
+
+from clinicaltrials.core import ClinicalTrial
+from clinicaltrials.manifest import MANIFEST_PATH, build_manifest, load_manifest, write_manifest
+
+
+class TestManifest(unittest.TestCase):
+    def test_manifest_matches_processors(self):
+        # * Fails when a processor or its metadata changed without regenerating the manifest
+        message = "The metadata manifest is out of date, regenerate it with `python -m clinicaltrials.manifest`"
+        manifest = load_manifest()
+        built_manifest = build_manifest()
+
+        self.assertEqual(built_manifest.core_version, manifest.core_version, message)
+        self.assertEqual(built_manifest.modules, manifest.modules, message)
+        self.assertEqual(built_manifest.metadata_dict, manifest.metadata_dict, message)
+
+    def test_metadata_round_trip(self):
+        ct = ClinicalTrial()
+        self.assertEqual(ct.metadata, load_manifest().metadata)
+
+    def test_format_version_checked(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manifest_path = os.path.join(temp_dir, "metadata_manifest.json")
+            write_manifest(manifest_path=manifest_path)
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                content = f.read().replace('"format_version": 1', '"format_version": 0')
+            with open(manifest_path, "w", encoding="utf-8") as f:
+                f.write(content)
+
+            with self.assertRaises(ValueError):
+                load_manifest(manifest_path=manifest_path)
+
+    def test_manifest_shipped_with_package(self):
+        self.assertTrue(os.path.exists(MANIFEST_PATH))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import sys
+
+sys.path.append("..")
+sys.path.append("../src/")
+
+import unittest
+
+from spacy.matcher import Matcher, PhraseMatcher
+
+from clinicaltrials.core import Document, Page
+from clinicaltrials.match_engine import MatchEngine, match_engine
+from clinicaltrials.products import get_product
+from clinicaltrials.resources import nlp
+
+PHRASE_PATTERNS = {"crossover": ["crossover", "cross-over"], "placebo": ["placebo", "sugar pill"]}
+
+TOKEN_PATTERNS = [[{"LIKE_NUM": True}, {"LOWER": {"IN": ["patients", "subjects"]}}], [{"LOWER": "placebo"}]]
+
+
+def make_document() -> Document:
+    return Document(
+        pages=[
+            Page(content="A cross-over trial of 60 patients. The placebo arm received a sugar pill.", page_number=1),
+            Page(content="", page_number=2),
+            Page(content="Placebo was given to 12 subjects in a crossover design.", page_number=3),
+        ]
+    )
+
+
+class TestMatchEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = MatchEngine()
+        self.engine.add_phrase_patterns(namespace="phrases", patterns=PHRASE_PATTERNS)
+        self.engine.add_token_patterns(namespace="tokens", label="placebo", patterns=TOKEN_PATTERNS)
+
+    def test_same_matches_as_separate_matchers(self):
+        phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+        for label, surface_forms in PHRASE_PATTERNS.items():
+            phrase_matcher.add(label, list(nlp.pipe(surface_forms)))
+        matcher = Matcher(nlp.vocab)
+        matcher.add("placebo", TOKEN_PATTERNS)
+
+        document = make_document()
+        page_matches = self.engine.match(document=document)
+        for page_no, doc in enumerate(document.tokenised_pages):
+            self.assertEqual(list(phrase_matcher(doc)), page_matches["phrases"][page_no])
+            self.assertEqual(list(matcher(doc)), page_matches["tokens"][page_no])
+
+        # * The same label in two namespaces comes out under the label the processor registered
+        self.assertEqual({"crossover", "placebo"}, {nlp.vocab.strings[match_id] for match_id, _, _ in page_matches["phrases"][0]})
+        self.assertEqual({"placebo"}, {nlp.vocab.strings[match_id] for match_id, _, _ in page_matches["tokens"][0]})
+
+    def test_namespace_holds_one_matcher(self):
+        with self.assertRaises(ValueError):
+            self.engine.add_token_patterns(namespace="phrases", label="placebo", patterns=TOKEN_PATTERNS)
+
+    def test_unknown_namespace(self):
+        with self.assertRaises(KeyError):
+            self.engine.get_matches(document=make_document(), namespace="unknown")
+
+    def test_page_matches_built_once(self):
+        import clinicaltrials.interim  # noqa: F401 registers the "interim" namespace
+
+        document = make_document()
+        self.assertIs(get_product(document=document, name="page_matches"), get_product(document=document, name="page_matches"))
+        self.assertIs(match_engine.get_matches(document=document, namespace="interim"), match_engine.get_matches(document=document, namespace="interim"))
+        self.assertEqual(len(document.pages), len(match_engine.get_matches(document=document, namespace="interim")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import sys
+
+sys.path.append("..")
+sys.path.append("../src/")
+
+import glob
+import tempfile
+import unittest
+
+from clinicaltrials import matcher_cache
+from clinicaltrials.matcher_cache import LazyMatcher
+from clinicaltrials.resources import nlp
+
+TOKEN_PATTERNS = [[{"LIKE_NUM": True}, {"LOWER": {"IN": ["patients", "subjects"]}}], [{"LOWER": "placebo"}]]
+
+
+class TestMatcherCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        matcher_cache.set_cache_dir(cache_dir=self.cache_dir)
+
+        self.doc = nlp("The placebo arm of 60 patients received a sugar pill.")
+
+    def tearDown(self):
+        matcher_cache.set_cache_dir(cache_dir=None)
+
+    def test_compiled_on_first_use(self):
+        matcher = LazyMatcher(name="test")
+        matcher.add("placebo", TOKEN_PATTERNS)
+        self.assertFalse(matcher.is_compiled)
+
+        self.assertEqual(2, len(matcher(self.doc)))
+        self.assertTrue(matcher.is_compiled)
+
+    def test_loaded_from_cache(self):
+        matcher = LazyMatcher(name="test")
+        matcher.add("placebo", TOKEN_PATTERNS)
+        matches = matcher(self.doc)
+        self.assertEqual([matcher.cache_path], glob.glob(f"{self.cache_dir}/test-*.pkl"))
+
+        cached_matcher = LazyMatcher(name="test")
+        cached_matcher.add("placebo", TOKEN_PATTERNS)
+        self.assertEqual(matches, cached_matcher(self.doc))
+
+        # * The cached Matcher does not validate its patterns again
+        self.assertFalse(cached_matcher.matcher.validate)
+        self.assertIs(nlp.vocab, cached_matcher.matcher.vocab)
+
+    def test_phrase_matcher_loaded_from_cache(self):
+        matcher = LazyMatcher(name="test_phrases", attr="LOWER")
+        matcher.add("placebo", {"placebo", "sugar pill"})
+        matches = matcher(self.doc)
+
+        cached_matcher = LazyMatcher(name="test_phrases", attr="LOWER")
+        cached_matcher.add("placebo", ["sugar pill", "placebo"])
+        self.assertEqual(matcher.cache_path, cached_matcher.cache_path)
+        self.assertEqual(matches, cached_matcher(self.doc))
+
+    def test_changed_patterns_not_loaded(self):
+        matcher = LazyMatcher(name="test")
+        matcher.add("placebo", TOKEN_PATTERNS)
+        matcher(self.doc)
+
+        changed_matcher = LazyMatcher(name="test")
+        changed_matcher.add("placebo", TOKEN_PATTERNS[:1])
+        self.assertNotEqual(matcher.cache_path, changed_matcher.cache_path)
+        self.assertEqual(1, len(changed_matcher(self.doc)))
+
+        # * The stale cache file is replaced
+        self.assertEqual([changed_matcher.cache_path], glob.glob(f"{self.cache_dir}/test-*.pkl"))
+
+    def test_patterns_added_after_compiling(self):
+        matcher = LazyMatcher(name="test")
+        matcher.add("placebo", TOKEN_PATTERNS[:1])
+        self.assertEqual(1, len(matcher(self.doc)))
+
+        matcher.add("placebo", TOKEN_PATTERNS[1:])
+        self.assertEqual(2, len(matcher(self.doc)))
+
+    def test_corrupt_cache_file(self):
+        matcher = LazyMatcher(name="test")
+        matcher.add("placebo", TOKEN_PATTERNS)
+        with open(matcher.cache_path, "wb") as f:
+            f.write(b"corrupt")
+
+        self.assertEqual(2, len(matcher(self.doc)))
+
+
+if __name__ == "__main__":
+    unittest.main()
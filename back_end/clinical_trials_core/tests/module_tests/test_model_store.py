@@ -0,0 +1,60 @@
+import sys
+
+sys.path.append("..")
+sys.path.append("../src/")
+
+import bz2
+import pickle as pkl
+import tempfile
+import unittest
+
+import numpy as np
+
+from clinicaltrials import model_store
+from clinicaltrials.core import ClassifierConfig
+
+
+class TestModelStore(unittest.TestCase):
+    def setUp(self):
+        model_store.unload_models()
+        model_store.set_memory_budget(memory_budget=None)
+
+        self.storage_path = tempfile.mkdtemp()
+        self.config = ClassifierConfig(path_to_classifier="", classifier_storage_path=self.storage_path)
+
+        for name, size in [("placebo", 1000), ("child", 2000), ("healthy", 4000)]:
+            with bz2.open(f"{self.storage_path}/{model_store.MODEL_DEFINITIONS[name].file_name}", "wb") as f:
+                pkl.dump(np.zeros(size), f)
+
+    def tearDown(self):
+        model_store.unload_models()
+        model_store.set_memory_budget(memory_budget=None)
+
+    def test_model_loaded_once(self):
+        model = model_store.get_model("placebo", config=self.config)
+        self.assertIs(model, model_store.get_model("placebo", config=self.config))
+
+    def test_model_sizes(self):
+        model_store.get_model("placebo", config=self.config)
+        model_store.get_model("child", config=self.config)
+        sizes = model_store.get_model_sizes()
+        self.assertGreaterEqual(sizes["placebo"], 8000)
+        self.assertGreaterEqual(sizes["child"], 16000)
+
+    def test_lru_eviction(self):
+        model_store.set_memory_budget(memory_budget=45000)
+        model_store.get_model("placebo", config=self.config)
+        model_store.get_model("child", config=self.config)
+        model_store.get_model("placebo", config=self.config)
+        model_store.get_model("healthy", config=self.config)
+
+        # * child was the least recently used model
+        self.assertEqual({"placebo", "healthy"}, set(model_store.get_model_sizes().keys()))
+
+    def test_unknown_model(self):
+        with self.assertRaises(KeyError):
+            model_store.get_model("unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()
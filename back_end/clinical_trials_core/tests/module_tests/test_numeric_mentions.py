@@ -0,0 +1,108 @@
+import sys
+
+sys.path.append("..")
+sys.path.append("../src/")
+
+import re
+import unittest
+
+from clinicaltrials.core import Document, Page
+from clinicaltrials.numeric_mentions import SMALL_NUMBER_VOCABULARY, WORD_NUMBERS, NumericRange, parse_number
+from clinicaltrials.sample_size import number_vocabulary as sample_size_vocabulary
+
+
+def make_document() -> Document:
+    return Document(
+        pages=[
+            Page(content="Aged 18-65 years, 1,200 patients at Twelve sites over 2.5 years.", page_number=1),
+            Page(content="", page_number=2),
+            Page(content="Cohorts of ten to twenty subjects, 10–20 visits, x² and 12,34.", page_number=3),
+        ]
+    )
+
+
+class TestNumericMentions(unittest.TestCase):
+    def test_values(self):
+        document = make_document()
+        numeric_mentions = document.context.numeric_mentions
+
+        values = {}
+        for page_no, doc in enumerate(document.tokenised_pages):
+            for token_no, token in enumerate(doc):
+                value = numeric_mentions.get_value(page_no=page_no, token_no=token_no)
+                if value is not None:
+                    values[token.text] = value
+
+        self.assertEqual({"18": 18, "65": 65, "Twelve": 12, "ten": 10, "twenty": 20}, values)
+
+    def test_grouped_numbers(self):
+        document = make_document()
+        numeric_mentions = document.context.numeric_mentions
+        token_no = [token.text for token in document.tokenised_pages[0]].index("1,200")
+
+        self.assertIsNone(numeric_mentions.get_value(page_no=0, token_no=token_no))
+        self.assertEqual(1200, numeric_mentions.get_value(page_no=0, token_no=token_no, allow_grouped=True))
+        self.assertEqual(1200, numeric_mentions.value_at(token_idx=token_no, allow_grouped=True))
+
+    def test_ranges(self):
+        numeric_mentions = make_document().context.numeric_mentions
+
+        self.assertEqual([NumericRange(page_no=0, start=1, end=4, low=18, high=65)], numeric_mentions.get_ranges(page_no=0))
+        self.assertEqual([], numeric_mentions.get_ranges(page_no=1))
+        self.assertEqual(
+            [(10, 20), (10, 20)],
+            [(numeric_range.low, numeric_range.high) for numeric_range in numeric_mentions.get_ranges(page_no=2)],
+        )
+
+    def test_built_once_per_tokenisation(self):
+        context = make_document().context
+        self.assertIs(context.numeric_mentions, context.get_numeric_mentions())
+        self.assertIsNot(context.numeric_mentions, context.get_numeric_mentions(tokenisation="compatible"))
+
+    def test_parse_number(self):
+        self.assertEqual(12, parse_number("12"))
+        self.assertEqual(1200, parse_number("1,200"))
+        self.assertIsNone(parse_number("1,200", allow_grouped=False))
+        self.assertEqual(40, parse_number("Forty"))
+        self.assertIsNone(parse_number("12,34"))
+        self.assertIsNone(parse_number("2.5"))
+
+    def test_vocabularies(self):
+        document = Document(pages=[
+            Page(content="Twelve sites, nineteen or Twenty cohorts of 012, 8 and 40 patients, 12,34 or 1,200 and 1,200,000 subjects.", page_number=1),
+            Page(content="Fifty-five participants in 3 groups, one per site.", page_number=2),
+        ])
+        numeric_mentions = document.context.numeric_mentions
+
+        # * The number words up to nineteen and plain integers that NumSites and CohortSize have always read
+        def parse_small_number(token) -> int | None:
+            if not token.like_num:
+                return None
+            if token.norm_ in WORD_NUMBERS and WORD_NUMBERS[token.norm_] < 20:
+                return WORD_NUMBERS[token.norm_]
+            return int(token.text) if re.match(r"^\d+$", token.norm_) else None
+
+        # * The digits and decade words that SampleSize has always read
+        def parse_sample_size_number(token) -> int | None:
+            if not re.match(r"(?i)^(?:[1-9]\d*,?\d+|\d|twenty|thirty|forty|fifty|sixty|seventy|eighty|ninety)$", token.text):
+                return None
+            return WORD_NUMBERS.get(token.text.lower()) or int(token.text.replace(",", ""))
+
+        for page_no, doc in enumerate(document.tokenised_pages):
+            for token_no, token in enumerate(doc):
+                self.assertEqual(parse_small_number(token), numeric_mentions.get_value(page_no=page_no, token_no=token_no, vocabulary=SMALL_NUMBER_VOCABULARY))
+                self.assertEqual(parse_sample_size_number(token), numeric_mentions.get_value(page_no=page_no, token_no=token_no, vocabulary=sample_size_vocabulary))
+
+        token_no = [token.text for token in document.tokenised_pages[0]].index("12,34")
+        self.assertIsNone(numeric_mentions.get_value(page_no=0, token_no=token_no, allow_grouped=True))
+        self.assertEqual(1234, numeric_mentions.get_value(page_no=0, token_no=token_no, vocabulary=sample_size_vocabulary))
+        self.assertIs(numeric_mentions.get_vocabulary_values(vocabulary=SMALL_NUMBER_VOCABULARY), numeric_mentions.get_vocabulary_values(vocabulary=SMALL_NUMBER_VOCABULARY))
+
+    def test_empty_document(self):
+        numeric_mentions = Document(pages=[]).context.numeric_mentions
+        self.assertEqual([], numeric_mentions.ranges)
+        self.assertEqual(0, len(numeric_mentions.get_vocabulary_values(vocabulary=SMALL_NUMBER_VOCABULARY)))
+
+
+if __name__ == "__main__":
+    unittest.main()
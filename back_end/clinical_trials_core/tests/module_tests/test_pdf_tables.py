@@ -0,0 +1,116 @@
+import sys
+
+sys.path.append("..")
+sys.path.append("../src/")
+
+import os
+import tempfile
+import time
+import unittest
+from os import cpu_count
+
+from clinicaltrials.core import MIN_PAGES_PER_PDF_WORKER, Document, Page, RunCancelledError, read_pdf_pages
+from tests.fixtures.fixture_pdf import make_pdf
+
+SCHEDULE_OF_EVENTS = (["Table 3. Schedule of Assessments"],
+                      [["Procedure", "Screening", "Day 1", "Week 4", "Week 12"], ["Informed consent", "X", "", "", ""],
+                       ["ECG", "X", "X", "", "X"], ["Blood sample", "x", "X", "X", "X"], ["Adverse events", "", "X", "X", "X"]])
+
+PROSE = (["The primary endpoint is progression-free survival, assessed by the investigator."], [])
+
+
+def make_pages(num_pages: int) -> list[tuple[list[str], list[list[str]]]]:
+    # * Every page different, so that a page read out of order would show
+    return [([f"Page {page_no + 1}"] + PROSE[0], [[f"Visit {page_no + 1}", "1", "2"]] + SCHEDULE_OF_EVENTS[1][1:]) if page_no % 3 == 0 else
+            ([f"Page {page_no + 1}"] + PROSE[0], []) for page_no in range(num_pages)]
+
+
+def make_document(num_pages: int) -> Document:
+    return Document(pages=[Page(content="", page_number=page_no + 1) for page_no in range(num_pages)])
+
+
+class TestPdfTables(unittest.TestCase):
+    def test_parallel_same_as_serial(self):
+        file_buffer = make_pdf(make_pages(num_pages=2 * MIN_PAGES_PER_PDF_WORKER + 7))
+        page_indices = list(range(2 * MIN_PAGES_PER_PDF_WORKER + 7))
+
+        serial_pages = read_pdf_pages(file_buffer=file_buffer, page_indices=page_indices, extract_text=True)
+        self.assertEqual(serial_pages, read_pdf_pages(file_buffer=file_buffer, page_indices=page_indices, extract_text=True, max_workers=2))
+        self.assertEqual("Page 5", serial_pages[4][0].split("\n")[0])
+        self.assertEqual("Visit 4", serial_pages[3][1][0][0][0])
+
+        # * Only the given pages, in the given order
+        self.assertEqual([serial_pages[page_idx] for page_idx in page_indices[::-1]],
+                         read_pdf_pages(file_buffer=file_buffer, page_indices=page_indices[::-1], extract_text=True, max_workers=2))
+
+    def test_cancelled_between_ranges(self):
+        num_pages = 4 * MIN_PAGES_PER_PDF_WORKER
+        file_buffer = make_pdf(make_pages(num_pages=num_pages))
+        checks = []
+
+        def raise_if_cancelled(cancel_at: int | None) -> None:
+            checks.append(len(checks))
+            if len(checks) == cancel_at:
+                raise RunCancelledError("The run was cancelled")
+
+        # * Checked before each range of pages, not once per worker
+        read_pdf_pages(file_buffer=file_buffer, page_indices=list(range(num_pages)), extract_text=False, max_workers=2, raise_if_cancelled=lambda: raise_if_cancelled(None))
+        self.assertEqual(4, len(checks))
+
+        checks.clear()
+        with self.assertRaises(RunCancelledError):
+            read_pdf_pages(file_buffer=file_buffer, page_indices=list(range(num_pages)), extract_text=False, max_workers=2, raise_if_cancelled=lambda: raise_if_cancelled(2))
+        self.assertEqual(2, len(checks))
+
+    def test_extract_tables(self):
+        num_pages = 2 * MIN_PAGES_PER_PDF_WORKER
+        file_buffer = make_pdf(make_pages(num_pages=num_pages))
+
+        serial = make_document(num_pages=num_pages)
+        serial.extract_tables(file_buffer=file_buffer)
+        parallel = make_document(num_pages=num_pages)
+        parallel.extract_tables(file_buffer=file_buffer, max_workers=None)
+
+        self.assertEqual([page.tables for page in serial.pages], [page.tables for page in parallel.pages])
+        self.assertEqual(num_pages // 3 + 1, len([page for page in parallel.pages if page.tables]))
+
+        # * A PDF of another document is ignored
+        mismatch = make_document(num_pages=num_pages + 1)
+        mismatch.extract_tables(file_buffer=file_buffer, max_workers=2)
+        self.assertEqual([], [page.tables for page in mismatch.pages if page.tables])
+
+    def test_pdf_to_document(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pdf_path = os.path.join(tmp_dir, "protocol.pdf")
+            with open(pdf_path, "wb") as pdf_file:
+                pdf_file.write(make_pdf(make_pages(num_pages=60)))
+
+            serial = Document.pdf_to_document(pdf_path=pdf_path)
+            parallel = Document.pdf_to_document(pdf_path=pdf_path, max_workers=2)
+
+        self.assertEqual(list(range(1, 61)), [page.page_number for page in parallel.pages])
+        self.assertEqual([(page.content, page.tables) for page in serial.pages], [(page.content, page.tables) for page in parallel.pages])
+
+    @unittest.skipIf((cpu_count() or 1) < 2, "Needs several CPUs")
+    def test_speedup(self):
+        for num_pages in (50, 200, 500):
+            file_buffer = make_pdf(make_pages(num_pages=num_pages))
+            page_indices = list(range(num_pages))
+
+            start_time = time.time()
+            serial_pages = read_pdf_pages(file_buffer=file_buffer, page_indices=page_indices, extract_text=False)
+            serial_time = time.time() - start_time
+
+            start_time = time.time()
+            parallel_pages = read_pdf_pages(file_buffer=file_buffer, page_indices=page_indices, extract_text=False, max_workers=None)
+            parallel_time = time.time() - start_time
+
+            print(f"Tables of a {num_pages} page PDF: {serial_time:.3f}s -> {parallel_time:.3f}s")
+
+            self.assertEqual(serial_pages, parallel_pages)
+            if num_pages >= 200:
+                self.assertLess(parallel_time, serial_time)
+
+
+if __name__ == "__main__":
+    unittest.main()
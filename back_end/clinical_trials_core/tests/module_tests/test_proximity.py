@@ -0,0 +1,100 @@
+import sys
+
+sys.path.append("..")
+sys.path.append("../src/")
+
+import random
+import time
+import unittest
+
+import numpy as np
+
+from clinicaltrials.proximity import distance_to_span, nearest_distance, nearest_pair, sorted_positions, window_distance
+
+
+def random_positions(random_state: random.Random, max_count: int, length: int = 200) -> set:
+    return {random_state.randrange(length) for _ in range(random_state.randint(0, max_count))}
+
+
+class TestProximity(unittest.TestCase):
+    def test_nearest_distance_same_as_pairwise(self):
+        random_state = random.Random(0)
+        for _ in range(500):
+            positions = random_positions(random_state=random_state, max_count=20)
+            targets = random_positions(random_state=random_state, max_count=20)
+            expected = min([abs(i - j) for i in targets for j in positions], default=None)
+
+            self.assertEqual(expected, nearest_distance(positions=sorted_positions(positions), targets=sorted_positions(targets)))
+
+    def test_nearest_pair(self):
+        self.assertIsNone(nearest_pair(positions=sorted_positions([]), targets=sorted_positions([3])))
+        self.assertEqual((2, 10, 12), nearest_pair(positions=sorted_positions([1, 12, 30]), targets=sorted_positions([10, 40])))
+        # * On a tie the lowest target, then the lowest position, wins
+        self.assertEqual((1, 5, 4), nearest_pair(positions=sorted_positions([4, 6, 21]), targets=sorted_positions([5, 20])))
+
+        random_state = random.Random(1)
+        for _ in range(200):
+            positions = sorted_positions(random_positions(random_state=random_state, max_count=20))
+            targets = sorted_positions(random_positions(random_state=random_state, max_count=20))
+            nearest = nearest_pair(positions=positions, targets=targets)
+            if nearest is None:
+                continue
+            distance, target, position = nearest
+            self.assertEqual(distance, abs(target - position))
+            self.assertEqual(distance, nearest_distance(positions=positions, targets=targets))
+
+    def test_distance_to_span_same_as_pairwise(self):
+        random_state = random.Random(2)
+        for _ in range(500):
+            positions = random_positions(random_state=random_state, max_count=20)
+            start = random_state.randrange(200)
+            end = start + random_state.randint(1, 5)
+            for before_only in (False, True):
+                expected = min([min(abs(i - start), abs(i - end)) for i in positions if not (before_only and i >= start)], default=None)
+
+                self.assertEqual(expected, distance_to_span(positions=sorted_positions(positions), start=start, end=end, before_only=before_only))
+
+    def test_window_distance_same_as_scan(self):
+        random_state = random.Random(3)
+        for _ in range(1000):
+            length = random_state.randint(1, 60)
+            positions = random_positions(random_state=random_state, max_count=10, length=length + 1)
+            start = random_state.randrange(length)
+            end = min(start + random_state.randint(1, 4), length)
+
+            expected = None
+            for j in range(max(start - 10, 0), min(end + 10, length)):
+                if j in positions:
+                    distance = start - j if j < start else abs(j - end)
+                    expected = distance if expected is None else min(expected, distance)
+
+            self.assertEqual(expected, window_distance(positions=sorted_positions(positions), start=start, end=end, window=10, length=length))
+
+    def test_speedup(self):
+        random_state = random.Random(4)
+        positions = random_positions(random_state=random_state, max_count=2000, length=200000)
+        targets = random_positions(random_state=random_state, max_count=2000, length=200000)
+
+        start_time = time.time()
+        expected = min(abs(i - j) for i in targets for j in positions)
+        pairwise_time = time.time() - start_time
+
+        start_time = time.time()
+        distance = nearest_distance(positions=sorted_positions(positions), targets=sorted_positions(targets))
+        sorted_time = time.time() - start_time
+
+        print(f"Nearest of {len(targets)} x {len(positions)} positions: {pairwise_time:.3f}s -> {sorted_time:.4f}s")
+
+        self.assertEqual(expected, distance)
+        self.assertLess(sorted_time * 10, pairwise_time)
+
+    def test_empty(self):
+        empty = sorted_positions(set())
+        self.assertEqual(np.int64, empty.dtype)
+        self.assertIsNone(nearest_distance(positions=empty, targets=sorted_positions([1])))
+        self.assertIsNone(distance_to_span(positions=sorted_positions([5]), start=3, end=4, before_only=True))
+        self.assertIsNone(window_distance(positions=empty, start=3, end=4, window=10, length=20))
+
+
+if __name__ == "__main__":
+    unittest.main()
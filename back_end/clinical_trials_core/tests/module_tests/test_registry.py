@@ -0,0 +1,61 @@
+import sys
+
+sys.path.append("..")
+sys.path.append("../src/")
+
+import os
+import subprocess
+import unittest
+
+from clinicaltrials.core import BaseProcessor, ClinicalTrial
+from clinicaltrials.registry import PROCESSORS
+
+
+class TestRegistry(unittest.TestCase):
+    def test_metadata_without_importing_processors(self):
+        # * A fresh interpreter, as this one may already have imported processors for other tests
+        code = (
+            "import sys\n"
+            "from clinicaltrials.core import ClinicalTrial\n"
+            "ct = ClinicalTrial()\n"
+            "assert len(ct.metadata_dict) == len(ct.modules)\n"
+            "print(sorted(name for name in sys.modules if name.split('.')[-1] in ct.modules))\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+
+        self.assertEqual("[]", output.strip())
+
+    def test_metadata_without_nlp_stack(self):
+        code = (
+            "import sys\n"
+            "from clinicaltrials.core import ClinicalTrial\n"
+            "assert len(ClinicalTrial().metadata) > 0\n"
+            "print('spacy' in sys.modules)\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+
+        self.assertEqual("False", output.strip())
+
+    def test_processors_match_registry(self):
+        ct = ClinicalTrial()
+        for module_name, definition in PROCESSORS.items():
+            processor = ct.get_module(module_name)
+            self.assertIsInstance(processor, BaseProcessor)
+            self.assertEqual(module_name, processor.module_name)
+            self.assertIs(definition.metadata, processor.metadata)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import sys
+
+sys.path.append("..")
+sys.path.append("../src/")
+
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from clinicaltrials.core import ClinicalTrial, Document, Page
+from clinicaltrials.products import get_product
+from clinicaltrials.schedule_of_events import find_schedule_of_events_pages, is_schedule_of_events_page
+from tests.fixtures.fixture_pdf import make_pdf
+
+ct = ClinicalTrial()
+
+SCHEDULE_OF_EVENTS = (["Table 3. Schedule of Assessments"],
+                      [["Procedure", "Screening", "Day 1", "Week 4", "Week 12"], ["Informed consent", "X", "", "", ""],
+                       ["ECG", "X", "X", "", "X"], ["Blood sample", "x", "X", "X", "X"], ["Adverse events", "", "X", "X", "X"]])
+
+VISIT_TABLE = (["Appendix B Laboratory procedures"],
+               [["Visit", "1", "2", "3", "4"], ["Urinalysis", "X", "", "X", ""], ["Pregnancy test", "X", "X", "", "X"]])
+
+ABBREVIATIONS = (["List of abbreviations"], [["AE", "Adverse event"], ["ECG", "Electrocardiogram"], ["PK", "Pharmacokinetics"]])
+
+PROSE = (["The primary endpoint is progression-free survival, assessed by the investigator.",
+          "Patients will be followed up until disease progression or death."], [])
+
+
+def make_document(pages: list[tuple[list[str], list[list[str]]]]) -> Document:
+    # * The text of a page as the document parser gives it, a line per line of text and per row of the table
+    return Document(
+        pages=[Page(content="\n".join(lines + [" ".join(cell for cell in row if cell) for row in table]), page_number=page_no + 1)
+               for page_no, (lines, table) in enumerate(pages)],
+        file_buffer=make_pdf(pages),
+    )
+
+
+class TestScheduleOfEvents(unittest.TestCase):
+    def test_detector(self):
+        self.assertTrue(is_schedule_of_events_page("Visit: 1 2 3 4 5 6 7 8 9\nDay: D0 D7 D14 D112"))
+        self.assertTrue(is_schedule_of_events_page("Week 0 4 8 12\nDosing"))
+        self.assertTrue(is_schedule_of_events_page("Urinalysis Local lab Local lab X — — X — — X — —"))
+        self.assertTrue(is_schedule_of_events_page("Pregnancy test\nX10\nX\n✓\n×"))
+        self.assertTrue(is_schedule_of_events_page("Appendix A: Schedule of Events"))
+        self.assertFalse(is_schedule_of_events_page("Patients will be seen at day 1 and at week 4 for an X-ray."))
+        self.assertFalse(is_schedule_of_events_page("Figure X shows the design."))
+        self.assertFalse(is_schedule_of_events_page(""))
+
+        self.assertEqual([0, 1], find_schedule_of_events_pages([" ".join(PROSE[0]) + "\nSchedule of events", "ECG X X X", "AE Adverse event"]))
+
+    def test_tables_of_detected_pages(self):
+        pages = [PROSE, SCHEDULE_OF_EVENTS, ABBREVIATIONS, VISIT_TABLE]
+        document = make_document(pages=pages)
+        self.assertEqual([False, False, False, False], [page.are_tables_loaded for page in document.pages])
+
+        table_cells = get_product(document=document, name="table_cells")
+        self.assertEqual([False, True, False, True], [page.are_tables_loaded for page in document.pages])
+
+        all_tables = make_document(pages=pages)
+        all_tables.extract_tables(file_buffer=all_tables.file_buffer)
+        self.assertEqual(1, len(all_tables.pages[2].tables))
+
+        self.assertEqual([0, 1, 0, 1], [len(tables) for tables in table_cells])
+        self.assertEqual([all_tables.pages[1].tables, all_tables.pages[3].tables], [document.pages[1].tables, document.pages[3].tables])
+        self.assertEqual([["Blood sample", "X", "X", "X", "X"]], [row for row in table_cells[1][0] if row[0] == "Blood sample"])
+
+    def test_tables_read_from_pdf(self):
+        document = make_document(pages=[PROSE, ABBREVIATIONS])
+        self.assertEqual(1, len(document.pages[1].tables))
+        self.assertEqual([False, True], [page.are_tables_loaded for page in document.pages])
+        self.assertEqual([], document.pages[0].tables)
+
+        document.pages[0].tables = [[["ECG", "X"]]]
+        self.assertEqual([[["ECG", "X"]]], document.pages[0].tables)
+
+        copy = Document.from_bytes(data=make_document(pages=[ABBREVIATIONS]).to_bytes())
+        self.assertFalse(copy.pages[0].are_tables_loaded)
+        self.assertEqual(1, len(copy.pages[0].tables))
+
+    def test_tables_read_once_by_concurrent_threads(self):
+        document = make_document(pages=[ABBREVIATIONS])
+        extract_tables = document.extract_tables
+        calls = []
+
+        def slow_extract_tables(**kwargs):
+            calls.append(kwargs["page_indices"])
+            time.sleep(0.2)
+            extract_tables(**kwargs)
+
+        document.extract_tables = slow_extract_tables
+
+        # * Printing or comparing a page does not read its tables
+        repr(document.pages[0])
+        self.assertEqual(document.pages[0], document.pages[0])
+        self.assertFalse(document.pages[0].are_tables_loaded)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(lambda: document.pages[0].tables) for _ in range(4)]
+            time.sleep(0.1)
+            self.assertFalse(document.pages[0].are_tables_loaded)
+            tables = [future.result() for future in futures]
+
+        self.assertEqual([[0]], calls)
+        self.assertEqual([1, 1, 1, 1], [len(page_tables) for page_tables in tables])
+        self.assertTrue(document.pages[0].are_tables_loaded)
+
+    def test_same_predictions_as_all_tables(self):
+        pages = [PROSE, SCHEDULE_OF_EVENTS, ABBREVIATIONS, VISIT_TABLE, PROSE]
+        all_tables = make_document(pages=pages)
+        all_tables.extract_tables(file_buffer=all_tables.file_buffer)
+        all_tables.file_buffer = None
+
+        for module_name in ("num_visits", "num_interventions_per_visit", "num_interventions_total"):
+            module = ct.get_module(module_name)
+            expected = module.process(document=all_tables)["prediction"]
+            self.assertLess(0, expected)
+            self.assertEqual(expected, module.process(document=make_document(pages=pages))["prediction"])
+
+    def test_document_without_pdf(self):
+        document = Document(pages=[Page(content="ECG", page_number=1, tables=[[["ECG", "✓"]]])])
+        self.assertEqual([[[["ECG", "X"]]]], get_product(document=document, name="table_cells"))
+
+    def test_serialised_with_pdf(self):
+        document = make_document(pages=[SCHEDULE_OF_EVENTS])
+        copy = Document.from_bytes(data=document.to_bytes())
+        self.assertEqual(document.file_buffer, copy.file_buffer)
+        self.assertEqual(1, len(get_product(document=copy, name="table_cells")[0]))
+
+    def test_speedup(self):
+        pages = [ABBREVIATIONS if page_no % 2 == 0 else PROSE for page_no in range(60)]
+        pages[20] = SCHEDULE_OF_EVENTS
+        pages[41] = VISIT_TABLE
+        file_buffer = make_pdf(pages)
+
+        start_time = time.time()
+        make_document(pages=pages).extract_tables(file_buffer=file_buffer)
+        all_pages_time = time.time() - start_time
+
+        start_time = time.time()
+        table_cells = get_product(document=make_document(pages=pages), name="table_cells")
+        detected_pages_time = time.time() - start_time
+
+        print(f"Tables of a {len(pages)} page protocol: {all_pages_time:.3f}s -> {detected_pages_time:.3f}s")
+
+        self.assertEqual([20, 41], [page_no for page_no, tables in enumerate(table_cells) if tables])
+        self.assertLess(detected_pages_time, all_pages_time)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import sys
+
+sys.path.append("..")
+sys.path.append("../src/")
+
+import random
+import unittest
+
+import spacy
+from spacy.training import Example
+
+from clinicaltrials.core import Document, Page
+from clinicaltrials.textcat import make_doc, predict_cats
+
+WORDS = ("The trial will recruit 120 patients in 3 arms in the UK , Kenya and the USA .\n\nPhase 2 randomised , "
+         "multicentre international study ; n = 40 per group . don't U.S. (approximately) 5-year\n").split(" ")
+
+
+def make_classifier() -> spacy.language.Language:
+    random_state = random.Random(0)
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    textcat = nlp.add_pipe("textcat")
+    for label in ("1", "2", "3+"):
+        textcat.add_label(label)
+
+    texts = [" ".join(random_state.choice(WORDS) for _ in range(random_state.randint(5, 100))) for _ in range(10)]
+    examples = [Example.from_dict(nlp.make_doc(text), {"cats": {"1": float(idx % 2 == 0), "2": float(idx % 2 == 1), "3+": 0.0}})
+                for idx, text in enumerate(texts)]
+    nlp.initialize(lambda: examples)
+    nlp.update(examples)
+    return nlp
+
+
+class TestTextcat(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.nlp = make_classifier()
+
+    def test_same_as_pipeline(self):
+        random_state = random.Random(1)
+        texts = [" ".join(random_state.choice(WORDS) for _ in range(random_state.randint(0, 300))) for _ in range(10)]
+
+        expected = [dict(self.nlp(text).cats) for text in texts]
+
+        self.assertEqual(expected, predict_cats(nlp=self.nlp, docs=[self.nlp.make_doc(text) for text in texts]))
+        self.assertEqual(expected, predict_cats(nlp=self.nlp, docs=[self.nlp.make_doc(text) for text in texts], batch_size=3))
+
+    def test_textcat_only(self):
+        doc = self.nlp.make_doc("Phase 2 trial. Two arms.")
+        predict_cats(nlp=self.nlp, docs=[doc])
+        self.assertEqual({"1", "2", "3+"}, set(doc.cats))
+        self.assertFalse(doc.has_annotation("SENT_START"))
+
+    def test_make_doc(self):
+        document = Document(pages=[Page(content="Phase 2 trial in the UK", page_number=1), Page(content="", page_number=2),
+                                   Page(content="Two arms (approximately)", page_number=3)])
+        tokenised_pages = document.tokenised_pages
+
+        doc = make_doc(vocab=self.nlp.vocab, tokenised_pages=tokenised_pages)
+
+        self.assertIs(self.nlp.vocab, doc.vocab)
+        self.assertEqual([token.text for page in tokenised_pages for token in page], [token.text for token in doc])
+        self.assertEqual("".join(page.text_with_ws for page in tokenised_pages), doc.text)
+        self.assertEqual(0, len(make_doc(vocab=self.nlp.vocab, tokenised_pages=[])))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import sys
+
+sys.path.append("..")
+sys.path.append("../src/")
+
+import unittest
+
+import numpy as np
+from scipy.sparse import issparse
+
+from clinicaltrials.core import Document, Page
+from clinicaltrials.resources import nlp
+from clinicaltrials.token_features import TermIndex, TokenIndex
+
+VOCABULARY = {"placebo": 0, "patients": 1, "cancer": 2, "12": 3, "absent": 4}
+
+
+def make_document() -> Document:
+    return Document(
+        pages=[
+            Page(content="Placebo was given to 12 Patients.\n\nThe cancer  patients", page_number=1),
+            Page(content="", page_number=2),
+            Page(content="12 placebo, twelve PATIENTS (cancer).", page_number=3),
+        ]
+    )
+
+
+class TestTokenFeatures(unittest.TestCase):
+    def test_arrays_match_tokens(self):
+        context = make_document().context
+        for tokenisation in ("normalised", "compatible"):
+            arrays = context.get_token_arrays(tokenisation=tokenisation)
+            tokens = [(page_no, token) for page_no, doc in enumerate(context.get_docs(tokenisation=tokenisation)) for token in doc]
+
+            self.assertEqual(len(tokens), len(arrays))
+            self.assertEqual(3, arrays.num_pages)
+            for token_idx, (page_no, token) in enumerate(tokens):
+                self.assertEqual(token.norm_, nlp.vocab.strings[int(arrays.norm[token_idx])])
+                self.assertEqual(token.text.lower(), nlp.vocab.strings[int(arrays.lower[token_idx])])
+                self.assertEqual(token.text, arrays.text(token_idx))
+                self.assertEqual(token.like_num, arrays.like_num[token_idx])
+                self.assertEqual(token.is_punct, arrays.is_punct[token_idx])
+                self.assertEqual(token.idx, arrays.idx[token_idx])
+                self.assertEqual(len(token.text), arrays.length[token_idx])
+                self.assertEqual(page_no, arrays.page[token_idx])
+
+        self.assertIs(context.token_arrays, context.get_token_arrays())
+
+    def test_count_same_as_token_loop(self):
+        context = make_document().context
+        arrays = context.token_arrays
+
+        token_counts = np.zeros((context.num_pages, len(VOCABULARY)))
+        for page_no, doc in enumerate(context.docs):
+            for token in doc:
+                if token.norm_ in VOCABULARY:
+                    token_counts[page_no, VOCABULARY[token.norm_]] += 1
+
+        term_index = TermIndex(vocabulary=VOCABULARY)
+        page_token_counts = term_index.count(hash_ids=arrays.norm, rows=arrays.page, num_rows=arrays.num_pages)
+        self.assertTrue(issparse(page_token_counts))
+        np.testing.assert_array_equal(token_counts, page_token_counts.toarray())
+        np.testing.assert_array_equal(token_counts.sum(axis=0, keepdims=True), term_index.count(hash_ids=arrays.norm).toarray())
+
+    def test_token_index(self):
+        context = make_document().context
+        arrays = context.token_arrays
+        token_index = context.get_token_index(attribute="lower")
+        positions = token_index.find(["patients", "absent"])
+        self.assertEqual(["Patients", "patients", "PATIENTS"], [arrays.text(token_idx) for token_idx in positions])
+        self.assertEqual([0, 0, 2], list(arrays.page[positions]))
+        self.assertEqual(0, len(token_index.find(["absent"])))
+        self.assertIs(token_index, context.get_token_index(attribute="lower"))
+
+    def test_token_index_same_as_token_loop(self):
+        context = make_document().context
+        for tokenisation in ("normalised", "compatible"):
+            tokens = [token for doc in context.get_docs(tokenisation=tokenisation) for token in doc]
+            for attribute in ("orth", "norm", "lower"):
+                token_index = context.get_token_index(attribute=attribute, tokenisation=tokenisation)
+                for terms in (["placebo"], ["12", "patients", "cancer"], ["Patients", "twelve", "\n\n"]):
+                    expected = [token_idx for token_idx, token in enumerate(tokens) if getattr(token, f"{attribute}_") in terms]
+                    self.assertEqual(expected, list(token_index.find(terms)))
+
+    def test_empty_document(self):
+        arrays = Document(pages=[]).context.token_arrays
+        self.assertEqual(0, len(arrays))
+        self.assertEqual((1, len(VOCABULARY)), TermIndex(vocabulary=VOCABULARY).count(hash_ids=arrays.norm).shape)
+        self.assertEqual(0, len(TokenIndex(hash_ids=arrays.norm).find(["patients"])))
+
+
+if __name__ == "__main__":
+    unittest.main()